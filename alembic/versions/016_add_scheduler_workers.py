@@ -0,0 +1,33 @@
+"""Add scheduler_workers lease table for multi-worker endpoint sharding.
+
+Revision ID: 016_add_scheduler_workers
+Revises: 015_add_ai_memory
+Create Date: 2026-10-16
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "016_add_scheduler_workers"
+down_revision = "015_add_ai_memory"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "scheduler_workers",
+        sa.Column("worker_id", sa.String(128), primary_key=True),
+        sa.Column("hostname", sa.String(255), nullable=False),
+        sa.Column("pid", sa.Integer, nullable=False),
+        sa.Column("started_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("heartbeat_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index(
+        "ix_scheduler_workers_heartbeat_at", "scheduler_workers", ["heartbeat_at"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_scheduler_workers_heartbeat_at", table_name="scheduler_workers")
+    op.drop_table("scheduler_workers")
@@ -0,0 +1,24 @@
+"""Add per-endpoint adaptive scheduling bounds.
+
+Revision ID: 017_add_adaptive_interval_bounds
+Revises: 016_add_scheduler_workers
+Create Date: 2026-10-16
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "017_add_adaptive_interval_bounds"
+down_revision = "016_add_scheduler_workers"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("api_endpoints", sa.Column("min_interval_seconds", sa.Integer, nullable=True))
+    op.add_column("api_endpoints", sa.Column("max_interval_seconds", sa.Integer, nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("api_endpoints", "max_interval_seconds")
+    op.drop_column("api_endpoints", "min_interval_seconds")
@@ -0,0 +1,26 @@
+"""Add per-phase HTTP timings to api_runs.
+
+Revision ID: 018_add_run_phase_timings
+Revises: 017_add_adaptive_interval_bounds
+Create Date: 2026-10-16
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "018_add_run_phase_timings"
+down_revision = "017_add_adaptive_interval_bounds"
+branch_labels = None
+depends_on = None
+
+_COLUMNS = ("dns_ms", "connect_ms", "tls_ms", "ttfb_ms", "download_ms")
+
+
+def upgrade() -> None:
+    for name in _COLUMNS:
+        op.add_column("api_runs", sa.Column(name, sa.Float, nullable=True))
+
+
+def downgrade() -> None:
+    for name in reversed(_COLUMNS):
+        op.drop_column("api_runs", name)
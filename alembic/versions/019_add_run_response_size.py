@@ -0,0 +1,27 @@
+"""Add response size and truncation flag to api_runs.
+
+Revision ID: 019_add_run_response_size
+Revises: 018_add_run_phase_timings
+Create Date: 2026-10-16
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "019_add_run_response_size"
+down_revision = "018_add_run_phase_timings"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("api_runs", sa.Column("response_bytes", sa.Integer, nullable=True))
+    op.add_column(
+        "api_runs",
+        sa.Column("response_truncated", sa.Boolean(), nullable=False, server_default=sa.text("false")),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("api_runs", "response_truncated")
+    op.drop_column("api_runs", "response_bytes")
@@ -0,0 +1,36 @@
+"""Add endpoint_latency_stats for persisted streaming latency baselines.
+
+Revision ID: 020_add_endpoint_latency_stats
+Revises: 019_add_run_response_size
+Create Date: 2026-10-16
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "020_add_endpoint_latency_stats"
+down_revision = "019_add_run_response_size"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "endpoint_latency_stats",
+        sa.Column(
+            "endpoint_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("api_endpoints.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column("state", postgresql.JSON, nullable=False),
+        sa.Column("sample_count", sa.Integer, nullable=False, server_default="0"),
+        sa.Column(
+            "updated_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("endpoint_latency_stats")
@@ -0,0 +1,94 @@
+"""Add endpoint_latency_histograms and backfill the last 30 days from api_runs.
+
+Revision ID: 021_add_endpoint_latency_histograms
+Revises: 020_add_endpoint_latency_stats
+Create Date: 2026-10-16
+"""
+
+from datetime import datetime, timedelta, timezone
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from app.monitoring.pipeline_stats import LatencyHistogram
+
+revision = "021_add_endpoint_latency_histograms"
+down_revision = "020_add_endpoint_latency_stats"
+branch_labels = None
+depends_on = None
+
+# Longest SLA window ("30d").
+BACKFILL_DAYS = 30
+
+
+def upgrade() -> None:
+    table = op.create_table(
+        "endpoint_latency_histograms",
+        sa.Column(
+            "endpoint_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("api_endpoints.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column("bucket_start", sa.DateTime(timezone=True), primary_key=True),
+        sa.Column(
+            "organization_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("organizations.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("sample_count", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("counts", sa.LargeBinary, nullable=False),
+    )
+    op.create_index(
+        "ix_latency_histograms_org_bucket",
+        "endpoint_latency_histograms",
+        ["organization_id", "bucket_start"],
+    )
+    _backfill(table)
+
+
+def _backfill(table: sa.Table) -> None:
+    """One endpoint at a time, so memory stays bounded by one endpoint's hours."""
+    since = datetime.now(timezone.utc) - timedelta(days=BACKFILL_DAYS)
+    rows = op.get_bind().execution_options(stream_results=True).execute(
+        sa.text(
+            # UTC hours, as bucket_start() uses — not the session TimeZone's.
+            "SELECT endpoint_id, organization_id, "
+            "date_trunc('hour', created_at AT TIME ZONE 'UTC') AT TIME ZONE 'UTC' AS hour, "
+            "response_time_ms FROM api_runs "
+            "WHERE created_at >= :since AND response_time_ms IS NOT NULL "
+            "ORDER BY endpoint_id, hour"
+        ),
+        {"since": since},
+    )
+    current = None
+    buckets: dict = {}
+
+    def write() -> None:
+        if buckets:
+            op.bulk_insert(table, [
+                {
+                    "endpoint_id": endpoint_id, "bucket_start": hour,
+                    "organization_id": organization_id,
+                    "sample_count": hist.count, "counts": hist.to_bytes(),
+                }
+                for (endpoint_id, hour), (organization_id, hist) in buckets.items()
+            ])
+            buckets.clear()
+
+    for endpoint_id, organization_id, hour, latency_ms in rows:
+        if endpoint_id != current:
+            write()
+            current = endpoint_id
+        key = (endpoint_id, hour)
+        if key not in buckets:
+            buckets[key] = (organization_id, LatencyHistogram())
+        buckets[key][1].observe(latency_ms)
+    write()
+
+
+def downgrade() -> None:
+    op.drop_index("ix_latency_histograms_org_bucket", table_name="endpoint_latency_histograms")
+    op.drop_table("endpoint_latency_histograms")
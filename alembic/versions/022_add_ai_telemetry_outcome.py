@@ -0,0 +1,25 @@
+"""Add outcome to ai_telemetry so avoided LLM calls can be recorded.
+
+Revision ID: 022_add_ai_telemetry_outcome
+Revises: 021_add_endpoint_latency_histograms
+Create Date: 2026-10-16
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "022_add_ai_telemetry_outcome"
+down_revision = "021_add_endpoint_latency_histograms"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "ai_telemetry",
+        sa.Column("outcome", sa.String(20), nullable=False, server_default="called"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("ai_telemetry", "outcome")
@@ -0,0 +1,241 @@
+"""
+Per-organization LLM budgets.
+
+Responsibilities:
+  - Keep two token buckets per organization: LLM tokens per minute
+    (``LLM_BUDGET_TOKENS_PER_MINUTE``) and USD per day
+    (``LLM_BUDGET_USD_PER_DAY``).  Both refill continuously up to one
+    period's allowance, so a quiet tenant can burst to its full budget
+    and a busy one is held to its rate.
+  - Predict a call's tokens and cost before it is made — prompt length
+    at ~4 characters per token plus ``EXPECTED_COMPLETION_TOKENS``,
+    priced with the ``llm_client`` cost table — and admit it only if
+    both buckets cover the prediction.
+  - Settle each call against its actual telemetry: refund what was
+    over-predicted, charge what was under (a bucket may go negative,
+    which delays the tenant's next call).
+
+``LLMClient`` checks the budget before a call waits for a slot, so an
+over-budget tenant degrades to its fallback immediately and never
+holds a place in the shared queue.  ``LLM_BUDGET_TENANT_WEIGHTS`` scales
+one organization's budget.  A limit of 0 disables that bucket.
+
+State is per process.  So that a restart does not grant a fresh day,
+``seed()`` charges each organization's USD bucket at startup with what
+it spent in ``ai_telemetry`` over the last 24 hours.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING, Any, Callable
+
+from app.core.config import settings
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+    from app.ai.llm_client import CallTelemetry
+
+logger = logging.getLogger(__name__)
+
+CHARS_PER_TOKEN = 4
+EXPECTED_COMPLETION_TOKENS = 250
+SECONDS_PER_MINUTE = 60.0
+SECONDS_PER_DAY = 86400.0
+
+
+@dataclass(frozen=True, slots=True)
+class Prediction:
+    """Expected tokens and USD of one call."""
+
+    tokens: int
+    cost_usd: float
+
+
+@dataclass(slots=True)
+class _Bucket:
+    capacity: float
+    per_second: float
+    level: float
+    updated_at: float
+
+    def refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated_at) * self.per_second)
+        self.updated_at = now
+
+
+@dataclass(slots=True)
+class _OrgBudget:
+    tokens: _Bucket | None
+    usd: _Bucket | None
+    admitted: int = 0
+    denied: int = 0
+    tokens_used: int = 0
+    cost_usd: float = 0.0
+
+
+class LLMBudget:
+    """Token-bucket budgets per organization for tokens/minute and USD/day."""
+
+    def __init__(
+        self,
+        *,
+        tokens_per_minute: int | None = None,
+        usd_per_day: float | None = None,
+        tenant_weights: dict[str, float] | None = None,
+        clock: Callable[[], float] = time.monotonic,
+        factory: async_sessionmaker[AsyncSession] | None = None,
+    ) -> None:
+        self._tokens_per_minute = tokens_per_minute
+        self._usd_per_day = usd_per_day
+        self._weights = tenant_weights
+        self._clock = clock
+        self._factory = factory
+        self._orgs: dict[uuid.UUID, _OrgBudget] = {}
+
+    @property
+    def tokens_per_minute(self) -> int:
+        if self._tokens_per_minute is not None:
+            return self._tokens_per_minute
+        return settings.LLM_BUDGET_TOKENS_PER_MINUTE
+
+    @property
+    def usd_per_day(self) -> float:
+        if self._usd_per_day is not None:
+            return self._usd_per_day
+        return settings.LLM_BUDGET_USD_PER_DAY
+
+    @property
+    def enabled(self) -> bool:
+        return self.tokens_per_minute > 0 or self.usd_per_day > 0
+
+    # ── lifecycle ────────────────────────────────────────────────────
+
+    async def seed(self) -> int:
+        """
+        Charge each organization's USD bucket with the ``called`` spend
+        recorded in the last 24 hours — one grouped query, run once at
+        startup before any LLM call.  A failed lookup leaves the buckets
+        full.  Returns the number of organizations charged.
+        """
+        if self.usd_per_day <= 0:
+            return 0
+        from app.repositories.ai_telemetry import AiTelemetryRepository
+
+        factory = self._factory
+        if factory is None:
+            from app.db.session import async_session_factory as factory
+        since = datetime.now(timezone.utc) - timedelta(seconds=SECONDS_PER_DAY)
+        try:
+            async with factory() as session:
+                spend = await AiTelemetryRepository(session).get_cost_by_org_since(since)
+        except Exception:
+            logger.exception("LLM budget seeding failed — USD buckets start full")
+            return 0
+        for organization_id, spent in spend.items():
+            org = self._org(organization_id)
+            if org.usd is not None:
+                org.usd.level -= spent
+        logger.info("LLM USD budgets seeded from the last 24h for %d organization(s)", len(spend))
+        return len(spend)
+
+    # ── admission ────────────────────────────────────────────────────
+
+    def predict(self, model: str, system_prompt: str, user_prompt: str) -> Prediction:
+        """Tokens and cost a call is expected to use."""
+        from app.ai.llm_client import _estimate_cost
+
+        prompt_tokens = (len(system_prompt) + len(user_prompt)) // CHARS_PER_TOKEN + 1
+        return Prediction(
+            tokens=prompt_tokens + EXPECTED_COMPLETION_TOKENS,
+            cost_usd=_estimate_cost(model, prompt_tokens, EXPECTED_COMPLETION_TOKENS),
+        )
+
+    def try_acquire(self, organization_id: uuid.UUID, prediction: Prediction) -> bool:
+        """Reserve the predicted spend, or return False if either bucket is short."""
+        org = self._org(organization_id)
+        now = self._clock()
+        for bucket, amount in ((org.tokens, prediction.tokens), (org.usd, prediction.cost_usd)):
+            if bucket is None:
+                continue
+            bucket.refill(now)
+            # A call larger than the whole allowance needs a full bucket.
+            if bucket.level < min(amount, bucket.capacity):
+                org.denied += 1
+                return False
+        if org.tokens is not None:
+            org.tokens.level -= prediction.tokens
+        if org.usd is not None:
+            org.usd.level -= prediction.cost_usd
+        org.admitted += 1
+        return True
+
+    def settle(
+        self,
+        organization_id: uuid.UUID,
+        prediction: Prediction,
+        telemetry: CallTelemetry | None,
+    ) -> None:
+        """Replace the reservation with the call's actual spend (none without telemetry)."""
+        org = self._org(organization_id)
+        tokens = telemetry.total_tokens if telemetry is not None else 0
+        cost = telemetry.cost_usd if telemetry is not None else 0.0
+        if org.tokens is not None:
+            org.tokens.level += prediction.tokens - tokens
+        if org.usd is not None:
+            org.usd.level += prediction.cost_usd - cost
+        org.tokens_used += tokens
+        org.cost_usd += cost
+
+    # ── observability ────────────────────────────────────────────────
+
+    def snapshot(self, organization_id: uuid.UUID) -> dict[str, Any]:
+        """Budget state of one organization, for the AI telemetry API."""
+        org = self._org(organization_id)
+        now = self._clock()
+        for bucket in (org.tokens, org.usd):
+            if bucket is not None:
+                bucket.refill(now)
+        return {
+            "enabled": self.enabled,
+            "tokens_per_minute": org.tokens.capacity if org.tokens else None,
+            "tokens_available": round(org.tokens.level) if org.tokens else None,
+            "usd_per_day": round(org.usd.capacity, 6) if org.usd else None,
+            "usd_available": round(org.usd.level, 6) if org.usd else None,
+            "admitted_calls": org.admitted,
+            "denied_calls": org.denied,
+            "tokens_used": org.tokens_used,
+            "cost_usd": round(org.cost_usd, 6),
+        }
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "organizations": len(self._orgs),
+            "admitted_calls": sum(o.admitted for o in self._orgs.values()),
+            "denied_calls": sum(o.denied for o in self._orgs.values()),
+        }
+
+    # ── internals ────────────────────────────────────────────────────
+
+    def _org(self, organization_id: uuid.UUID) -> _OrgBudget:
+        org = self._orgs.get(organization_id)
+        if org is None:
+            weights = self._weights if self._weights is not None else settings.LLM_BUDGET_TENANT_WEIGHTS
+            weight = weights.get(str(organization_id), 1.0)
+            now = self._clock()
+            org = self._orgs[organization_id] = _OrgBudget(
+                tokens=_new_bucket(self.tokens_per_minute * weight, SECONDS_PER_MINUTE, now),
+                usd=_new_bucket(self.usd_per_day * weight, SECONDS_PER_DAY, now),
+            )
+        return org
+
+def _new_bucket(capacity: float, period_seconds: float, now: float) -> _Bucket | None:
+    if capacity <= 0:
+        return None
+    return _Bucket(capacity, capacity / period_seconds, capacity, now)
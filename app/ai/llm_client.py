@@ -5,17 +5,24 @@ Responsibilities:
   - Manage an async OpenAI client with proper lifecycle.
   - Send structured prompts and parse JSON responses.
   - Retry with exponential backoff on transient failures.
-  - Track metrics (latency, success/failure counts, token usage).
-  - Emit per-call telemetry for the AI FinOps dashboard.
+  - Track metrics (latency, success/failure counts, token usage,
+    in-flight and queued calls).
+  - Return per-call telemetry for the AI FinOps dashboard.
+  - Cap concurrent calls process-wide (``LLM_MAX_CONCURRENT``) with a
+    bounded wait queue (``LLM_QUEUE_SIZE``).
+  - Enforce per-organization token and USD budgets (``LLMBudget``)
+    before a call joins the queue.
   - Fail gracefully — never crash the monitoring pipeline.
 
 Design:
   - Thin wrapper around the official ``openai`` SDK.
-  - Returns parsed dict on success, None on any failure.
-  - Retries up to MAX_RETRIES on timeout/network errors.
+  - ``analyse()`` returns an ``LLMResult``: the parsed dict (None on any
+    failure) and that call's token/latency/cost telemetry for the caller
+    to persist.  No per-call state lives on the client, so pipelines,
+    narratives, memory extraction and the debug assistant can share one
+    instance concurrently.
+  - Retries up to MAX_RETRIES on timeout/network errors, holding its slot.
   - No retries on auth errors or invalid responses (non-recoverable).
-  - After each ``analyse()`` call, ``last_call_telemetry`` contains
-    per-call token/latency/cost data for the runner to persist.
 """
 
 from __future__ import annotations
@@ -24,11 +31,13 @@ import asyncio
 import json
 import logging
 import time
+import uuid
 from dataclasses import dataclass, field
 from typing import Any
 
 from openai import AsyncOpenAI
 
+from app.ai.llm_budget import LLMBudget
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
@@ -57,7 +66,7 @@ def _estimate_cost(
 
 @dataclass
 class CallTelemetry:
-    """Per-call metadata emitted after every ``analyse()`` invocation."""
+    """Per-call metadata returned by every ``analyse()`` invocation."""
 
     model_name: str
     prompt_tokens: int = 0
@@ -69,6 +78,15 @@ class CallTelemetry:
     error_message: str | None = None
 
 
+@dataclass(frozen=True, slots=True)
+class LLMResult:
+    """Parsed response (None on failure) and telemetry of one call."""
+
+    data: dict[str, Any] | None = None
+    telemetry: CallTelemetry | None = None  # None when no call was made
+    over_budget: bool = False  # denied by the organization's LLM budget
+
+
 # ── Metrics tracking ───────────────────────────────────────────────────────
 
 @dataclass
@@ -82,6 +100,11 @@ class LLMMetrics:
     total_tokens_used: int = 0
     total_latency_ms: float = 0.0
     last_error: str | None = None
+    in_flight: int = 0
+    queued: int = 0
+    peak_queued: int = 0
+    rejected_calls: int = 0  # wait queue full
+    budget_denied_calls: int = 0  # organization over its LLM budget
 
     @property
     def success_rate(self) -> float:
@@ -105,6 +128,11 @@ class LLMMetrics:
             "avg_latency_ms": round(self.avg_latency_ms, 1),
             "total_tokens_used": self.total_tokens_used,
             "last_error": self.last_error,
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "peak_queued": self.peak_queued,
+            "rejected_calls": self.rejected_calls,
+            "budget_denied_calls": self.budget_denied_calls,
         }
 
 
@@ -136,11 +164,19 @@ def _is_retryable(error: Exception) -> bool:
 class LLMClient:
     """Async wrapper around OpenAI chat completions with retry and metrics."""
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        *,
+        max_concurrent: int | None = None,
+        max_queue: int | None = None,
+        budget: LLMBudget | None = None,
+    ) -> None:
         self._client: AsyncOpenAI | None = None
         self.metrics = LLMMetrics()
-        self.last_call_telemetry: CallTelemetry | None = None
-        self._last_usage: dict[str, int] | None = None  # from _do_call
+        self.budget = budget if budget is not None else LLMBudget()
+        self._max_concurrent = max(1, max_concurrent or settings.LLM_MAX_CONCURRENT)
+        self._max_queue = max(0, max_queue if max_queue is not None else settings.LLM_QUEUE_SIZE)
+        self._slots = asyncio.BoundedSemaphore(self._max_concurrent)
 
     # ── lifecycle ────────────────────────────────────────────────────
 
@@ -155,10 +191,11 @@ class LLMClient:
             timeout=settings.OPENAI_TIMEOUT_SECONDS,
         )
         logger.info(
-            "LLMClient started (model=%s, timeout=%.0fs, max_retries=%d)",
+            "LLMClient started (model=%s, timeout=%.0fs, max_retries=%d, max_concurrent=%d)",
             settings.OPENAI_MODEL,
             settings.OPENAI_TIMEOUT_SECONDS,
             MAX_RETRIES,
+            self._max_concurrent,
         )
 
     async def shutdown(self) -> None:
@@ -179,33 +216,90 @@ class LLMClient:
         *,
         system_prompt: str,
         user_prompt: str,
-    ) -> dict[str, Any] | None:
+        organization_id: uuid.UUID | None = None,
+    ) -> LLMResult:
         """
-        Send a prompt pair and return the parsed JSON response.
-
-        Retries up to MAX_RETRIES on transient failures with exponential
-        backoff.  Returns ``None`` if all attempts fail.
-
-        After completion, ``self.last_call_telemetry`` contains per-call
-        token/latency/cost data for the pipeline to persist.
+        Send a prompt pair and return the parsed JSON response together
+        with this call's telemetry.
+
+        With an ``organization_id`` the call's predicted tokens and cost
+        are reserved from that organization's budget first; if it cannot
+        afford them the call returns at once with ``over_budget=True``
+        and never joins the queue.  The reservation is settled against
+        the actual usage afterwards.  Waits for one of ``LLM_MAX_CONCURRENT`` slots; when
+        ``LLM_QUEUE_SIZE`` callers are already waiting the call is
+        rejected without reaching the API (``data`` and ``telemetry``
+        both ``None``).  Retries up to MAX_RETRIES on transient failures
+        with exponential backoff.  ``data`` is ``None`` if all attempts
+        fail.
 
         This method **never raises**.
         """
         if self._client is None:
             logger.debug("LLM call skipped — client not available")
-            self.last_call_telemetry = None
-            return None
+            return LLMResult()
+
+        if organization_id is None or not self.budget.enabled:
+            return await self._queued_call(system_prompt, user_prompt)
+
+        prediction = self.budget.predict(settings.OPENAI_MODEL, system_prompt, user_prompt)
+        if not self.budget.try_acquire(organization_id, prediction):
+            self.metrics.budget_denied_calls += 1
+            logger.info(
+                "LLM call skipped — organization %s over its LLM budget", organization_id
+            )
+            return LLMResult(over_budget=True)
+        result = LLMResult()
+        try:
+            result = await self._queued_call(system_prompt, user_prompt)
+        finally:
+            self.budget.settle(organization_id, prediction, result.telemetry)
+        return result
+
+    # ── internal ─────────────────────────────────────────────────────
+
+    async def _queued_call(self, system_prompt: str, user_prompt: str) -> LLMResult:
+        """Wait for a concurrency slot (or be rejected), then call."""
+        waiting = self._slots.locked()
+        if waiting:
+            if self.metrics.queued >= self._max_queue:
+                self.metrics.rejected_calls += 1
+                logger.warning(
+                    "LLM call rejected — %d call(s) in flight, %d queued",
+                    self.metrics.in_flight,
+                    self.metrics.queued,
+                )
+                return LLMResult()
+            self.metrics.queued += 1
+            self.metrics.peak_queued = max(self.metrics.peak_queued, self.metrics.queued)
+        try:
+            await self._slots.acquire()
+        finally:
+            if waiting:
+                self.metrics.queued -= 1
 
+        self.metrics.in_flight += 1
+        try:
+            return await self._call(system_prompt, user_prompt)
+        finally:
+            self.metrics.in_flight -= 1
+            self._slots.release()
+
+    async def _call(self, system_prompt: str, user_prompt: str) -> LLMResult:
+        """One logical call: attempts with retry, metrics and telemetry."""
         self.metrics.total_calls += 1
-        self._last_usage = None
         last_error: Exception | None = None
         call_start = time.monotonic()
 
         for attempt in range(1, MAX_RETRIES + 1):
             start_time = time.monotonic()
             try:
-                result = await self._do_call(system_prompt, user_prompt)
+                result, usage = await self._do_call(system_prompt, user_prompt)
                 elapsed_ms = (time.monotonic() - call_start) * 1000
+                p_tok = usage.get("prompt_tokens", 0)
+                c_tok = usage.get("completion_tokens", 0)
+                t_tok = usage.get("total_tokens", 0)
+                self.metrics.total_tokens_used += t_tok
 
                 if result is not None:
                     self.metrics.successful_calls += 1
@@ -215,41 +309,35 @@ class LLMClient:
                         attempt,
                         elapsed_ms,
                     )
-                    # Emit telemetry
-                    usage = self._last_usage or {}
-                    p_tok = usage.get("prompt_tokens", 0)
-                    c_tok = usage.get("completion_tokens", 0)
-                    t_tok = usage.get("total_tokens", 0)
-                    self.last_call_telemetry = CallTelemetry(
+                    return LLMResult(
+                        result,
+                        CallTelemetry(
+                            model_name=settings.OPENAI_MODEL,
+                            prompt_tokens=p_tok,
+                            completion_tokens=c_tok,
+                            total_tokens=t_tok,
+                            latency_ms=round(elapsed_ms, 1),
+                            success=True,
+                            cost_usd=_estimate_cost(settings.OPENAI_MODEL, p_tok, c_tok),
+                        ),
+                    )
+
+                # result is None — LLM returned unparseable response
+                self.metrics.failed_calls += 1
+                self.metrics.last_error = "Unparseable LLM response"
+                return LLMResult(  # Don't retry parse failures
+                    None,
+                    CallTelemetry(
                         model_name=settings.OPENAI_MODEL,
                         prompt_tokens=p_tok,
                         completion_tokens=c_tok,
                         total_tokens=t_tok,
                         latency_ms=round(elapsed_ms, 1),
-                        success=True,
+                        success=False,
                         cost_usd=_estimate_cost(settings.OPENAI_MODEL, p_tok, c_tok),
-                    )
-                    return result
-
-                # result is None — LLM returned unparseable response
-                elapsed_ms = (time.monotonic() - call_start) * 1000
-                self.metrics.failed_calls += 1
-                self.metrics.last_error = "Unparseable LLM response"
-                usage = self._last_usage or {}
-                p_tok = usage.get("prompt_tokens", 0)
-                c_tok = usage.get("completion_tokens", 0)
-                t_tok = usage.get("total_tokens", 0)
-                self.last_call_telemetry = CallTelemetry(
-                    model_name=settings.OPENAI_MODEL,
-                    prompt_tokens=p_tok,
-                    completion_tokens=c_tok,
-                    total_tokens=t_tok,
-                    latency_ms=round(elapsed_ms, 1),
-                    success=False,
-                    cost_usd=_estimate_cost(settings.OPENAI_MODEL, p_tok, c_tok),
-                    error_message="Unparseable LLM response",
+                        error_message="Unparseable LLM response",
+                    ),
                 )
-                return None  # Don't retry parse failures
 
             except Exception as exc:
                 elapsed_ms = (time.monotonic() - start_time) * 1000
@@ -274,12 +362,6 @@ class LLMClient:
                 total_elapsed = (time.monotonic() - call_start) * 1000
                 self.metrics.failed_calls += 1
                 self.metrics.last_error = str(exc)
-                self.last_call_telemetry = CallTelemetry(
-                    model_name=settings.OPENAI_MODEL,
-                    latency_ms=round(total_elapsed, 1),
-                    success=False,
-                    error_message=str(exc)[:500],
-                )
                 logger.error(
                     "LLM call failed permanently (attempt=%d/%d, latency=%.0fms): %s",
                     attempt,
@@ -287,30 +369,38 @@ class LLMClient:
                     elapsed_ms,
                     exc,
                 )
-                return None
+                return LLMResult(
+                    None,
+                    CallTelemetry(
+                        model_name=settings.OPENAI_MODEL,
+                        latency_ms=round(total_elapsed, 1),
+                        success=False,
+                        error_message=str(exc)[:500],
+                    ),
+                )
 
         # Should not reach here, but safety net
         total_elapsed = (time.monotonic() - call_start) * 1000
         self.metrics.failed_calls += 1
         err_msg = str(last_error) if last_error else "Unknown"
         self.metrics.last_error = err_msg
-        self.last_call_telemetry = CallTelemetry(
-            model_name=settings.OPENAI_MODEL,
-            latency_ms=round(total_elapsed, 1),
-            success=False,
-            error_message=err_msg[:500],
+        return LLMResult(
+            None,
+            CallTelemetry(
+                model_name=settings.OPENAI_MODEL,
+                latency_ms=round(total_elapsed, 1),
+                success=False,
+                error_message=err_msg[:500],
+            ),
         )
-        return None
-
-    # ── internal ─────────────────────────────────────────────────────
 
     async def _do_call(
         self,
         system_prompt: str,
         user_prompt: str,
-    ) -> dict[str, Any] | None:
+    ) -> tuple[dict[str, Any] | None, dict[str, int]]:
         """
-        Single LLM call attempt.  Returns parsed dict or None.
+        Single LLM call attempt.  Returns (parsed dict or None, token usage).
         Raises on network/API errors (caller handles retry).
         """
         if self._client is None:
@@ -326,36 +416,31 @@ class LLMClient:
             response_format={"type": "json_object"},
         )
 
+        usage = {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+        if response.usage:
+            usage = {
+                "prompt_tokens": response.usage.prompt_tokens or 0,
+                "completion_tokens": response.usage.completion_tokens or 0,
+                "total_tokens": response.usage.total_tokens or 0,
+            }
+
         content = response.choices[0].message.content
         if not content:
             logger.warning("LLM returned empty content")
-            return None
+            return None, usage
 
         try:
             parsed = json.loads(content)
         except json.JSONDecodeError as exc:
             logger.error("LLM returned invalid JSON: %s", exc)
-            return None
+            return None, usage
 
         if not isinstance(parsed, dict):
             logger.warning("LLM returned non-dict JSON: %s", type(parsed))
-            return None
-
-        # Track token usage (aggregate + per-call)
-        if response.usage:
-            self._last_usage = {
-                "prompt_tokens": response.usage.prompt_tokens or 0,
-                "completion_tokens": response.usage.completion_tokens or 0,
-                "total_tokens": response.usage.total_tokens or 0,
-            }
-            self.metrics.total_tokens_used += response.usage.total_tokens or 0
-        else:
-            self._last_usage = {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
-        logger.debug(
-            "LLM response parsed (%d tokens)", self._last_usage["total_tokens"]
-        )
+            return None, usage
 
-        return parsed
+        logger.debug("LLM response parsed (%d tokens)", usage["total_tokens"])
+        return parsed, usage
 
 
 # ─── module-level singleton ─────────────────────────────────────────────
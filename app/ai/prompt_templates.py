@@ -14,6 +14,7 @@ Design:
 from __future__ import annotations
 
 import re
+import textwrap
 from typing import Any, Optional
 
 
@@ -36,7 +37,7 @@ def _sanitize(value: str, max_length: int = 500) -> str:
         cleaned = cleaned[:max_length] + "..."
     return cleaned
 
-SYSTEM_PROMPT = """You are an API reliability intelligence engine for SentinelAI.
+_ANALYST_RULES = """You are an API reliability intelligence engine for SentinelAI.
 
 Your job is to analyse API execution summaries and determine whether
 an anomaly exists.  You assess severity, provide concise technical
@@ -47,6 +48,9 @@ RULES:
 - If everything looks normal, set anomaly_detected to false and severity_score to 0.
 - Focus on actionable insights a backend engineer can act on.
 - NEVER hallucinate anomalies.  If data is ambiguous, lean toward "no anomaly".
+- Use the timing breakdown to separate network from server latency: time in
+  DNS / TCP connect / TLS is connection setup (network, or a fresh
+  connection), time-to-first-byte is server processing.
 - Always include your confidence level (0.0 to 1.0) in the analysis.
 
 SEVERITY SCALE (0–100):
@@ -62,19 +66,78 @@ CONFIDENCE SCALE (0.0–1.0):
   0.4–0.6 = Moderate confidence — some signals present
   0.7–0.8 = High confidence — clear signals
   0.9–1.0 = Very high confidence — definitive evidence
+"""
 
-Respond ONLY with a JSON object in this exact shape:
-{
-  "anomaly_detected": boolean,
+_VERDICT_FIELDS = '''  "anomaly_detected": boolean,
   "severity_score": number,
   "reasoning": "string — concise technical explanation",
   "probable_cause": "string — most likely root cause",
   "confidence": number,
-  "recommendation": "string — specific action to take"
-}"""
+  "recommendation": "string — specific action to take"'''
+
+SYSTEM_PROMPT = _ANALYST_RULES + f"""
+Respond ONLY with a JSON object in this exact shape:
+{{
+{_VERDICT_FIELDS}
+}}"""
+
+# Several endpoints of one organization in one call (incident storms).
+BATCH_SYSTEM_PROMPT = _ANALYST_RULES + f"""
+You will receive several numbered runs.  Judge each run on its own data;
+runs failing at the same time may share a root cause — say so in
+probable_cause when the evidence supports it.
+
+Respond ONLY with a JSON object in this exact shape, one entry per run:
+{{
+  "results": [
+    {{
+      "run": number,
+{textwrap.indent(_VERDICT_FIELDS, "    ")}
+    }}
+  ]
+}}"""
+
+_TASKS = [
+    "1. Determine if a genuine anomaly exists (NOT minor fluctuations).",
+    "2. Provide a severity score (0–100) calibrated to the scale above.",
+    "3. Provide concise technical reasoning.",
+    "4. Suggest the most probable root cause.",
+    "5. Provide a confidence score (0.0–1.0).",
+    "6. Suggest a specific recommended action.",
+]
+
+
+def build_user_prompt(**run: Any) -> str:
+    """
+    Build the user prompt from monitoring pipeline data.
+
+    Takes the ``build_run_summary`` arguments.
+    """
+    return single_run_prompt(build_run_summary(**run))
+
+
+def single_run_prompt(summary: str) -> str:
+    """User prompt for one run summary."""
+    return "\n".join([
+        "Analyse the following API execution summary:",
+        "",
+        summary,
+        "",
+        "Tasks:",
+        *_TASKS,
+    ])
+
+
+def build_batch_prompt(summaries: list[str]) -> str:
+    """User prompt for several run summaries, numbered from 1."""
+    lines = [f"Analyse each of the following {len(summaries)} API execution summaries:"]
+    for number, summary in enumerate(summaries, start=1):
+        lines.extend(["", f"Run {number}:", summary])
+    lines.extend(["", "Tasks, for each run:", *_TASKS])
+    return "\n".join(lines)
 
 
-def build_user_prompt(
+def build_run_summary(
     *,
     endpoint_name: str,
     url: str,
@@ -87,9 +150,11 @@ def build_user_prompt(
     schema_diff_summary: dict[str, Any] | None,
     failure_rate_percent: float,
     error_message: str | None,
+    phase_timings: dict[str, float | None] | None = None,
+    latency_source: str | None = None,
 ) -> str:
     """
-    Build the user prompt from monitoring pipeline data.
+    The data lines describing one run.
 
     All parameters are optional-safe — missing data is rendered as "N/A".
     """
@@ -100,8 +165,6 @@ def build_user_prompt(
     safe_error = _sanitize(error_message, max_length=500) if error_message else None
 
     lines = [
-        "Analyse the following API execution summary:",
-        "",
         f"Endpoint: {safe_name}",
         f"URL: {safe_method} {safe_url}",
         f"Expected Status: {expected_status}",
@@ -112,6 +175,11 @@ def build_user_prompt(
         f"Historical Failure Rate: {failure_rate_percent:.1f}%",
     ]
 
+    if phase_timings:
+        lines.append(f"Timing Breakdown: {_fmt_phases(phase_timings)}")
+    if latency_source:
+        lines.append(f"Latency Spike Source: {latency_source}")
+
     if safe_error:
         lines.append(f"Error: {safe_error}")
 
@@ -120,17 +188,6 @@ def build_user_prompt(
     else:
         lines.append("Schema Differences: None")
 
-    lines.extend([
-        "",
-        "Tasks:",
-        "1. Determine if a genuine anomaly exists (NOT minor fluctuations).",
-        "2. Provide a severity score (0–100) calibrated to the scale above.",
-        "3. Provide concise technical reasoning.",
-        "4. Suggest the most probable root cause.",
-        "5. Provide a confidence score (0.0–1.0).",
-        "6. Suggest a specific recommended action.",
-    ])
-
     return "\n".join(lines)
 
 
@@ -148,6 +205,14 @@ def _fmt_pct(value: float | None) -> str:
     return f"{value:+.1f}%"
 
 
+def _fmt_phases(phases: dict[str, float | None]) -> str:
+    labels = (
+        ("dns_ms", "DNS"), ("connect_ms", "Connect"), ("tls_ms", "TLS"),
+        ("ttfb_ms", "TTFB"), ("download_ms", "Download"),
+    )
+    return ", ".join(f"{label} {_fmt_ms(phases.get(key))}" for key, label in labels)
+
+
 def _fmt_schema(diff: dict[str, Any]) -> str:
     """Compact schema diff summary for the prompt."""
     parts: list[str] = []
@@ -10,6 +10,8 @@ pipeline run completes.  It:
 
 Design:
   - Stateless: call ``maybe_alert()`` with pipeline data.
+  - SLA breach and alert rule payloads are built while the run's
+    session is open and sent with ``send_alerts()`` after it commits.
   - Never raises: all errors are logged and swallowed.
   - Respects ``ALERT_MIN_RISK_LEVEL`` from config.
   - Cooldown: at most one alert per endpoint per ALERT_COOLDOWN_SECONDS.
@@ -45,6 +47,12 @@ def _meets_threshold(risk_level: str) -> bool:
     return actual >= threshold
 
 
+def may_alert(pipeline: PipelineResult) -> bool:
+    """Return True if ``maybe_alert`` could dispatch for this run (cooldown aside)."""
+    risk_level = pipeline.risk.risk_level if pipeline.risk else "LOW"
+    return webhook_client.available and _meets_threshold(risk_level)
+
+
 def _in_cooldown(endpoint_id: str) -> bool:
     """Return True if this endpoint was alerted recently (within cooldown)."""
     last_alert = _cooldown_tracker.get(endpoint_id)
@@ -133,7 +141,7 @@ async def maybe_alert(
     }
 
 
-async def maybe_alert_sla_breach(
+def sla_breach_alert(
     *,
     endpoint_id: str,
     endpoint_name: str,
@@ -144,15 +152,18 @@ async def maybe_alert_sla_breach(
     window: str,
     total_runs: int,
     successful_runs: int,
-) -> dict[str, Any]:
+) -> dict[str, Any] | None:
     """
-    Send a webhook alert for an SLA breach.
+    Build the webhook payload for an SLA breach, or ``None`` when the
+    webhook is unavailable or the endpoint is within its SLA cooldown.
 
+    The cooldown starts here; the caller sends the payload with
+    ``send_alerts`` once its transaction has committed.
     This method **never raises**.
     """
     try:
         if not webhook_client.available:
-            return {"alerted": False, "reason": "webhook_unavailable"}
+            return None
 
         # SLA alerts also respect cooldown
         cooldown_key = f"sla_{endpoint_id}"
@@ -161,7 +172,7 @@ async def maybe_alert_sla_breach(
                 "SLA breach alert suppressed for %s: within cooldown",
                 endpoint_name,
             )
-            return {"alerted": False, "reason": "cooldown"}
+            return None
 
         payload = build_sla_breach_payload(
             endpoint_id=endpoint_id,
@@ -176,16 +187,30 @@ async def maybe_alert_sla_breach(
         )
 
         logger.info(
-            "Dispatching SLA breach alert for %s: uptime=%.2f%% < target=%.2f%%",
+            "SLA breach alert queued for %s: uptime=%.2f%% < target=%.2f%%",
             endpoint_name,
             uptime_percent,
             sla_target,
         )
-
-        success = await webhook_client.send(payload)
         _mark_alerted(cooldown_key)
-        return {"alerted": True, "delivered": success, "event": "sla_breach"}
+        return payload
 
     except Exception:
-        logger.exception("SLA breach alert dispatch failed for %s", endpoint_name)
-        return {"alerted": False, "reason": "exception"}
+        logger.exception("SLA breach alert build failed for %s", endpoint_name)
+        return None
+
+
+async def send_alerts(payloads: list[dict[str, Any]]) -> int:
+    """
+    Send queued webhook payloads in order.  Returns how many were delivered.
+
+    This method **never raises**.
+    """
+    delivered = 0
+    for payload in payloads:
+        try:
+            if await webhook_client.send(payload):
+                delivered += 1
+        except Exception:
+            logger.exception("Alert dispatch failed for event %s", payload.get("event"))
+    return delivered
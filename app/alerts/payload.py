@@ -72,7 +72,7 @@ def build_alert_payload(
     }
 
     # ── anomaly (only if AI was called and detected something) ──────
-    if anomaly and anomaly.ai_called and anomaly.anomaly_detected:
+    if anomaly and (anomaly.ai_called or anomaly.cache_hit) and anomaly.anomaly_detected:
         payload["anomaly"] = {
             "severity_score": anomaly.severity_score,
             "reasoning": anomaly.reasoning,
@@ -4,10 +4,14 @@ Rule evaluator — checks each active alert rule against the latest pipeline res
 For each active rule on the endpoint:
   1. Evaluate the condition (latency, failure, status code, drift, risk, SLA).
   2. If the condition matches, increment the consecutive counter.
-  3. If consecutive counter >= required count, trigger the rule (fire webhook + reset).
+  3. If consecutive counter >= required count, trigger the rule (build its
+     webhook payload + reset).
   4. If the condition does NOT match, reset the consecutive counter.
 
-This module is called by the scheduler after each pipeline run.
+This module is called by the scheduler after each pipeline run.  A
+triggered rule's payload is returned under ``"alert"`` in its result; the
+scheduler sends it once the rule's counter reset has committed, so no
+webhook is awaited while the session holds a connection.
 """
 
 from __future__ import annotations
@@ -78,7 +82,7 @@ class RuleEvaluator:
 
             if rule.current_consecutive >= rule.consecutive_count:
                 # Threshold met — trigger the rule
-                await self._trigger(rule, pipeline)
+                alert = self._trigger(rule, pipeline)
                 rule.last_triggered_at = datetime.now(timezone.utc)
                 rule.current_consecutive = 0
                 await self._repo.update(rule)
@@ -87,6 +91,7 @@ class RuleEvaluator:
                     "name": rule.name,
                     "triggered": True,
                     "condition_type": rule.condition_type,
+                    "alert": alert,
                 }
             else:
                 await self._repo.update(rule)
@@ -147,11 +152,11 @@ class RuleEvaluator:
         logger.warning("Unknown condition_type: %s", ct)
         return False
 
-    async def _trigger(self, rule: AlertRule, pipeline: PipelineResult) -> None:
-        """Send webhook for a triggered rule."""
+    def _trigger(self, rule: AlertRule, pipeline: PipelineResult) -> dict[str, Any] | None:
+        """Webhook payload for a triggered rule (``None`` without a webhook)."""
         if not webhook_client.available:
             logger.debug("Webhook unavailable; skipping rule trigger for %s", rule.name)
-            return
+            return None
 
         payload: dict[str, Any] = {
             "event": "alert_rule_triggered",
@@ -190,5 +195,4 @@ class RuleEvaluator:
             rule.threshold,
             pipeline.endpoint_name,
         )
-
-        await webhook_client.send(payload)
+        return payload
@@ -6,16 +6,19 @@ Endpoints:
   GET /daily        → daily breakdown for time-series chart
   GET /by-endpoint  → per-endpoint AI usage ranking
   GET /health       → LLM health (success rate, last error)
+  GET /budget       → the tenant's LLM token / USD budget state
 """
 
 from fastapi import APIRouter, Depends, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.ai.llm_client import llm_client
 from app.core.auth import CurrentUser, TenantId
 from app.core.config import settings
 from app.db.session import get_session
 from app.repositories.ai_telemetry import AiTelemetryRepository
 from app.schemas.ai_telemetry import (
+    AiBudgetResponse,
     AiHealthResponse,
     AiTelemetryStats,
     AiTelemetryStatsResponse,
@@ -88,3 +91,12 @@ async def get_ai_health(
         last_error_at=data["last_error_at"],
         model_name=settings.OPENAI_MODEL,
     )
+
+
+@router.get("/budget", response_model=AiBudgetResponse)
+async def get_ai_budget(
+    user: CurrentUser,
+    tenant_id: TenantId,
+):
+    """LLM budget state — tokens/minute and USD/day left for the tenant."""
+    return AiBudgetResponse(**llm_client.budget.snapshot(tenant_id))
@@ -5,7 +5,7 @@ Returns pre-computed KPI values in a single query so the frontend
 dashboard doesn't need N+1 requests per endpoint.
 
 New chart endpoints (Phase 1):
-  - /response-trends   → hourly avg response times
+  - /response-trends   → hourly avg / p50 / p95 / p99 response times
   - /top-failures      → worst endpoints by failure rate
   - /risk-distribution → count of endpoints per risk level
   - /uptime-overview   → SLA status per endpoint
@@ -28,7 +28,9 @@ from app.models.endpoint_sla import EndpointSLA
 from app.models.risk_score import RiskScore
 from app.models.security_finding import SecurityFinding
 from app.models.schema_snapshot import SchemaSnapshot
-from app.models.ai_telemetry import AiTelemetryRecord
+from app.models.ai_telemetry import OUTCOME_CALLED, AiTelemetryRecord
+from app.monitoring.latency_histograms import latency_histograms
+from app.repositories.latency_stats import EndpointLatencyHistogramRepository
 from app.schemas.dashboard import (
     ResponseTrendsResponse,
     RiskDistribution,
@@ -136,34 +138,26 @@ async def get_response_trends(
     hours: int = Query(default=24, ge=1, le=168),
     session: AsyncSession = Depends(get_session),
 ):
-    """Hourly average response time across all tenant endpoints."""
-    since = datetime.now(timezone.utc) - timedelta(hours=hours)
-
-    hour_trunc = func.date_trunc("hour", ApiRun.created_at)
+    """Hourly response-time average and percentiles across all tenant endpoints.
 
-    rows = await session.execute(
-        select(
-            hour_trunc.label("hour"),
-            func.avg(ApiRun.response_time_ms).label("avg_ms"),
-            func.count().label("cnt"),
-        )
-        .where(
-            ApiRun.organization_id == tenant_id,
-            ApiRun.created_at >= since,
-            ApiRun.response_time_ms.is_not(None),
-        )
-        .group_by(hour_trunc)
-        .order_by(hour_trunc)
+    Read from the hourly latency histograms, not from ``api_runs``.
+    """
+    since = datetime.now(timezone.utc) - timedelta(hours=hours)
+    buckets = await latency_histograms.window(
+        EndpointLatencyHistogramRepository(session), tenant_id, since
     )
 
-    points = [
-        TrendPoint(
-            hour=row.hour.isoformat(),
-            avg_response_time_ms=round(row.avg_ms, 2),
-            request_count=row.cnt,
-        )
-        for row in rows
-    ]
+    points = []
+    for hour, hist in buckets.items():
+        summary = hist.summary()
+        points.append(TrendPoint(
+            hour=hour.isoformat(),
+            avg_response_time_ms=summary["avg"],
+            p50_response_time_ms=summary["p50"],
+            p95_response_time_ms=summary["p95"],
+            p99_response_time_ms=summary["p99"],
+            request_count=hist.count,
+        ))
     return ResponseTrendsResponse(points=points)
 
 
@@ -393,6 +387,7 @@ async def get_feature_summary(
         select(func.count()).where(
             AiTelemetryRecord.organization_id == tenant_id,
             AiTelemetryRecord.created_at >= since,
+            AiTelemetryRecord.outcome == OUTCOME_CALLED,
         )
     ) or 0
 
@@ -13,6 +13,7 @@ from app.schemas.api_endpoint import (
 )
 from app.services.api_endpoint import ApiEndpointService
 from app.scheduler.engine import monitor_scheduler
+from app.scheduler.events import publish_endpoint_change
 
 router = APIRouter(prefix="/endpoints", tags=["endpoints"])
 
@@ -21,6 +22,24 @@ def _get_service(session: AsyncSession = Depends(get_session)) -> ApiEndpointSer
     return ApiEndpointService(ApiEndpointRepository(session))
 
 
+async def _reschedule(session: AsyncSession, endpoint) -> None:  # noqa: ANN001
+    """Commit, then register the endpoint's job locally and in peer processes.
+
+    The local job only changes once the commit has succeeded, so a failed
+    request never leaves it pointing at rolled-back state.
+    """
+    await publish_endpoint_change(session, "upsert", endpoint.id)
+    await session.commit()
+    monitor_scheduler.schedule_endpoint(
+        endpoint.id,
+        endpoint.name,
+        endpoint.monitoring_interval_seconds,
+        min_interval_seconds=endpoint.min_interval_seconds,
+        max_interval_seconds=endpoint.max_interval_seconds,
+        organization_id=endpoint.organization_id,
+    )
+
+
 @router.get("/", response_model=list[ApiEndpointRead])
 async def list_endpoints(
     user: CurrentUser,
@@ -46,8 +65,11 @@ async def create_endpoint(
     user: CurrentUser,
     tenant_id: TenantId,
     service: ApiEndpointService = Depends(_get_service),
+    session: AsyncSession = Depends(get_session),
 ):
-    return await service.create_endpoint(data, tenant_id)
+    endpoint = await service.create_endpoint(data, tenant_id)
+    await _reschedule(session, endpoint)
+    return endpoint
 
 
 @router.patch("/{endpoint_id}", response_model=ApiEndpointRead, dependencies=[RequireWrite])
@@ -57,8 +79,11 @@ async def update_endpoint(
     user: CurrentUser,
     tenant_id: TenantId,
     service: ApiEndpointService = Depends(_get_service),
+    session: AsyncSession = Depends(get_session),
 ):
-    return await service.update_endpoint(endpoint_id, data, tenant_id)
+    endpoint = await service.update_endpoint(endpoint_id, data, tenant_id)
+    await _reschedule(session, endpoint)
+    return endpoint
 
 
 @router.delete("/{endpoint_id}", status_code=204, dependencies=[RequireWrite])
@@ -67,12 +92,11 @@ async def delete_endpoint(
     user: CurrentUser,
     tenant_id: TenantId,
     service: ApiEndpointService = Depends(_get_service),
+    session: AsyncSession = Depends(get_session),
 ):
     await service.delete_endpoint(endpoint_id, tenant_id)
-    # Remove the scheduler job for this endpoint
-    if monitor_scheduler.is_running and monitor_scheduler.scheduler:
-        job_id = f"monitor_{endpoint_id}"
-        try:
-            monitor_scheduler.scheduler.remove_job(job_id)
-        except Exception:
-            pass  # Job may not exist
+    # Remove the scheduler job for this endpoint in peer processes and,
+    # once the delete has committed, here
+    await publish_endpoint_change(session, "delete", endpoint_id)
+    await session.commit()
+    monitor_scheduler.unschedule_endpoint(endpoint_id)
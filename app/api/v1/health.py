@@ -34,7 +34,16 @@ async def detailed_health_check(session: AsyncSession = Depends(get_session)):
     from app.ai.llm_client import llm_client
     from app.alerts.webhook import webhook_client
     from app.api.v1.ws import ws_manager
+    from app.monitoring.analysis_cache import analysis_cache
+    from app.monitoring.anomaly_batcher import anomaly_batcher
+    from app.monitoring.anomaly_gate import anomaly_gate
+    from app.monitoring.analysis_offload import analysis_offload
     from app.monitoring.api_runner import api_runner
+    from app.monitoring.latency_histograms import latency_histograms
+    from app.monitoring.online_stats import online_stats
+    from app.monitoring.pipeline_stats import pipeline_stage_stats
+    from app.monitoring.result_writer import result_writer
+    from app.monitoring.verdict_cache import verdict_cache
     from app.scheduler.engine import monitor_scheduler
 
     subsystems = {}
@@ -74,6 +83,65 @@ async def detailed_health_check(session: AsyncSession = Depends(get_session)):
     # API Runner
     subsystems["api_runner"] = {
         "status": "ok" if api_runner._client is not None else "unavailable",
+        "origins": api_runner.origin_stats,
+        "connections": api_runner.connection_stats,
+    }
+
+    # Bulk result writer
+    subsystems["result_writer"] = {
+        "status": "ok" if settings.RESULT_WRITER_ENABLED else "disabled",
+        **(result_writer.stats() if settings.RESULT_WRITER_ENABLED else {}),
+    }
+
+    # Memoized body analysis
+    subsystems["analysis_cache"] = {
+        "status": "ok" if settings.ANALYSIS_CACHE_ENABLED else "disabled",
+        **(analysis_cache.stats() if settings.ANALYSIS_CACHE_ENABLED else {}),
+    }
+
+    # Off-loop body analysis
+    subsystems["analysis_offload"] = {"status": "ok", **analysis_offload.stats()}
+
+    # Streaming latency baselines
+    subsystems["online_stats"] = {
+        "status": "ok" if settings.ONLINE_STATS_ENABLED else "disabled",
+        **(online_stats.stats() if settings.ONLINE_STATS_ENABLED else {}),
+    }
+
+    # Hourly latency histograms
+    subsystems["latency_histograms"] = {
+        "status": "ok" if settings.LATENCY_HISTOGRAMS_ENABLED else "disabled",
+        **(latency_histograms.stats() if settings.LATENCY_HISTOGRAMS_ENABLED else {}),
+    }
+
+    # Statistical pre-gate in front of the LLM
+    subsystems["anomaly_gate"] = {
+        "status": "ok" if settings.ANOMALY_GATE_ENABLED else "disabled",
+        **(anomaly_gate.stats() if settings.ANOMALY_GATE_ENABLED else {}),
+    }
+
+    # Per-organization LLM budgets
+    subsystems["llm_budget"] = {
+        "status": "ok" if llm_client.budget.enabled else "disabled",
+        **(llm_client.budget.stats() if llm_client.budget.enabled else {}),
+    }
+
+    # Per-organization batching of LLM anomaly analyses
+    subsystems["anomaly_batcher"] = {
+        "status": "ok" if settings.ANOMALY_BATCH_ENABLED else "disabled",
+        **(anomaly_batcher.stats() if settings.ANOMALY_BATCH_ENABLED else {}),
+    }
+
+    # LLM verdict cache
+    subsystems["verdict_cache"] = {
+        "status": "ok" if settings.ANOMALY_VERDICT_CACHE_ENABLED else "disabled",
+        **(verdict_cache.stats() if settings.ANOMALY_VERDICT_CACHE_ENABLED else {}),
+    }
+
+    # Pipeline stage latencies
+    subsystems["pipeline_stages"] = {
+        "status": "ok",
+        **pipeline_stage_stats.snapshot(),
     }
 
     # WebSocket Manager
@@ -192,6 +192,7 @@ async def generate_narrative(
         avg_resolution_ms=match_data["avg_resolution_ms"],
         last_resolution_notes=match_data["last_resolution_notes"],
         cross_endpoint_count=cross_count,
+        organization_id=tenant_id,
     )
 
     incident.narrative = narrative
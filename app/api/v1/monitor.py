@@ -8,11 +8,12 @@ from app.db.session import get_session
 from app.monitoring.anomaly_engine import AnomalyEngine
 from app.monitoring.api_runner import api_runner
 from app.monitoring.performance_tracker import performance_tracker
+from app.monitoring.pipeline_stats import pipeline_stage_stats
 from app.monitoring.runner_service import RunnerService
 from app.ai.llm_client import llm_client
 from app.repositories.api_run import ApiRunRepository
 from app.schemas.anomaly_readout import AnomalyReadout
-from app.schemas.monitor import MonitorRunResult
+from app.schemas.monitor import MonitorRunResult, PipelineStageStats
 from app.schemas.performance import PerformanceReadout
 from app.schemas.risk_readout import RiskReadout
 from app.schemas.schema_drift import FieldDifference, SchemaDriftReadout
@@ -78,6 +79,9 @@ def _map_anomaly(pipeline) -> AnomalyReadout | None:
         skipped_reason=a.skipped_reason,
         ai_called=a.ai_called,
         used_fallback=a.used_fallback,
+        gated=a.gated,
+        cache_hit=a.cache_hit,
+        over_budget=a.over_budget,
     )
 
 
@@ -112,6 +116,14 @@ def _map_perf(pipeline) -> PerformanceReadout | None:
         is_critical_spike=p.is_critical_spike,
         sample_size=p.sample_size,
         has_enough_data=p.has_enough_data,
+        connection_ms=p.connection_ms,
+        ttfb_ms=p.ttfb_ms,
+        latency_source=p.latency_source,
+        rolling_p95_ms=p.rolling_p95_ms,
+        lifetime_avg_ms=p.lifetime_avg_ms,
+        lifetime_stddev_ms=p.lifetime_stddev_ms,
+        baseline=p.baseline,
+        seasonal_slot=p.seasonal_slot,
     )
 
 
@@ -144,9 +156,24 @@ async def trigger_run(
         schema_drift=_map_drift(pipeline),
         anomaly=_map_anomaly(pipeline),
         risk=_map_risk(pipeline),
+        stage_timings=pipeline.stage_timings,
     )
 
 
+@router.get(
+    "/pipeline-stats",
+    response_model=PipelineStageStats,
+    summary="Get per-stage pipeline latency percentiles",
+)
+async def get_pipeline_stats(user: CurrentUser):
+    """
+    p50 / p95 / p99 latency of each monitoring pipeline stage (endpoint
+    load, HTTP, persistence, analysis, AI, risk) across all runs in this
+    process, so slow stages can be found without profiling.
+    """
+    return pipeline_stage_stats.snapshot()
+
+
 @router.get(
     "/performance/{endpoint_id}",
     response_model=PerformanceReadout,
@@ -191,4 +218,5 @@ async def get_performance(
         is_critical_spike=result.is_critical_spike,
         sample_size=result.sample_size,
         has_enough_data=result.has_enough_data,
+        rolling_p95_ms=result.rolling_p95_ms,
     )
@@ -2,7 +2,7 @@ from typing import Any
 
 from fastapi import APIRouter, Depends
 
-from app.core.auth import CurrentUser, require_role
+from app.core.auth import CurrentUser, TenantId, require_role
 from app.models.user import UserRole
 from app.scheduler.engine import monitor_scheduler
 
@@ -15,12 +15,18 @@ router = APIRouter(prefix="/scheduler", tags=["scheduler"])
 )
 async def get_status(
     user: CurrentUser,
+    tenant_id: TenantId,
 ) -> dict[str, Any]:
     """
     Return the current scheduler state, including whether it's running,
     the number of active jobs, and each job's next scheduled run time.
+
+    ``pipeline`` reports the global concurrency gate: running and queued
+    pipelines, dropped ticks, queue wait and scheduling lag (avg/p95/max).
+    ``pipeline.tenant`` is the caller's organization's fair share of it:
+    weight, running and queued pipelines, and its own queue wait.
     """
-    return monitor_scheduler.get_status()
+    return monitor_scheduler.get_status(tenant_id)
 
 
 @router.post(
@@ -38,8 +44,8 @@ async def sync_jobs() -> dict[str, Any]:
     - Updates intervals for changed endpoints.
     - Removes jobs for deleted endpoints.
 
-    Call this after creating, updating, or deleting endpoints
-    to reflect changes immediately (otherwise they take effect
-    on the next app restart).
+    Endpoint create/update/delete already reschedule their own job in
+    every worker, so this is only needed to recover from drift (e.g.
+    rows edited directly in the database).
     """
     return await monitor_scheduler.sync_jobs()
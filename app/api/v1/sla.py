@@ -1,16 +1,18 @@
 import uuid
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.auth import CurrentUser, RequireWrite, TenantId
 from app.db.session import get_session
 from app.repositories.api_run import ApiRunRepository
 from app.repositories.endpoint_sla import EndpointSLARepository
+from app.repositories.latency_stats import EndpointLatencyHistogramRepository
 from app.schemas.endpoint_sla import (
     EndpointSLACreate,
     EndpointSLARead,
     EndpointSLAUpdate,
+    LatencyPercentiles,
     UptimeStats,
 )
 from app.services.endpoint_sla import EndpointSLAService
@@ -22,6 +24,7 @@ def _get_service(session: AsyncSession = Depends(get_session)) -> EndpointSLASer
     return EndpointSLAService(
         repo=EndpointSLARepository(session),
         run_repo=ApiRunRepository(session),
+        histogram_repo=EndpointLatencyHistogramRepository(session),
     )
 
 
@@ -45,6 +48,17 @@ async def get_uptime(
     return await service.get_uptime(endpoint_id, tenant_id)
 
 
+@router.get("/{endpoint_id}/latency", response_model=LatencyPercentiles)
+async def get_latency(
+    endpoint_id: uuid.UUID,
+    user: CurrentUser,
+    tenant_id: TenantId,
+    window: str | None = Query(default=None, pattern=r"^(24h|7d|30d)$"),
+    service: EndpointSLAService = Depends(_get_service),
+):
+    return await service.get_latency(endpoint_id, tenant_id, window)
+
+
 @router.post("/", response_model=EndpointSLARead, status_code=201, dependencies=[RequireWrite])
 async def create_sla(
     data: EndpointSLACreate,
@@ -19,10 +19,81 @@ class Settings(BaseSettings):
     OPENAI_MODEL: str = "gpt-4o-mini"
     OPENAI_TIMEOUT_SECONDS: float = 30.0
     AI_ENABLED: bool = True
+    LLM_MAX_CONCURRENT: int = 4  # LLM calls in flight at once (process-wide)
+    LLM_QUEUE_SIZE: int = 100  # calls allowed to wait for a slot; more fall back
+    # Per-org LLM budgets (token buckets); over budget → fallback, no queueing.
+    # Off by default — opt in per deployment.
+    LLM_BUDGET_TOKENS_PER_MINUTE: int = 0  # 0 = unlimited
+    LLM_BUDGET_USD_PER_DAY: float = 0.0  # 0 = unlimited
+    LLM_BUDGET_TENANT_WEIGHTS: dict[str, float] = {}  # org id → budget multiplier (default 1)
+    ANOMALY_GATE_ENABLED: bool = True  # robust-z / CUSUM / burst pre-gate before the LLM
+    # LLM verdicts reused per (endpoint, incident fingerprint, latency bucket)
+    ANOMALY_VERDICT_CACHE_ENABLED: bool = True
+    ANOMALY_VERDICT_CACHE_SIZE: int = 2048  # entries (LRU)
+    ANOMALY_VERDICT_CACHE_TTL_SECONDS: int = 900
+    # Concurrent anomaly analyses of one org share an LLM call
+    ANOMALY_BATCH_ENABLED: bool = True
+    ANOMALY_BATCH_WINDOW_MS: int = 500  # collect for this long after the first request
+    ANOMALY_BATCH_MAX_SIZE: int = 10  # runs per prompt; a full batch is sent at once
 
     # Scheduler
     SCHEDULER_ENABLED: bool = True
-    SCHEDULER_MAX_CONCURRENT: int = 5
+    SCHEDULER_MAX_CONCURRENT: int = 5  # pipelines running at once (process-wide)
+    SCHEDULER_QUEUE_SIZE: int = 1000  # pipelines allowed to wait for a slot
+    SCHEDULER_TENANT_MAX_SHARE: float = 0.5  # max slot share per org while others wait
+    SCHEDULER_TENANT_WEIGHTS: dict[str, float] = {}  # org id → fair-share weight (default 1)
+    SCHEDULER_SPREAD_ENABLED: bool = False  # hash each endpoint onto its own phase
+    SCHEDULER_JITTER_SECONDS: float = 0.0  # extra random delay per tick (spread mode)
+    SCHEDULER_LISTEN_ENABLED: bool = True  # apply peers' endpoint changes via LISTEN/NOTIFY
+    SCHEDULER_RESYNC_SECONDS: int = 900  # fallback full resync period
+    SCHEDULER_ADAPTIVE_ENABLED: bool = False  # tune intervals from risk/incidents
+    SCHEDULER_ADAPTIVE_HEALTHY_RUNS: int = 5  # LOW runs per back-off step
+    SCHEDULER_ADAPTIVE_BACKOFF_FACTOR: float = 2.0
+    SCHEDULER_ADAPTIVE_MAX_FACTOR: float = 8.0  # default max = base × factor
+    SCHEDULER_SHARDING_ENABLED: bool = False  # share endpoints across workers
+    SCHEDULER_WORKER_HEARTBEAT_SECONDS: int = 15
+    SCHEDULER_WORKER_TTL_SECONDS: int = 45  # lease expiry → shard rebalanced
+
+    # Probe runner (per-origin limits; endpoint advanced_config overrides)
+    RUNNER_ORIGIN_MAX_CONCURRENT: int = 10  # probes in flight per origin per org
+    RUNNER_ORIGIN_RATE_PER_SECOND: float = 10.0  # 0 = no rate limit
+    RUNNER_ORIGIN_BURST: int = 10
+    RUNNER_ORIGIN_ORG_LIMITS: dict[str, dict[str, float]] = {}  # org id → overrides
+    # Probe client connections
+    RUNNER_HTTP2_ORIGINS: list[str] = []  # origins probed over HTTP/2 (needs h2)
+    RUNNER_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    RUNNER_WARM_KEEP_MAX_INTERVAL_SECONDS: int = 600  # keep idle connections up to this interval
+    RUNNER_DNS_CACHE_ENABLED: bool = True
+    RUNNER_DNS_MIN_TTL_SECONDS: int = 5
+    RUNNER_DNS_MAX_TTL_SECONDS: int = 300
+    RUNNER_DNS_FALLBACK_TTL_SECONDS: int = 30  # getaddrinfo answers carry no TTL
+    # In-memory run history (serves rolling latency, failure rate, streaks)
+    RUN_HISTORY_ENABLED: bool = True
+    RUN_HISTORY_SIZE: int = 64  # runs kept per endpoint
+    RUN_HISTORY_RESYNC_SECONDS: int = 3600  # reload from DB to pick up other processes' runs
+    # Streaming per-endpoint latency baseline (EWMA, Welford, P² quantiles)
+    ONLINE_STATS_ENABLED: bool = True
+    ONLINE_STATS_EWMA_ALPHA: float = 0.1  # ≈ the old 20-run window's sensitivity
+    ONLINE_STATS_FLUSH_SECONDS: int = 60  # persist changed state this often
+    ONLINE_STATS_SEASONAL_ALPHA: float = 0.05  # per hour-of-week slot
+    ONLINE_STATS_SEED_DAYS: int = 28  # history replayed into a new endpoint's baseline
+    # Hourly per-endpoint latency histograms for dashboard / SLA percentiles
+    LATENCY_HISTOGRAMS_ENABLED: bool = True
+    LATENCY_HISTOGRAM_FLUSH_SECONDS: int = 60  # merge pending hours into the table this often
+    # Write-behind bulk writer for scheduled pipeline results
+    RESULT_WRITER_ENABLED: bool = False
+    RESULT_WRITER_FLUSH_MS: int = 250
+    RESULT_WRITER_MAX_BATCH: int = 500  # rows; flush early once this many are queued
+    RESULT_WRITER_DURABILITY: str = "sync"  # sync = wait for commit | async = queue only
+    # Memoized drift / credential / contract results per (config, body hash, status)
+    ANALYSIS_CACHE_ENABLED: bool = True
+    ANALYSIS_CACHE_SIZE: int = 4096  # entries (LRU)
+    # Where large bodies are analysed: inline | thread | process
+    ANALYSIS_OFFLOAD_MODE: str = "thread"
+    ANALYSIS_OFFLOAD_MIN_BYTES: int = 65536  # smaller bodies are analysed inline
+    ANALYSIS_OFFLOAD_WORKERS: int = 2
+    # Per-stage pipeline latency histograms (/monitor/pipeline-stats)
+    PIPELINE_STATS_WINDOW_SECONDS: int = 300  # percentiles cover the last 1–2 windows
 
     # Auth / JWT
     SECRET_KEY: str = "change-me-in-production"
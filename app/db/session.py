@@ -1,4 +1,5 @@
-from collections.abc import AsyncGenerator
+from collections.abc import AsyncGenerator, AsyncIterator
+from contextlib import asynccontextmanager
 
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 
@@ -26,3 +27,18 @@ async def get_session() -> AsyncGenerator[AsyncSession, None]:
         except Exception:
             await session.rollback()
             raise
+
+
+@asynccontextmanager
+async def pinned_session(
+    factory: async_sessionmaker[AsyncSession] = async_session_factory,
+) -> AsyncIterator[AsyncSession]:
+    """Session that keeps one pooled connection across commits.
+
+    A plain session returns its connection to the pool on every commit
+    and checks out another for the next statement; background jobs that
+    commit more than once use this to hold a single connection instead.
+    """
+    async with factory.kw["bind"].connect() as conn:
+        async with factory(bind=conn) as session:
+            yield session
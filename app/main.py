@@ -14,7 +14,13 @@ from app.core.config import settings
 from app.core.rate_limit import limiter
 from app.db.base import Base
 from app.db.session import engine
+from app.monitoring.analysis_offload import analysis_offload
+from app.monitoring.anomaly_batcher import anomaly_batcher
 from app.monitoring.api_runner import api_runner
+from app.monitoring.latency_histograms import latency_histograms
+from app.monitoring.online_stats import online_stats
+from app.monitoring.result_writer import result_writer
+from app.monitoring.run_history import run_history
 from app.scheduler.engine import monitor_scheduler
 
 # Ensure all models are imported so Base.metadata is populated.
@@ -32,6 +38,8 @@ import app.models.alert_rule  # noqa: F401
 import app.models.schema_snapshot  # noqa: F401
 import app.models.security_finding  # noqa: F401
 import app.models.ai_telemetry  # noqa: F401
+import app.models.scheduler_worker  # noqa: F401
+import app.models.latency_stats  # noqa: F401
 
 logging.basicConfig(
     level=logging.DEBUG if settings.DEBUG else logging.INFO,
@@ -45,18 +53,33 @@ async def lifespan(app: FastAPI):
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
     await api_runner.startup()
+    analysis_offload.startup()
     llm_client.startup()
+    await llm_client.budget.seed()
     webhook_client.startup()
+    # Warm the in-memory run history and baselines before any probe can
+    # record a run, so a warm-up snapshot never replaces fresher entries.
+    await run_history.warm()
+    await online_stats.warm()
     monitor_scheduler.startup()
     await monitor_scheduler.sync_jobs()
+    await monitor_scheduler.start_listener()
+    latency_histograms.startup()
+    if settings.RESULT_WRITER_ENABLED:
+        result_writer.startup()
 
     yield
 
     # Shutdown
     await monitor_scheduler.shutdown()
+    await result_writer.shutdown()
+    await online_stats.shutdown()
+    await latency_histograms.shutdown()
+    await anomaly_batcher.shutdown()
     await webhook_client.shutdown()
     await llm_client.shutdown()
     await api_runner.shutdown()
+    await analysis_offload.shutdown()
     await engine.dispose()
 
 
@@ -4,6 +4,10 @@ AI Telemetry record — persists per-call LLM usage data for the FinOps dashboar
 Each row represents a single LLM API call made by the monitoring pipeline.
 Tracks tokens, latency, cost, and success/failure for billing visibility
 and AI health monitoring.
+
+Rows with an ``outcome`` other than ``called`` record a call that was
+*avoided* (zero tokens and cost) so the dashboard can show savings;
+usage aggregates only count ``called`` rows.
 """
 
 import uuid
@@ -16,6 +20,11 @@ from sqlalchemy.orm import Mapped, mapped_column
 
 from app.db.base import Base
 
+OUTCOME_CALLED = "called"
+OUTCOME_GATED = "gated"  # held back by the statistical pre-gate
+OUTCOME_CACHE_HIT = "cache_hit"  # verdict reused from the verdict cache
+OUTCOME_OVER_BUDGET = "over_budget"  # skipped, organization over its LLM budget
+
 
 class AiTelemetryRecord(Base):
     __tablename__ = "ai_telemetry"
@@ -43,6 +52,9 @@ class AiTelemetryRecord(Base):
     success: Mapped[bool] = mapped_column(Boolean, nullable=False, default=True)
     cost_usd: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
     error_message: Mapped[Optional[str]] = mapped_column(String(500), nullable=True)
+    outcome: Mapped[str] = mapped_column(
+        String(20), nullable=False, default=OUTCOME_CALLED, server_default=OUTCOME_CALLED
+    )
 
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now()
@@ -29,6 +29,9 @@ class ApiEndpoint(Base):
     monitoring_interval_seconds: Mapped[int] = mapped_column(
         Integer, nullable=False, default=300
     )
+    # Adaptive scheduling bounds (NULL → derived from the base interval)
+    min_interval_seconds: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    max_interval_seconds: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
 
     # ── V2 advanced config (backward-compatible, all nullable) ────────
     query_params: Mapped[Optional[list]] = mapped_column(JSON, nullable=True)
@@ -2,7 +2,7 @@ import uuid
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import DateTime, Float, ForeignKey, Integer, func
+from sqlalchemy import Boolean, DateTime, Float, ForeignKey, Integer, func
 from sqlalchemy.dialects.postgresql import JSON, UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -29,7 +29,18 @@ class ApiRun(Base):
     )
     status_code: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
     response_time_ms: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    # Phase breakdown of response_time_ms (NULL → phase not observed)
+    dns_ms: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    connect_ms: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    tls_ms: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    ttfb_ms: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    download_ms: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
     response_body: Mapped[Optional[dict]] = mapped_column(JSON, nullable=True)
+    # Body bytes read; reading stops once the runner's byte budget is hit
+    response_bytes: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    response_truncated: Mapped[bool] = mapped_column(
+        Boolean, nullable=False, default=False, server_default="false"
+    )
     is_success: Mapped[bool] = mapped_column(nullable=False, default=False)
     error_message: Mapped[Optional[str]] = mapped_column(nullable=True)
     created_at: Mapped[datetime] = mapped_column(
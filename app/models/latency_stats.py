@@ -0,0 +1,59 @@
+import uuid
+from datetime import datetime
+
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, LargeBinary, func
+from sqlalchemy.dialects.postgresql import JSON, UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class EndpointLatencyStats(Base):
+    """Serialized streaming latency statistics of one endpoint.
+
+    ``state`` holds the Welford, EWMA and P² estimator state maintained by
+    ``app.monitoring.online_stats``; it is rewritten periodically so the
+    long-horizon baseline survives restarts.
+    """
+
+    __tablename__ = "endpoint_latency_stats"
+
+    endpoint_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("api_endpoints.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    state: Mapped[dict] = mapped_column(JSON, nullable=False)
+    sample_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+
+
+class EndpointLatencyHistogram(Base):
+    """Latency histogram of one endpoint over one hour.
+
+    ``counts`` is a ``LatencyHistogram`` in its compact binary encoding
+    (see ``app.monitoring.pipeline_stats``).  Histograms merge exactly, so
+    percentiles over any window of whole hours are read by merging rows
+    instead of scanning ``api_runs``.
+    """
+
+    __tablename__ = "endpoint_latency_histograms"
+    __table_args__ = (
+        Index("ix_latency_histograms_org_bucket", "organization_id", "bucket_start"),
+    )
+
+    endpoint_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("api_endpoints.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    bucket_start: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
+    organization_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("organizations.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    sample_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    counts: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
@@ -0,0 +1,27 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, String, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class SchedulerWorker(Base):
+    """Lease row for one scheduler process taking part in endpoint sharding.
+
+    Each process upserts its row on every heartbeat.  Rows whose
+    ``heartbeat_at`` is older than the lease TTL are considered dead and
+    their endpoints are redistributed across the remaining workers.
+    """
+
+    __tablename__ = "scheduler_workers"
+
+    worker_id: Mapped[str] = mapped_column(String(128), primary_key=True)
+    hostname: Mapped[str] = mapped_column(String(255), nullable=False)
+    pid: Mapped[int] = mapped_column(nullable=False)
+    started_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now()
+    )
+    heartbeat_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, index=True
+    )
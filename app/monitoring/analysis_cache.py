@@ -0,0 +1,89 @@
+"""
+Memoized response-body analysis.
+
+Schema drift, the credential scan and contract validation are pure
+functions of the endpoint's configuration, the response body and the
+status code.  Most endpoints return a structurally identical body run
+after run, so their results are kept in a bounded LRU keyed on
+
+    (endpoint id, config version, config updated_at, body hash, status code)
+
+and reused while the key matches.  ``config_version`` alone only marks
+the config format (v1/v2) and is not bumped on edits, so the endpoint's
+``updated_at`` is part of the key: editing the expected schema, spec,
+URL or method invalidates its entries.  The body hash is the
+canonical-JSON ``compute_schema_hash`` the schema snapshot needs anyway,
+so it is computed once per run.
+
+Accessed from the pipeline's analysis worker threads, hence the lock.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable
+
+from app.core.config import settings
+
+
+def analysis_key(endpoint: Any, digest: str, status_code: int | None) -> tuple[Hashable, ...]:
+    """Cache key for one endpoint config + canonical body hash + status."""
+    return (
+        endpoint.id, endpoint.config_version, endpoint.updated_at, digest, status_code,
+    )
+
+
+class AnalysisCache:
+    """Thread-safe bounded LRU of analysis results."""
+
+    def __init__(self, max_entries: int | None = None) -> None:
+        self._max_entries = max_entries
+        self._entries: OrderedDict[Hashable, Any] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    @property
+    def max_entries(self) -> int:
+        return self._max_entries or settings.ANALYSIS_CACHE_SIZE
+
+    def get(self, key: Hashable) -> Any | None:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+# ─── module-level singleton ─────────────────────────────────────────────
+
+analysis_cache = AnalysisCache()
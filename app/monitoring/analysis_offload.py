@@ -0,0 +1,204 @@
+"""
+Off-loop execution of the CPU-heavy response analyzers.
+
+The credential scan (11+ regexes over the serialized body), schema drift
+(``compute_diff``) and contract validation (``_validate_schema``) are
+pure CPU.  Run on the event loop, a large body stalls every other probe,
+WebSocket and API request in the process.  ``ANALYSIS_OFFLOAD_MODE``
+selects where bodies of at least ``ANALYSIS_OFFLOAD_MIN_BYTES`` go:
+
+  - ``inline``  — on the event loop (no offload).
+  - ``thread``  — a dedicated thread pool.  Nothing blocks the loop for
+    the whole analysis, but the analyzers hold the GIL, so the loop
+    still competes with them in switch-interval (~5 ms) slices.
+  - ``process`` — a ``ProcessPoolExecutor`` (spawned workers).  Body and
+    results are pickled across, and the loop is not slowed at all.  A
+    broken pool is rebuilt and the call falls back to the thread pool.
+
+Smaller bodies always run inline: the hop costs more than the work.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import multiprocessing
+import pickle
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional, TypeVar
+
+from app.core.config import settings
+from app.monitoring.contract_validator import ContractResult, contract_validator
+from app.monitoring.credential_scanner import ScanResult, credential_scanner
+from app.monitoring.schema_validator import DriftAnalysis, SchemaValidator
+
+logger = logging.getLogger(__name__)
+
+MODE_INLINE = "inline"
+MODE_THREAD = "thread"
+MODE_PROCESS = "process"
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True, slots=True)
+class BodyAnalysis:
+    """Drift, credential and contract results for one response body."""
+
+    drift: DriftAnalysis
+    security_scan: ScanResult
+    contract: Optional[ContractResult] = None
+    timings: dict[str, float] = field(default_factory=dict)  # stage → ms
+    failed: bool = False  # a stage raised and fell back to an empty result
+
+
+def analyse_body(
+    validator: SchemaValidator,
+    endpoint_name: str,
+    expected_schema: Optional[dict[str, Any]],
+    openapi_spec: Optional[dict[str, Any]],
+    url: str,
+    method: str,
+    status_code: Optional[int],
+    response_body: Any,
+) -> BodyAnalysis:
+    """
+    Run the three body analyzers.  Module-level and argument-only so it
+    can be shipped to a worker process.
+    """
+    timings: dict[str, float] = {}
+    failed = False
+
+    start = time.perf_counter()
+    try:
+        drift = validator.validate(expected_schema=expected_schema, response_body=response_body)
+    except Exception:
+        logger.exception("Schema drift detection failed for %s", endpoint_name)
+        drift = DriftAnalysis(skipped_reason="analysis_error")
+        failed = True
+    timings["drift"] = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    try:
+        security_scan = credential_scanner.scan(response_body)
+    except Exception:
+        logger.exception("Credential scan failed for %s", endpoint_name)
+        security_scan = ScanResult(findings=[])
+        failed = True
+    timings["credential_scan"] = (time.perf_counter() - start) * 1000
+
+    # Contract validation (if OpenAPI spec exists)
+    start = time.perf_counter()
+    contract: ContractResult | None = None
+    if openapi_spec:
+        contract = contract_validator.validate(
+            openapi_spec=openapi_spec,
+            url=url,
+            method=method,
+            status_code=status_code,
+            response_body=response_body,
+        )
+    timings["contract"] = (time.perf_counter() - start) * 1000
+
+    return BodyAnalysis(drift, security_scan, contract, timings, failed)
+
+
+def _warm() -> None:
+    """No-op submitted at startup so worker processes spawn ahead of need."""
+
+
+class AnalysisOffload:
+    """Runs analyzer calls inline, on a thread pool or on a process pool."""
+
+    def __init__(self) -> None:
+        self._threads: ThreadPoolExecutor | None = None
+        self._processes: ProcessPoolExecutor | None = None
+        self._counts = {MODE_INLINE: 0, MODE_THREAD: 0, MODE_PROCESS: 0}
+        self._process_failures = 0
+
+    @property
+    def mode(self) -> str:
+        return settings.ANALYSIS_OFFLOAD_MODE
+
+    # ── lifecycle ────────────────────────────────────────────────────────
+
+    def startup(self) -> None:
+        """Create the configured pool.  Call once during app lifespan."""
+        if self.mode == MODE_PROCESS:
+            self._process_pool().submit(_warm)
+        elif self.mode == MODE_THREAD:
+            self._thread_pool()
+
+    async def shutdown(self) -> None:
+        """Stop the pools.  Call once during app shutdown."""
+        for pool in (self._threads, self._processes):
+            if pool is not None:
+                pool.shutdown(wait=False, cancel_futures=True)
+        self._threads = self._processes = None
+
+    # ── public API ───────────────────────────────────────────────────────
+
+    async def run(self, fn: Callable[..., T], /, *args: Any, size: int | None) -> T:
+        """
+        Call ``fn(*args)`` where the mode and ``size`` (body bytes) say.
+
+        In process mode ``fn`` and its arguments must be picklable.
+        """
+        mode = self.mode
+        if mode == MODE_INLINE or size is None or size < settings.ANALYSIS_OFFLOAD_MIN_BYTES:
+            self._counts[MODE_INLINE] += 1
+            return fn(*args)
+
+        loop = asyncio.get_running_loop()
+        if mode == MODE_PROCESS:
+            try:
+                result = await loop.run_in_executor(self._process_pool(), fn, *args)
+            except (BrokenProcessPool, pickle.PicklingError) as exc:
+                self._process_failures += 1
+                logger.exception("Analysis process pool failed — using a thread instead")
+                if isinstance(exc, BrokenProcessPool):
+                    self._processes = None  # rebuilt on next use
+            else:
+                self._counts[MODE_PROCESS] += 1
+                return result
+
+        self._counts[MODE_THREAD] += 1
+        return await loop.run_in_executor(self._thread_pool(), fn, *args)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "min_bytes": settings.ANALYSIS_OFFLOAD_MIN_BYTES,
+            "workers": settings.ANALYSIS_OFFLOAD_WORKERS,
+            "inline_calls": self._counts[MODE_INLINE],
+            "thread_calls": self._counts[MODE_THREAD],
+            "process_calls": self._counts[MODE_PROCESS],
+            "process_failures": self._process_failures,
+        }
+
+    # ── internals ────────────────────────────────────────────────────────
+
+    def _thread_pool(self) -> Executor:
+        if self._threads is None:
+            self._threads = ThreadPoolExecutor(
+                max_workers=settings.ANALYSIS_OFFLOAD_WORKERS,
+                thread_name_prefix="analysis",
+            )
+        return self._threads
+
+    def _process_pool(self) -> Executor:
+        if self._processes is None:
+            # spawn, not fork: the parent runs an event loop and threads.
+            self._processes = ProcessPoolExecutor(
+                max_workers=settings.ANALYSIS_OFFLOAD_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._processes
+
+
+# ─── module-level singleton ─────────────────────────────────────────────
+
+analysis_offload = AnalysisOffload()
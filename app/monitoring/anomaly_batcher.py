@@ -0,0 +1,215 @@
+"""
+Micro-batching of LLM anomaly analysis.
+
+When a shared dependency fails, many endpoints of one organization trip
+their signals within seconds and each would make its own LLM call with
+the same system prompt.  The batcher sits between ``AnomalyEngine`` and
+the ``LLMClient``:
+
+  - Requests are collected per (LLM client, organization) for
+    ``ANOMALY_BATCH_WINDOW_MS`` after the first one arrives, or until
+    ``ANOMALY_BATCH_MAX_SIZE`` are waiting.
+  - A lone request is sent exactly as before (``SYSTEM_PROMPT`` +
+    ``single_run_prompt``).  Several are sent as one numbered
+    ``build_batch_prompt`` under ``BATCH_SYSTEM_PROMPT``, which asks for
+    ``{"results": [{"run": n, ...verdict}]}``.
+  - Verdicts are fanned back out to the waiting pipelines by run
+    number.  The call's tokens and cost are split evenly across the
+    batch, so per-endpoint telemetry still sums to what was billed.
+  - A run the response leaves out, or a failed call, gets no data and
+    the engine falls back to its rule-based analysis.  A batch the
+    organization's LLM budget cannot afford is answered ``over_budget``
+    for every run.
+
+Organizations are never mixed in one prompt.  Pure asyncio; one
+instance per process.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import uuid
+from dataclasses import dataclass, field, replace
+from typing import Any
+
+from app.ai.llm_client import CallTelemetry, LLMClient, LLMResult
+from app.ai.prompt_templates import (
+    BATCH_SYSTEM_PROMPT,
+    SYSTEM_PROMPT,
+    build_batch_prompt,
+    single_run_prompt,
+)
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _Batch:
+    llm: LLMClient
+    organization_id: uuid.UUID
+    summaries: list[str] = field(default_factory=list)
+    waiters: list[asyncio.Future[LLMResult]] = field(default_factory=list)
+    timer: asyncio.TimerHandle | None = None
+
+
+class AnomalyBatcher:
+    """Collects anomaly prompts per organization and sends them together."""
+
+    def __init__(
+        self, *, window_ms: float | None = None, max_size: int | None = None
+    ) -> None:
+        self._window_ms = window_ms
+        self._max_size = max_size
+        self._pending: dict[tuple[LLMClient, uuid.UUID], _Batch] = {}
+        self._sending: set[asyncio.Task[None]] = set()
+        self._requests = 0
+        self._calls = 0
+        self._batches = 0  # calls covering more than one run
+        self._batched_requests = 0
+        self._largest_batch = 0
+        self._unanswered = 0
+
+    @property
+    def window_seconds(self) -> float:
+        window_ms = self._window_ms if self._window_ms is not None else settings.ANOMALY_BATCH_WINDOW_MS
+        return window_ms / 1000
+
+    @property
+    def max_size(self) -> int:
+        return max(1, self._max_size or settings.ANOMALY_BATCH_MAX_SIZE)
+
+    async def analyse(
+        self, llm: LLMClient, organization_id: uuid.UUID, summary: str
+    ) -> LLMResult:
+        """
+        Queue one run summary and wait for its verdict.
+
+        This method **never raises** (other than on cancellation).
+        """
+        key = (llm, organization_id)
+        batch = self._pending.get(key)
+        if batch is None:
+            batch = self._pending[key] = _Batch(llm, organization_id)
+            batch.timer = asyncio.get_running_loop().call_later(
+                self.window_seconds, self._dispatch, key
+            )
+        waiter: asyncio.Future[LLMResult] = asyncio.get_running_loop().create_future()
+        batch.summaries.append(summary)
+        batch.waiters.append(waiter)
+        self._requests += 1
+        if len(batch.summaries) >= self.max_size:
+            self._dispatch(key)
+        return await waiter
+
+    # ── lifecycle ────────────────────────────────────────────────────
+
+    async def shutdown(self) -> None:
+        """Send every pending batch and wait for the calls to finish."""
+        for key in list(self._pending):
+            self._dispatch(key)
+        if self._sending:
+            await asyncio.gather(*self._sending, return_exceptions=True)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "pending_batches": len(self._pending),
+            "requests": self._requests,
+            "llm_calls": self._calls,
+            "batches": self._batches,
+            "batched_requests": self._batched_requests,
+            "calls_saved": self._batched_requests - self._batches,
+            "largest_batch": self._largest_batch,
+            "unanswered": self._unanswered,
+        }
+
+    # ── internals ────────────────────────────────────────────────────
+
+    def _dispatch(self, key: tuple[LLMClient, uuid.UUID]) -> None:
+        batch = self._pending.pop(key, None)
+        if batch is None:
+            return
+        if batch.timer is not None:
+            batch.timer.cancel()
+        task = asyncio.create_task(self._send(batch), name="anomaly-batch")
+        self._sending.add(task)
+        task.add_done_callback(self._sending.discard)
+
+    async def _send(self, batch: _Batch) -> None:
+        size = len(batch.summaries)
+        self._calls += 1
+        self._largest_batch = max(self._largest_batch, size)
+        try:
+            if size == 1:
+                results = [
+                    await batch.llm.analyse(
+                        system_prompt=SYSTEM_PROMPT,
+                        user_prompt=single_run_prompt(batch.summaries[0]),
+                        organization_id=batch.organization_id,
+                    )
+                ]
+            else:
+                self._batches += 1
+                self._batched_requests += size
+                logger.info("Sending %d anomaly analyses in one LLM call", size)
+                response = await batch.llm.analyse(
+                    system_prompt=BATCH_SYSTEM_PROMPT,
+                    user_prompt=build_batch_prompt(batch.summaries),
+                    organization_id=batch.organization_id,
+                )
+                if response.over_budget:
+                    results = [response] * size
+                else:
+                    results = self._fan_out(response, size)
+        except Exception:
+            logger.exception("Batched anomaly analysis failed (%d run(s))", size)
+            results = [LLMResult()] * size
+        for waiter, result in zip(batch.waiters, results):
+            if not waiter.done():
+                waiter.set_result(result)
+
+    def _fan_out(self, response: LLMResult, size: int) -> list[LLMResult]:
+        """Per-run results from a batch response, with telemetry shares."""
+        shares = _split_telemetry(response.telemetry, size)
+        verdicts: dict[int, dict[str, Any]] = {}
+        entries = (response.data or {}).get("results")
+        if isinstance(entries, list):
+            for entry in entries:
+                if not isinstance(entry, dict):
+                    continue
+                try:
+                    number = int(entry.get("run"))
+                except (TypeError, ValueError):
+                    continue
+                if 1 <= number <= size:
+                    verdicts.setdefault(number, entry)
+        if response.data is not None and len(verdicts) < size:
+            self._unanswered += size - len(verdicts)
+            logger.warning("Batch response covered %d of %d runs", len(verdicts), size)
+        return [LLMResult(verdicts.get(i + 1), shares[i]) for i in range(size)]
+
+
+def _split_telemetry(telemetry: CallTelemetry | None, size: int) -> list[CallTelemetry | None]:
+    """Even shares of one call's tokens and cost; the first run takes the remainder."""
+    if telemetry is None:
+        return [None] * size
+
+    def share(total: int, index: int) -> int:
+        return total // size + (total % size if index == 0 else 0)
+
+    return [
+        replace(
+            telemetry,
+            prompt_tokens=share(telemetry.prompt_tokens, i),
+            completion_tokens=share(telemetry.completion_tokens, i),
+            total_tokens=share(telemetry.total_tokens, i),
+            cost_usd=telemetry.cost_usd / size,
+        )
+        for i in range(size)
+    ]
+
+
+# ─── module-level singleton ─────────────────────────────────────────────
+
+anomaly_batcher = AnomalyBatcher()
@@ -16,6 +16,17 @@ COST OPTIMISATION:
   This is critical for a SaaS product — LLM calls cost money.
   "Don't pay for good news."
 
+  Of those, runs that are neither new nor significant against the
+  endpoint's recent runs — a flapping endpoint failing at its usual
+  rate, a slowdown the CUSUM already flagged — are held back by the
+  statistical pre-gate (``anomaly_gate``) and get the rule-based
+  analysis instead.  A run that fails the same way as a recent one
+  (same incident fingerprint and latency bucket) reuses that run's LLM
+  verdict from ``verdict_cache``.  Runs of one organization that reach
+  the LLM within a short window share one call (``anomaly_batcher``).
+  An organization over its LLM budget (``LLMBudget``) gets the
+  rule-based analysis at once instead of waiting for a call.
+
 RESILIENCE:
   If the LLM fails after retries, the engine falls back to a
   deterministic rule-based analysis.  The user ALWAYS gets a result.
@@ -30,13 +41,19 @@ Design:
 from __future__ import annotations
 
 import logging
-from dataclasses import dataclass
+import uuid
+from dataclasses import dataclass, replace
 from typing import Any, Optional
 
-from app.ai.llm_client import LLMClient
-from app.ai.prompt_templates import SYSTEM_PROMPT, build_user_prompt
-from app.monitoring.performance_tracker import PerformanceResult
+from app.ai.llm_client import CallTelemetry, LLMClient
+from app.ai.prompt_templates import SYSTEM_PROMPT, build_run_summary, single_run_prompt
+from app.core.config import settings
+from app.monitoring.anomaly_batcher import AnomalyBatcher, anomaly_batcher
+from app.monitoring.anomaly_gate import AnomalyGate, RecentWindow, anomaly_gate
+from app.monitoring.api_runner import PhaseTimings
+from app.monitoring.performance_tracker import LATENCY_SOURCE_NETWORK, PerformanceResult
 from app.monitoring.schema_validator import DriftAnalysis
+from app.monitoring.verdict_cache import VerdictCache, verdict_cache, verdict_key
 
 logger = logging.getLogger(__name__)
 
@@ -54,6 +71,10 @@ class AnomalyResult:
     skipped_reason: Optional[str] = None
     ai_called: bool = False
     used_fallback: bool = False
+    gated: bool = False  # LLM held back by the statistical pre-gate
+    cache_hit: bool = False  # LLM verdict reused from a matching earlier run
+    over_budget: bool = False  # LLM skipped, organization over its LLM budget
+    telemetry: Optional[CallTelemetry] = None  # of this run's LLM call, if one was made
 
 
 # ─── sentinel values ────────────────────────────────────────────────────
@@ -73,8 +94,17 @@ class AnomalyEngine:
     If the LLM fails, falls back to deterministic rule-based analysis.
     """
 
-    def __init__(self, llm: LLMClient) -> None:
+    def __init__(
+        self,
+        llm: LLMClient,
+        gate: AnomalyGate | None = None,
+        cache: VerdictCache | None = None,
+        batcher: AnomalyBatcher | None = None,
+    ) -> None:
         self._llm = llm
+        self._gate = gate if gate is not None else anomaly_gate
+        self._cache = cache if cache is not None else verdict_cache
+        self._batcher = batcher if batcher is not None else anomaly_batcher
 
     async def analyse(
         self,
@@ -95,6 +125,14 @@ class AnomalyEngine:
         drift: DriftAnalysis | None,
         # Historical
         failure_rate_percent: float,
+        # Phase breakdown of response_time_ms
+        phases: PhaseTimings | None = None,
+        # Endpoint's recent runs, for the statistical pre-gate
+        window: RecentWindow | None = None,
+        # Scopes cached verdicts; no caching without it
+        endpoint_id: uuid.UUID | None = None,
+        # Batches concurrent analyses of one organization; none without it
+        organization_id: uuid.UUID | None = None,
     ) -> AnomalyResult:
         """
         Analyse a single run and return an ``AnomalyResult``.
@@ -120,13 +158,61 @@ class AnomalyEngine:
             ", ".join(signals),
         )
 
+        # Also the severity band of the verdict cache key.
+        rules = self._rule_based_analysis(
+            is_success=is_success,
+            error_message=error_message,
+            actual_status=actual_status,
+            expected_status=expected_status,
+            performance=performance,
+            drift=drift,
+            failure_rate_percent=failure_rate_percent,
+        )
+
+        # ── verdict cache: same incident seen recently? ─────────────
+        cache_key = None
+        if (
+            self._llm.available
+            and endpoint_id is not None
+            and settings.ANOMALY_VERDICT_CACHE_ENABLED
+        ):
+            cache_key = verdict_key(
+                endpoint_id, signals, rules.severity_score, actual_status, response_time_ms
+            )
+            cached = self._cache.get(cache_key)
+            if cached is not None:
+                logger.info("Cached AI verdict reused for %s", endpoint_name)
+                return replace(cached, ai_called=False, cache_hit=True, telemetry=None)
+
+        # ── statistical pre-gate: new or significant? ───────────────
+        if self._llm.available and window is not None and settings.ANOMALY_GATE_ENABLED:
+            decision = self._gate.evaluate(
+                signals=signals,
+                window=window,
+                response_time_ms=response_time_ms,
+                is_success=is_success,
+            )
+            if not decision.call_llm:
+                logger.info(
+                    "AI call gated for %s (z=%s cusum=%s burst_p=%s)",
+                    endpoint_name,
+                    decision.robust_z,
+                    decision.cusum,
+                    decision.burst_p_value,
+                )
+                return replace(
+                    rules,
+                    skipped_reason="Not new or significant against recent runs — AI skipped",
+                    gated=True,
+                )
+
         # ── try LLM analysis ───────────────────────────────────────
         if self._llm.available:
             schema_diff_summary: dict[str, Any] | None = None
             if drift and drift.diff:
                 schema_diff_summary = drift.diff.to_summary_dict()
 
-            user_prompt = build_user_prompt(
+            summary = build_run_summary(
                 endpoint_name=endpoint_name,
                 url=url,
                 method=method,
@@ -142,17 +228,35 @@ class AnomalyEngine:
                 schema_diff_summary=schema_diff_summary,
                 failure_rate_percent=failure_rate_percent,
                 error_message=error_message,
+                phase_timings=phases.to_dict() if phases else None,
+                latency_source=performance.latency_source if performance else None,
             )
 
             logger.info("Calling AI for anomaly analysis on %s", endpoint_name)
 
-            raw = await self._llm.analyse(
-                system_prompt=SYSTEM_PROMPT,
-                user_prompt=user_prompt,
-            )
+            if organization_id is not None and settings.ANOMALY_BATCH_ENABLED:
+                response = await self._batcher.analyse(self._llm, organization_id, summary)
+            else:
+                response = await self._llm.analyse(
+                    system_prompt=SYSTEM_PROMPT,
+                    user_prompt=single_run_prompt(summary),
+                    organization_id=organization_id,
+                )
+            telemetry = response.telemetry
 
-            if raw is not None:
-                result = self._parse_response(raw)
+            if response.over_budget:
+                logger.info(
+                    "LLM budget exhausted for %s — using rule-based analysis",
+                    endpoint_name,
+                )
+                return replace(
+                    rules,
+                    skipped_reason="Organization LLM budget exhausted — AI skipped",
+                    over_budget=True,
+                )
+
+            if response.data is not None:
+                result = replace(self._parse_response(response.data), telemetry=telemetry)
                 logger.info(
                     "AI analysis for %s: detected=%s severity=%.0f confidence=%.2f",
                     endpoint_name,
@@ -160,6 +264,8 @@ class AnomalyEngine:
                     result.severity_score,
                     result.confidence,
                 )
+                if cache_key is not None:
+                    self._cache.put(cache_key, result)
                 return result
 
             logger.warning(
@@ -167,23 +273,21 @@ class AnomalyEngine:
                 endpoint_name,
             )
         else:
+            telemetry = None
             logger.warning(
                 "LLM unavailable for %s — using rule-based analysis",
                 endpoint_name,
             )
 
         # ── fallback: rule-based analysis ───────────────────────────
-        return self._rule_based_analysis(
-            endpoint_name=endpoint_name,
-            is_success=is_success,
-            error_message=error_message,
-            actual_status=actual_status,
-            expected_status=expected_status,
-            performance=performance,
-            drift=drift,
-            failure_rate_percent=failure_rate_percent,
-            signals=signals,
+        logger.info(
+            "Rule-based analysis for %s: detected=%s severity=%.0f signals=%s",
+            endpoint_name,
+            rules.anomaly_detected,
+            rules.severity_score,
+            signals,
         )
+        return replace(rules, telemetry=telemetry)
 
     # ── signal collection ─────────────────────────────────────────
 
@@ -248,7 +352,6 @@ class AnomalyEngine:
     @staticmethod
     def _rule_based_analysis(
         *,
-        endpoint_name: str,
         is_success: bool,
         error_message: str | None,
         actual_status: int | None,
@@ -256,7 +359,6 @@ class AnomalyEngine:
         performance: PerformanceResult | None,
         drift: DriftAnalysis | None,
         failure_rate_percent: float,
-        signals: list[str],
     ) -> AnomalyResult:
         """
         Deterministic fallback when LLM is unavailable.
@@ -300,12 +402,17 @@ class AnomalyEngine:
 
         # ── Performance spike ──────────────────────────────────────
         if performance:
+            network = performance.latency_source == LATENCY_SOURCE_NETWORK
             if performance.is_critical_spike:
                 severity += 35
                 deviation = performance.deviation_percent or 0
                 reasons.append(f"Critical latency spike: {deviation:+.0f}% deviation")
-                causes.append("Resource exhaustion or downstream bottleneck")
-                recommendations.append("Profile the endpoint and check system resources")
+                if network:
+                    causes.append("Slow connection setup (DNS, TCP connect or TLS handshake)")
+                    recommendations.append("Check DNS resolution and network path to the host")
+                else:
+                    causes.append("Resource exhaustion or downstream bottleneck")
+                    recommendations.append("Profile the endpoint and check system resources")
             elif performance.is_spike:
                 severity += 20
                 deviation = performance.deviation_percent or 0
@@ -342,14 +449,6 @@ class AnomalyEngine:
         # Confidence is lower for rule-based (no AI nuance)
         confidence = 0.6 if detected else 0.8
 
-        logger.info(
-            "Rule-based analysis for %s: detected=%s severity=%.0f signals=%s",
-            endpoint_name,
-            detected,
-            severity,
-            signals,
-        )
-
         return AnomalyResult(
             anomaly_detected=detected,
             severity_score=severity,
@@ -0,0 +1,212 @@
+"""
+Statistical pre-gate for AI anomaly analysis.
+
+Responsibilities:
+  - Decide, deterministically and before any LLM call, whether a run
+    whose signals fired is *new or significant* against the endpoint's
+    recent window of runs:
+      * robust z-score of the latency against the window median, scaled
+        by the MAD (Iglewicz & Hoaglin; |z| ≥ 3.5 is an outlier),
+      * an upper CUSUM change-point on the same robust scale (increments
+        clipped, sum capped, so one outlier cannot hold it up for long)
+        — an alarm that fires on this run is a new level shift, one
+        that was already raised before this run is an ongoing, known one,
+      * failure onset — the first failure after ``BURST_WINDOW`` clean
+        runs — and a binomial failure-burst test: failures among the
+        last ``BURST_WINDOW`` runs against the endpoint's own earlier
+        failure rate; only the run that makes the burst significant
+        counts as new.
+  - Return a ``GateDecision`` with the scores, so callers can log why.
+  - Count decisions, so the health endpoint shows how many LLM calls
+    the gate avoided.
+
+A flapping endpoint fails at its usual rate, so its failures are not a
+significant burst; a sustained slowdown alarms the CUSUM once and is
+ongoing afterwards.  Neither reaches the LLM on every run.  Schema
+drift and runs without enough history always pass.
+
+No I/O; the only state is the decision counters.  The window comes
+from the caller (the in-memory run history), oldest first, *excluding*
+the current run.
+"""
+
+from __future__ import annotations
+
+import math
+import statistics
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any
+
+# ─── defaults ───────────────────────────────────────────────────────────
+MIN_WINDOW = 8  # fewer past runs → cannot judge, always pass
+ROBUST_Z_THRESHOLD = 3.5
+MAD_SCALE = 0.6745  # z = 0.6745·(x − median) / MAD
+MAD_FLOOR_RATIO = 0.01  # MAD floor, as a share of the median (flat windows)
+CUSUM_DRIFT = 0.5  # k, in robust standard deviations
+CUSUM_THRESHOLD = 5.0  # h; increments are clipped to ±h and the sum capped at 2h
+BURST_WINDOW = 10  # most recent runs tested for a failure burst
+BURST_P_VALUE = 0.01
+BASE_FAILURE_FLOOR = 0.02  # assumed failure rate without enough reference runs
+
+PASS_NO_HISTORY = "insufficient_history"
+PASS_SCHEMA_DRIFT = "schema_drift"
+PASS_LATENCY_OUTLIER = "latency_outlier"
+PASS_LATENCY_SHIFT = "latency_shift"
+PASS_FAILURE_ONSET = "failure_onset"
+PASS_FAILURE_BURST = "failure_burst"
+
+
+@dataclass(frozen=True, slots=True)
+class RecentWindow:
+    """An endpoint's recent runs, oldest first, excluding the current one."""
+
+    latencies: list[float] = field(default_factory=list)
+    outcomes: list[bool] = field(default_factory=list)  # True = success
+
+
+@dataclass(frozen=True, slots=True)
+class GateDecision:
+    """Whether the LLM should see this run, and why."""
+
+    call_llm: bool
+    reasons: tuple[str, ...] = ()
+    robust_z: float | None = None
+    cusum: float | None = None
+    burst_p_value: float | None = None
+
+
+class AnomalyGate:
+    """Robust-z / CUSUM / failure-burst detector with decision counters."""
+
+    def __init__(
+        self,
+        *,
+        min_window: int = MIN_WINDOW,
+        z_threshold: float = ROBUST_Z_THRESHOLD,
+        cusum_threshold: float = CUSUM_THRESHOLD,
+        burst_p_value: float = BURST_P_VALUE,
+    ) -> None:
+        self._min_window = min_window
+        self._z_threshold = z_threshold
+        self._cusum_threshold = cusum_threshold
+        self._burst_p_value = burst_p_value
+        self._evaluated = 0
+        self._avoided = 0
+        self._reasons: Counter[str] = Counter()
+
+    def evaluate(
+        self,
+        *,
+        signals: list[str],
+        window: RecentWindow,
+        response_time_ms: float | None,
+        is_success: bool,
+    ) -> GateDecision:
+        decision = self._decide(signals, window, response_time_ms, is_success)
+        self._evaluated += 1
+        if decision.call_llm:
+            self._reasons.update(decision.reasons)
+        else:
+            self._avoided += 1
+        return decision
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "evaluated": self._evaluated,
+            "passed": self._evaluated - self._avoided,
+            "calls_avoided": self._avoided,
+            "pass_reasons": dict(self._reasons),
+        }
+
+    # ── detectors ────────────────────────────────────────────────────
+
+    def _decide(
+        self,
+        signals: list[str],
+        window: RecentWindow,
+        response_time_ms: float | None,
+        is_success: bool,
+    ) -> GateDecision:
+        if "schema_drift" in signals:
+            return GateDecision(True, (PASS_SCHEMA_DRIFT,))
+        if len(window.outcomes) < self._min_window:
+            return GateDecision(True, (PASS_NO_HISTORY,))
+
+        reasons: list[str] = []
+        z = cusum = p_value = None
+
+        latency_signal = any(s.endswith("latency_spike") for s in signals)
+        if latency_signal and response_time_ms is not None:
+            if len(window.latencies) < self._min_window:
+                reasons.append(PASS_NO_HISTORY)
+            else:
+                z, before, cusum = self._latency_scores(window.latencies, response_time_ms)
+                ongoing = before > self._cusum_threshold
+                if cusum > self._cusum_threshold and not ongoing:
+                    reasons.append(PASS_LATENCY_SHIFT)
+                elif abs(z) >= self._z_threshold and not ongoing:
+                    reasons.append(PASS_LATENCY_OUTLIER)
+
+        if "status_failure" in signals or "http_error" in signals:
+            outcomes = [*window.outcomes, is_success]
+            p_value = self._burst_p_value_of(outcomes)
+            if all(window.outcomes[-BURST_WINDOW:]):
+                reasons.append(PASS_FAILURE_ONSET)
+            elif p_value < self._burst_p_value:
+                # New only if the burst was not already significant a run ago.
+                if self._burst_p_value_of(outcomes[:-1]) >= self._burst_p_value:
+                    reasons.append(PASS_FAILURE_BURST)
+
+        return GateDecision(
+            call_llm=bool(reasons),
+            reasons=tuple(reasons),
+            robust_z=_round(z),
+            cusum=_round(cusum),
+            burst_p_value=_round(p_value, 6),
+        )
+
+    @staticmethod
+    def _latency_scores(window: list[float], current: float) -> tuple[float, float, float]:
+        """(robust z of current, CUSUM before current, CUSUM after current)."""
+        median = statistics.median(window)
+        mad = statistics.median(abs(x - median) for x in window)
+        mad = max(mad, abs(median) * MAD_FLOOR_RATIO, 1e-9)
+        scale = MAD_SCALE / mad
+
+        def step(s: float, z: float) -> float:
+            z = max(-CUSUM_THRESHOLD, min(CUSUM_THRESHOLD, z))
+            return min(2 * CUSUM_THRESHOLD, max(0.0, s + z - CUSUM_DRIFT))
+
+        s = 0.0
+        for x in window:
+            s = step(s, (x - median) * scale)
+        z = (current - median) * scale
+        return z, s, step(s, z)
+
+    @staticmethod
+    def _burst_p_value_of(outcomes: list[bool]) -> float:
+        """P(≥ observed failures in the last BURST_WINDOW runs) under the earlier rate."""
+        recent, reference = outcomes[-BURST_WINDOW:], outcomes[:-BURST_WINDOW]
+        failures = recent.count(False)
+        if not failures:
+            return 1.0
+        if len(reference) >= BURST_WINDOW:
+            base = max(reference.count(False) / len(reference), BASE_FAILURE_FLOOR)
+        else:
+            base = BASE_FAILURE_FLOOR
+        return _binomial_tail(failures, len(recent), min(base, 1.0))
+
+
+def _binomial_tail(k: int, n: int, p: float) -> float:
+    """P(X ≥ k) for X ~ Binomial(n, p)."""
+    return min(1.0, sum(math.comb(n, i) * p**i * (1 - p) ** (n - i) for i in range(k, n + 1)))
+
+
+def _round(value: float | None, digits: int = 3) -> float | None:
+    return round(value, digits) if value is not None else None
+
+
+# ─── module-level singleton ─────────────────────────────────────────────
+
+anomaly_gate = AnomalyGate()
@@ -3,10 +3,27 @@ Async HTTP execution engine.
 
 Responsibilities:
   - Execute a single HTTP request against a registered API endpoint.
-  - Measure response time with sub-millisecond precision.
+  - Measure response time with sub-millisecond precision, broken down
+    into connection setup, time-to-first-byte and body download via the
+    httpcore ``trace`` extension.
+  - Stream response bodies under a hard byte budget
+    (``MAX_RESPONSE_BODY_BYTES``) so memory per in-flight probe stays
+    bounded whatever the target returns — compressed bodies are inflated
+    incrementally against the same budget.
   - Parse JSON responses safely (non-JSON bodies are captured as null).
   - Retry failed requests with configurable attempts and backoff.
   - Timeout protection per request.
+  - Per-origin concurrency and rate limits (see ``origin_limiter``);
+    time spent waiting for an origin slot is excluded from
+    ``response_time_ms``.
+  - Keep connections warm between runs: each endpoint uses a client
+    whose keep-alive expiry covers its monitoring interval, so probes
+    every few minutes reuse the connection instead of re-handshaking.
+  - Resolve hostnames through a TTL-respecting cache (see ``dns_cache``)
+    and report ``dns_ms`` separately from the TCP connect.  Requests
+    routed through an ``HTTP(S)_PROXY`` are resolved by the proxy.
+  - Opt-in HTTP/2 per origin (``RUNNER_HTTP2_ORIGINS``) or endpoint
+    (``advanced_config.http2``) when ``h2`` is installed.
   - Return a structured result dataclass — never raise on HTTP errors.
 
 This module is intentionally I/O-only.  It does NOT touch the database.
@@ -15,20 +32,125 @@ Persistence is handled by the runner service that calls this.
 
 from __future__ import annotations
 
+import importlib.util
+import ipaddress
+import json
 import logging
 import time
-from dataclasses import dataclass, field
+import urllib.request
+import zlib
+from dataclasses import dataclass, field, replace
 from typing import Any
 
 import httpx
 
+from app.core.config import settings
+from app.monitoring.dns_cache import CachingTransport, DnsCache, dns_timing
+from app.monitoring.origin_limiter import OriginLimiter, OriginLimits, origin_of
+
 logger = logging.getLogger(__name__)
 
 # ─── defaults ───────────────────────────────────────────────────────────
 DEFAULT_TIMEOUT_SECONDS = 30.0
 DEFAULT_MAX_RETRIES = 2
 DEFAULT_RETRY_BACKOFF_SECONDS = 1.0
-MAX_RESPONSE_BODY_BYTES = 512 * 1024  # 512 KB cap on stored body
+MAX_RESPONSE_BODY_BYTES = 512 * 1024  # 512 KB read budget per response body
+DEFAULT_KEEPALIVE_SECONDS = 30.0
+KEEPALIVE_TIERS_SECONDS = (60, 120, 300, 600)  # one client per tier, not per interval
+KEEPALIVE_SLACK_SECONDS = 15  # covers scheduler jitter around the interval
+MAX_CONNECTIONS = 100
+USER_AGENT = "SentinelAI/0.1.0"
+ACCEPT_ENCODING = "gzip, deflate"
+
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+def keepalive_for_interval(interval_seconds: int | None) -> float:
+    """
+    Keep-alive expiry that keeps a connection open across one probe interval.
+
+    Intervals above ``RUNNER_WARM_KEEP_MAX_INTERVAL_SECONDS`` (or the
+    largest tier) are not worth an idle socket and use the default.
+    """
+    if not interval_seconds or interval_seconds > settings.RUNNER_WARM_KEEP_MAX_INTERVAL_SECONDS:
+        return DEFAULT_KEEPALIVE_SECONDS
+    for tier in KEEPALIVE_TIERS_SECONDS:
+        if interval_seconds <= tier:
+            return float(tier + KEEPALIVE_SLACK_SECONDS)
+    return DEFAULT_KEEPALIVE_SECONDS
+
+
+@dataclass(frozen=True, slots=True)
+class PhaseTimings:
+    """Per-phase durations of one request, in milliseconds.
+
+    Connection phases are ``None`` when a pooled keep-alive connection
+    was reused.  ``dns_ms`` is only measured when the DNS cache backend
+    is active; otherwise resolution is included in ``connect_ms``.
+    """
+
+    dns_ms: float | None = None
+    connect_ms: float | None = None
+    tls_ms: float | None = None
+    ttfb_ms: float | None = None
+    download_ms: float | None = None
+
+    @property
+    def connection_ms(self) -> float:
+        """DNS + TCP connect + TLS handshake (0 on a reused connection)."""
+        return round(sum(p or 0.0 for p in (self.dns_ms, self.connect_ms, self.tls_ms)), 2)
+
+    def to_dict(self) -> dict[str, float | None]:
+        return {
+            "dns_ms": self.dns_ms,
+            "connect_ms": self.connect_ms,
+            "tls_ms": self.tls_ms,
+            "ttfb_ms": self.ttfb_ms,
+            "download_ms": self.download_ms,
+        }
+
+
+class _PhaseTrace:
+    """httpcore ``trace`` callback recording when each phase starts/ends."""
+
+    __slots__ = ("_marks",)
+
+    def __init__(self) -> None:
+        self._marks: dict[str, float] = {}
+
+    async def __call__(self, event_name: str, info: dict[str, Any]) -> None:
+        # "connection.connect_tcp.started" / "http11.send_request_headers.complete"
+        _, _, phase = event_name.partition(".")
+        self._marks[phase] = time.perf_counter()
+
+    def _span(self, phase: str, start: str = "started", end: str | None = None) -> float | None:
+        begin = self._marks.get(f"{phase}.{start}")
+        finish = self._marks.get(end or f"{phase}.complete")
+        if begin is None or finish is None:
+            return None
+        return round((finish - begin) * 1000, 2)
+
+    @property
+    def opened_connection(self) -> bool:
+        """True if the request had to open a new connection (pool miss)."""
+        return "connect_tcp.started" in self._marks
+
+    def timings(self, dns_ms: float | None = None) -> PhaseTimings | None:
+        if not self._marks:
+            return None  # transport does not emit trace events (e.g. mocks)
+        connect_ms = self._span("connect_tcp")
+        if connect_ms is not None and dns_ms is not None:
+            # The caching backend resolves inside connect_tcp.
+            connect_ms = round(max(connect_ms - dns_ms, 0.0), 2)
+        return PhaseTimings(
+            dns_ms=dns_ms,
+            connect_ms=connect_ms,
+            tls_ms=self._span("start_tls"),
+            ttfb_ms=self._span(
+                "send_request_headers", end="receive_response_headers.complete"
+            ),
+            download_ms=self._span("receive_response_body"),
+        )
 
 
 @dataclass(frozen=True, slots=True)
@@ -40,6 +162,10 @@ class RunResult:
     response_body: dict[str, Any] | None = None
     is_success: bool = False
     error_message: str | None = None
+    queue_wait_ms: float = 0.0  # time spent waiting for an origin slot
+    phases: PhaseTimings | None = None
+    body_bytes: int | None = None  # bytes read before completion or the cap
+    body_truncated: bool = False  # reading stopped at MAX_RESPONSE_BODY_BYTES
 
 
 @dataclass(slots=True)
@@ -51,39 +177,170 @@ class RunnerConfig:
     retry_backoff_seconds: float = DEFAULT_RETRY_BACKOFF_SECONDS
 
 
+def _environment_proxies() -> dict[str, str | None]:
+    """Mount pattern → proxy URL from HTTP(S)_PROXY / ALL_PROXY; NO_PROXY hosts → None."""
+    info = urllib.request.getproxies()
+    mounts: dict[str, str | None] = {}
+    for scheme in ("http", "https", "all"):
+        proxy = info.get(scheme)
+        if proxy:
+            mounts[f"{scheme}://"] = proxy if "://" in proxy else f"http://{proxy}"
+    for host in (h.strip() for h in info.get("no", "").split(",")):
+        if host == "*":
+            return {}
+        if not host:
+            continue
+        try:
+            ip = ipaddress.ip_address(host.strip("[]"))
+        except ValueError:
+            ip = None
+        if "://" in host:
+            mounts[host] = None
+        elif ip is not None and ip.version == 6:
+            mounts[f"all://[{ip}]"] = None
+        elif ip is not None or host.lower() == "localhost":
+            mounts[f"all://{host}"] = None
+        else:
+            mounts[f"all://*{host.lstrip('.')}"] = None
+    return mounts
+
+
+class _Inflater:
+    """Incremental gzip / deflate decoder whose output per call is bounded."""
+
+    def __init__(self, wbits: int, raw_fallback: bool = False) -> None:
+        self._obj = zlib.decompressobj(wbits)
+        self._raw_fallback = raw_fallback  # deflate sent without a zlib header
+        self._started = False
+
+    @classmethod
+    def for_encoding(cls, encoding: str) -> _Inflater | None:
+        if encoding in ("gzip", "x-gzip"):
+            return cls(16 + zlib.MAX_WBITS)
+        if encoding == "deflate":
+            return cls(zlib.MAX_WBITS, raw_fallback=True)
+        return None
+
+    def inflate(self, data: bytes, max_length: int) -> bytes:
+        """Decode ``data``, returning at most ``max_length`` bytes."""
+        try:
+            out = self._obj.decompress(data, max_length)
+        except zlib.error as exc:
+            if not (self._raw_fallback and not self._started):
+                raise httpx.DecodingError(str(exc)) from exc
+            self._raw_fallback = False
+            self._obj = zlib.decompressobj(-zlib.MAX_WBITS)
+            return self.inflate(data, max_length)
+        self._started = True
+        return out
+
+
 class ApiRunner:
     """
     Async HTTP execution engine.
 
-    Holds a shared ``httpx.AsyncClient`` with connection pooling.
-    Created once at app startup, reused across all requests.
+    Holds a shared ``httpx.AsyncClient`` with connection pooling, plus
+    lazily created clients per (HTTP/2, keep-alive tier) that share one
+    DNS cache.  Created once at app startup, reused across all requests.
     """
 
     def __init__(self) -> None:
         self._client: httpx.AsyncClient | None = None
+        self._clients: dict[tuple[bool, float], httpx.AsyncClient] = {}
+        self._origins = OriginLimiter()
+        self._dns = DnsCache()
+        self._http2_origins: frozenset[str] = frozenset()
+        self._pool_hits = 0
+        self._pool_misses = 0
+        self._warned_no_h2 = False
+
+    @property
+    def origin_stats(self) -> dict[str, Any]:
+        """Per-origin gate counters for health reporting."""
+        return self._origins.stats()
+
+    @property
+    def connection_stats(self) -> dict[str, Any]:
+        """Connection reuse and DNS cache counters for health reporting."""
+        total = self._pool_hits + self._pool_misses
+        return {
+            "pool_hits": self._pool_hits,
+            "pool_misses": self._pool_misses,
+            "pool_hit_rate": round(self._pool_hits / total, 3) if total else None,
+            "clients": len(self._clients) + (self._client is not None),
+            "http2_available": HTTP2_AVAILABLE,
+            "dns": self._dns.stats() if settings.RUNNER_DNS_CACHE_ENABLED else None,
+        }
 
     # ── lifecycle ────────────────────────────────────────────────────────
 
     async def startup(self) -> None:
         """Create the shared HTTP client.  Call once during app lifespan."""
-        self._client = httpx.AsyncClient(
-            follow_redirects=True,
-            limits=httpx.Limits(
-                max_connections=100,
-                max_keepalive_connections=20,
-                keepalive_expiry=30,
-            ),
-            headers={"User-Agent": "SentinelAI/0.1.0"},
+        self._http2_origins = frozenset(
+            origin_of(o) for o in settings.RUNNER_HTTP2_ORIGINS
         )
+        self._client = self._build_client(http2=False, keepalive=DEFAULT_KEEPALIVE_SECONDS)
         logger.info("ApiRunner HTTP client started")
 
     async def shutdown(self) -> None:
-        """Close the shared HTTP client.  Call once during app shutdown."""
+        """Close the shared HTTP clients.  Call once during app shutdown."""
+        for client in self._clients.values():
+            await client.aclose()
+        self._clients.clear()
         if self._client:
             await self._client.aclose()
             self._client = None
             logger.info("ApiRunner HTTP client closed")
 
+    def _build_client(self, *, http2: bool, keepalive: float) -> httpx.AsyncClient:
+        limits = httpx.Limits(
+            max_connections=MAX_CONNECTIONS,
+            max_keepalive_connections=settings.RUNNER_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=keepalive,
+        )
+        # Only encodings _read_capped can inflate under its budget.
+        headers = {"User-Agent": USER_AGENT, "Accept-Encoding": ACCEPT_ENCODING}
+        if not settings.RUNNER_DNS_CACHE_ENABLED:
+            # httpx builds the transport and honours HTTP(S)_PROXY itself.
+            return httpx.AsyncClient(
+                http2=http2, limits=limits, follow_redirects=True, headers=headers,
+            )
+        # An explicit transport turns off httpx's environment proxies, so
+        # mount them here; proxied requests are resolved by the proxy.
+        mounts = {
+            pattern: httpx.AsyncHTTPTransport(proxy=proxy, http2=http2, limits=limits)
+            if proxy is not None else None
+            for pattern, proxy in _environment_proxies().items()
+        }
+        return httpx.AsyncClient(
+            transport=CachingTransport(self._dns, limits=limits, http2=http2),
+            mounts=mounts,
+            follow_redirects=True,
+            headers=headers,
+        )
+
+    def _client_for(
+        self, url: str, http2: bool, interval_seconds: int | None
+    ) -> httpx.AsyncClient | None:
+        """Client whose protocol and keep-alive fit this endpoint."""
+        use_h2 = http2 or (
+            bool(self._http2_origins) and origin_of(url) in self._http2_origins
+        )
+        if use_h2 and not HTTP2_AVAILABLE:
+            if not self._warned_no_h2:
+                logger.warning("HTTP/2 requested but h2 is not installed — using HTTP/1.1")
+                self._warned_no_h2 = True
+            use_h2 = False
+
+        keepalive = keepalive_for_interval(interval_seconds)
+        if self._client is None or (not use_h2 and keepalive == DEFAULT_KEEPALIVE_SECONDS):
+            return self._client
+        key = (use_h2, keepalive)
+        client = self._clients.get(key)
+        if client is None:
+            client = self._clients[key] = self._build_client(http2=use_h2, keepalive=keepalive)
+        return client
+
     # ── public API ───────────────────────────────────────────────────────
 
     async def execute(
@@ -97,6 +354,10 @@ class ApiRunner:
         params: dict[str, str] | None = None,
         content: str | None = None,
         content_type: str | None = None,
+        limits: OriginLimits | None = None,
+        tenant: Any = None,
+        http2: bool = False,
+        interval_seconds: int | None = None,
     ) -> RunResult:
         """
         Execute an HTTP request with retries and return a ``RunResult``.
@@ -109,8 +370,16 @@ class ApiRunner:
           - params: query string parameters to append.
           - content: raw request body (string).
           - content_type: body Content-Type header (set automatically for JSON).
+
+        Each attempt first waits for a slot on the URL's origin under
+        ``limits`` (defaults from settings), scoped to ``tenant``.
+        ``interval_seconds`` (the endpoint's probe interval) picks a
+        keep-alive that spans the gap between runs; ``http2`` opts the
+        endpoint into HTTP/2.
         """
         cfg = config or RunnerConfig()
+        origin_limits = limits or OriginLimits.resolve()
+        client = self._client_for(url, http2, interval_seconds)
         last_result: RunResult | None = None
 
         for attempt in range(1, cfg.max_retries + 1):
@@ -123,6 +392,9 @@ class ApiRunner:
                 params=params,
                 content=content,
                 content_type=content_type,
+                limits=origin_limits,
+                tenant=tenant,
+                client=client,
             )
 
             # Success or non-retryable HTTP response → return immediately.
@@ -159,13 +431,19 @@ class ApiRunner:
         params: dict[str, str] | None = None,
         content: str | None = None,
         content_type: str | None = None,
+        limits: OriginLimits | None = None,
+        tenant: Any = None,
+        client: httpx.AsyncClient | None = None,
     ) -> RunResult:
         """Execute one HTTP request and measure its response time."""
-        if self._client is None:
+        client = client or self._client
+        if client is None:
             return RunResult(
                 error_message="ApiRunner not started — call startup() first"
             )
 
+        dns_times: list[float] = []
+        dns_token = dns_timing.set(dns_times)
         try:
             # Build request kwargs
             kwargs: dict[str, Any] = {
@@ -183,12 +461,37 @@ class ApiRunner:
                 if content_type and (not headers or "Content-Type" not in headers):
                     kwargs.setdefault("headers", {})
                     kwargs["headers"]["Content-Type"] = content_type
-
-            start = time.perf_counter()
-            response = await self._client.request(**kwargs)
-            elapsed_ms = round((time.perf_counter() - start) * 1000, 2)
-
-            body = self._safe_parse_json(response)
+            trace = _PhaseTrace()
+            kwargs["extensions"] = {"trace": trace}
+
+            waited_ms = 0.0
+            async with self._origins.slot(
+                url, limits or OriginLimits.resolve(), tenant
+            ) as waited_ms:
+                # Timed only once the origin slot is held.
+                start = time.perf_counter()
+                request = client.build_request(**kwargs)
+                response = await client.send(request, stream=True)
+                try:
+                    download_start = time.perf_counter()
+                    raw, body_bytes, truncated = await self._read_capped(response)
+                    download_ms = round((time.perf_counter() - download_start) * 1000, 2)
+                finally:
+                    await response.aclose()
+                elapsed_ms = round((time.perf_counter() - start) * 1000, 2)
+
+            if truncated:
+                logger.warning(
+                    "%s %s body exceeded %d bytes — stopped reading after %d",
+                    method, url, MAX_RESPONSE_BODY_BYTES, body_bytes,
+                )
+            body = self._safe_parse_json(response.headers.get("content-type", ""), raw)
+            dns_ms = round(sum(dns_times), 2) if dns_times else None
+            phases = trace.timings(dns_ms) or PhaseTimings()
+            if trace.opened_connection:
+                self._pool_misses += 1
+            elif phases.ttfb_ms is not None:  # traced transport, pooled connection
+                self._pool_hits += 1
             is_success = response.status_code == expected_status
 
             if not is_success:
@@ -206,6 +509,11 @@ class ApiRunner:
                 response_time_ms=elapsed_ms,
                 response_body=body,
                 is_success=is_success,
+                queue_wait_ms=waited_ms,
+                # Measured here: an early stop never completes the trace span.
+                phases=replace(phases, download_ms=download_ms),
+                body_bytes=body_bytes,
+                body_truncated=truncated,
             )
 
         except httpx.TimeoutException as exc:
@@ -213,6 +521,8 @@ class ApiRunner:
             return RunResult(
                 response_time_ms=elapsed_ms,
                 error_message=f"Timeout after {timeout}s: {exc}",
+                queue_wait_ms=waited_ms,
+                phases=trace.timings(round(sum(dns_times), 2) if dns_times else None),
             )
 
         except httpx.ConnectError as exc:
@@ -225,29 +535,68 @@ class ApiRunner:
             logger.exception("Unexpected error calling %s %s", method, url)
             return RunResult(error_message=f"Unexpected error: {exc}")
 
+        finally:
+            dns_timing.reset(dns_token)
+
     @staticmethod
-    def _safe_parse_json(response: httpx.Response) -> dict[str, Any] | None:
+    async def _read_capped(
+        response: httpx.Response,
+    ) -> tuple[bytes | None, int, bool]:
+        """
+        Stream the body, keeping at most ``MAX_RESPONSE_BODY_BYTES`` decoded.
+
+        Reads the raw (still compressed) stream and inflates gzip / deflate
+        step by step with ``max_length`` set to what is left of the budget,
+        so a small compressed body never expands past the cap in memory.
+
+        Returns ``(content, bytes_seen, truncated)``.  Once the budget is
+        exceeded reading stops, the partial buffer is discarded and
+        ``content`` is ``None``.  An encoding other than gzip / deflate
+        yields ``content`` ``None`` (the body cannot be decoded safely).
+        """
+        if response.is_stream_consumed:  # built in memory, already decoded (mock transports)
+            content = response.content
+            if len(content) > MAX_RESPONSE_BODY_BYTES:
+                return None, len(content), True
+            return content, len(content), False
+
+        encoding = response.headers.get("content-encoding", "identity").strip().lower()
+        decoder = _Inflater.for_encoding(encoding)
+        undecodable = decoder is None and encoding not in ("", "identity")
+        if undecodable:
+            logger.warning("Unsupported content-encoding %r — body not decoded", encoding)
+        buffer = bytearray()
+        raw_seen = 0
+        async for chunk in response.aiter_raw():
+            raw_seen += len(chunk)
+            if raw_seen > MAX_RESPONSE_BODY_BYTES:
+                return None, raw_seen, True
+            if decoder is None:
+                buffer += chunk
+                continue
+            remaining = MAX_RESPONSE_BODY_BYTES - len(buffer)
+            buffer += decoder.inflate(chunk, remaining + 1)
+            if len(buffer) > MAX_RESPONSE_BODY_BYTES:
+                return None, len(buffer), True
+        if undecodable:
+            return None, raw_seen, False
+        return bytes(buffer), len(buffer), False
+
+    @staticmethod
+    def _safe_parse_json(content_type: str, content: bytes | None) -> dict[str, Any] | None:
         """
         Attempt to parse the response body as JSON.
 
         Returns ``None`` if:
         - Content-Type is not JSON.
-        - Body exceeds size cap.
+        - Body exceeded the read budget (``content`` is ``None``).
         - Body is not valid JSON.
         """
-        content_type = response.headers.get("content-type", "")
-        if "json" not in content_type:
-            return None
-
-        if len(response.content) > MAX_RESPONSE_BODY_BYTES:
-            logger.warning(
-                "Response body too large (%d bytes), skipping JSON parse",
-                len(response.content),
-            )
+        if "json" not in content_type or content is None:
             return None
 
         try:
-            data = response.json()
+            data = json.loads(content)
             # Only store dicts at top level — lists / primitives are wrapped.
             if isinstance(data, dict):
                 return data
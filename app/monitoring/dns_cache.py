@@ -0,0 +1,285 @@
+"""
+TTL-respecting async DNS cache for the probe client.
+
+Responsibilities:
+  - Resolve probe hostnames once per record TTL instead of on every new
+    connection (httpcore otherwise calls ``getaddrinfo`` inside every
+    ``connect_tcp``).
+  - Coalesce concurrent lookups of the same name into one query.
+  - Report per-request resolution time so ``ApiRunner`` can fill
+    ``PhaseTimings.dns_ms`` separately from the TCP connect.
+
+Resolution:
+  - ``dnspython``'s async resolver provides the record TTL, clamped to
+    ``[RUNNER_DNS_MIN_TTL_SECONDS, RUNNER_DNS_MAX_TTL_SECONDS]``.
+  - Names it cannot answer (``/etc/hosts`` entries, ``localhost``) fall
+    back to ``getaddrinfo`` cached for ``RUNNER_DNS_FALLBACK_TTL_SECONDS``.
+  - IP literals are never looked up.
+
+``CachingNetworkBackend`` plugs the cache into httpcore's connection
+pool, and ``CachingTransport`` is the httpx transport that owns such a
+pool (httpx has no public hook for the network backend).  TLS still uses the original hostname for SNI and certificate
+verification, because httpcore takes it from the request origin.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import ipaddress
+import logging
+import socket
+import time
+from collections.abc import AsyncIterator, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any
+
+import httpcore
+import httpx
+
+try:
+    import dns.asyncresolver
+    import dns.exception
+    import dns.resolver
+except ImportError:  # pragma: no cover — declared in requirements.txt
+    dns = None
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+MAX_CACHED_HOSTS = 4096
+
+# Per-request accumulator for lookup time, set by ApiRunner around a request.
+dns_timing: ContextVar[list[float] | None] = ContextVar("dns_timing", default=None)
+
+
+def _is_ip(host: str) -> bool:
+    try:
+        ipaddress.ip_address(host.strip("[]"))
+    except ValueError:
+        return False
+    return True
+
+
+class DnsCache:
+    """Hostname → addresses, each entry expiring with its record TTL."""
+
+    def __init__(self) -> None:
+        self._entries: dict[str, tuple[float, list[str]]] = {}  # host → (expires_at, ips)
+        self._pending: dict[str, asyncio.Future[list[str]]] = {}
+        self._hits = 0
+        self._misses = 0
+
+    async def resolve(self, host: str) -> list[str]:
+        """Addresses for ``host`` (cached).  Raises ``OSError`` if unresolvable."""
+        if _is_ip(host):
+            return [host.strip("[]")]
+
+        entry = self._entries.get(host)
+        if entry is not None and entry[0] > time.monotonic():
+            self._hits += 1
+            return entry[1]
+
+        pending = self._pending.get(host)
+        if pending is not None:
+            self._hits += 1
+            return await asyncio.shield(pending)
+
+        self._misses += 1
+        fut: asyncio.Future[list[str]] = asyncio.get_running_loop().create_future()
+        self._pending[host] = fut
+        try:
+            ips, ttl = await self._lookup(host)
+        except asyncio.CancelledError:
+            fut.cancel()
+            raise
+        except Exception as exc:
+            fut.set_exception(exc)
+            fut.exception()  # mark retrieved when nobody else was waiting
+            raise
+        else:
+            fut.set_result(ips)
+            if len(self._entries) >= MAX_CACHED_HOSTS:
+                self._evict_expired()
+            self._entries[host] = (time.monotonic() + ttl, ips)
+            return ips
+        finally:
+            self._pending.pop(host, None)
+
+    async def _lookup(self, host: str) -> tuple[list[str], float]:
+        if dns is not None and host != "localhost" and not host.endswith(".localhost"):
+            try:
+                for rdtype in ("A", "AAAA"):
+                    try:
+                        answer = await dns.asyncresolver.resolve(host, rdtype, lifetime=5.0)
+                    except (dns.resolver.NoAnswer, dns.resolver.NXDOMAIN):
+                        continue
+                    ips = [rr.address for rr in answer]
+                    ttl = float(answer.rrset.ttl) if answer.rrset is not None else 0.0
+                    ttl = min(
+                        max(ttl, settings.RUNNER_DNS_MIN_TTL_SECONDS),
+                        settings.RUNNER_DNS_MAX_TTL_SECONDS,
+                    )
+                    return ips, ttl
+            except dns.exception.DNSException:
+                pass
+
+        infos = await asyncio.get_running_loop().getaddrinfo(
+            host, None, type=socket.SOCK_STREAM
+        )
+        ips = list(dict.fromkeys(info[4][0] for info in infos))
+        if not ips:
+            raise OSError(f"No addresses for {host}")
+        return ips, float(settings.RUNNER_DNS_FALLBACK_TTL_SECONDS)
+
+    def _evict_expired(self) -> None:
+        now = time.monotonic()
+        for host in [h for h, (exp, _) in self._entries.items() if exp <= now]:
+            del self._entries[host]
+        if len(self._entries) >= MAX_CACHED_HOSTS:
+            self._entries.clear()
+
+    def stats(self) -> dict[str, Any]:
+        total = self._hits + self._misses
+        return {
+            "entries": len(self._entries),
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_rate": round(self._hits / total, 3) if total else None,
+        }
+
+
+class CachingNetworkBackend(httpcore.AsyncNetworkBackend):
+    """httpcore backend that resolves through ``DnsCache`` before connecting."""
+
+    def __init__(self, cache: DnsCache, inner: httpcore.AsyncNetworkBackend | None = None) -> None:
+        self._cache = cache
+        self._inner = inner or httpcore.AnyIOBackend()
+
+    async def connect_tcp(
+        self,
+        host: str,
+        port: int,
+        timeout: float | None = None,
+        local_address: str | None = None,
+        socket_options: Any = None,
+    ) -> httpcore.AsyncNetworkStream:
+        start = time.perf_counter()
+        try:
+            ips = await self._cache.resolve(host)
+        except OSError as exc:
+            raise httpcore.ConnectError(str(exc)) from exc
+        finally:
+            timing = dns_timing.get()
+            if timing is not None:
+                timing.append((time.perf_counter() - start) * 1000)
+
+        last_exc: Exception | None = None
+        for ip in ips:
+            try:
+                return await self._inner.connect_tcp(
+                    ip, port, timeout=timeout,
+                    local_address=local_address, socket_options=socket_options,
+                )
+            except (httpcore.ConnectError, httpcore.ConnectTimeout) as exc:
+                last_exc = exc
+        assert last_exc is not None
+        raise last_exc
+
+    async def connect_unix_socket(self, path: str, timeout: float | None = None, socket_options: Any = None):  # noqa: ANN201
+        return await self._inner.connect_unix_socket(path, timeout=timeout, socket_options=socket_options)
+
+    async def sleep(self, seconds: float) -> None:
+        await self._inner.sleep(seconds)
+
+
+# httpcore → httpx exceptions, most specific first.
+_EXCEPTION_MAP: tuple[tuple[type[Exception], type[httpx.HTTPError]], ...] = (
+    (httpcore.ConnectTimeout, httpx.ConnectTimeout),
+    (httpcore.ReadTimeout, httpx.ReadTimeout),
+    (httpcore.WriteTimeout, httpx.WriteTimeout),
+    (httpcore.PoolTimeout, httpx.PoolTimeout),
+    (httpcore.TimeoutException, httpx.TimeoutException),
+    (httpcore.ConnectError, httpx.ConnectError),
+    (httpcore.ReadError, httpx.ReadError),
+    (httpcore.WriteError, httpx.WriteError),
+    (httpcore.NetworkError, httpx.NetworkError),
+    (httpcore.ProxyError, httpx.ProxyError),
+    (httpcore.UnsupportedProtocol, httpx.UnsupportedProtocol),
+    (httpcore.RemoteProtocolError, httpx.RemoteProtocolError),
+    (httpcore.LocalProtocolError, httpx.LocalProtocolError),
+    (httpcore.ProtocolError, httpx.ProtocolError),
+)
+
+
+@contextmanager
+def _mapped_exceptions(request: httpx.Request) -> Iterator[None]:
+    try:
+        yield
+    except Exception as exc:
+        for source, target in _EXCEPTION_MAP:
+            if isinstance(exc, source):
+                raise target(str(exc), request=request) from exc
+        raise
+
+
+class _ResponseStream(httpx.AsyncByteStream):
+    def __init__(self, stream: Any, request: httpx.Request) -> None:
+        self._stream = stream
+        self._request = request
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        with _mapped_exceptions(self._request):
+            async for chunk in self._stream:
+                yield chunk
+
+    async def aclose(self) -> None:
+        if hasattr(self._stream, "aclose"):
+            await self._stream.aclose()
+
+
+class CachingTransport(httpx.AsyncBaseTransport):
+    """httpx transport owning an httpcore pool that connects via ``CachingNetworkBackend``."""
+
+    def __init__(
+        self,
+        cache: DnsCache,
+        *,
+        limits: httpx.Limits,
+        http2: bool = False,
+    ) -> None:
+        self._pool = httpcore.AsyncConnectionPool(
+            ssl_context=httpx.create_ssl_context(),
+            max_connections=limits.max_connections,
+            max_keepalive_connections=limits.max_keepalive_connections,
+            keepalive_expiry=limits.keepalive_expiry,
+            http1=True,
+            http2=http2,
+            network_backend=CachingNetworkBackend(cache),
+        )
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        core_request = httpcore.Request(
+            method=request.method,
+            url=httpcore.URL(
+                scheme=request.url.raw_scheme,
+                host=request.url.raw_host,
+                port=request.url.port,
+                target=request.url.raw_path,
+            ),
+            headers=request.headers.raw,
+            content=request.stream,
+            extensions=request.extensions,
+        )
+        with _mapped_exceptions(request):
+            response = await self._pool.handle_async_request(core_request)
+        return httpx.Response(
+            status_code=response.status,
+            headers=response.headers,
+            stream=_ResponseStream(response.stream, request),
+            extensions=response.extensions,
+        )
+
+    async def aclose(self) -> None:
+        await self._pool.aclose()
@@ -0,0 +1,186 @@
+"""
+Hourly latency histograms per endpoint.
+
+Responsibilities:
+  - Fold every run's response time into an in-memory ``LatencyHistogram``
+    for its (endpoint, UTC hour) bucket.
+  - Merge pending buckets into ``endpoint_latency_histograms`` every
+    ``LATENCY_HISTOGRAM_FLUSH_SECONDS`` and on shutdown.
+  - Serve percentiles over any window of whole hours by merging stored
+    rows with this process's unflushed buckets, so dashboards and SLA
+    reports never scan ``api_runs``.
+
+Histograms are log-bucketed (10% growth), so a percentile is within
+~10% of the exact value; counts and means are exact.  Merging is exact
+too, which is what makes per-hour rows composable into 24 h / 7 d / 30 d
+windows and lets several workers add to the same hour.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.monitoring.pipeline_stats import LatencyHistogram
+from app.repositories.latency_stats import EndpointLatencyHistogramRepository, HistogramBuckets
+
+logger = logging.getLogger(__name__)
+
+def bucket_start(at: datetime) -> datetime:
+    """Start of the UTC hour containing ``at``."""
+    return at.astimezone(timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+
+class LatencyHistogramStore:
+    """Pending per-hour histograms of this process, flushed periodically."""
+
+    def __init__(self, factory: async_sessionmaker[AsyncSession] | None = None) -> None:
+        self._factory = factory
+        self._pending: HistogramBuckets = {}
+        self._flushing: HistogramBuckets = {}  # being written; still readable
+        self._task: asyncio.Task[None] | None = None
+        self._observed = 0
+        self._flushes = 0
+        self._rows_written = 0
+        self._last_flush_at: float | None = None
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def observe(
+        self,
+        endpoint_id: uuid.UUID,
+        organization_id: uuid.UUID,
+        latency_ms: float,
+        at: datetime | None = None,
+    ) -> None:
+        key = (endpoint_id, bucket_start(at or datetime.now(timezone.utc)))
+        entry = self._pending.get(key)
+        if entry is None:
+            entry = self._pending[key] = (organization_id, LatencyHistogram())
+        entry[1].observe(latency_ms)
+        self._observed += 1
+
+    async def window(
+        self,
+        repo: EndpointLatencyHistogramRepository,
+        organization_id: uuid.UUID,
+        since: datetime,
+        until: datetime | None = None,
+        endpoint_id: uuid.UUID | None = None,
+    ) -> dict[datetime, LatencyHistogram]:
+        """
+        Hour → histogram (all matching endpoints merged) for the hours
+        overlapping [since, until).
+        """
+        start = bucket_start(since)
+        hours: dict[datetime, LatencyHistogram] = {}
+
+        def add(hour: datetime, hist: LatencyHistogram) -> None:
+            merged = hours.get(hour)
+            if merged is None:
+                merged = hours[hour] = LatencyHistogram()
+            merged.merge(hist)
+
+        for _, hour, hist in await repo.list_window(organization_id, start, until, endpoint_id):
+            add(hour, hist)
+        unflushed = [*self._flushing.items(), *self._pending.items()]
+        for (eid, hour), (org_id, hist) in unflushed:
+            if (
+                org_id == organization_id
+                and (endpoint_id is None or eid == endpoint_id)
+                and hour >= start
+                and (until is None or hour < until)
+            ):
+                add(hour, hist)
+        return dict(sorted(hours.items()))
+
+    # ── persistence ──────────────────────────────────────────────────
+
+    async def flush(self) -> int:
+        """Merge every pending bucket into the table in one transaction."""
+        if not self._pending:
+            return 0
+        pending, self._pending = self._pending, {}
+        self._flushing = pending
+        try:
+            async with self._session() as session:
+                await EndpointLatencyHistogramRepository(session).merge_many(pending)
+                await session.commit()
+                self._flushing = {}
+        except Exception:
+            logger.exception("Failed to persist %d latency histogram bucket(s)", len(pending))
+            self._flushing = {}
+            # Put them back, folding in anything observed meanwhile.
+            for key, (org_id, hist) in pending.items():
+                entry = self._pending.get(key)
+                if entry is not None:
+                    hist.merge(entry[1])
+                self._pending[key] = (org_id, hist)
+            return 0
+        self._flushes += 1
+        self._rows_written += len(pending)
+        self._last_flush_at = time.time()
+        return len(pending)
+
+    # ── lifecycle ────────────────────────────────────────────────────
+
+    def startup(self) -> None:
+        """Start the flush loop.  Call once during app lifespan."""
+        if not settings.LATENCY_HISTOGRAMS_ENABLED:
+            return
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="latency-histogram-flush")
+
+    async def shutdown(self) -> None:
+        """Stop the flush loop and persist pending buckets."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "pending_buckets": len(self._pending),
+            "observed": self._observed,
+            "flushes": self._flushes,
+            "rows_written": self._rows_written,
+            "last_flush_at": self._last_flush_at,
+        }
+
+    # ── internals ────────────────────────────────────────────────────
+
+    def _session(self) -> AsyncSession:
+        factory = self._factory
+        if factory is None:
+            from app.db.session import async_session_factory as factory
+        return factory()
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(settings.LATENCY_HISTOGRAM_FLUSH_SECONDS)
+            await self.flush()
+
+
+def merge_all(hours: dict[datetime, LatencyHistogram]) -> LatencyHistogram:
+    """One histogram for a whole window."""
+    merged = LatencyHistogram()
+    for hist in hours.values():
+        merged.merge(hist)
+    return merged
+
+
+# ─── module-level singleton ─────────────────────────────────────────────
+
+latency_histograms = LatencyHistogramStore()
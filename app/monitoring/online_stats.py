@@ -0,0 +1,465 @@
+"""
+Streaming per-endpoint latency statistics.
+
+Responsibilities:
+  - Maintain, per endpoint and in O(1) per sample:
+      * a Welford accumulator (exact lifetime mean / variance),
+      * an EWMA mean and variance (recent-weighted baseline that never
+        needs the raw history),
+      * P² estimators (Jain & Chlamtac, 1985) of the median and p95,
+      * an hour-of-week profile (``SeasonalProfile``): an EWMA mean and
+        variance per UTC (weekday, hour) slot, so business-hours load is
+        expected rather than flagged.
+  - Feed ``PerformanceTracker`` a long-horizon baseline, so spike
+    detection does not read history on each run.
+  - Persist every changed endpoint's state to ``endpoint_latency_stats``
+    every ``ONLINE_STATS_FLUSH_SECONDS`` and on shutdown, and warm it
+    back at startup.  Endpoints without stored state are seeded from
+    the last ``ONLINE_STATS_SEED_DAYS`` of runs by a background pass at
+    startup; one first seen later is seeded on first use, from the
+    in-memory run history when available.
+
+State is per process and last-writer-wins in the table: with several
+scheduler workers each endpoint is owned by one worker at a time.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Iterable
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.repositories.api_run import ApiRunRepository
+from app.repositories.latency_stats import EndpointLatencyStatsRepository
+
+logger = logging.getLogger(__name__)
+
+STATE_VERSION = 1
+SLOTS = 7 * 24
+SEED_LIMIT = 50_000  # newest runs read when seeding a new endpoint
+
+
+def _epoch(value: datetime) -> float:
+    if value.tzinfo is None:  # SQLite returns naive UTC
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def slot_of(ts: float) -> int:
+    """Hour-of-week slot of a UNIX timestamp (UTC, Monday 00:00 = 0)."""
+    t = time.gmtime(ts)
+    return t.tm_wday * 24 + t.tm_hour
+
+
+class Welford:
+    """Running count, mean and sum of squared deviations."""
+
+    __slots__ = ("count", "mean", "m2")
+
+    def __init__(self, count: int = 0, mean: float = 0.0, m2: float = 0.0) -> None:
+        self.count = count
+        self.mean = mean
+        self.m2 = m2
+
+    def add(self, x: float) -> None:
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (x - self.mean)
+
+    @property
+    def stddev(self) -> float:
+        """Sample standard deviation (0 below two samples)."""
+        return math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else 0.0
+
+
+class Ewma:
+    """Exponentially weighted mean and variance."""
+
+    __slots__ = ("alpha", "mean", "var", "primed")
+
+    def __init__(self, alpha: float, mean: float = 0.0, var: float = 0.0, primed: bool = False) -> None:
+        self.alpha = alpha
+        self.mean = mean
+        self.var = var
+        self.primed = primed
+
+    def add(self, x: float) -> None:
+        if not self.primed:
+            self.mean, self.var, self.primed = x, 0.0, True
+            return
+        delta = x - self.mean
+        increment = self.alpha * delta
+        self.mean += increment
+        self.var = (1 - self.alpha) * (self.var + delta * increment)
+
+    @property
+    def stddev(self) -> float:
+        return math.sqrt(self.var)
+
+
+class P2Quantile:
+    """
+    P² streaming estimate of one quantile: five markers, no samples kept.
+
+    Exact (nearest rank over the first samples) until five have been seen.
+    """
+
+    __slots__ = ("p", "heights", "positions", "desired")
+
+    def __init__(
+        self,
+        p: float,
+        heights: list[float] | None = None,
+        positions: list[float] | None = None,
+        desired: list[float] | None = None,
+    ) -> None:
+        self.p = p
+        self.heights = heights if heights is not None else []
+        self.positions = positions if positions is not None else [0.0, 1.0, 2.0, 3.0, 4.0]
+        self.desired = desired if desired is not None else [0.0, 2 * p, 4 * p, 2 + 2 * p, 4.0]
+
+    def add(self, x: float) -> None:
+        q, n = self.heights, self.positions
+        if len(q) < 5:
+            q.append(x)
+            q.sort()
+            return
+
+        if x < q[0]:
+            q[0] = x
+            k = 0
+        elif x >= q[4]:
+            q[4] = x
+            k = 3
+        else:
+            k = next(i for i in range(1, 5) if x < q[i]) - 1
+        for i in range(k + 1, 5):
+            n[i] += 1
+        increments = (0.0, self.p / 2, self.p, (1 + self.p) / 2, 1.0)
+        for i in range(5):
+            self.desired[i] += increments[i]
+
+        for i in (1, 2, 3):
+            d = self.desired[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                step = 1 if d > 0 else -1
+                candidate = self._parabolic(i, step)
+                if q[i - 1] < candidate < q[i + 1]:
+                    q[i] = candidate
+                else:
+                    q[i] = q[i] + step * (q[i + step] - q[i]) / (n[i + step] - n[i])
+                n[i] += step
+
+    def _parabolic(self, i: int, step: int) -> float:
+        q, n = self.heights, self.positions
+        return q[i] + step / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + step) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+            + (n[i + 1] - n[i] - step) * (q[i] - q[i - 1]) / (n[i] - n[i - 1])
+        )
+
+    @property
+    def value(self) -> float | None:
+        q = self.heights
+        if not q:
+            return None
+        if len(q) < 5:
+            return q[min(len(q) - 1, int(len(q) * self.p))]
+        return q[2]
+
+
+class SeasonalProfile:
+    """
+    EWMA mean and variance per hour-of-week slot.
+
+    Each slot only moves on samples taken in that hour of the week, so it
+    remembers last week's shape; the first sample of a slot primes it.
+    """
+
+    __slots__ = ("alpha", "counts", "means", "variances")
+
+    def __init__(
+        self,
+        alpha: float,
+        counts: list[int] | None = None,
+        means: list[float] | None = None,
+        variances: list[float] | None = None,
+    ) -> None:
+        self.alpha = alpha
+        self.counts = counts if counts is not None else [0] * SLOTS
+        self.means = means if means is not None else [0.0] * SLOTS
+        self.variances = variances if variances is not None else [0.0] * SLOTS
+
+    def add(self, x: float, ts: float) -> None:
+        slot = slot_of(ts)
+        if self.counts[slot]:
+            delta = x - self.means[slot]
+            increment = self.alpha * delta
+            self.means[slot] += increment
+            self.variances[slot] = (1 - self.alpha) * (self.variances[slot] + delta * increment)
+        else:
+            self.means[slot], self.variances[slot] = x, 0.0
+        self.counts[slot] += 1
+
+    def expected(self, ts: float) -> tuple[int, int, float, float]:
+        """(slot, samples, mean, stddev) of the slot containing ``ts``."""
+        slot = slot_of(ts)
+        return slot, self.counts[slot], self.means[slot], math.sqrt(self.variances[slot])
+
+
+class EndpointStats:
+    """Streaming latency state of one endpoint."""
+
+    __slots__ = ("lifetime", "ewma", "median", "p95", "seasonal", "dirty")
+
+    def __init__(self, alpha: float, seasonal_alpha: float | None = None) -> None:
+        self.lifetime = Welford()
+        self.ewma = Ewma(alpha)
+        self.median = P2Quantile(0.5)
+        self.p95 = P2Quantile(0.95)
+        self.seasonal = SeasonalProfile(seasonal_alpha if seasonal_alpha is not None else alpha)
+        self.dirty = False
+
+    @property
+    def count(self) -> int:
+        return self.lifetime.count
+
+    def add(self, latency_ms: float, ts: float | None = None) -> None:
+        self.lifetime.add(latency_ms)
+        self.ewma.add(latency_ms)
+        self.median.add(latency_ms)
+        self.p95.add(latency_ms)
+        self.seasonal.add(latency_ms, ts if ts is not None else time.time())
+        self.dirty = True
+
+    def seed(self, oldest_first: Iterable[tuple[float, float]]) -> None:
+        """Replay (timestamp, latency_ms) samples, oldest first."""
+        for ts, latency_ms in oldest_first:
+            self.add(latency_ms, ts)
+
+    # ── serialization ────────────────────────────────────────────────
+
+    def to_state(self) -> dict[str, Any]:
+        return {
+            "v": STATE_VERSION,
+            "welford": [self.lifetime.count, self.lifetime.mean, self.lifetime.m2],
+            "ewma": [self.ewma.mean, self.ewma.var, self.ewma.primed],
+            "p2": [
+                [est.p, est.heights, est.positions, est.desired]
+                for est in (self.median, self.p95)
+            ],
+            "seasonal": [self.seasonal.counts, self.seasonal.means, self.seasonal.variances],
+        }
+
+    @classmethod
+    def from_state(
+        cls, state: dict[str, Any], alpha: float, seasonal_alpha: float | None = None
+    ) -> EndpointStats:
+        stats = cls(alpha, seasonal_alpha)
+        if state.get("v") != STATE_VERSION:
+            return stats
+        stats.lifetime = Welford(*state["welford"])
+        mean, var, primed = state["ewma"]
+        stats.ewma = Ewma(alpha, mean, var, primed)
+        stats.median, stats.p95 = (
+            P2Quantile(p, list(heights), list(positions), list(desired))
+            for p, heights, positions, desired in state["p2"]
+        )
+        # Profiles are absent from states written before seasonality.
+        if "seasonal" in state:
+            counts, means, variances = state["seasonal"]
+            stats.seasonal = SeasonalProfile(
+                stats.seasonal.alpha, list(counts), list(means), list(variances)
+            )
+        return stats
+
+
+class OnlineStatsStore:
+    """Process-wide map of endpoint id → ``EndpointStats``, persisted periodically."""
+
+    def __init__(self, factory: async_sessionmaker[AsyncSession] | None = None) -> None:
+        self._factory = factory
+        self._entries: dict[uuid.UUID, EndpointStats] = {}
+        self._task: asyncio.Task[None] | None = None
+        self._flushes = 0
+        self._rows_written = 0
+        self._seeded = 0
+        self._last_flush_at: float | None = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def alpha(self) -> float:
+        return settings.ONLINE_STATS_EWMA_ALPHA
+
+    @property
+    def seasonal_alpha(self) -> float:
+        return settings.ONLINE_STATS_SEASONAL_ALPHA
+
+    def get(self, endpoint_id: uuid.UUID) -> EndpointStats | None:
+        return self._entries.get(endpoint_id)
+
+    async def ensure(
+        self,
+        endpoint_id: uuid.UUID,
+        session: AsyncSession,
+        *,
+        seed: list[tuple[float, float]] | None = None,
+        exclude_run_id: uuid.UUID | None = None,
+    ) -> EndpointStats:
+        """
+        Stats for the endpoint: tracked, stored, or new.  A new entry is
+        seeded from ``seed`` ((timestamp, latency) samples, oldest first,
+        e.g. the in-memory run history) or else from the last
+        ``ONLINE_STATS_SEED_DAYS`` of runs except ``exclude_run_id``.
+        """
+        entry = self._entries.get(endpoint_id)
+        if entry is not None:
+            return entry
+        if seed is not None:
+            entry = EndpointStats(self.alpha, self.seasonal_alpha)
+            entry.seed(seed)
+        else:
+            row = await EndpointLatencyStatsRepository(session).get(endpoint_id)
+            if row is not None:
+                entry = self._from_state(row.state)
+            else:
+                entry = await self._seed_from_runs(endpoint_id, session, exclude_run_id)
+        return self._entries.setdefault(endpoint_id, entry)
+
+    def forget(self, endpoint_id: uuid.UUID) -> None:
+        self._entries.pop(endpoint_id, None)
+
+    # ── persistence ──────────────────────────────────────────────────
+
+    async def load(self, session: AsyncSession) -> int:
+        """Load every stored endpoint state.  Returns the number loaded."""
+        rows = await EndpointLatencyStatsRepository(session).get_all()
+        for row in rows:
+            self._entries.setdefault(row.endpoint_id, self._from_state(row.state))
+        return len(rows)
+
+    async def backfill(self, session: AsyncSession) -> int:
+        """
+        Seed every endpoint without stored state from its run history
+        (hour-of-week profile included).  Returns the number seeded.
+        """
+        ids = await EndpointLatencyStatsRepository(session).get_unseeded_endpoint_ids()
+        seeded = 0
+        for endpoint_id in ids:
+            if endpoint_id in self._entries:
+                continue
+            entry = await self._seed_from_runs(endpoint_id, session)
+            if self._entries.setdefault(endpoint_id, entry) is entry:
+                seeded += 1
+        self._seeded += seeded
+        return seeded
+
+    async def flush(self) -> int:
+        """Write every changed endpoint's state in one transaction."""
+        dirty = {eid: entry for eid, entry in self._entries.items() if entry.dirty}
+        if not dirty:
+            return 0
+        states = {eid: (entry.to_state(), entry.count) for eid, entry in dirty.items()}
+        for entry in dirty.values():
+            entry.dirty = False
+        try:
+            async with self._session() as session:
+                await EndpointLatencyStatsRepository(session).save_many(states)
+                await session.commit()
+        except Exception:
+            logger.exception("Failed to persist latency stats for %d endpoint(s)", len(states))
+            for entry in dirty.values():
+                entry.dirty = True
+            return 0
+        self._flushes += 1
+        self._rows_written += len(states)
+        self._last_flush_at = time.time()
+        return len(states)
+
+    # ── lifecycle ────────────────────────────────────────────────────
+
+    async def warm(self) -> None:
+        """Load stored states and start the flush loop.  Call once during app lifespan."""
+        if not settings.ONLINE_STATS_ENABLED:
+            return
+        try:
+            async with self._session() as session:
+                loaded = await self.load(session)
+            logger.info("Latency stats warmed for %d endpoint(s)", loaded)
+        except Exception:
+            logger.exception("Latency stats warm-up failed — endpoints load on first run")
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="online-stats-flush")
+
+    async def shutdown(self) -> None:
+        """Stop the flush loop and persist outstanding changes."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if settings.ONLINE_STATS_ENABLED:
+            await self.flush()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "endpoints": len(self._entries),
+            "dirty": sum(1 for entry in self._entries.values() if entry.dirty),
+            "flushes": self._flushes,
+            "rows_written": self._rows_written,
+            "seeded_from_history": self._seeded,
+            "last_flush_at": self._last_flush_at,
+        }
+
+    # ── internals ────────────────────────────────────────────────────
+
+    def _from_state(self, state: dict[str, Any]) -> EndpointStats:
+        return EndpointStats.from_state(state, self.alpha, self.seasonal_alpha)
+
+    def _session(self) -> AsyncSession:
+        factory = self._factory
+        if factory is None:
+            from app.db.session import async_session_factory as factory
+        return factory()
+
+    async def _seed_from_runs(
+        self,
+        endpoint_id: uuid.UUID,
+        session: AsyncSession,
+        exclude_run_id: uuid.UUID | None = None,
+    ) -> EndpointStats:
+        since = datetime.now(timezone.utc) - timedelta(days=settings.ONLINE_STATS_SEED_DAYS)
+        samples = await ApiRunRepository(session).get_latency_samples(
+            endpoint_id, since=since, exclude_run_id=exclude_run_id, limit=SEED_LIMIT
+        )
+        entry = EndpointStats(self.alpha, self.seasonal_alpha)
+        entry.seed((_epoch(created_at), ms) for created_at, ms in samples)
+        return entry
+
+    async def _run(self) -> None:
+        try:
+            async with self._session() as session:
+                seeded = await self.backfill(session)
+            if seeded:
+                logger.info("Latency baselines seeded from history for %d endpoint(s)", seeded)
+        except Exception:
+            logger.exception("Latency baseline backfill failed — endpoints seed on first run")
+        while True:
+            await asyncio.sleep(settings.ONLINE_STATS_FLUSH_SECONDS)
+            await self.flush()
+
+
+# ─── module-level singleton ─────────────────────────────────────────────
+
+online_stats = OnlineStatsStore()
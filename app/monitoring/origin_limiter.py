@@ -0,0 +1,199 @@
+"""
+Per-origin concurrency and rate limiting for outbound probes.
+
+Responsibilities:
+  - Stop many endpoints on the same customer host from being probed at
+    the same instant: each origin (``scheme://host:port``) gets a
+    concurrency cap and a token bucket.
+  - Over-limit probes wait in a FIFO queue — they are never failed.
+  - Report how long each probe waited so the runner can keep queue time
+    out of ``response_time_ms``.
+
+Limits resolve in this order (first match wins, per field):
+  1. ``advanced_config.origin_max_concurrency`` /
+     ``advanced_config.origin_rate_per_second`` on the endpoint.
+  2. ``RUNNER_ORIGIN_ORG_LIMITS[<organization id>]``.
+  3. ``RUNNER_ORIGIN_MAX_CONCURRENT`` / ``RUNNER_ORIGIN_RATE_PER_SECOND``
+     / ``RUNNER_ORIGIN_BURST``.
+
+Gates are keyed by organization *and* origin, so one tenant's probes
+never queue behind another's.  Endpoints of the same organization that
+share an origin share its gate; the most recently resolved limits apply.
+
+Pure asyncio, no DB access.  One instance per ``ApiRunner``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any
+from urllib.parse import urlsplit
+
+from app.core.config import settings
+
+MAX_TRACKED_ORIGINS = 2048  # idle gates are pruned past this
+
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def origin_of(url: str) -> str:
+    """``scheme://host:port`` for a URL (default port filled in)."""
+    parts = urlsplit(url)
+    scheme = (parts.scheme or "http").lower()
+    host = (parts.hostname or "").lower()
+    port = parts.port or _DEFAULT_PORTS.get(scheme, 0)
+    return f"{scheme}://{host}:{port}"
+
+
+@dataclass(frozen=True, slots=True)
+class OriginLimits:
+    """Concurrency cap and token bucket for one origin."""
+
+    max_concurrent: int
+    rate_per_second: float  # 0 → no rate limit
+    burst: int
+
+    @classmethod
+    def resolve(
+        cls,
+        organization_id: Any = None,
+        advanced_config: dict[str, Any] | None = None,
+    ) -> OriginLimits:
+        org = settings.RUNNER_ORIGIN_ORG_LIMITS.get(str(organization_id), {}) if organization_id else {}
+        adv = advanced_config or {}
+
+        def pick(adv_key: str, org_key: str, default: float) -> float:
+            for value in (adv.get(adv_key), org.get(org_key)):
+                if value is not None:
+                    return value
+            return default
+
+        return cls(
+            max_concurrent=max(1, int(pick(
+                "origin_max_concurrency", "max_concurrent", settings.RUNNER_ORIGIN_MAX_CONCURRENT,
+            ))),
+            rate_per_second=max(0.0, float(pick(
+                "origin_rate_per_second", "rate_per_second", settings.RUNNER_ORIGIN_RATE_PER_SECOND,
+            ))),
+            burst=max(1, int(org.get("burst", settings.RUNNER_ORIGIN_BURST))),
+        )
+
+
+class _OriginGate:
+    """FIFO concurrency slots plus a reservation-style token bucket."""
+
+    __slots__ = ("limits", "in_flight", "waiters", "tokens", "stamp")
+
+    def __init__(self, limits: OriginLimits) -> None:
+        self.limits = limits
+        self.in_flight = 0
+        self.waiters: deque[asyncio.Future[None]] = deque()
+        self.tokens = float(limits.burst)
+        self.stamp = time.monotonic()
+
+    @property
+    def idle(self) -> bool:
+        return self.in_flight == 0 and not self.waiters
+
+    async def acquire(self) -> None:
+        if self.in_flight < self.limits.max_concurrent and not self.waiters:
+            self.in_flight += 1
+        else:
+            fut: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+            self.waiters.append(fut)
+            try:
+                await fut  # release() hands the slot over directly
+            except asyncio.CancelledError:
+                if fut.done() and not fut.cancelled():
+                    self.release()
+                elif fut in self.waiters:
+                    self.waiters.remove(fut)
+                raise
+
+        try:
+            await self._take_token()
+        except asyncio.CancelledError:
+            self.release()
+            raise
+
+    async def _take_token(self) -> None:
+        rate = self.limits.rate_per_second
+        if rate <= 0:
+            return
+        now = time.monotonic()
+        self.tokens = min(float(self.limits.burst), self.tokens + (now - self.stamp) * rate)
+        self.stamp = now
+        # Reserve the token up front so sleepers are served in arrival order.
+        self.tokens -= 1.0
+        if self.tokens < 0:
+            await asyncio.sleep(-self.tokens / rate)
+
+    def release(self) -> None:
+        while self.waiters:
+            fut = self.waiters.popleft()
+            if not fut.done():
+                fut.set_result(None)  # slot passes to the waiter
+                return
+        self.in_flight = max(0, self.in_flight - 1)
+
+
+class OriginLimiter:
+    """
+    Registry of per-origin gates.
+
+    Usage::
+
+        async with limiter.slot(url, limits, tenant=org_id) as waited_ms:
+            start = time.perf_counter()  # queue time already excluded
+            ...
+    """
+
+    def __init__(self) -> None:
+        self._gates: dict[tuple[str, str], _OriginGate] = {}
+        self._waited = 0
+        self._wait_ms_total = 0.0
+
+    def _gate(self, key: tuple[str, str], limits: OriginLimits) -> _OriginGate:
+        gate = self._gates.get(key)
+        if gate is None:
+            if len(self._gates) >= MAX_TRACKED_ORIGINS:
+                for k in [k for k, g in self._gates.items() if g.idle]:
+                    del self._gates[k]
+            gate = self._gates[key] = _OriginGate(limits)
+        elif gate.limits != limits:
+            gate.limits = limits
+        return gate
+
+    @asynccontextmanager
+    async def slot(
+        self,
+        url: str,
+        limits: OriginLimits,
+        tenant: Any = None,
+    ) -> AsyncIterator[float]:
+        """Hold a slot on the URL's origin; yields the queue wait in ms."""
+        gate = self._gate((str(tenant or ""), origin_of(url)), limits)
+        start = time.perf_counter()
+        await gate.acquire()
+        waited_ms = round((time.perf_counter() - start) * 1000, 2)
+        if waited_ms >= 1:
+            self._waited += 1
+            self._wait_ms_total += waited_ms
+        try:
+            yield waited_ms
+        finally:
+            gate.release()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "tracked_origins": len(self._gates),
+            "in_flight": sum(g.in_flight for g in self._gates.values()),
+            "waiting": sum(len(g.waiters) for g in self._gates.values()),
+            "delayed_probes": self._waited,
+            "avg_delay_ms": round(self._wait_ms_total / self._waited, 1) if self._waited else 0.0,
+        }
@@ -2,13 +2,26 @@
 Performance tracking engine.
 
 Responsibilities:
-  - Calculate rolling average response time from the last N runs.
+  - Calculate rolling average response time from the last N runs, or
+    take it from the endpoint's streaming baseline (``EndpointStats``:
+    EWMA mean / variance, P² median and p95, Welford lifetime stats)
+    when one is supplied.
+  - Prefer the baseline's hour-of-week slot (the expected latency for
+    this time of the week) once it has enough samples, so endpoints
+    that are routinely slower in business hours do not spike every
+    morning.
   - Calculate deviation percentage of the current run vs the rolling average.
   - Detect abnormal performance spikes using configurable thresholds.
+  - Attribute spikes to the network (DNS/TCP/TLS connection setup) or
+    the server (time-to-first-byte) when a phase breakdown is supplied.
+    A spike that disappears once connection setup is excluded — e.g. a
+    connection-pool miss — is reported as a network spike and not
+    flagged unless it is critical.
   - Return a structured, immutable result — never touch the database.
 
 This module is a pure computation layer.  It receives pre-fetched data
-(response times list + current run time) and returns analysis.
+(response times list or streaming baseline + current run time) and
+returns analysis.
 Database access is handled by the caller (RunnerService).
 """
 
@@ -16,7 +29,12 @@ from __future__ import annotations
 
 import logging
 import statistics
+import time
 from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from app.monitoring.online_stats import EndpointStats
 
 logger = logging.getLogger(__name__)
 
@@ -24,6 +42,14 @@ logger = logging.getLogger(__name__)
 DEFAULT_WINDOW_SIZE = 20
 SPIKE_THRESHOLD_PERCENT = 50.0  # deviation ≥ 50% = spike
 CRITICAL_SPIKE_THRESHOLD_PERCENT = 150.0  # deviation ≥ 150% = critical spike
+SEASONAL_MIN_SAMPLES = 8  # hour-of-week slot samples before it is trusted
+
+LATENCY_SOURCE_NETWORK = "network"
+LATENCY_SOURCE_SERVER = "server"
+
+BASELINE_WINDOW = "window"
+BASELINE_STREAMING = "streaming"
+BASELINE_SEASONAL = "seasonal"
 
 
 @dataclass(frozen=True, slots=True)
@@ -38,6 +64,14 @@ class PerformanceResult:
     is_spike: bool
     is_critical_spike: bool
     sample_size: int
+    connection_ms: float | None = None
+    ttfb_ms: float | None = None
+    latency_source: str | None = None  # network | server, set on spikes
+    rolling_p95_ms: float | None = None
+    lifetime_avg_ms: float | None = None  # streaming baseline only
+    lifetime_stddev_ms: float | None = None
+    baseline: str = BASELINE_WINDOW  # window | streaming | seasonal
+    seasonal_slot: int | None = None  # hour of week (UTC, Monday 00:00 = 0)
 
     @property
     def has_enough_data(self) -> bool:
@@ -61,16 +95,27 @@ class PerformanceTracker:
         window_size: int = DEFAULT_WINDOW_SIZE,
         spike_threshold_percent: float = SPIKE_THRESHOLD_PERCENT,
         critical_spike_threshold_percent: float = CRITICAL_SPIKE_THRESHOLD_PERCENT,
+        seasonal_min_samples: int = SEASONAL_MIN_SAMPLES,
     ) -> None:
         self._window_size = window_size
         self._spike_threshold = spike_threshold_percent
         self._critical_spike_threshold = critical_spike_threshold_percent
+        self._seasonal_min_samples = seasonal_min_samples
+
+    @property
+    def window_size(self) -> int:
+        """Number of past runs the rolling stats are computed over."""
+        return self._window_size
 
     def analyse(
         self,
         *,
         current_time_ms: float,
         historical_times: list[float],
+        connection_ms: float | None = None,
+        ttfb_ms: float | None = None,
+        baseline: EndpointStats | None = None,
+        at: float | None = None,
     ) -> PerformanceResult:
         """
         Analyse performance of the current run against historical data.
@@ -79,10 +124,40 @@ class PerformanceTracker:
             current_time_ms: Response time of the current run.
             historical_times: Recent response times (newest first),
                               *excluding* the current run.
+            connection_ms: DNS + connect + TLS time of the current run.
+            ttfb_ms: Time-to-first-byte of the current run.
+            baseline: Streaming stats of the endpoint, *excluding* the
+                      current run.  Used instead of ``historical_times``
+                      once it holds at least two samples.
+            at: UNIX time of the current run (default: now); selects
+                the baseline's hour-of-week slot.
 
         Returns:
             ``PerformanceResult`` with rolling stats and spike detection.
         """
+        if baseline is not None and baseline.count >= 2:
+            # Expected latency for this hour of the week, once learned;
+            # otherwise the recency-weighted mean.  Median / p95 are
+            # always endpoint-wide.
+            slot, slot_samples, slot_mean, slot_stddev = baseline.seasonal.expected(
+                at if at is not None else time.time()
+            )
+            seasonal = slot_samples >= self._seasonal_min_samples
+            return self._evaluate(
+                current_time_ms,
+                rolling_avg=slot_mean if seasonal else baseline.ewma.mean,
+                rolling_median=baseline.median.value,
+                rolling_stddev=slot_stddev if seasonal else baseline.ewma.stddev,
+                rolling_p95=baseline.p95.value,
+                sample_size=baseline.count,
+                connection_ms=connection_ms,
+                ttfb_ms=ttfb_ms,
+                lifetime_avg=baseline.lifetime.mean,
+                lifetime_stddev=baseline.lifetime.stddev,
+                source=BASELINE_SEASONAL if seasonal else BASELINE_STREAMING,
+                seasonal_slot=slot if seasonal else None,
+            )
+
         # Trim to window size (list should already be limited by repository,
         # but we enforce it here for safety).
         window = historical_times[: self._window_size]
@@ -99,12 +174,39 @@ class PerformanceTracker:
                 is_spike=False,
                 is_critical_spike=False,
                 sample_size=sample_size,
+                connection_ms=connection_ms,
+                ttfb_ms=ttfb_ms,
             )
 
-        rolling_avg = statistics.mean(window)
-        rolling_median = statistics.median(window)
-        rolling_stddev = statistics.stdev(window)
+        ordered = sorted(window)
+        return self._evaluate(
+            current_time_ms,
+            rolling_avg=statistics.mean(window),
+            rolling_median=statistics.median(ordered),
+            rolling_stddev=statistics.stdev(window),
+            rolling_p95=ordered[min(sample_size - 1, int(sample_size * 0.95))],
+            sample_size=sample_size,
+            connection_ms=connection_ms,
+            ttfb_ms=ttfb_ms,
+        )
 
+    def _evaluate(
+        self,
+        current_time_ms: float,
+        *,
+        rolling_avg: float,
+        rolling_median: float | None,
+        rolling_stddev: float,
+        rolling_p95: float | None,
+        sample_size: int,
+        connection_ms: float | None,
+        ttfb_ms: float | None,
+        lifetime_avg: float | None = None,
+        lifetime_stddev: float | None = None,
+        source: str = BASELINE_WINDOW,
+        seasonal_slot: int | None = None,
+    ) -> PerformanceResult:
+        """Deviation and spike flags of the current run against a baseline."""
         # Deviation: how far the current run is from the rolling average.
         if rolling_avg > 0:
             deviation_pct = round(
@@ -116,6 +218,16 @@ class PerformanceTracker:
         is_spike = deviation_pct >= self._spike_threshold
         is_critical = deviation_pct >= self._critical_spike_threshold
 
+        latency_source: str | None = None
+        if is_spike:
+            latency_source = LATENCY_SOURCE_SERVER
+            if connection_ms and rolling_avg > 0:
+                without_setup = ((current_time_ms - connection_ms - rolling_avg) / rolling_avg) * 100
+                if without_setup < self._spike_threshold:
+                    # Connection setup alone explains the spike.
+                    latency_source = LATENCY_SOURCE_NETWORK
+                    is_spike = is_critical
+
         if is_critical:
             logger.warning(
                 "CRITICAL spike: %.1f ms vs avg %.1f ms (%.1f%% deviation)",
@@ -134,15 +246,27 @@ class PerformanceTracker:
         return PerformanceResult(
             current_time_ms=round(current_time_ms, 2),
             rolling_avg_ms=round(rolling_avg, 2),
-            rolling_median_ms=round(rolling_median, 2),
+            rolling_median_ms=_round(rolling_median),
             rolling_stddev_ms=round(rolling_stddev, 2),
             deviation_percent=deviation_pct,
             is_spike=is_spike,
             is_critical_spike=is_critical,
             sample_size=sample_size,
+            connection_ms=connection_ms,
+            ttfb_ms=ttfb_ms,
+            latency_source=latency_source,
+            rolling_p95_ms=_round(rolling_p95),
+            lifetime_avg_ms=_round(lifetime_avg),
+            lifetime_stddev_ms=_round(lifetime_stddev),
+            baseline=source,
+            seasonal_slot=seasonal_slot,
         )
 
 
+def _round(value: float | None) -> float | None:
+    return round(value, 2) if value is not None else None
+
+
 # ─── module-level singleton ─────────────────────────────────────────────
 
 performance_tracker = PerformanceTracker()
@@ -0,0 +1,278 @@
+"""
+Per-stage pipeline timing.
+
+Responsibilities:
+  - Time each stage of ``RunnerService.execute_endpoint`` with a
+    monotonic lap timer (``StageTimer``), so a run carries its own
+    breakdown.
+  - Aggregate every run's breakdown into fixed-size, log-bucketed
+    latency histograms per stage (``PipelineStageStats``), from which
+    p50 / p95 / p99 are read without keeping raw samples.
+
+Histograms cover a sliding window: the current and previous
+``PIPELINE_STATS_WINDOW_SECONDS`` periods are kept and merged on read,
+so a percentile reflects the last one to two windows of runs, not the
+whole process lifetime.
+
+``LatencyHistogram`` is also the storage format of the per-endpoint
+hourly latency histograms (``app.monitoring.latency_histograms``), hence
+its compact binary encoding.
+"""
+
+from __future__ import annotations
+
+import math
+import struct
+import time
+from array import array
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Any
+
+from app.core.config import settings
+
+# Pipeline stages in execution order.
+STAGES = (
+    "load_endpoint",
+    "http",
+    "history",
+    "persist_run",
+    "performance",
+    "drift",
+    "snapshot",
+    "credential_scan",
+    "contract",
+    "failure_rate",
+    "ai",
+    "risk",
+    "persist",
+)
+TOTAL = "total"
+
+# Bucket i covers (MIN_MS·GROWTH^(i-1), MIN_MS·GROWTH^i]; 10% growth keeps
+# a percentile within ~10% of the true value from 10 µs to ~5 minutes.
+MIN_MS = 0.01
+GROWTH = 1.1
+BUCKET_COUNT = int(math.ceil(math.log(300_000 / MIN_MS) / math.log(GROWTH))) + 1
+_LOG_GROWTH = math.log(GROWTH)
+
+# Encoding: version byte, total_ms and max_ms as little-endian doubles,
+# then one (gap since previous non-empty bucket, count) varint pair per
+# non-empty bucket — tens of bytes for a typical hour of one endpoint.
+ENCODING_VERSION = 1
+_HEADER = struct.Struct("<Bdd")
+
+
+def _bucket(ms: float) -> int:
+    if ms <= MIN_MS:
+        return 0
+    return min(BUCKET_COUNT - 1, int(math.ceil(math.log(ms / MIN_MS) / _LOG_GROWTH)))
+
+
+class LatencyHistogram:
+    """Fixed log-bucketed histogram of millisecond durations."""
+
+    __slots__ = ("counts", "count", "total_ms", "max_ms")
+
+    def __init__(self) -> None:
+        self.counts = array("q", [0]) * BUCKET_COUNT
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, ms: float) -> None:
+        ms = max(ms, 0.0)
+        self.counts[_bucket(ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        if ms > self.max_ms:
+            self.max_ms = ms
+
+    def merge(self, other: LatencyHistogram) -> None:
+        for i, n in enumerate(other.counts):
+            if n:
+                self.counts[i] += n
+        self.count += other.count
+        self.total_ms += other.total_ms
+        self.max_ms = max(self.max_ms, other.max_ms)
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the ``q`` quantile (capped at max)."""
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(q * self.count))
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                return min(MIN_MS * GROWTH ** i, self.max_ms)
+        return self.max_ms
+
+    def summary(self) -> dict[str, float]:
+        """count / avg / p50 / p95 / p99 / max, in milliseconds."""
+        if not self.count:
+            return {"count": 0, "avg": 0.0, "p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+        return {
+            "count": self.count,
+            "avg": round(self.total_ms / self.count, 2),
+            "p50": round(self.quantile(0.50), 2),
+            "p95": round(self.quantile(0.95), 2),
+            "p99": round(self.quantile(0.99), 2),
+            "max": round(self.max_ms, 2),
+        }
+
+    # ── encoding ─────────────────────────────────────────────────────
+
+    def to_bytes(self) -> bytes:
+        out = bytearray(_HEADER.pack(ENCODING_VERSION, self.total_ms, self.max_ms))
+        previous = -1
+        for i, n in enumerate(self.counts):
+            if n:
+                _put_varint(out, i - previous - 1)
+                _put_varint(out, n)
+                previous = i
+        return bytes(out)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> LatencyHistogram:
+        version, total_ms, max_ms = _HEADER.unpack_from(data)
+        if version != ENCODING_VERSION:
+            raise ValueError(f"Unsupported latency histogram encoding v{version}")
+        hist = cls()
+        hist.total_ms, hist.max_ms = total_ms, max_ms
+        pos, index = _HEADER.size, -1
+        while pos < len(data):
+            gap, pos = _get_varint(data, pos)
+            n, pos = _get_varint(data, pos)
+            index += gap + 1
+            hist.counts[index] += n
+            hist.count += n
+        return hist
+
+
+def _put_varint(out: bytearray, value: int) -> None:
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _get_varint(data: bytes, pos: int) -> tuple[int, int]:
+    value = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+class StageTimer:
+    """
+    Lap timer for one pipeline run.
+
+    ``lap(stage)`` charges the time since the previous lap (or since the
+    timer was created) to ``stage``; a stage lapped twice accumulates.
+    Stages that run concurrently are timed with ``measure`` instead, so
+    their times may add up to more than the run's wall-clock total.
+    """
+
+    __slots__ = ("_start", "_last", "timings")
+
+    def __init__(self) -> None:
+        self._start = self._last = time.perf_counter()
+        self.timings: dict[str, float] = {}
+
+    def lap(self, stage: str) -> None:
+        now = time.perf_counter()
+        self.timings[stage] = self.timings.get(stage, 0.0) + (now - self._last) * 1000
+        self._last = now
+
+    @contextmanager
+    def measure(self, stage: str) -> Iterator[None]:
+        """Charge the duration of the block to ``stage`` (safe from threads)."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(stage, (time.perf_counter() - start) * 1000)
+
+    def add(self, stage: str, ms: float) -> None:
+        self.timings[stage] = self.timings.get(stage, 0.0) + ms
+
+    def mark(self) -> None:
+        """Restart lap timing after concurrently measured stages."""
+        self._last = time.perf_counter()
+
+    @property
+    def total_ms(self) -> float:
+        return (self._last - self._start) * 1000
+
+    def breakdown(self) -> dict[str, float]:
+        """Stage → milliseconds, rounded, plus the run total."""
+        out = {stage: round(ms, 3) for stage, ms in self.timings.items()}
+        out[TOTAL] = round(self.total_ms, 3)
+        return out
+
+
+class PipelineStageStats:
+    """Process-wide per-stage latency histograms over a sliding window."""
+
+    def __init__(self) -> None:
+        self._current: dict[str, LatencyHistogram] = {}
+        self._previous: dict[str, LatencyHistogram] = {}
+        self._window_started = time.monotonic()
+        self._runs = 0
+
+    def observe(self, timer: StageTimer) -> None:
+        """Fold one finished run's stage timings into the histograms."""
+        self._rotate()
+        self._runs += 1
+        for stage, ms in timer.timings.items():
+            self._hist(stage).observe(ms)
+        self._hist(TOTAL).observe(timer.total_ms)
+
+    def snapshot(self) -> dict[str, Any]:
+        """Per-stage summaries (execution order, ``total`` last); ``runs`` is lifetime."""
+        self._rotate()
+        extra = sorted((set(self._current) | set(self._previous)) - {*STAGES, TOTAL})
+        stages: dict[str, dict[str, float]] = {}
+        for stage in (*STAGES, *extra, TOTAL):
+            merged = LatencyHistogram()
+            for window in (self._previous, self._current):
+                if stage in window:
+                    merged.merge(window[stage])
+            stages[stage] = merged.summary()
+        return {
+            "runs": self._runs,
+            "window_seconds": settings.PIPELINE_STATS_WINDOW_SECONDS,
+            "stages": stages,
+        }
+
+    def reset(self) -> None:
+        self._current.clear()
+        self._previous.clear()
+        self._window_started = time.monotonic()
+        self._runs = 0
+
+    def _hist(self, stage: str) -> LatencyHistogram:
+        hist = self._current.get(stage)
+        if hist is None:
+            hist = self._current[stage] = LatencyHistogram()
+        return hist
+
+    def _rotate(self) -> None:
+        window = settings.PIPELINE_STATS_WINDOW_SECONDS
+        elapsed = time.monotonic() - self._window_started
+        if elapsed < window:
+            return
+        # Skipping more than one window means the previous one is stale too.
+        self._previous = self._current if elapsed < 2 * window else {}
+        self._current = {}
+        self._window_started = time.monotonic()
+
+
+# ─── module-level singleton ─────────────────────────────────────────────
+
+pipeline_stage_stats = PipelineStageStats()
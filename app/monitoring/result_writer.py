@@ -0,0 +1,238 @@
+"""
+Write-behind bulk writer for pipeline results.
+
+Responsibilities:
+  - Buffer the rows a pipeline run produces (``ApiRun``, ``SecurityFinding``,
+    ``Anomaly``, ``RiskScore``, ``AiTelemetryRecord``) across many
+    concurrent runs.
+  - Flush every ``RESULT_WRITER_FLUSH_MS`` (or once
+    ``RESULT_WRITER_MAX_BATCH`` rows are waiting) as one transaction with
+    one multi-row INSERT per table, parents before children.
+  - Resolve a future per submission once its rows are committed, so the
+    caller can hold alerts until the data is safe.
+  - Write through its own single-connection engine, never the shared
+    pool: jobs waiting on a flush cannot starve the writer of the
+    connection it needs to finish that flush.
+
+Durability (``RESULT_WRITER_DURABILITY``) is honoured by the caller,
+which awaits the submission's future without holding a connection:
+  - ``sync``  — every run waits for its batch to commit before its
+    post-processing.  Nothing acknowledged is lost; each run pays up to
+    one flush interval of latency.
+  - ``async`` — only runs that may alert or open an incident wait.  Rows
+    still in the buffer are lost if the process dies before the next
+    flush.
+
+Primary keys and ``created_at`` are assigned in Python before queueing,
+so child rows and downstream consumers can reference a run before it is
+written.  If a batch fails, its submissions are retried one by one so a
+single bad run does not drop the others.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any
+
+from sqlalchemy import inspect, insert
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+
+from app.core.config import settings
+from app.models.ai_telemetry import AiTelemetryRecord
+from app.models.anomaly import Anomaly
+from app.models.api_run import ApiRun
+from app.models.risk_score import RiskScore
+from app.models.security_finding import SecurityFinding
+
+logger = logging.getLogger(__name__)
+
+DURABILITY_SYNC = "sync"
+DURABILITY_ASYNC = "async"
+
+# Parents before children (FKs to api_runs).
+_INSERT_ORDER = (ApiRun, SecurityFinding, Anomaly, RiskScore, AiTelemetryRecord)
+
+
+def _row(record: Any) -> dict[str, Any]:
+    """Column values set on a pending ORM object, keyed by attribute name."""
+    state = record.__dict__
+    return {
+        attr.key: state[attr.key]
+        for attr in inspect(type(record)).column_attrs
+        if attr.key in state
+    }
+
+
+def prepare(record: Any) -> Any:
+    """Assign the client-side id / created_at a queued row needs up front."""
+    if getattr(record, "id", None) is None:
+        record.id = uuid.uuid4()
+    if hasattr(type(record), "created_at") and record.created_at is None:
+        record.created_at = datetime.now(timezone.utc)
+    return record
+
+
+class ResultWriter:
+    """Batches pipeline rows from concurrent runs into periodic bulk inserts."""
+
+    def __init__(self, factory: async_sessionmaker[AsyncSession] | None = None) -> None:
+        self._factory = factory
+        self._engine: AsyncEngine | None = None  # owned, when no factory is given
+        self._queue: list[tuple[list[Any], asyncio.Future[None]]] = []
+        self._queued_rows = 0
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task[None] | None = None
+        self._closing = False
+        self._batches = 0
+        self._rows_written = 0
+        self._failed_submissions = 0
+        self._last_flush_ms: float | None = None
+
+    @property
+    def durability(self) -> str:
+        return settings.RESULT_WRITER_DURABILITY
+
+    # ── lifecycle ────────────────────────────────────────────────────────
+
+    def startup(self) -> None:
+        """Start the flush loop.  Call once during app lifespan."""
+        self._closing = False
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="result-writer")
+
+    async def shutdown(self) -> None:
+        """Flush whatever is buffered and stop.  Call once during app shutdown."""
+        self._closing = True
+        self._wakeup.set()
+        if self._task is not None:
+            await self._task
+            self._task = None
+        if self._queue:
+            await self.flush()
+        if self._engine is not None:
+            await self._engine.dispose()
+            self._engine = None
+            self._factory = None
+
+    # ── public API ───────────────────────────────────────────────────────
+
+    def submit(self, records: list[Any]) -> asyncio.Future[None]:
+        """
+        Queue one run's rows (parents first) for the next flush.
+
+        Returns a future that resolves when they are committed, or
+        carries the insert error.
+        """
+        fut: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        if not records:
+            fut.set_result(None)
+            return fut
+        self._queue.append(([prepare(r) for r in records], fut))
+        self._queued_rows += len(records)
+        if self._task is None or self._task.done():
+            self.startup()
+        if self._queued_rows >= settings.RESULT_WRITER_MAX_BATCH:
+            self._wakeup.set()
+        return fut
+
+    async def flush(self) -> None:
+        """Write everything queued so far in one transaction."""
+        batch, self._queue = self._queue, []
+        self._queued_rows = 0
+        if not batch:
+            return
+        start = time.perf_counter()
+        try:
+            await self._write([r for records, _ in batch for r in records])
+        except Exception:
+            logger.exception(
+                "Bulk write of %d run(s) failed — retrying them one by one", len(batch)
+            )
+            for records, fut in batch:
+                try:
+                    await self._write(records)
+                except Exception as exc:
+                    self._failed_submissions += 1
+                    if not fut.done():
+                        fut.set_exception(exc)
+                else:
+                    if not fut.done():
+                        fut.set_result(None)
+        else:
+            for _, fut in batch:
+                if not fut.done():
+                    fut.set_result(None)
+        self._last_flush_ms = round((time.perf_counter() - start) * 1000, 2)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "durability": self.durability,
+            "queued_rows": self._queued_rows,
+            "batches": self._batches,
+            "rows_written": self._rows_written,
+            "failed_submissions": self._failed_submissions,
+            "last_flush_ms": self._last_flush_ms,
+        }
+
+    # ── internals ────────────────────────────────────────────────────────
+
+    async def _run(self) -> None:
+        interval = settings.RESULT_WRITER_FLUSH_MS / 1000
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Result writer flush failed")
+            if self._closing:
+                return
+
+    async def _write(self, records: list[Any]) -> None:
+        groups: dict[type, list[dict[str, Any]]] = {}
+        for record in records:
+            groups.setdefault(type(record), []).append(_row(record))
+        unsupported = set(groups) - set(_INSERT_ORDER)
+        if unsupported:
+            raise TypeError(f"Unsupported row types: {sorted(t.__name__ for t in unsupported)}")
+
+        async with self._session_factory()() as session:
+            for model in _INSERT_ORDER:
+                rows = groups.get(model)
+                if rows:
+                    # ORM bulk INSERT → multi-row INSERT … VALUES batches.
+                    await session.execute(insert(model), rows)
+            await session.commit()
+        self._batches += 1
+        self._rows_written += len(records)
+
+    def _session_factory(self) -> async_sessionmaker[AsyncSession]:
+        """Sessions on the writer's own engine; flushes are serial, so one connection."""
+        if self._factory is None:
+            self._engine = create_async_engine(
+                settings.DATABASE_URL,
+                echo=settings.DEBUG,
+                pool_size=1,
+                max_overflow=0,
+            )
+            self._factory = async_sessionmaker(
+                self._engine, class_=AsyncSession, expire_on_commit=False
+            )
+        return self._factory
+
+
+# ─── module-level singleton ─────────────────────────────────────────────
+
+result_writer = ResultWriter()
@@ -172,7 +172,9 @@ class RiskEngine:
 
         # ── 4. AI / fallback severity component ──────────────────────
         ai_score = 0.0
-        if anomaly and anomaly.anomaly_detected and (anomaly.ai_called or anomaly.used_fallback):
+        if anomaly and anomaly.anomaly_detected and (
+            anomaly.ai_called or anomaly.cache_hit or anomaly.used_fallback
+        ):
             # severity_score is 0–100; we scale to 0–W_AI
             ai_score = (anomaly.severity_score / 100.0) * self.W_AI
 
@@ -0,0 +1,281 @@
+"""
+Per-endpoint in-memory run history.
+
+Responsibilities:
+  - Keep the last ``RUN_HISTORY_SIZE`` runs of every endpoint as a
+    compact ring of (timestamp, latency, success) in flat arrays.
+  - Keep 24h success/failure counts in fixed time buckets, so the
+    failure rate is a division, not two ``count(*)`` scans.
+  - Keep the current streak of consecutive successes for incident
+    auto-resolve.
+  - Warm from the database in bulk at startup; endpoints first seen
+    later (new endpoints, shard moves) are loaded on first use.
+
+The pipeline records each run as it persists it, so reads never touch
+the database.  State is per process: runs recorded by another process
+(e.g. a manual run served by the API) are picked up when an entry is
+re-synced after ``RUN_HISTORY_RESYNC_SECONDS``.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import time
+import uuid
+from array import array
+from datetime import datetime, timedelta, timezone
+from typing import Iterable
+
+from app.core.config import settings
+from app.monitoring.anomaly_gate import RecentWindow
+from app.repositories.api_run import ApiRunRepository
+
+logger = logging.getLogger(__name__)
+
+FAILURE_WINDOW_SECONDS = 24 * 3600
+WARM_LOOKBACK = timedelta(days=7)  # older runs are no latency baseline
+BUCKET_SECONDS = 900  # 15-minute failure-rate buckets
+BUCKET_COUNT = FAILURE_WINDOW_SECONDS // BUCKET_SECONDS
+
+
+def _epoch(value: datetime) -> float:
+    if value.tzinfo is None:  # SQLite returns naive UTC
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+class EndpointHistory:
+    """Ring buffer and 24h outcome buckets for one endpoint."""
+
+    __slots__ = (
+        "_ts", "_latency", "_ok", "_head", "_size",
+        "_bucket_ids", "_bucket_total", "_bucket_failed",
+        "_window_total", "_window_failed", "_expired_to", "streak", "synced_at",
+    )
+
+    def __init__(self, capacity: int) -> None:
+        self._ts = array("d", [0.0]) * capacity
+        self._latency = array("d", [0.0]) * capacity
+        self._ok = array("b", [0]) * capacity
+        self._head = 0  # next write position
+        self._size = 0
+        self._bucket_ids = array("q", [-1]) * BUCKET_COUNT
+        self._bucket_total = array("q", [0]) * BUCKET_COUNT
+        self._bucket_failed = array("q", [0]) * BUCKET_COUNT
+        self._window_total = 0
+        self._window_failed = 0
+        self._expired_to = -1  # last bucket the window was trimmed for
+        self.streak = 0
+        self.synced_at = time.monotonic()
+
+    # ── writes ───────────────────────────────────────────────────────
+
+    def append(self, ts: float, latency_ms: float | None, success: bool) -> None:
+        """Record one run in the ring (no effect on buckets or streak)."""
+        capacity = len(self._ok)
+        self._ts[self._head] = ts
+        self._latency[self._head] = math.nan if latency_ms is None else latency_ms
+        self._ok[self._head] = 1 if success else 0
+        self._head = (self._head + 1) % capacity
+        self._size = min(self._size + 1, capacity)
+
+    def count(self, ts: float, success: bool, n: int = 1) -> None:
+        """Add ``n`` outcomes at ``ts`` to the failure-rate buckets."""
+        bucket = int(ts // BUCKET_SECONDS)
+        current = int(time.time() // BUCKET_SECONDS)
+        if bucket <= current - BUCKET_COUNT:
+            return  # older than the window
+        self._expire(current)
+        slot = bucket % BUCKET_COUNT
+        if self._bucket_ids[slot] != bucket:
+            if bucket < self._bucket_ids[slot]:
+                return
+            self._clear(slot)
+            self._bucket_ids[slot] = bucket
+        self._bucket_total[slot] += n
+        self._window_total += n
+        if not success:
+            self._bucket_failed[slot] += n
+            self._window_failed += n
+
+    def record(self, ts: float, latency_ms: float | None, success: bool) -> None:
+        """Record a new run: ring, buckets and streak."""
+        self.append(ts, latency_ms, success)
+        self.count(ts, success)
+        self.streak = self.streak + 1 if success else 0
+
+    # ── reads ────────────────────────────────────────────────────────
+
+    def recent_times(self, limit: int) -> list[float]:
+        """Up to ``limit`` latencies, newest first (runs without one skipped)."""
+        capacity = len(self._ok)
+        times: list[float] = []
+        for i in range(1, self._size + 1):
+            value = self._latency[(self._head - i) % capacity]
+            if not math.isnan(value):
+                times.append(value)
+                if len(times) >= limit:
+                    break
+        return times
+
+    def recent_samples(self) -> list[tuple[float, float]]:
+        """(timestamp, latency) of every run in the ring, oldest first."""
+        capacity = len(self._ok)
+        samples: list[tuple[float, float]] = []
+        for i in range(self._size, 0, -1):
+            index = (self._head - i) % capacity
+            value = self._latency[index]
+            if not math.isnan(value):
+                samples.append((self._ts[index], value))
+        return samples
+
+    def recent_window(self) -> RecentWindow:
+        """Latencies and outcomes of every run in the ring, oldest first."""
+        capacity = len(self._ok)
+        latencies: list[float] = []
+        outcomes: list[bool] = []
+        for i in range(self._size, 0, -1):
+            index = (self._head - i) % capacity
+            value = self._latency[index]
+            if not math.isnan(value):
+                latencies.append(value)
+            outcomes.append(bool(self._ok[index]))
+        return RecentWindow(latencies, outcomes)
+
+    def failure_rate(self) -> float:
+        """Failure percentage over the last 24h (bucket granularity)."""
+        self._expire(int(time.time() // BUCKET_SECONDS))
+        if not self._window_total:
+            return 0.0
+        return round(self._window_failed / self._window_total * 100, 2)
+
+    # ── internals ────────────────────────────────────────────────────
+
+    def _clear(self, slot: int) -> None:
+        self._window_total -= self._bucket_total[slot]
+        self._window_failed -= self._bucket_failed[slot]
+        self._bucket_total[slot] = 0
+        self._bucket_failed[slot] = 0
+        self._bucket_ids[slot] = -1
+
+    def _expire(self, current_bucket: int) -> None:
+        # At most one pass over the buckets per bucket period.
+        if current_bucket == self._expired_to:
+            return
+        self._expired_to = current_bucket
+        oldest = current_bucket - BUCKET_COUNT + 1
+        for slot in range(BUCKET_COUNT):
+            bucket = self._bucket_ids[slot]
+            if bucket != -1 and bucket < oldest:
+                self._clear(slot)
+
+
+class RunHistoryStore:
+    """Process-wide map of endpoint id → ``EndpointHistory``."""
+
+    def __init__(self) -> None:
+        self._entries: dict[uuid.UUID, EndpointHistory] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, endpoint_id: uuid.UUID) -> EndpointHistory | None:
+        """Tracked, fresh history for the endpoint, or ``None``."""
+        entry = self._entries.get(endpoint_id)
+        if entry is None:
+            return None
+        if time.monotonic() - entry.synced_at > settings.RUN_HISTORY_RESYNC_SECONDS:
+            del self._entries[endpoint_id]
+            return None
+        return entry
+
+    async def ensure(
+        self, endpoint_id: uuid.UUID, repo: ApiRunRepository
+    ) -> EndpointHistory:
+        """History for the endpoint, loading it from the DB if not tracked."""
+        entry = self.get(endpoint_id)
+        if entry is None:
+            await self.load(repo, [endpoint_id])
+            entry = self._entries[endpoint_id]
+        return entry
+
+    def forget(self, endpoint_id: uuid.UUID) -> None:
+        self._entries.pop(endpoint_id, None)
+
+    async def load(
+        self, repo: ApiRunRepository, endpoint_ids: Iterable[uuid.UUID] | None = None
+    ) -> int:
+        """
+        (Re)build histories from the database in two bulk queries —
+        recent runs per endpoint and 24h outcome counts per bucket —
+        regardless of how many endpoints are loaded.
+
+        ``endpoint_ids=None`` loads every endpoint with runs.  Returns
+        the number of endpoints loaded.
+        """
+        ids = list(endpoint_ids) if endpoint_ids is not None else None
+        capacity = settings.RUN_HISTORY_SIZE
+        now = time.time()
+        window_start = (int(now // BUCKET_SECONDS) - BUCKET_COUNT + 1) * BUCKET_SECONDS
+        since = datetime.fromtimestamp(window_start, tz=timezone.utc)
+
+        rows = await repo.get_recent_history(
+            ids, limit=capacity, since=datetime.now(timezone.utc) - WARM_LOOKBACK
+        )
+        counts = await repo.get_outcome_counts(
+            ids, since=since, bucket=timedelta(seconds=BUCKET_SECONDS),
+            buckets=BUCKET_COUNT,
+        )
+
+        fresh: dict[uuid.UUID, EndpointHistory] = {
+            eid: EndpointHistory(capacity) for eid in ids or ()
+        }
+        newest_first: dict[uuid.UUID, list[bool]] = {}
+        for endpoint_id, created_at, latency_ms, success in rows:  # oldest first
+            entry = fresh.setdefault(endpoint_id, EndpointHistory(capacity))
+            entry.append(_epoch(created_at), latency_ms, bool(success))
+            newest_first.setdefault(endpoint_id, []).insert(0, bool(success))
+        for endpoint_id, index, total, failed in counts:
+            entry = fresh.setdefault(endpoint_id, EndpointHistory(capacity))
+            ts = window_start + index * BUCKET_SECONDS
+            if failed:
+                entry.count(ts, False, failed)
+            if total - failed:
+                entry.count(ts, True, total - failed)
+        for endpoint_id, outcomes in newest_first.items():
+            streak = 0
+            for success in outcomes:
+                if not success:
+                    break
+                streak += 1
+            fresh[endpoint_id].streak = streak
+
+        self._entries.update(fresh)
+        return len(fresh)
+
+    async def warm(self) -> None:
+        """Load every endpoint's history.  Call once during app lifespan."""
+        from app.db.session import async_session_factory
+
+        if not settings.RUN_HISTORY_ENABLED:
+            return
+        start = time.perf_counter()
+        try:
+            async with async_session_factory() as session:
+                loaded = await self.load(ApiRunRepository(session))
+        except Exception:
+            logger.exception("Run history warm-up failed — endpoints load on first run")
+            return
+        logger.info(
+            "Run history warmed for %d endpoint(s) in %.0f ms",
+            loaded, (time.perf_counter() - start) * 1000,
+        )
+
+    def stats(self) -> dict[str, int]:
+        return {"endpoints": len(self._entries), "capacity": settings.RUN_HISTORY_SIZE}
+
+
+# ─── module-level singleton ─────────────────────────────────────────────
+
+run_history = RunHistoryStore()
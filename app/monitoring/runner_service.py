@@ -5,21 +5,41 @@ Flow:
   1. Load the ApiEndpoint from the database.
   2. Call ApiRunner.execute() to perform the HTTP request.
   3. Persist the result as an ApiRun record.
-  4. Run performance analysis against historical response times.
-  5. Run schema drift detection (expected vs actual body).
-  6. Run AI anomaly analysis (cost-gated — only when signals warrant it).
+  4. Run performance analysis against the endpoint's streaming latency
+     baseline (seeded from historical response times on first use), and
+     add the response time to the endpoint's hourly latency histogram.
+  5. Run schema drift detection (expected vs actual body), the credential
+     scan and contract validation — off the event loop for large bodies
+     (``analysis_offload``) — while the schema snapshot and failure rate
+     are handled on the event loop.
+  6. Run AI anomaly analysis (cost-gated — only when signals warrant it
+     and the run is new or significant against the endpoint's recent runs;
+     a repeat of a recent incident reuses its cached verdict).
   7. Persist anomaly record if an anomaly was detected.
   8. Compute deterministic risk score from all pipeline signals.
   9. Persist risk score record.
   10. Return PipelineResult(run, performance, schema_drift, anomaly, risk).
 
+With a ``ResultWriter`` the rows from steps 3, 7 and 9 (plus findings and
+AI telemetry) are queued and written in bulk with other runs' rows
+instead of being flushed one by one; ``PipelineResult.persisted``
+resolves once they are committed.  The service never waits on it —
+callers do, per ``RESULT_WRITER_DURABILITY``, after releasing their
+connection.
+
+Each stage is timed with a monotonic lap timer; the breakdown is
+returned on ``PipelineResult.stage_timings`` and folded into the
+process-wide stage histograms (``pipeline_stage_stats``).
+
 This service owns the "execute → store → analyse" contract.
 """
 
 from __future__ import annotations
 
+import asyncio
 import base64
 import logging
+import time
 import uuid
 from dataclasses import dataclass
 from typing import Any, Optional
@@ -28,17 +48,33 @@ from fastapi import HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.ai.llm_client import CallTelemetry
-from app.models.ai_telemetry import AiTelemetryRecord
+from app.core.config import settings
+from app.models.ai_telemetry import (
+    OUTCOME_CACHE_HIT,
+    OUTCOME_CALLED,
+    OUTCOME_GATED,
+    OUTCOME_OVER_BUDGET,
+    AiTelemetryRecord,
+)
 from app.models.anomaly import Anomaly
 from app.models.api_run import ApiRun
 from app.models.risk_score import RiskScore
 from app.models.security_finding import SecurityFinding
+from app.monitoring.analysis_cache import AnalysisCache, analysis_cache, analysis_key
+from app.monitoring.analysis_offload import AnalysisOffload, analyse_body, analysis_offload
 from app.monitoring.anomaly_engine import AnomalyEngine, AnomalyResult
+from app.monitoring.anomaly_gate import RecentWindow
 from app.monitoring.api_runner import ApiRunner, RunnerConfig
-from app.monitoring.contract_validator import ContractResult, contract_validator
-from app.monitoring.credential_scanner import ScanResult, credential_scanner
+from app.monitoring.latency_histograms import LatencyHistogramStore, latency_histograms
+from app.monitoring.online_stats import EndpointStats, OnlineStatsStore, online_stats
+from app.monitoring.origin_limiter import OriginLimits
+from app.monitoring.contract_validator import ContractResult
+from app.monitoring.credential_scanner import ScanResult
 from app.monitoring.performance_tracker import PerformanceResult, PerformanceTracker
+from app.monitoring.pipeline_stats import PipelineStageStats, StageTimer, pipeline_stage_stats
+from app.monitoring.result_writer import ResultWriter, prepare
 from app.monitoring.risk_engine import RiskEngine, RiskResult
+from app.monitoring.run_history import EndpointHistory, RunHistoryStore, run_history
 from app.monitoring.schema_validator import DriftAnalysis, SchemaValidator
 from app.repositories.ai_telemetry import AiTelemetryRepository
 from app.repositories.anomaly import AnomalyRepository
@@ -47,9 +83,12 @@ from app.repositories.api_run import ApiRunRepository
 from app.repositories.risk_score import RiskScoreRepository
 from app.repositories.security_finding import SecurityFindingRepository
 from app.services.schema_snapshot import snapshot_if_changed
+from app.utils.schema_diff import compute_schema_hash
 
 logger = logging.getLogger(__name__)
 
+_BODY_STAGES = ("drift", "credential_scan", "contract")
+
 
 @dataclass(frozen=True, slots=True)
 class PipelineResult:
@@ -68,6 +107,16 @@ class PipelineResult:
     endpoint_url: str = ""
     endpoint_method: str = ""
 
+    # Set when rows went to the bulk writer: resolves once they are committed.
+    persisted: Optional[asyncio.Future[None]] = None
+
+    # Stage → milliseconds for this run (plus "total").
+    stage_timings: Optional[dict[str, float]] = None
+
+
+def _default_analysis_cache() -> AnalysisCache | None:
+    return analysis_cache if settings.ANALYSIS_CACHE_ENABLED else None
+
 
 class RunnerService:
     """
@@ -87,6 +136,13 @@ class RunnerService:
         anomaly_engine: AnomalyEngine | None = None,
         risk_engine: RiskEngine | None = None,
         config: RunnerConfig | None = None,
+        history: RunHistoryStore | None = None,
+        writer: ResultWriter | None = None,
+        stage_stats: PipelineStageStats | None = None,
+        analysis_cache: AnalysisCache | None = None,
+        offload: AnalysisOffload | None = None,
+        baselines: OnlineStatsStore | None = None,
+        histograms: LatencyHistogramStore | None = None,
     ) -> None:
         self._session = session
         self._endpoint_repo = ApiEndpointRepository(session)
@@ -101,6 +157,13 @@ class RunnerService:
         self._anomaly_engine = anomaly_engine
         self._risk_engine = risk_engine or RiskEngine()
         self._config = config
+        self._history = history if history is not None else run_history
+        self._writer = writer
+        self._stage_stats = stage_stats or pipeline_stage_stats
+        self._analysis_cache = analysis_cache or _default_analysis_cache()
+        self._offload = offload or analysis_offload
+        self._online_stats = baselines if baselines is not None else online_stats
+        self._histograms = histograms if histograms is not None else latency_histograms
 
     @staticmethod
     def _build_v2_config(
@@ -199,6 +262,7 @@ class RunnerService:
         """
         # Generate correlation ID for end-to-end pipeline tracing
         pipeline_id = str(uuid.uuid4())[:8]
+        stages = StageTimer()
 
         # 1. Load endpoint
         endpoint = await self._endpoint_repo.get_by_id(endpoint_id, tenant_id)
@@ -207,6 +271,7 @@ class RunnerService:
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"API endpoint {endpoint_id} not found",
             )
+        stages.lap("load_endpoint")
 
         logger.info(
             "[%s] Pipeline start: %s %s (expected %d)",
@@ -231,19 +296,44 @@ class RunnerService:
             params=extra_params or None,
             content=body_content,
             content_type=body_ct,
+            limits=OriginLimits.resolve(endpoint.organization_id, endpoint.advanced_config),
+            tenant=endpoint.organization_id,
+            http2=bool((endpoint.advanced_config or {}).get("http2")),
+            interval_seconds=endpoint.monitoring_interval_seconds,
         )
+        if result.queue_wait_ms >= 1:
+            logger.info(
+                "[%s] Waited %.0f ms for an origin slot (excluded from response time)",
+                pipeline_id, result.queue_wait_ms,
+            )
+        stages.lap("http")
+
+        # Rolling history, loaded before this run is flushed.
+        history: EndpointHistory | None = None
+        if settings.RUN_HISTORY_ENABLED:
+            try:
+                history = await self._history.ensure(endpoint.id, self._run_repo)
+            except Exception:
+                logger.exception("Run history load failed for %s", endpoint.name)
+        stages.lap("history")
 
         # 4. Persist as ApiRun
+        phases = result.phases
         run = ApiRun(
             endpoint_id=endpoint.id,
             organization_id=endpoint.organization_id,
             status_code=result.status_code,
             response_time_ms=result.response_time_ms,
+            **(phases.to_dict() if phases else {}),
+            response_bytes=result.body_bytes,
+            response_truncated=result.body_truncated,
             response_body=result.response_body,
             is_success=result.is_success,
             error_message=result.error_message,
         )
-        saved_run = await self._run_repo.create(run)
+        # With a bulk writer, rows are queued and written together at the end.
+        queued: list[Any] | None = [] if self._writer is not None else None
+        saved_run = await self._save(queued, run, self._run_repo.create)
 
         logger.info(
             "Run %s for endpoint %s: success=%s status=%s time=%.1fms",
@@ -253,66 +343,91 @@ class RunnerService:
             result.status_code,
             result.response_time_ms or 0,
         )
+        stages.lap("persist_run")
+
+        historical: list[float] | None = None
+        seed: list[tuple[float, float]] | None = None
+        window: RecentWindow | None = None
+        if history is not None:
+            historical = history.recent_times(self._tracker.window_size)
+            if settings.ONLINE_STATS_ENABLED and self._online_stats.get(endpoint.id) is None:
+                seed = history.recent_samples()
+            if self._anomaly_engine is not None:
+                window = history.recent_window()
+            history.record(time.time(), result.response_time_ms, result.is_success)
 
         # 4. Performance analysis (only if we got a response time)
         perf: PerformanceResult | None = None
         try:
             if result.response_time_ms is not None:
-                historical = await self._run_repo.get_recent_times(
-                    endpoint.id, limit=20
-                )
-                if historical and historical[0] == result.response_time_ms:
-                    historical = historical[1:]
+                # Streaming (hour-of-week aware) baseline; run history is
+                # only read to seed a new one.
+                now = time.time()
+                baseline: EndpointStats | None = None
+                if settings.ONLINE_STATS_ENABLED:
+                    baseline = self._online_stats.get(endpoint.id)
+                    if baseline is None:
+                        baseline = await self._online_stats.ensure(
+                            endpoint.id, self._session, seed=seed, exclude_run_id=saved_run.id
+                        )
+                if (baseline is None or baseline.count < 2) and historical is None:
+                    historical = await self._run_repo.get_recent_times(
+                        endpoint.id, limit=20
+                    )
+                    if historical and historical[0] == result.response_time_ms:
+                        historical = historical[1:]
 
                 perf = self._tracker.analyse(
                     current_time_ms=result.response_time_ms,
-                    historical_times=historical,
+                    historical_times=historical or [],
+                    connection_ms=phases.connection_ms if phases else None,
+                    ttfb_ms=phases.ttfb_ms if phases else None,
+                    baseline=baseline,
+                    at=now,
                 )
+                if baseline is not None:
+                    baseline.add(result.response_time_ms, now)
+                if settings.LATENCY_HISTOGRAMS_ENABLED:
+                    self._histograms.observe(
+                        endpoint.id, endpoint.organization_id, result.response_time_ms
+                    )
                 logger.info(
-                    "Performance for %s: avg=%.1fms dev=%.1f%% spike=%s",
+                    "Performance for %s: avg=%.1fms dev=%.1f%% spike=%s source=%s",
                     endpoint.name,
                     perf.rolling_avg_ms or 0,
                     perf.deviation_percent or 0,
                     perf.is_spike,
+                    perf.latency_source or "-",
                 )
         except Exception:
             logger.exception("Performance analysis failed for %s", endpoint.name)
+        stages.lap("performance")
+
+        # 5–6. Independent analysis stages, run concurrently.  The
+        #    CPU-bound ones (drift, credential scan, contract) go to the
+        #    analysis pool for large bodies; the session-bound ones
+        #    (snapshot, failure rate) are awaited in turn on the event loop
+        #    meanwhile — one session cannot run two statements at once.
+        #    Body analysis is reused from the cache while config, body and
+        #    status repeat.  The canonical hash that keys the cache walks
+        #    the whole body too, so it crosses the same size threshold.
+        digest = await self._offload.run(
+            compute_schema_hash, result.response_body, size=result.body_bytes,
+        )
+        cache_key = analysis_key(endpoint, digest, result.status_code)
+        body_analysis, failure_rate = await self._join(
+            self._analyse_body(endpoint, result, stages, cache_key),
+            self._session_stages(endpoint, result, history, stages, digest),
+        )
+        drift, security_scan, contract = body_analysis
+        stages.mark()
 
-        # 5. Schema drift detection
-        drift = DriftAnalysis(skipped_reason="analysis_error")
-        try:
-            drift = self._validator.validate(
-                expected_schema=endpoint.expected_schema,
-                response_body=result.response_body,
-            )
-            if drift.has_drift:
-                logger.warning(
-                    "Schema drift for %s: %d difference(s)",
-                    endpoint.name,
-                    drift.drift_count,
-                )
-        except Exception:
-            logger.exception("Schema drift detection failed for %s", endpoint.name)
-
-        # 5b. Auto-snapshot on schema change
-        try:
-            await snapshot_if_changed(
-                endpoint.id,
-                endpoint.organization_id,
-                result.response_body,
-                self._session,
-            )
-        except Exception:
-            logger.exception(
-                "Failed to create schema snapshot for %s", endpoint.name
+        if drift.has_drift:
+            logger.warning(
+                "Schema drift for %s: %d difference(s)",
+                endpoint.name,
+                drift.drift_count,
             )
-
-        # 5c. Credential leak scan
-        try:
-            security_scan: ScanResult = credential_scanner.scan(result.response_body)
-        except Exception:
-            logger.exception("Credential scan failed for %s", endpoint.name)
-            security_scan = ScanResult(findings=[])
         if security_scan.has_findings:
             logger.warning(
                 "Credential scan for %s: %d finding(s), max severity=%s",
@@ -334,27 +449,17 @@ class RunnerService:
                 )
                 for f in security_scan.findings
             ]
-            await self._security_repo.create_many(findings_to_persist)
-
-        # 5d. Contract validation (if OpenAPI spec exists)
-        contract: ContractResult | None = None
-        if getattr(endpoint, "openapi_spec", None):
-            contract = contract_validator.validate(
-                openapi_spec=endpoint.openapi_spec,
-                url=endpoint.url,
-                method=endpoint.method,
-                status_code=result.status_code,
-                response_body=result.response_body,
+            if queued is not None:
+                queued.extend(findings_to_persist)
+            else:
+                await self._security_repo.create_many(findings_to_persist)
+            stages.lap("credential_scan")
+        if contract is not None and contract.has_violations:
+            logger.warning(
+                "Contract violations for %s: %d violation(s)",
+                endpoint.name,
+                contract.total_violations,
             )
-            if contract.has_violations:
-                logger.warning(
-                    "Contract violations for %s: %d violation(s)",
-                    endpoint.name,
-                    contract.total_violations,
-                )
-
-        # 6. Historical failure rate (shared by anomaly engine and risk scorer)
-        failure_rate = await self._run_repo.get_failure_rate(endpoint.id)
 
         # 7. AI anomaly analysis (cost-gated)
         anomaly: AnomalyResult | None = None
@@ -371,6 +476,10 @@ class RunnerService:
                 performance=perf,
                 drift=drift,
                 failure_rate_percent=failure_rate,
+                phases=phases,
+                window=window,
+                endpoint_id=endpoint.id,
+                organization_id=endpoint.organization_id,
             )
 
             logger.info(
@@ -382,11 +491,11 @@ class RunnerService:
                 f" (skipped: {anomaly.skipped_reason})" if anomaly.skipped_reason else "",
             )
 
-            # 7b. Persist AI telemetry if an LLM call was made
-            # Capture telemetry immediately after analyse() to minimize race window
-            telem = self._anomaly_engine._llm.last_call_telemetry if hasattr(self._anomaly_engine, '_llm') else None
-            if anomaly.ai_called and telem:
-                await self._telemetry_repo.create(
+            # 7b. Persist AI telemetry if an LLM call was made (failed ones too)
+            telem = anomaly.telemetry
+            if telem is not None:
+                await self._save(
+                    queued,
                     AiTelemetryRecord(
                         endpoint_id=endpoint.id,
                         organization_id=endpoint.organization_id,
@@ -398,7 +507,9 @@ class RunnerService:
                         success=telem.success,
                         cost_usd=telem.cost_usd,
                         error_message=telem.error_message,
-                    )
+                        outcome=OUTCOME_CALLED,
+                    ),
+                    self._telemetry_repo.create,
                 )
                 logger.info(
                     "AI telemetry persisted for %s (tokens=%d cost=$%.6f latency=%.0fms)",
@@ -407,6 +518,28 @@ class RunnerService:
                     telem.cost_usd,
                     telem.latency_ms,
                 )
+            elif anomaly.gated or anomaly.cache_hit or anomaly.over_budget:
+                # Avoided call: zero tokens and cost, counted by the dashboard
+                if anomaly.over_budget:
+                    outcome = OUTCOME_OVER_BUDGET
+                else:
+                    outcome = OUTCOME_CACHE_HIT if anomaly.cache_hit else OUTCOME_GATED
+                await self._save(
+                    queued,
+                    AiTelemetryRecord(
+                        endpoint_id=endpoint.id,
+                        organization_id=endpoint.organization_id,
+                        model_name=settings.OPENAI_MODEL,
+                        prompt_tokens=0,
+                        completion_tokens=0,
+                        total_tokens=0,
+                        latency_ms=0.0,
+                        success=True,
+                        cost_usd=0.0,
+                        outcome=outcome,
+                    ),
+                    self._telemetry_repo.create,
+                )
 
             # 8. Persist anomaly record if AI detected one
             if anomaly.anomaly_detected:
@@ -421,7 +554,7 @@ class RunnerService:
                     ai_called=anomaly.ai_called,
                     used_fallback=anomaly.used_fallback,
                 )
-                await self._anomaly_repo.create(anomaly_record)
+                await self._save(queued, anomaly_record, self._anomaly_repo.create)
                 logger.info(
                     "Anomaly persisted for run %s (severity=%.0f confidence=%.2f ai=%s fallback=%s)",
                     saved_run.id,
@@ -430,6 +563,7 @@ class RunnerService:
                     anomaly.ai_called,
                     anomaly.used_fallback,
                 )
+        stages.lap("ai")
 
         # 9. Risk scoring (deterministic, always runs)
         risk = self._risk_engine.score(
@@ -456,6 +590,7 @@ class RunnerService:
             risk.contract_score,
             risk.history_score,
         )
+        stages.lap("risk")
 
         # 10. Persist risk score
         risk_record = RiskScore(
@@ -463,7 +598,13 @@ class RunnerService:
             calculated_score=risk.calculated_score,
             risk_level=risk.risk_level,
         )
-        await self._risk_repo.create(risk_record)
+        await self._save(queued, risk_record, self._risk_repo.create)
+
+        persisted: asyncio.Future[None] | None = None
+        if queued is not None:
+            persisted = self._writer.submit(queued)
+        stages.lap("persist")
+        self._stage_stats.observe(stages)
 
         return PipelineResult(
             run=saved_run,
@@ -476,4 +617,88 @@ class RunnerService:
             endpoint_name=endpoint.name,
             endpoint_url=endpoint.url,
             endpoint_method=endpoint.method,
+            persisted=persisted,
+            stage_timings=stages.breakdown(),
         )
+
+    async def _analyse_body(
+        self, endpoint: Any, result: Any, stages: StageTimer, cache_key: Any = None,
+    ) -> tuple[DriftAnalysis, ScanResult, ContractResult | None]:
+        """Drift, credential scan and contract checks — cached, large bodies off-loop."""
+        cache = self._analysis_cache
+        if cache is not None and cache_key is not None:
+            cached = cache.get(cache_key)
+            if cached is not None:
+                for stage in _BODY_STAGES:
+                    stages.add(stage, 0.0)
+                return cached
+
+        body = await self._offload.run(
+            analyse_body,
+            self._validator,
+            endpoint.name,
+            endpoint.expected_schema,
+            getattr(endpoint, "openapi_spec", None),
+            endpoint.url,
+            endpoint.method,
+            result.status_code,
+            result.response_body,
+            size=result.body_bytes,
+        )
+        for stage, ms in body.timings.items():
+            stages.add(stage, ms)
+
+        analysis = (body.drift, body.security_scan, body.contract)
+        if cache is not None and cache_key is not None and not body.failed:
+            cache.put(cache_key, analysis)
+        return analysis
+
+    async def _session_stages(
+        self,
+        endpoint: Any,
+        result: Any,
+        history: EndpointHistory | None,
+        stages: StageTimer,
+        schema_hash: str | None = None,
+    ) -> float:
+        """Schema snapshot and failure rate — the stages that need the session."""
+        with stages.measure("snapshot"):
+            try:
+                await snapshot_if_changed(
+                    endpoint.id,
+                    endpoint.organization_id,
+                    result.response_body,
+                    self._session,
+                    schema_hash=schema_hash,
+                    body_bytes=result.body_bytes,
+                )
+            except Exception:
+                logger.exception(
+                    "Failed to create schema snapshot for %s", endpoint.name
+                )
+
+        # Historical failure rate (shared by anomaly engine and risk scorer)
+        with stages.measure("failure_rate"):
+            if history is not None:
+                return history.failure_rate()
+            return await self._run_repo.get_failure_rate(endpoint.id)
+
+    @staticmethod
+    async def _join(*stages: Any) -> list[Any]:
+        """
+        Await concurrent stages; once all have finished, re-raise the
+        first failure — no stage is left running against the session.
+        """
+        results = await asyncio.gather(*stages, return_exceptions=True)
+        for outcome in results:
+            if isinstance(outcome, BaseException):
+                raise outcome
+        return results
+
+    @staticmethod
+    async def _save(queued: list[Any] | None, record: Any, create: Any) -> Any:
+        """Persist ``record`` now, or queue it for the bulk writer."""
+        if queued is None:
+            return await create(record)
+        queued.append(prepare(record))
+        return record
@@ -0,0 +1,135 @@
+"""
+Cache of LLM anomaly verdicts per incident fingerprint.
+
+An endpoint that keeps failing the same way produces an almost identical
+prompt on every run.  Verdicts are kept in a bounded LRU with a TTL,
+keyed on
+
+    (endpoint id, incident fingerprint, latency bucket)
+
+where the fingerprint is ``FingerprintService.compute_fingerprint`` over
+the run's signal set, its severity band (the rule-based severity mapped
+onto the risk levels) and its status class, and the latency bucket is
+the power of two the response time falls into.  A repeat failure is
+answered from the cache instead of waiting seconds for the LLM; the TTL
+bounds how long a verdict is reused before the LLM looks again.
+
+Only used from the event loop, so there is no lock.
+"""
+
+from __future__ import annotations
+
+import math
+import time
+import uuid
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Hashable
+
+from app.core.config import settings
+
+if TYPE_CHECKING:
+    from app.monitoring.anomaly_engine import AnomalyResult
+
+
+def severity_band(score: float) -> str:
+    """Rule-based severity (0–100) on the risk-level scale."""
+    if score >= 75:
+        return "CRITICAL"
+    if score >= 50:
+        return "HIGH"
+    if score >= 25:
+        return "MEDIUM"
+    return "LOW"
+
+
+def latency_bucket(response_time_ms: float | None) -> int:
+    """Power-of-two bucket of the response time; -1 without one."""
+    if response_time_ms is None or response_time_ms < 1:
+        return -1
+    return int(math.log2(response_time_ms))
+
+
+def verdict_key(
+    endpoint_id: uuid.UUID,
+    signals: list[str],
+    severity_score: float,
+    status_code: int | None,
+    response_time_ms: float | None,
+) -> tuple[Hashable, ...]:
+    """Cache key for one endpoint + incident fingerprint + latency bucket."""
+    # Deferred: the fingerprint service imports the pipeline, which imports us.
+    from app.services.fingerprint import FingerprintService
+
+    fingerprint = FingerprintService.compute_fingerprint(
+        signals,
+        severity_band(severity_score),
+        FingerprintService.get_error_category(status_code),
+    )
+    return endpoint_id, fingerprint, latency_bucket(response_time_ms)
+
+
+class VerdictCache:
+    """Bounded LRU of LLM verdicts whose entries expire after a TTL."""
+
+    def __init__(
+        self, max_entries: int | None = None, ttl_seconds: float | None = None
+    ) -> None:
+        self._max_entries = max_entries
+        self._ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[Hashable, tuple[float, AnomalyResult]] = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._expired = 0
+        self._evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def max_entries(self) -> int:
+        return self._max_entries or settings.ANOMALY_VERDICT_CACHE_SIZE
+
+    @property
+    def ttl_seconds(self) -> float:
+        return self._ttl_seconds or settings.ANOMALY_VERDICT_CACHE_TTL_SECONDS
+
+    def get(self, key: Hashable) -> AnomalyResult | None:
+        entry = self._entries.get(key)
+        if entry is not None and time.monotonic() - entry[0] > self.ttl_seconds:
+            del self._entries[key]
+            self._expired += 1
+            entry = None
+        if entry is None:
+            self._misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self._hits += 1
+        return entry[1]
+
+    def put(self, key: Hashable, result: AnomalyResult) -> None:
+        self._entries[key] = (time.monotonic(), result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._evictions += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self._hits + self._misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self._hits,
+            "misses": self._misses,
+            "expired": self._expired,
+            "evictions": self._evictions,
+            "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+# ─── module-level singleton ─────────────────────────────────────────────
+
+verdict_cache = VerdictCache()
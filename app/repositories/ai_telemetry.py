@@ -8,7 +8,13 @@ from datetime import datetime, timedelta, timezone
 from sqlalchemy import Float, case, cast, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models.ai_telemetry import AiTelemetryRecord
+from app.models.ai_telemetry import (
+    OUTCOME_CACHE_HIT,
+    OUTCOME_CALLED,
+    OUTCOME_GATED,
+    OUTCOME_OVER_BUDGET,
+    AiTelemetryRecord,
+)
 from app.models.api_endpoint import ApiEndpoint
 
 
@@ -59,11 +65,33 @@ class AiTelemetryRepository:
             ).where(
                 AiTelemetryRecord.organization_id == tenant_id,
                 AiTelemetryRecord.created_at >= since,
+                AiTelemetryRecord.outcome == OUTCOME_CALLED,
             )
         )
 
         r = row.one()
         total = r.total_calls or 0
+
+        # LLM calls avoided (pre-gate, verdict cache) or denied by the
+        # organization's LLM budget — zero tokens and cost
+        avoided = await self._session.execute(
+            select(
+                func.count()
+                .filter(AiTelemetryRecord.outcome.in_((OUTCOME_GATED, OUTCOME_CACHE_HIT)))
+                .label("calls_avoided"),
+                func.count()
+                .filter(AiTelemetryRecord.outcome == OUTCOME_CACHE_HIT)
+                .label("cache_hits"),
+                func.count()
+                .filter(AiTelemetryRecord.outcome == OUTCOME_OVER_BUDGET)
+                .label("budget_denied"),
+            ).where(
+                AiTelemetryRecord.organization_id == tenant_id,
+                AiTelemetryRecord.created_at >= since,
+                AiTelemetryRecord.outcome != OUTCOME_CALLED,
+            )
+        )
+        a = avoided.one()
         return {
             "total_calls": total,
             "successful_calls": r.successful_calls or 0,
@@ -74,8 +102,26 @@ class AiTelemetryRepository:
             "total_cost_usd": round(float(r.total_cost_usd), 6),
             "avg_latency_ms": round(float(r.avg_latency_ms), 1),
             "avg_tokens_per_call": round(r.total_tokens / total, 1) if total else 0.0,
+            "calls_avoided": a.calls_avoided or 0,
+            "cache_hits": a.cache_hits or 0,
+            "budget_denied": a.budget_denied or 0,
         }
 
+    async def get_cost_by_org_since(self, since: datetime) -> dict[uuid.UUID, float]:
+        """USD spent on LLM calls since ``since``, per organization — seeds the USD budgets."""
+        rows = await self._session.execute(
+            select(
+                AiTelemetryRecord.organization_id,
+                func.sum(AiTelemetryRecord.cost_usd).label("cost_usd"),
+            )
+            .where(
+                AiTelemetryRecord.created_at >= since,
+                AiTelemetryRecord.outcome == OUTCOME_CALLED,
+            )
+            .group_by(AiTelemetryRecord.organization_id)
+        )
+        return {row.organization_id: float(row.cost_usd or 0.0) for row in rows}
+
     # ── Daily breakdown ──────────────────────────────────────────────
 
     async def get_daily_breakdown(
@@ -105,6 +151,7 @@ class AiTelemetryRepository:
             .where(
                 AiTelemetryRecord.organization_id == tenant_id,
                 AiTelemetryRecord.created_at >= since,
+                AiTelemetryRecord.outcome == OUTCOME_CALLED,
             )
             .group_by(day_trunc)
             .order_by(day_trunc)
@@ -161,6 +208,7 @@ class AiTelemetryRepository:
             .where(
                 AiTelemetryRecord.organization_id == tenant_id,
                 AiTelemetryRecord.created_at >= since,
+                AiTelemetryRecord.outcome == OUTCOME_CALLED,
             )
             .group_by(AiTelemetryRecord.endpoint_id, ApiEndpoint.name)
             .order_by(func.sum(AiTelemetryRecord.cost_usd).desc())
@@ -198,7 +246,10 @@ class AiTelemetryRepository:
                 func.coalesce(func.avg(AiTelemetryRecord.latency_ms), 0.0).label(
                     "avg_latency_ms"
                 ),
-            ).where(AiTelemetryRecord.organization_id == tenant_id)
+            ).where(
+                AiTelemetryRecord.organization_id == tenant_id,
+                AiTelemetryRecord.outcome == OUTCOME_CALLED,
+            )
         )
         r = row.one()
         total = r.total_calls or 0
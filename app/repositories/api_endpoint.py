@@ -1,6 +1,6 @@
 import uuid
 
-from sqlalchemy import select
+from sqlalchemy import Row, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.api_endpoint import ApiEndpoint
@@ -18,6 +18,28 @@ class ApiEndpointRepository:
         result = await self._session.execute(stmt)
         return list(result.scalars().all())
 
+    async def get_schedule_projection(
+        self, endpoint_id: uuid.UUID | None = None
+    ) -> list[Row]:
+        """Lightweight scheduling rows (id, org, name, intervals, config_version).
+
+        Avoids loading the large JSON columns (``openapi_spec``,
+        ``expected_schema``, ...) when only scheduling data is needed.
+        """
+        stmt = select(
+            ApiEndpoint.id,
+            ApiEndpoint.organization_id,
+            ApiEndpoint.name,
+            ApiEndpoint.monitoring_interval_seconds,
+            ApiEndpoint.min_interval_seconds,
+            ApiEndpoint.max_interval_seconds,
+            ApiEndpoint.config_version,
+        )
+        if endpoint_id is not None:
+            stmt = stmt.where(ApiEndpoint.id == endpoint_id)
+        result = await self._session.execute(stmt)
+        return list(result.all())
+
     async def get_by_id(
         self, endpoint_id: uuid.UUID, tenant_id: uuid.UUID | None = None
     ) -> ApiEndpoint | None:
@@ -1,7 +1,7 @@
 import uuid
-from datetime import datetime
+from datetime import datetime, timedelta
 
-from sqlalchemy import func, select
+from sqlalchemy import extract, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.api_run import ApiRun
@@ -57,6 +57,101 @@ class ApiRunRepository:
         )
         return list(result.scalars().all())
 
+    async def get_latency_samples(
+        self,
+        endpoint_id: uuid.UUID,
+        *,
+        since: datetime,
+        limit: int,
+        exclude_run_id: uuid.UUID | None = None,
+    ) -> list[tuple[datetime, float]]:
+        """(created_at, response_time_ms) since ``since``, oldest first,
+        capped at the newest ``limit`` runs.  Seeds latency baselines."""
+        stmt = select(ApiRun.created_at, ApiRun.response_time_ms).where(
+            ApiRun.endpoint_id == endpoint_id,
+            ApiRun.created_at >= since,
+            ApiRun.response_time_ms.is_not(None),
+        )
+        if exclude_run_id is not None:
+            stmt = stmt.where(ApiRun.id != exclude_run_id)
+        result = await self._session.execute(
+            stmt.order_by(ApiRun.created_at.desc()).limit(limit)
+        )
+        return [tuple(row) for row in reversed(result.all())]
+
+    async def get_recent_history(
+        self,
+        endpoint_ids: list[uuid.UUID] | None,
+        *,
+        limit: int,
+        since: datetime | None = None,
+    ) -> list[tuple[uuid.UUID, datetime, float | None, bool]]:
+        """Last N (endpoint_id, created_at, response_time_ms, is_success) per
+        endpoint in one query, oldest first within each endpoint.
+
+        ``endpoint_ids=None`` covers every endpoint; ``since`` bounds the
+        scan.  Used to warm the in-memory run history.
+        """
+        rank = (
+            func.row_number()
+            .over(partition_by=ApiRun.endpoint_id, order_by=ApiRun.created_at.desc())
+            .label("rank")
+        )
+        inner = select(
+            ApiRun.endpoint_id,
+            ApiRun.created_at,
+            ApiRun.response_time_ms,
+            ApiRun.is_success,
+            rank,
+        )
+        if endpoint_ids is not None:
+            inner = inner.where(ApiRun.endpoint_id.in_(endpoint_ids))
+        if since is not None:
+            inner = inner.where(ApiRun.created_at >= since)
+        ranked = inner.subquery()
+        result = await self._session.execute(
+            select(
+                ranked.c.endpoint_id,
+                ranked.c.created_at,
+                ranked.c.response_time_ms,
+                ranked.c.is_success,
+            )
+            .where(ranked.c.rank <= limit)
+            .order_by(ranked.c.endpoint_id, ranked.c.rank.desc())
+        )
+        return [tuple(row) for row in result.all()]
+
+    async def get_outcome_counts(
+        self,
+        endpoint_ids: list[uuid.UUID] | None,
+        *,
+        since: datetime,
+        bucket: timedelta,
+        buckets: int,
+    ) -> list[tuple[uuid.UUID, int, int, int]]:
+        """(endpoint_id, bucket_index, total, failures) for runs since ``since``,
+        grouped into ``buckets`` fixed-width time buckets, in one query.
+        """
+        # One arithmetic expression for any bucket count; EXTRACT(epoch)
+        # compiles on both SQLite and PostgreSQL.
+        index = func.floor(
+            (extract("epoch", ApiRun.created_at) - since.timestamp()) / bucket.total_seconds()
+        ).label("bucket")
+        stmt = (
+            select(
+                ApiRun.endpoint_id,
+                index,
+                func.count(),
+                func.count().filter(ApiRun.is_success.is_(False)),
+            )
+            .where(ApiRun.created_at >= since, ApiRun.created_at < since + bucket * buckets)
+            .group_by(ApiRun.endpoint_id, index)
+        )
+        if endpoint_ids is not None:
+            stmt = stmt.where(ApiRun.endpoint_id.in_(endpoint_ids))
+        result = await self._session.execute(stmt)
+        return [(eid, int(i), int(total), int(failed or 0)) for eid, i, total, failed in result.all()]
+
     async def get_failure_rate(
         self,
         endpoint_id: uuid.UUID,
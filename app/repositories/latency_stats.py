@@ -0,0 +1,125 @@
+"""
+Repositories for EndpointLatencyStats (streaming stats) and
+EndpointLatencyHistogram (hourly latency histograms).
+"""
+
+from __future__ import annotations
+
+import uuid
+from datetime import datetime, timezone
+from typing import Any
+
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.api_endpoint import ApiEndpoint
+from app.models.latency_stats import EndpointLatencyHistogram, EndpointLatencyStats
+from app.monitoring.pipeline_stats import LatencyHistogram
+
+# (endpoint_id, bucket_start) → (organization_id, histogram)
+HistogramBuckets = dict[tuple[uuid.UUID, datetime], tuple[uuid.UUID, LatencyHistogram]]
+
+
+class EndpointLatencyStatsRepository:
+    def __init__(self, session: AsyncSession) -> None:
+        self._session = session
+
+    async def get(self, endpoint_id: uuid.UUID) -> EndpointLatencyStats | None:
+        return await self._session.get(EndpointLatencyStats, endpoint_id)
+
+    async def get_all(self) -> list[EndpointLatencyStats]:
+        result = await self._session.execute(select(EndpointLatencyStats))
+        return list(result.scalars().all())
+
+    async def get_unseeded_endpoint_ids(self) -> list[uuid.UUID]:
+        """Endpoints that have no stored stats yet."""
+        result = await self._session.execute(
+            select(ApiEndpoint.id).where(
+                ApiEndpoint.id.not_in(select(EndpointLatencyStats.endpoint_id))
+            )
+        )
+        return list(result.scalars().all())
+
+    async def save_many(self, states: dict[uuid.UUID, tuple[dict[str, Any], int]]) -> None:
+        """Insert or overwrite the state of each endpoint (one SELECT, one flush)."""
+        result = await self._session.execute(
+            select(EndpointLatencyStats).where(EndpointLatencyStats.endpoint_id.in_(states))
+        )
+        existing = {row.endpoint_id: row for row in result.scalars()}
+        now = datetime.now(timezone.utc)
+        for endpoint_id, (state, sample_count) in states.items():
+            row = existing.get(endpoint_id)
+            if row is None:
+                self._session.add(EndpointLatencyStats(
+                    endpoint_id=endpoint_id, state=state,
+                    sample_count=sample_count, updated_at=now,
+                ))
+            else:
+                row.state = state
+                row.sample_count = sample_count
+                row.updated_at = now
+        await self._session.flush()
+
+
+class EndpointLatencyHistogramRepository:
+    def __init__(self, session: AsyncSession) -> None:
+        self._session = session
+
+    async def merge_many(self, buckets: HistogramBuckets) -> None:
+        """Merge each histogram into its stored row, creating missing rows."""
+        result = await self._session.execute(
+            select(EndpointLatencyHistogram)
+            .where(
+                tuple_(
+                    EndpointLatencyHistogram.endpoint_id,
+                    EndpointLatencyHistogram.bucket_start,
+                ).in_(list(buckets))
+            )
+            .with_for_update()
+        )
+        existing = {
+            (row.endpoint_id, _utc(row.bucket_start)): row for row in result.scalars()
+        }
+        for (endpoint_id, bucket_start), (organization_id, hist) in buckets.items():
+            row = existing.get((endpoint_id, bucket_start))
+            if row is None:
+                self._session.add(EndpointLatencyHistogram(
+                    endpoint_id=endpoint_id, bucket_start=bucket_start,
+                    organization_id=organization_id,
+                    sample_count=hist.count, counts=hist.to_bytes(),
+                ))
+            else:
+                merged = LatencyHistogram.from_bytes(row.counts)
+                merged.merge(hist)
+                row.sample_count = merged.count
+                row.counts = merged.to_bytes()
+        await self._session.flush()
+
+    async def list_window(
+        self,
+        organization_id: uuid.UUID,
+        since: datetime,
+        until: datetime | None = None,
+        endpoint_id: uuid.UUID | None = None,
+    ) -> list[tuple[uuid.UUID, datetime, LatencyHistogram]]:
+        """(endpoint_id, bucket_start, histogram) for buckets starting in [since, until)."""
+        query = select(EndpointLatencyHistogram).where(
+            EndpointLatencyHistogram.organization_id == organization_id,
+            EndpointLatencyHistogram.bucket_start >= since,
+        )
+        if until is not None:
+            query = query.where(EndpointLatencyHistogram.bucket_start < until)
+        if endpoint_id is not None:
+            query = query.where(EndpointLatencyHistogram.endpoint_id == endpoint_id)
+        result = await self._session.execute(
+            query.order_by(EndpointLatencyHistogram.bucket_start)
+        )
+        return [
+            (row.endpoint_id, _utc(row.bucket_start), LatencyHistogram.from_bytes(row.counts))
+            for row in result.scalars()
+        ]
+
+
+def _utc(value: datetime) -> datetime:
+    """SQLite drops the zone; stored buckets are always UTC."""
+    return value if value.tzinfo is not None else value.replace(tzinfo=timezone.utc)
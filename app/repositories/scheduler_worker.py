@@ -0,0 +1,61 @@
+"""
+Repository for SchedulerWorker — lease heartbeats and membership queries.
+
+Heartbeats are stamped and expiry is checked with the database clock
+(``now()``), never the app node's, so clock skew between nodes cannot
+make a live worker's lease look expired and hand its shard to a peer.
+"""
+
+from __future__ import annotations
+
+from datetime import timedelta
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.scheduler_worker import SchedulerWorker
+
+
+class SchedulerWorkerRepository:
+    def __init__(self, session: AsyncSession) -> None:
+        self._session = session
+
+    async def heartbeat(self, worker_id: str, hostname: str, pid: int) -> None:
+        """Create or refresh the lease row for ``worker_id``."""
+        worker = await self._session.get(SchedulerWorker, worker_id)
+        if worker is None:
+            self._session.add(
+                SchedulerWorker(
+                    worker_id=worker_id,
+                    hostname=hostname,
+                    pid=pid,
+                    started_at=func.now(),
+                    heartbeat_at=func.now(),
+                )
+            )
+        else:
+            worker.heartbeat_at = func.now()
+        await self._session.flush()
+
+    async def get_live_ids(self, ttl_seconds: int) -> list[str]:
+        """Worker ids whose lease has not expired, sorted for stable ordering."""
+        since = func.now() - timedelta(seconds=ttl_seconds)
+        result = await self._session.execute(
+            select(SchedulerWorker.worker_id)
+            .where(SchedulerWorker.heartbeat_at >= since)
+            .order_by(SchedulerWorker.worker_id)
+        )
+        return list(result.scalars().all())
+
+    async def delete_expired(self, ttl_seconds: int) -> int:
+        """Drop lease rows of workers that stopped heartbeating."""
+        since = func.now() - timedelta(seconds=ttl_seconds)
+        result = await self._session.execute(
+            delete(SchedulerWorker).where(SchedulerWorker.heartbeat_at < since)
+        )
+        return result.rowcount or 0
+
+    async def delete(self, worker_id: str) -> None:
+        await self._session.execute(
+            delete(SchedulerWorker).where(SchedulerWorker.worker_id == worker_id)
+        )
@@ -0,0 +1,80 @@
+"""
+Adaptive probe intervals driven by endpoint health.
+
+Rules (evaluated after every scheduled run):
+  - HIGH / CRITICAL risk, or an open incident → probe at the endpoint's
+    minimum interval so failures and recoveries are seen sooner.
+  - MEDIUM risk → snap back to the configured base interval.
+  - LOW risk → after every ``SCHEDULER_ADAPTIVE_HEALTHY_RUNS`` consecutive
+    LOW runs, multiply the interval by ``SCHEDULER_ADAPTIVE_BACKOFF_FACTOR``
+    up to the endpoint's maximum.  Leaving the minimum interval after an
+    incident closes goes straight back to the base interval first.
+
+Bounds default to ``base / 4`` (never below 10s) and
+``base * SCHEDULER_ADAPTIVE_MAX_FACTOR`` unless the endpoint sets
+``min_interval_seconds`` / ``max_interval_seconds``.
+
+Pure computation — the scheduler owns the state and the rescheduling.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+from app.core.config import settings
+from app.monitoring.risk_engine import RISK_CRITICAL, RISK_HIGH, RISK_LOW
+
+MIN_INTERVAL_FLOOR_SECONDS = 10
+
+
+@dataclass(frozen=True, slots=True)
+class IntervalBounds:
+    """Configured, fastest and slowest probe interval for one endpoint."""
+
+    base: int
+    min: int
+    max: int
+
+    @classmethod
+    def for_endpoint(
+        cls,
+        base: int,
+        min_interval: int | None = None,
+        max_interval: int | None = None,
+    ) -> IntervalBounds:
+        lo = min_interval or max(MIN_INTERVAL_FLOOR_SECONDS, base // 4)
+        hi = max_interval or int(base * settings.SCHEDULER_ADAPTIVE_MAX_FACTOR)
+        return cls(base=base, min=min(lo, base), max=max(hi, base))
+
+
+@dataclass(slots=True)
+class AdaptiveState:
+    """Current interval and healthy-run streak for one endpoint."""
+
+    bounds: IntervalBounds
+    current: int
+    low_streak: int = 0
+
+    @classmethod
+    def initial(cls, bounds: IntervalBounds) -> AdaptiveState:
+        return cls(bounds=bounds, current=bounds.base)
+
+    def observe(self, risk_level: str | None, incident_open: bool) -> int:
+        """Fold in one run's outcome and return the interval to use next."""
+        b = self.bounds
+        if incident_open or risk_level in (RISK_HIGH, RISK_CRITICAL):
+            self.low_streak = 0
+            self.current = b.min
+        elif risk_level != RISK_LOW:
+            self.low_streak = 0
+            self.current = b.base
+        elif self.current < b.base:
+            self.low_streak = 0
+            self.current = b.base
+        else:
+            self.low_streak += 1
+            if self.low_streak >= settings.SCHEDULER_ADAPTIVE_HEALTHY_RUNS:
+                self.low_streak = 0
+                stepped = int(self.current * settings.SCHEDULER_ADAPTIVE_BACKOFF_FACTOR)
+                self.current = min(b.max, max(stepped, self.current))
+        return self.current
@@ -6,28 +6,57 @@ Responsibilities:
   - Sync scheduled jobs to the database on startup and on demand.
   - Each ``ApiEndpoint`` gets its own interval job based on
     ``monitoring_interval_seconds``.
-  - Jobs are added, updated, or removed when endpoints change.
+  - Jobs are added, updated, or removed incrementally when endpoints
+    change — directly in the process that handled the API call, and via
+    Postgres LISTEN/NOTIFY in every other process (see ``events``).
+  - A periodic lightweight full resync is the fallback for missed
+    notifications.
   - Exposes status information for the API layer.
 
 Design:
   - Uses APScheduler 3.x ``AsyncIOScheduler`` (in-memory job store).
   - Each job calls ``run_endpoint`` from the jobs module.
-  - Concurrent execution is limited via ``SCHEDULER_MAX_CONCURRENT``.
+  - Concurrent pipelines are capped process-wide by ``pipeline_limiter``
+    (``SCHEDULER_MAX_CONCURRENT`` running, ``SCHEDULER_QUEUE_SIZE``
+    waiting), shared fairly between organizations; each endpoint job
+    runs at most one instance at a time.
   - Resilient: a failing job never crashes the scheduler.
+  - With ``SCHEDULER_SPREAD_ENABLED`` each endpoint fires on its own
+    hashed phase within its interval (see ``spread``) instead of all
+    endpoints firing together.
+  - With ``SCHEDULER_ADAPTIVE_ENABLED`` each run's risk level and
+    incident state tighten or relax that endpoint's interval within its
+    bounds (see ``adaptive``).
+  - With ``SCHEDULER_SHARDING_ENABLED`` every process heartbeats a lease
+    row and only schedules the endpoints it owns (see ``sharding``), so
+    several API workers or nodes can split the probing load.
 """
 
 from __future__ import annotations
 
 import logging
+import uuid
 from datetime import datetime, timezone
 from typing import Any
 
+from apscheduler.events import EVENT_JOB_SUBMITTED, JobSubmissionEvent
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 
 from app.core.config import settings
+from app.monitoring.online_stats import online_stats
+from app.monitoring.run_history import run_history
+from app.scheduler.adaptive import AdaptiveState, IntervalBounds
+from app.scheduler.events import EndpointChangeListener
+from app.scheduler.limiter import pipeline_limiter
+from app.scheduler.sharding import WorkerMembership
+from app.scheduler.spread import build_trigger
 
 logger = logging.getLogger(__name__)
 
+JOB_PREFIX = "monitor_"
+HEARTBEAT_JOB_ID = "scheduler_heartbeat"
+RESYNC_JOB_ID = "scheduler_resync"
+
 
 class MonitorScheduler:
     """
@@ -40,6 +69,11 @@ class MonitorScheduler:
     def __init__(self) -> None:
         self._scheduler: AsyncIOScheduler | None = None
         self._started_at: datetime | None = None
+        self._membership: WorkerMembership | None = None
+        self._listener = EndpointChangeListener(self.apply_endpoint_change)
+        self._bounds: dict[uuid.UUID, IntervalBounds] = {}
+        self._adaptive: dict[uuid.UUID, AdaptiveState] = {}
+        self._adaptive_changes = {"tightened": 0, "relaxed": 0}
 
     # ── lifecycle ────────────────────────────────────────────────────
 
@@ -56,25 +90,60 @@ class MonitorScheduler:
         self._scheduler = AsyncIOScheduler(
             job_defaults={
                 "coalesce": True,           # merge missed runs into one
-                "max_instances": settings.SCHEDULER_MAX_CONCURRENT,
+                "max_instances": 1,         # one in-flight run per endpoint
                 "misfire_grace_time": 60,    # seconds of grace for misfired jobs
             },
         )
+        self._scheduler.add_listener(self._on_job_submitted, EVENT_JOB_SUBMITTED)
         self._scheduler.start()
         self._started_at = datetime.now(timezone.utc)
+
+        if settings.SCHEDULER_SHARDING_ENABLED:
+            self._membership = WorkerMembership()
+            self._scheduler.add_job(
+                self._heartbeat,
+                trigger="interval",
+                seconds=settings.SCHEDULER_WORKER_HEARTBEAT_SECONDS,
+                id=HEARTBEAT_JOB_ID,
+                name="Scheduler worker heartbeat",
+                replace_existing=True,
+            )
+
+        self._scheduler.add_job(
+            self._periodic_resync,
+            trigger="interval",
+            seconds=settings.SCHEDULER_RESYNC_SECONDS,
+            id=RESYNC_JOB_ID,
+            name="Scheduler full resync",
+            replace_existing=True,
+        )
+
         logger.info(
-            "Scheduler started (max_concurrent=%d)",
+            "Scheduler started (max_concurrent=%d, sharding=%s)",
             settings.SCHEDULER_MAX_CONCURRENT,
+            self._membership.worker_id if self._membership else "off",
         )
 
+    async def start_listener(self) -> None:
+        """Start receiving endpoint changes from other processes."""
+        if self._scheduler is None or not settings.SCHEDULER_LISTEN_ENABLED:
+            return
+        await self._listener.start()
+
     async def shutdown(self) -> None:
         """Gracefully stop all jobs and the scheduler."""
         if self._scheduler is None:
             return
 
+        await self._listener.stop()
+
         self._scheduler.shutdown(wait=True)
         self._scheduler = None
         self._started_at = None
+
+        if self._membership is not None:
+            await self._membership.leave()
+            self._membership = None
         logger.info("Scheduler stopped (waited for in-flight jobs)")
 
     # ── properties ───────────────────────────────────────────────────
@@ -87,17 +156,217 @@ class MonitorScheduler:
     def scheduler(self) -> AsyncIOScheduler | None:
         return self._scheduler
 
+    @staticmethod
+    def _on_job_submitted(event: JobSubmissionEvent) -> None:
+        """Remember each tick's scheduled time so queue lag can be measured."""
+        if event.job_id.startswith(JOB_PREFIX) and event.scheduled_run_times:
+            pipeline_limiter.mark_scheduled(event.job_id, event.scheduled_run_times[-1])
+
+    # ── sharding ─────────────────────────────────────────────────────
+
+    async def _heartbeat(self) -> None:
+        """Refresh this worker's lease and rebalance if membership changed."""
+        if self._membership is None:
+            return
+        try:
+            changed = await self._membership.heartbeat()
+        except Exception:
+            logger.exception("Scheduler heartbeat failed")
+            return
+        if changed:
+            await self.sync_jobs(refresh_membership=False)
+
     # ── job management ───────────────────────────────────────────────
 
-    async def sync_jobs(self) -> dict[str, Any]:
+    def _upsert_job(
+        self,
+        endpoint_id: uuid.UUID,
+        name: str,
+        interval: int,
+        min_interval: int | None = None,
+        max_interval: int | None = None,
+        organization_id: uuid.UUID | None = None,
+    ) -> str:
+        """Add or reschedule one endpoint job.  Returns added/updated/unchanged."""
+        from app.scheduler.jobs import run_endpoint  # local import
+
+        job_id = f"{JOB_PREFIX}{endpoint_id}"
+        job_name = f"Monitor: {name}"
+        existing_job = self._scheduler.get_job(job_id)
+        bounds = IntervalBounds.for_endpoint(interval, min_interval, max_interval)
+        previous_bounds = self._bounds.get(endpoint_id)
+        self._bounds[endpoint_id] = bounds
+        # The org id lets the pipeline gate queue the tick under its tenant.
+        job_kwargs = {"endpoint_id": str(endpoint_id)}
+        if organization_id is not None:
+            job_kwargs["organization_id"] = str(organization_id)
+
+        if existing_job is None:
+            self._scheduler.add_job(
+                run_endpoint,
+                trigger=build_trigger(str(endpoint_id), interval),
+                id=job_id,
+                name=job_name,
+                kwargs=job_kwargs,
+                replace_existing=True,
+            )
+            logger.info("Added job %s (%s every %ds)", job_id, name, interval)
+            return "added"
+
+        action = "unchanged"
+        current_interval = int(existing_job.trigger.interval.total_seconds())
+        # Adaptive mode moves the live interval away from the base, so
+        # compare configuration rather than the trigger when we know it.
+        changed = (
+            previous_bounds != bounds if previous_bounds is not None
+            else current_interval != interval
+        )
+        if changed:
+            self._adaptive.pop(endpoint_id, None)
+            self._scheduler.reschedule_job(
+                job_id,
+                trigger=build_trigger(str(endpoint_id), interval),
+            )
+            logger.info(
+                "Updated job %s: interval %ds → %ds",
+                job_id, current_interval, interval,
+            )
+            action = "updated"
+        if existing_job.name != job_name:
+            existing_job.modify(name=job_name)
+        if organization_id is not None and existing_job.kwargs != job_kwargs:
+            existing_job.modify(kwargs=job_kwargs)
+        return action
+
+    def schedule_endpoint(
+        self,
+        endpoint_id: uuid.UUID,
+        name: str,
+        interval_seconds: int,
+        *,
+        min_interval_seconds: int | None = None,
+        max_interval_seconds: int | None = None,
+        organization_id: uuid.UUID | None = None,
+    ) -> str:
+        """
+        Register or reschedule the job for a single endpoint.
+
+        Called directly after an endpoint is created or updated, so the
+        change takes effect without a full ``sync_jobs``.  Endpoints owned
+        by another shard are removed from this worker instead.
+        """
+        if self._scheduler is None:
+            return "scheduler_disabled"
+        if self._membership is not None and not self._membership.owns(str(endpoint_id)):
+            return "removed" if self.unschedule_endpoint(endpoint_id) else "not_owned"
+        return self._upsert_job(
+            endpoint_id, name, interval_seconds,
+            min_interval_seconds, max_interval_seconds, organization_id,
+        )
+
+    def unschedule_endpoint(self, endpoint_id: uuid.UUID) -> bool:
+        """Remove the job for a single endpoint.  Returns True if one existed."""
+        if self._scheduler is None:
+            return False
+        self._bounds.pop(endpoint_id, None)
+        self._adaptive.pop(endpoint_id, None)
+        run_history.forget(endpoint_id)
+        online_stats.forget(endpoint_id)
+        job_id = f"{JOB_PREFIX}{endpoint_id}"
+        if self._scheduler.get_job(job_id) is None:
+            return False
+        self._scheduler.remove_job(job_id)
+        logger.info("Removed job %s", job_id)
+        return True
+
+    async def apply_endpoint_change(self, op: str, endpoint_id: uuid.UUID) -> None:
+        """Apply a change notification published by another process."""
+        if self._scheduler is None:
+            return
+        if op == "delete":
+            self.unschedule_endpoint(endpoint_id)
+            return
+
+        from app.db.session import async_session_factory
+        from app.repositories.api_endpoint import ApiEndpointRepository
+
+        try:
+            async with async_session_factory() as session:
+                rows = await ApiEndpointRepository(session).get_schedule_projection(
+                    endpoint_id
+                )
+        except Exception:
+            logger.exception("Failed to load endpoint %s for rescheduling", endpoint_id)
+            return
+
+        if not rows:
+            self.unschedule_endpoint(endpoint_id)
+            return
+        row = rows[0]
+        self.schedule_endpoint(
+            row.id, row.name, row.monitoring_interval_seconds,
+            min_interval_seconds=row.min_interval_seconds,
+            max_interval_seconds=row.max_interval_seconds,
+            organization_id=row.organization_id,
+        )
+
+    def observe_run(
+        self, endpoint_id: uuid.UUID, risk_level: str | None, incident_open: bool
+    ) -> int | None:
+        """
+        Adapt an endpoint's probe interval after a scheduled run.
+
+        Returns the new interval if the job was rescheduled, else None.
+        No-op unless ``SCHEDULER_ADAPTIVE_ENABLED``.
+        """
+        if self._scheduler is None or not settings.SCHEDULER_ADAPTIVE_ENABLED:
+            return None
+        bounds = self._bounds.get(endpoint_id)
+        job_id = f"{JOB_PREFIX}{endpoint_id}"
+        if bounds is None or self._scheduler.get_job(job_id) is None:
+            return None
+
+        state = self._adaptive.get(endpoint_id)
+        if state is None:
+            state = self._adaptive[endpoint_id] = AdaptiveState.initial(bounds)
+        previous = state.current
+        interval = state.observe(risk_level, incident_open)
+        if interval == previous:
+            return None
+
+        self._scheduler.reschedule_job(
+            job_id, trigger=build_trigger(str(endpoint_id), interval)
+        )
+        self._adaptive_changes["tightened" if interval < previous else "relaxed"] += 1
+        logger.info(
+            "Adaptive interval for %s: %ds → %ds (risk=%s incident_open=%s)",
+            job_id, previous, interval, risk_level, incident_open,
+        )
+        return interval
+
+    async def _periodic_resync(self) -> None:
+        """Fallback full resync; also reconnects a dropped change listener."""
+        await self.start_listener()
+        await self.sync_jobs()
+
+    async def sync_jobs(self, *, refresh_membership: bool = True) -> dict[str, Any]:
         """
         Synchronise scheduled jobs to the current set of endpoints.
 
-        Reads all endpoints from the database, then:
+        Reads a lightweight (id, name, interval, config_version) projection
+        of every endpoint, then:
           - Adds new jobs for endpoints without a scheduled job.
           - Updates interval for endpoints whose interval changed.
           - Removes jobs for endpoints that no longer exist.
 
+        Day-to-day changes are applied incrementally through
+        ``schedule_endpoint`` / ``unschedule_endpoint`` and change
+        notifications; this full pass runs at startup, on demand and every
+        ``SCHEDULER_RESYNC_SECONDS`` as a safety net.
+
+        When sharding is enabled only endpoints owned by this worker are
+        scheduled; jobs for endpoints that moved to a peer are removed.
+
         Returns a summary dict for logging / API response.
         """
         if self._scheduler is None:
@@ -108,20 +377,28 @@ class MonitorScheduler:
         from app.db.session import async_session_factory
         from app.repositories.api_endpoint import ApiEndpointRepository
 
+        if self._membership is not None and refresh_membership:
+            try:
+                await self._membership.heartbeat()
+            except Exception:
+                logger.exception("Scheduler heartbeat failed during sync")
+
         async with async_session_factory() as session:
             repo = ApiEndpointRepository(session)
-            endpoints = await repo.get_all()
+            endpoints = await repo.get_schedule_projection()
 
         # Build lookup of desired jobs
-        desired: dict[str, int] = {}  # job_id → interval_seconds
-        endpoint_map: dict[str, Any] = {}  # job_id → endpoint
+        desired: dict[str, Any] = {}  # job_id → projection row
         for ep in endpoints:
-            job_id = f"monitor_{ep.id}"
-            desired[job_id] = ep.monitoring_interval_seconds
-            endpoint_map[job_id] = ep
-
-        # Current jobs in scheduler
-        existing_ids = {job.id for job in self._scheduler.get_jobs()}
+            if self._membership is not None and not self._membership.owns(str(ep.id)):
+                continue
+            desired[f"{JOB_PREFIX}{ep.id}"] = ep
+
+        # Current monitoring jobs in scheduler (internal jobs are left alone)
+        existing_ids = {
+            job.id for job in self._scheduler.get_jobs()
+            if job.id.startswith(JOB_PREFIX)
+        }
 
         added = 0
         updated = 0
@@ -132,50 +409,24 @@ class MonitorScheduler:
             if job_id not in desired:
                 self._scheduler.remove_job(job_id)
                 removed += 1
-                logger.info("Removed job %s (endpoint deleted)", job_id)
+                logger.info("Removed job %s (endpoint deleted or moved)", job_id)
 
         # Add or update jobs
-        from app.scheduler.jobs import run_endpoint  # local import
-
-        for job_id, interval in desired.items():
-            ep = endpoint_map[job_id]
-
-            if job_id in existing_ids:
-                # Check if interval changed
-                existing_job = self._scheduler.get_job(job_id)
-                if existing_job is not None:
-                    current_interval = existing_job.trigger.interval.total_seconds()
-                    if int(current_interval) != interval:
-                        self._scheduler.reschedule_job(
-                            job_id,
-                            trigger="interval",
-                            seconds=interval,
-                        )
-                        updated += 1
-                        logger.info(
-                            "Updated job %s: interval %ds → %ds",
-                            job_id, int(current_interval), interval,
-                        )
-            else:
-                # New endpoint → add job
-                self._scheduler.add_job(
-                    run_endpoint,
-                    trigger="interval",
-                    seconds=interval,
-                    id=job_id,
-                    name=f"Monitor: {ep.name}",
-                    kwargs={"endpoint_id": str(ep.id)},
-                    replace_existing=True,
-                )
+        for ep in desired.values():
+            action = self._upsert_job(
+                ep.id, ep.name, ep.monitoring_interval_seconds,
+                ep.min_interval_seconds, ep.max_interval_seconds,
+                ep.organization_id,
+            )
+            if action == "added":
                 added += 1
-                logger.info(
-                    "Added job %s (%s every %ds)",
-                    job_id, ep.name, interval,
-                )
+            elif action == "updated":
+                updated += 1
 
         summary = {
             "status": "synced",
             "total_jobs": len(desired),
+            "total_endpoints": len(endpoints),
             "added": added,
             "updated": updated,
             "removed": removed,
@@ -183,22 +434,40 @@ class MonitorScheduler:
         logger.info("Job sync complete: %s", summary)
         return summary
 
-    def get_status(self) -> dict[str, Any]:
-        """Return scheduler status for the API."""
+    def get_status(self, tenant_id: uuid.UUID | None = None) -> dict[str, Any]:
+        """Return scheduler status for the API.
+
+        With ``tenant_id`` the pipeline block also carries that
+        organization's fair-share queue metrics.
+        """
+        tenant = str(tenant_id) if tenant_id is not None else None
         if self._scheduler is None:
             return {
                 "running": False,
                 "enabled": settings.SCHEDULER_ENABLED,
                 "job_count": 0,
                 "jobs": [],
+                "sharding": self._sharding_status(),
+                "pipeline": pipeline_limiter.snapshot(tenant),
+                "adaptive": {"enabled": False},
             }
 
         jobs = []
+        probes_per_min = 0.0
+        base_probes_per_min = 0.0
         for job in self._scheduler.get_jobs():
+            if not job.id.startswith(JOB_PREFIX):
+                continue
+            interval = int(job.trigger.interval.total_seconds())
+            bounds = self._bounds.get(uuid.UUID(job.kwargs["endpoint_id"]))
+            base = bounds.base if bounds else interval
+            probes_per_min += 60 / interval
+            base_probes_per_min += 60 / base
             jobs.append({
                 "id": job.id,
                 "name": job.name,
-                "interval_seconds": int(job.trigger.interval.total_seconds()),
+                "interval_seconds": interval,
+                "base_interval_seconds": base,
                 "next_run": job.next_run_time.isoformat() if job.next_run_time else None,
             })
 
@@ -208,6 +477,26 @@ class MonitorScheduler:
             "started_at": self._started_at.isoformat() if self._started_at else None,
             "job_count": len(jobs),
             "jobs": jobs,
+            "sharding": self._sharding_status(),
+            "pipeline": pipeline_limiter.snapshot(tenant),
+            "adaptive": {
+                "enabled": settings.SCHEDULER_ADAPTIVE_ENABLED,
+                **self._adaptive_changes,
+                "probes_per_minute": round(probes_per_min, 2),
+                "base_probes_per_minute": round(base_probes_per_min, 2),
+            },
+        }
+
+    def _sharding_status(self) -> dict[str, Any]:
+        if self._membership is None:
+            return {"enabled": False}
+        members = self._membership.members
+        return {
+            "enabled": True,
+            "worker_id": self._membership.worker_id,
+            "is_leader": self._membership.is_leader,
+            "worker_count": len(members),
+            "workers": members,
         }
 
 
@@ -0,0 +1,109 @@
+"""
+Cross-process endpoint change events for the scheduler.
+
+When an endpoint is created, updated or deleted, the API process that
+handled the request updates its own scheduler directly.  Every other
+process (other uvicorn workers, other nodes) learns about the change
+through Postgres LISTEN/NOTIFY:
+
+  - ``publish_endpoint_change`` issues ``pg_notify`` inside the request
+    transaction, so peers are only told once the change is committed.
+  - ``EndpointChangeListener`` holds one dedicated asyncpg connection
+    (outside the SQLAlchemy pool) and forwards notifications to the
+    scheduler's ``apply_endpoint_change``.
+
+Notifications are best-effort: if the listener connection drops, the
+periodic lightweight resync in the scheduler catches up.  On non-Postgres
+databases (the SQLite test suite) publishing and listening are no-ops.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import uuid
+from collections.abc import Awaitable, Callable
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "sentinel_endpoint_changes"
+
+# Identifies this process so it can ignore its own notifications.
+_ORIGIN = uuid.uuid4().hex[:12]
+
+ChangeHandler = Callable[[str, uuid.UUID], Awaitable[None]]
+
+
+async def publish_endpoint_change(
+    session: AsyncSession, op: str, endpoint_id: uuid.UUID
+) -> None:
+    """Queue a change notification; delivered to peers on commit."""
+    if session.get_bind().dialect.name != "postgresql":
+        return
+    payload = json.dumps({"op": op, "id": str(endpoint_id), "origin": _ORIGIN})
+    await session.execute(
+        text("SELECT pg_notify(:channel, :payload)"),
+        {"channel": CHANNEL, "payload": payload},
+    )
+
+
+class EndpointChangeListener:
+    """Dedicated LISTEN connection that forwards endpoint changes."""
+
+    def __init__(self, on_change: ChangeHandler) -> None:
+        self._on_change = on_change
+        self._conn = None  # asyncpg.Connection
+        self._tasks: set[asyncio.Task] = set()
+
+    @property
+    def connected(self) -> bool:
+        return self._conn is not None and not self._conn.is_closed()
+
+    async def start(self) -> None:
+        """Open the LISTEN connection.  Idempotent; never raises."""
+        if self.connected:
+            return
+        try:
+            import asyncpg
+
+            self._conn = await asyncpg.connect(
+                host=settings.DB_HOST,
+                port=settings.DB_PORT,
+                user=settings.DB_USER,
+                password=settings.DB_PASSWORD,
+                database=settings.DB_NAME,
+            )
+            await self._conn.add_listener(CHANNEL, self._on_notify)
+            logger.info("Listening for endpoint changes on %s", CHANNEL)
+        except Exception:
+            logger.exception("Endpoint change listener failed to start")
+            self._conn = None
+
+    async def stop(self) -> None:
+        if self._conn is not None:
+            try:
+                await self._conn.close()
+            except Exception:
+                logger.exception("Error closing endpoint change listener")
+            self._conn = None
+
+    def _on_notify(self, connection, pid, channel, payload) -> None:  # noqa: ANN001
+        try:
+            data = json.loads(payload)
+            if data.get("origin") == _ORIGIN:
+                return
+            op = data["op"]
+            endpoint_id = uuid.UUID(data["id"])
+        except Exception:
+            logger.warning("Ignoring malformed endpoint change payload: %r", payload)
+            return
+
+        task = asyncio.get_running_loop().create_task(self._on_change(op, endpoint_id))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
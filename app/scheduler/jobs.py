@@ -13,7 +13,20 @@ Design:
   - Jobs use ``async_session_factory`` directly — there is no
     FastAPI ``Depends`` injection in background tasks.
   - Reuses the module-level singletons (``api_runner``, ``llm_client``).
-  - Alerts fire AFTER the DB commit, so data is safe even if webhook fails.
+  - One run holds one pooled connection (``pinned_session``) and commits
+    at most twice: the pipeline results, then all post-processing (SLA,
+    alert rules, incidents).  Each post-processing step runs in a
+    SAVEPOINT so one failing step does not discard the others.
+  - When the bulk writer must commit the run's rows first, the job
+    releases its connection while it waits and takes a fresh one for
+    post-processing — never two at once.
+  - Alerts fire AFTER the DB commits and after the connection is
+    released, so data is safe even if the webhook fails and a slow
+    webhook never holds a pooled connection.  Post-processing only
+    builds the SLA breach and alert rule payloads; they are sent with
+    the risk alert once the session is closed.
+  - Every run passes through ``pipeline_limiter`` first, so the number of
+    pipelines holding DB connections at once stays bounded.
   - Each job execution is fully independent and self-cleaning.
 """
 
@@ -23,25 +36,31 @@ import logging
 import uuid
 
 from app.ai.llm_client import llm_client
-from app.alerts.dispatcher import maybe_alert, maybe_alert_sla_breach
-from app.db.session import async_session_factory
+from app.alerts.dispatcher import may_alert, maybe_alert, send_alerts, sla_breach_alert
+from app.core.config import settings
+from app.db.session import async_session_factory, pinned_session
 from app.monitoring.anomaly_engine import AnomalyEngine
 from app.monitoring.api_runner import api_runner
+from app.monitoring.result_writer import DURABILITY_SYNC, result_writer
 from app.monitoring.runner_service import RunnerService
+from app.scheduler.limiter import pipeline_limiter
 
 logger = logging.getLogger(__name__)
 
 
-async def run_endpoint(endpoint_id: str) -> None:
+async def run_endpoint(endpoint_id: str, organization_id: str | None = None) -> None:
     """
     Execute the full monitoring pipeline for a single endpoint.
 
     This is the function that APScheduler calls on each interval tick.
-    It opens its own DB session, runs the pipeline, commits, then
-    fires alerts if the risk threshold is met.
+    It waits for a global pipeline slot (queued fairly under its
+    organization), opens its own DB session, runs the pipeline, commits,
+    then fires alerts if the risk threshold is met.  If the wait queue is
+    full the tick is dropped.
 
     Parameters:
         endpoint_id: UUID string of the endpoint to monitor.
+        organization_id: Owning organization, used as the fair-share tenant.
 
     This function **never raises** — all errors are logged and swallowed
     so that the scheduler continues running other jobs.
@@ -52,14 +71,23 @@ async def run_endpoint(endpoint_id: str) -> None:
         logger.error("Invalid endpoint_id passed to job: %s", endpoint_id)
         return
 
+    async with pipeline_limiter.slot(f"monitor_{eid}", organization_id) as admitted:
+        if not admitted:
+            return
+        await _run_pipeline(eid)
+
+
+async def _run_pipeline(eid: uuid.UUID) -> None:
+    """Run the pipeline and post-processing once a limiter slot is held."""
     logger.debug("Scheduler job started for endpoint %s", eid)
 
     try:
-        async with async_session_factory() as session:
+        async with pinned_session(async_session_factory) as session:
             service = RunnerService(
                 session=session,
                 runner=api_runner,
                 anomaly_engine=AnomalyEngine(llm=llm_client),
+                writer=result_writer if settings.RESULT_WRITER_ENABLED else None,
             )
 
             pipeline = await service.execute_endpoint(eid)
@@ -74,7 +102,21 @@ async def run_endpoint(endpoint_id: str) -> None:
                 pipeline.risk.risk_level if pipeline.risk else "N/A",
             )
 
-        # Alert dispatch — AFTER commit so DB data is safe
+            wait_for_rows = _must_wait_for_rows(pipeline)
+            if not wait_for_rows:
+                incident_open, alerts = await _post_process(session, eid, pipeline)
+
+        if wait_for_rows:
+            # Bulk-written rows must be committed first.  Wait with no
+            # connection held, so the pool keeps serving other jobs.
+            await pipeline.persisted
+            async with pinned_session(async_session_factory) as session:
+                incident_open, alerts = await _post_process(session, eid, pipeline)
+
+        # Alert dispatch — AFTER both commits so DB data is safe, and
+        # outside the session so a slow webhook holds no connection
+        if alerts:
+            await send_alerts(alerts)
         try:
             alert_result = await maybe_alert(
                 pipeline=pipeline,
@@ -91,23 +133,11 @@ async def run_endpoint(endpoint_id: str) -> None:
         except Exception:
             logger.exception("Alert dispatch failed for endpoint %s", eid)
 
-        # SLA breach check — AFTER alert dispatch
-        try:
-            await _check_sla_breach(eid, pipeline)
-        except Exception:
-            logger.exception("SLA breach check failed for endpoint %s", eid)
-
-        # Custom alert rule evaluation — AFTER SLA check
+        # Adaptive probe interval — AFTER incident state is known
         try:
-            await _evaluate_alert_rules(eid, pipeline)
+            _adapt_interval(eid, pipeline, incident_open)
         except Exception:
-            logger.exception("Alert rule evaluation failed for endpoint %s", eid)
-
-        # Incident auto-create / auto-resolve — AFTER alert rules
-        try:
-            await _manage_incidents(eid, pipeline)
-        except Exception:
-            logger.exception("Incident management failed for endpoint %s", eid)
+            logger.exception("Adaptive interval update failed for endpoint %s", eid)
 
         # WebSocket broadcast — AFTER all processing
         try:
@@ -119,203 +149,270 @@ async def run_endpoint(endpoint_id: str) -> None:
         logger.exception("Scheduler job FAILED for endpoint %s", eid)
 
 
-async def _check_sla_breach(eid: uuid.UUID, pipeline) -> None:  # noqa: ANN001
-    """Check if the endpoint is breaching its SLA and fire an alert if so."""
+def _must_wait_for_rows(pipeline) -> bool:  # noqa: ANN001
+    """Whether post-processing must wait for the bulk writer to commit this run.
+
+    Always with ``sync`` durability.  With ``async`` only a run that may
+    alert or open an incident waits; healthy runs go straight on.
+    """
+    if pipeline.persisted is None:
+        return False
+    if result_writer.durability == DURABILITY_SYNC:
+        return True
+    anomaly = pipeline.anomaly is not None and pipeline.anomaly.anomaly_detected
+    return not pipeline.run.is_success or anomaly or may_alert(pipeline)
+
+
+async def _post_process(session, eid: uuid.UUID, pipeline) -> tuple[bool, list[dict]]:  # noqa: ANN001
+    """SLA, alert rules and incidents, each in a SAVEPOINT, then one commit.
+
+    Returns whether the endpoint still has an open incident, and the
+    webhook payloads to send once the session is closed (none if the
+    commit failed).
+    """
+    alerts: list[dict] = []
+
+    # SLA breach check
+    try:
+        async with session.begin_nested():
+            sla_alert = await _check_sla_breach(session, eid, pipeline)
+        if sla_alert is not None:
+            alerts.append(sla_alert)
+    except Exception:
+        logger.exception("SLA breach check failed for endpoint %s", eid)
+
+    # Custom alert rule evaluation — AFTER SLA check
+    try:
+        async with session.begin_nested():
+            rule_alerts = await _evaluate_alert_rules(session, eid, pipeline)
+        alerts.extend(rule_alerts)
+    except Exception:
+        logger.exception("Alert rule evaluation failed for endpoint %s", eid)
+
+    # Incident auto-create / auto-resolve — AFTER alert rules
+    incident_open = False
+    try:
+        async with session.begin_nested():
+            incident_open = await _manage_incidents(session, eid, pipeline)
+    except Exception:
+        logger.exception("Incident management failed for endpoint %s", eid)
+
+    # Second and last commit: everything post-processing wrote.
+    try:
+        await session.commit()
+    except Exception:
+        logger.exception("Post-processing commit failed for endpoint %s", eid)
+        alerts = []
+    return incident_open, alerts
+
+
+async def _check_sla_breach(session, eid: uuid.UUID, pipeline) -> dict | None:  # noqa: ANN001
+    """Return the SLA breach alert payload if the endpoint is breaching its SLA."""
     from app.repositories.api_run import ApiRunRepository
     from app.repositories.endpoint_sla import EndpointSLARepository
     from app.services.endpoint_sla import EndpointSLAService
 
-    async with async_session_factory() as session:
-        sla_service = EndpointSLAService(
-            repo=EndpointSLARepository(session),
-            run_repo=ApiRunRepository(session),
-        )
-        sla_repo = EndpointSLARepository(session)
-        sla = await sla_repo.get_by_endpoint(eid)
-        if sla is None or not sla.is_active:
-            return
-
-        uptime = await sla_service.get_uptime(eid, sla.organization_id)
-        if not uptime.is_breached:
-            return
-
-        result = await maybe_alert_sla_breach(
-            endpoint_id=str(eid),
-            endpoint_name=pipeline.endpoint_name,
-            endpoint_url=pipeline.endpoint_url,
-            endpoint_method=pipeline.endpoint_method,
-            uptime_percent=uptime.uptime_percent,
-            sla_target=uptime.sla_target,
-            window=uptime.window,
-            total_runs=uptime.total_runs,
-            successful_runs=uptime.successful_runs,
-        )
-        if result.get("alerted"):
-            logger.info(
-                "SLA breach alert dispatched for %s: uptime=%.2f%%",
-                pipeline.endpoint_name,
-                uptime.uptime_percent,
-            )
+    sla_repo = EndpointSLARepository(session)
+    sla_service = EndpointSLAService(
+        repo=sla_repo,
+        run_repo=ApiRunRepository(session),
+    )
+    sla = await sla_repo.get_by_endpoint(eid)
+    if sla is None or not sla.is_active:
+        return None
+
+    uptime = await sla_service.get_uptime(eid, sla.organization_id)
+    if not uptime.is_breached:
+        return None
+
+    return sla_breach_alert(
+        endpoint_id=str(eid),
+        endpoint_name=pipeline.endpoint_name,
+        endpoint_url=pipeline.endpoint_url,
+        endpoint_method=pipeline.endpoint_method,
+        uptime_percent=uptime.uptime_percent,
+        sla_target=uptime.sla_target,
+        window=uptime.window,
+        total_runs=uptime.total_runs,
+        successful_runs=uptime.successful_runs,
+    )
 
 
-async def _evaluate_alert_rules(eid: uuid.UUID, pipeline) -> None:  # noqa: ANN001
-    """Evaluate all custom alert rules for the endpoint."""
+async def _evaluate_alert_rules(session, eid: uuid.UUID, pipeline) -> list[dict]:  # noqa: ANN001
+    """Evaluate all custom alert rules for the endpoint; return their alert payloads."""
     from app.alerts.rule_evaluator import RuleEvaluator
 
-    async with async_session_factory() as session:
-        evaluator = RuleEvaluator(session)
-        results = await evaluator.evaluate(
-            endpoint_id=eid,
-            pipeline=pipeline,
-            tenant_id=pipeline.run.organization_id,
+    evaluator = RuleEvaluator(session)
+    results = await evaluator.evaluate(
+        endpoint_id=eid,
+        pipeline=pipeline,
+        tenant_id=pipeline.run.organization_id,
+    )
+
+    triggered = [r for r in results if r.get("triggered")]
+    if triggered:
+        logger.info(
+            "Alert rules triggered for %s: %s",
+            pipeline.endpoint_name,
+            [r["name"] for r in triggered],
         )
-        await session.commit()
+    return [r["alert"] for r in triggered if r.get("alert") is not None]
 
-        triggered = [r for r in results if r.get("triggered")]
-        if triggered:
-            logger.info(
-                "Alert rules triggered for %s: %s",
-                pipeline.endpoint_name,
-                [r["name"] for r in triggered],
-            )
 
+async def _manage_incidents(session, eid: uuid.UUID, pipeline) -> bool:  # noqa: ANN001
+    """Auto-create incidents from anomalies and auto-resolve on recovery.
 
-async def _manage_incidents(eid: uuid.UUID, pipeline) -> None:  # noqa: ANN001
-    """Auto-create incidents from anomalies and auto-resolve on recovery."""
+    Returns True if the endpoint still has an open incident afterwards
+    (only looked up when adaptive scheduling needs it).
+    """
     from app.models.incident import IncidentEvent
     from app.repositories.fingerprint import FingerprintRepository
     from app.repositories.incident import IncidentRepository
     from app.services.fingerprint import FingerprintService
     from app.services.incident import IncidentService
 
-    async with async_session_factory() as session:
-        svc = IncidentService(IncidentRepository(session))
-        fp_repo = FingerprintRepository(session)
-        fp_svc = FingerprintService()
+    svc = IncidentService(IncidentRepository(session))
+    fp_repo = FingerprintRepository(session)
+    fp_svc = FingerprintService()
 
-        # Compute fingerprint from pipeline
-        fingerprint, signal_flags = FingerprintService.compute_from_pipeline(pipeline)
+    # Compute fingerprint from pipeline
+    fingerprint, signal_flags = FingerprintService.compute_from_pipeline(pipeline)
 
-        # Auto-create from anomaly
-        if pipeline.anomaly and pipeline.anomaly.anomaly_detected:
-            incident = await svc.auto_create_from_anomaly(
-                endpoint_id=eid,
-                organization_id=pipeline.run.organization_id,
-                run_id=pipeline.run.id,
-                reasoning=pipeline.anomaly.reasoning,
-                severity_score=(
-                    pipeline.risk.calculated_score if pipeline.risk else 0.5
-                ),
+    # Auto-create from anomaly
+    if pipeline.anomaly and pipeline.anomaly.anomaly_detected:
+        incident = await svc.auto_create_from_anomaly(
+            endpoint_id=eid,
+            organization_id=pipeline.run.organization_id,
+            run_id=pipeline.run.id,
+            reasoning=pipeline.anomaly.reasoning,
+            severity_score=(
+                pipeline.risk.calculated_score if pipeline.risk else 0.5
+            ),
+            fingerprint=fingerprint,
+        )
+        if incident:
+            logger.info(
+                "Auto-created incident %s for %s (severity=%s fingerprint=%s)",
+                incident.id,
+                pipeline.endpoint_name,
+                incident.severity,
+                fingerprint[:12],
+            )
+
+            # Upsert fingerprint cache
+            await fp_repo.upsert_cache(
                 fingerprint=fingerprint,
+                endpoint_id=eid,
+                org_id=pipeline.run.organization_id,
+                signal_flags=signal_flags,
             )
-            if incident:
-                logger.info(
-                    "Auto-created incident %s for %s (severity=%s fingerprint=%s)",
-                    incident.id,
-                    pipeline.endpoint_name,
-                    incident.severity,
-                    fingerprint[:12],
-                )
 
-                # Upsert fingerprint cache
-                await fp_repo.upsert_cache(
-                    fingerprint=fingerprint,
-                    endpoint_id=eid,
-                    org_id=pipeline.run.organization_id,
-                    signal_flags=signal_flags,
-                )
+            # Find matches and store as an event
+            matches = await fp_svc.find_matches(
+                repo=fp_repo,
+                fingerprint=fingerprint,
+                signal_flags=signal_flags,
+                endpoint_id=eid,
+                org_id=pipeline.run.organization_id,
+            )
+            # Generate narrative
+            from app.services.narrative import NarrativeService
 
-                # Find matches and store as an event
-                matches = await fp_svc.find_matches(
-                    repo=fp_repo,
-                    fingerprint=fingerprint,
-                    signal_flags=signal_flags,
-                    endpoint_id=eid,
-                    org_id=pipeline.run.organization_id,
-                )
-                # Generate narrative
-                from app.services.narrative import NarrativeService
-
-                narrative_svc = NarrativeService(llm=llm_client)
-                narrative = await narrative_svc.generate(
-                    endpoint_name=pipeline.endpoint_name,
-                    severity=incident.severity,
-                    signal_flags=signal_flags,
-                    status_code=pipeline.run.status_code,
-                    response_time_ms=pipeline.run.response_time_ms,
-                    anomaly_reasoning=pipeline.anomaly.reasoning if pipeline.anomaly else None,
-                    occurrence_count=matches.exact_match["occurrence_count"] if matches.exact_match else 1,
-                    avg_resolution_ms=matches.exact_match["avg_resolution_ms"] if matches.exact_match else None,
-                    last_resolution_notes=matches.exact_match["last_resolution_notes"] if matches.exact_match else None,
-                    cross_endpoint_count=len(matches.cross_endpoint_matches),
-                )
-                incident.narrative = narrative
+            narrative_svc = NarrativeService(llm=llm_client)
+            narrative = await narrative_svc.generate(
+                endpoint_name=pipeline.endpoint_name,
+                severity=incident.severity,
+                signal_flags=signal_flags,
+                status_code=pipeline.run.status_code,
+                response_time_ms=pipeline.run.response_time_ms,
+                anomaly_reasoning=pipeline.anomaly.reasoning if pipeline.anomaly else None,
+                occurrence_count=matches.exact_match["occurrence_count"] if matches.exact_match else 1,
+                avg_resolution_ms=matches.exact_match["avg_resolution_ms"] if matches.exact_match else None,
+                last_resolution_notes=matches.exact_match["last_resolution_notes"] if matches.exact_match else None,
+                cross_endpoint_count=len(matches.cross_endpoint_matches),
+                organization_id=pipeline.run.organization_id,
+            )
+            incident.narrative = narrative
 
-                # Cluster detection
-                from app.repositories.cluster import ClusterRepository
-                from app.services.cluster import ClusterService
+            # Cluster detection
+            from app.repositories.cluster import ClusterRepository
+            from app.services.cluster import ClusterService
 
-                cluster_repo = ClusterRepository(session)
-                cluster_svc = ClusterService(cluster_repo)
-                cluster = await cluster_svc.detect_and_assign(
-                    incident, signal_flags, pipeline.run.organization_id
+            cluster_repo = ClusterRepository(session)
+            cluster_svc = ClusterService(cluster_repo)
+            cluster = await cluster_svc.detect_and_assign(
+                incident, signal_flags, pipeline.run.organization_id
+            )
+            if cluster:
+                logger.info(
+                    "Incident %s assigned to cluster %s",
+                    incident.id, cluster.id,
                 )
-                if cluster:
-                    logger.info(
-                        "Incident %s assigned to cluster %s",
-                        incident.id, cluster.id,
-                    )
 
-                if matches.exact_match or matches.fuzzy_matches or matches.cross_endpoint_matches:
-                    inc_repo = IncidentRepository(session)
-                    await inc_repo.add_event(
-                        IncidentEvent(
-                            incident_id=incident.id,
-                            event_type="fingerprint_match",
-                            detail={
-                                "fingerprint": fingerprint,
-                                "signal_flags": signal_flags,
-                                "exact_match": matches.exact_match,
-                                "fuzzy_matches": matches.fuzzy_matches[:5],
-                                "cross_endpoint_matches": matches.cross_endpoint_matches[:5],
-                            },
-                        )
+            if matches.exact_match or matches.fuzzy_matches or matches.cross_endpoint_matches:
+                inc_repo = IncidentRepository(session)
+                await inc_repo.add_event(
+                    IncidentEvent(
+                        incident_id=incident.id,
+                        event_type="fingerprint_match",
+                        detail={
+                            "fingerprint": fingerprint,
+                            "signal_flags": signal_flags,
+                            "exact_match": matches.exact_match,
+                            "fuzzy_matches": matches.fuzzy_matches[:5],
+                            "cross_endpoint_matches": matches.cross_endpoint_matches[:5],
+                        },
                     )
-
-        # Auto-resolve on consecutive successes
-        if pipeline.run.is_success:
-            consecutive = await _count_consecutive_successes(session, eid)
-            resolved = await svc.check_auto_resolve(eid, consecutive)
-            if resolved:
-                logger.info(
-                    "Auto-resolved incident %s for %s after %d successes",
-                    resolved.id,
-                    pipeline.endpoint_name,
-                    consecutive,
                 )
-                # Extract learning from resolved incident
-                try:
-                    from app.repositories.ai_memory import AiMemoryRepository
-                    from app.services.ai_memory import AiMemoryService
-                    from app.repositories.fingerprint import FingerprintRepository as FPRepo2
-
-                    mem_repo = AiMemoryRepository(session)
-                    mem_svc = AiMemoryService(mem_repo, llm=llm_client)
-
-                    # Get signal flags from fingerprint cache
-                    fp_repo2 = FPRepo2(session)
-                    cache = None
-                    if resolved.fingerprint:
-                        cache = await fp_repo2.get_cache_entry(resolved.fingerprint, eid)
-                    mem_signal_flags = cache.signal_flags if cache else []
 
+    # Auto-resolve on consecutive successes
+    if pipeline.run.is_success:
+        consecutive = await _count_consecutive_successes(session, eid)
+        resolved = await svc.check_auto_resolve(eid, consecutive)
+        if resolved:
+            logger.info(
+                "Auto-resolved incident %s for %s after %d successes",
+                resolved.id,
+                pipeline.endpoint_name,
+                consecutive,
+            )
+            # Extract learning from resolved incident
+            try:
+                from app.repositories.ai_memory import AiMemoryRepository
+                from app.services.ai_memory import AiMemoryService
+                from app.repositories.fingerprint import FingerprintRepository as FPRepo2
+
+                mem_repo = AiMemoryRepository(session)
+                mem_svc = AiMemoryService(mem_repo, llm=llm_client)
+
+                # Get signal flags from fingerprint cache
+                fp_repo2 = FPRepo2(session)
+                cache = None
+                if resolved.fingerprint:
+                    cache = await fp_repo2.get_cache_entry(resolved.fingerprint, eid)
+                mem_signal_flags = cache.signal_flags if cache else []
+
+                async with session.begin_nested():
                     await mem_svc.extract_and_store(
                         resolved, pipeline.endpoint_name, mem_signal_flags
                     )
-                except Exception:
-                    logger.exception("AI memory extraction failed for incident %s", resolved.id)
+            except Exception:
+                logger.exception("AI memory extraction failed for incident %s", resolved.id)
 
-        await session.commit()
+    incident_open = False
+    if settings.SCHEDULER_ADAPTIVE_ENABLED:
+        open_incident = await IncidentRepository(session).get_open_for_endpoint(eid)
+        incident_open = open_incident is not None
+
+    return incident_open
+
+
+def _adapt_interval(eid: uuid.UUID, pipeline, incident_open: bool) -> None:  # noqa: ANN001
+    """Tighten or relax the endpoint's probe interval from this run's outcome."""
+    from app.scheduler.engine import monitor_scheduler
+
+    risk_level = pipeline.risk.risk_level if pipeline.risk else None
+    monitor_scheduler.observe_run(eid, risk_level, incident_open)
 
 
 async def _broadcast_pipeline_events(eid: uuid.UUID, pipeline) -> None:  # noqa: ANN001
@@ -358,6 +455,11 @@ async def _broadcast_pipeline_events(eid: uuid.UUID, pipeline) -> None:  # noqa:
 async def _count_consecutive_successes(session, eid: uuid.UUID) -> int:  # noqa: ANN001
     """Count consecutive successful runs from the most recent backwards."""
     from sqlalchemy import select
+    from app.monitoring.run_history import run_history
+
+    history = run_history.get(eid) if settings.RUN_HISTORY_ENABLED else None
+    if history is not None:
+        return history.streak
     from app.models.api_run import ApiRun
 
     result = await session.execute(
@@ -0,0 +1,296 @@
+"""
+Global, tenant-fair admission gate for scheduled monitoring pipelines.
+
+Responsibilities:
+  - Cap how many ``run_endpoint`` pipelines execute at once across the
+    whole process (``SCHEDULER_MAX_CONCURRENT``).
+  - Hold excess pipelines in a bounded wait queue
+    (``SCHEDULER_QUEUE_SIZE``); when the queue is full a tick is
+    dropped — the next interval tick will try again.
+  - Share slots fairly between organizations so one tenant with
+    thousands of endpoints cannot starve everyone else.
+  - Track queue depth, queue wait time and scheduling lag (scheduled
+    fire time → pipeline start), globally and per tenant.
+
+Fairness:
+  - Each organization has its own FIFO queue.  Freed slots go to the
+    waiting tenant with the lowest *pass* value (stride scheduling); a
+    dispatch advances that tenant's pass by ``1 / weight``, so throughput
+    is shared in proportion to ``SCHEDULER_TENANT_WEIGHTS`` (default 1).
+  - While other tenants are waiting, a tenant may hold at most
+    ``SCHEDULER_TENANT_MAX_SHARE`` of the slots.  With nobody else
+    waiting it may use them all (work-conserving).
+  - A tenant that becomes active starts at the current virtual time, so
+    idle periods do not bank credit.
+  - When the queue is full, the tenant with the longest queue loses its
+    newest waiter instead of a small tenant's tick being dropped.
+
+Design:
+  - A plain counter plus deques of futures rather than an
+    ``asyncio.Semaphore`` so queues are observable and a freed slot is
+    handed directly to the chosen waiter.
+  - Pure asyncio, no DB access.  One instance per process.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import deque
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_WINDOW = 1000  # recent wait/lag samples kept for percentiles
+TENANT_SAMPLE_WINDOW = 200
+DEFAULT_TENANT = "default"
+
+
+def _summarise(samples: deque[float]) -> dict[str, float]:
+    """avg / p95 / max of a sample window, in milliseconds."""
+    if not samples:
+        return {"avg": 0.0, "p95": 0.0, "max": 0.0}
+    ordered = sorted(samples)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    return {
+        "avg": round(sum(ordered) / len(ordered), 1),
+        "p95": round(p95, 1),
+        "max": round(ordered[-1], 1),
+    }
+
+
+@dataclass(slots=True)
+class _Tenant:
+    """Queue and accounting for one organization."""
+
+    weight: float = 1.0
+    pass_value: float = 0.0
+    in_flight: int = 0
+    admitted: int = 0
+    rejected: int = 0
+    waiters: deque[asyncio.Future[bool]] = field(default_factory=deque)
+    wait_ms: deque[float] = field(
+        default_factory=lambda: deque(maxlen=TENANT_SAMPLE_WINDOW)
+    )
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "weight": self.weight,
+            "in_flight": self.in_flight,
+            "queue_depth": len(self.waiters),
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "queue_wait_ms": _summarise(self.wait_ms),
+        }
+
+
+class PipelineLimiter:
+    """
+    Process-wide concurrency gate with tenant-fair bounded queues.
+
+    Usage::
+
+        async with pipeline_limiter.slot(job_id, tenant=org_id) as admitted:
+            if not admitted:
+                return  # queue full — tick dropped
+            ...
+    """
+
+    def __init__(
+        self,
+        *,
+        max_concurrent: int | None = None,
+        max_queue: int | None = None,
+        tenant_max_share: float | None = None,
+        tenant_weights: dict[str, float] | None = None,
+    ) -> None:
+        self._max_concurrent = max(1, max_concurrent or settings.SCHEDULER_MAX_CONCURRENT)
+        self._max_queue = max(0, max_queue if max_queue is not None else settings.SCHEDULER_QUEUE_SIZE)
+        share = tenant_max_share if tenant_max_share is not None else settings.SCHEDULER_TENANT_MAX_SHARE
+        self._tenant_cap = max(1, int(self._max_concurrent * share))
+        self._weights = tenant_weights if tenant_weights is not None else settings.SCHEDULER_TENANT_WEIGHTS
+
+        self._in_flight = 0
+        self._queued = 0
+        self._virtual_time = 0.0
+        self._tenants: dict[str, _Tenant] = {}
+        self._scheduled_at: dict[str, datetime] = {}
+
+        # Counters
+        self._admitted = 0
+        self._rejected = 0
+        self._peak_queue_depth = 0
+        self._wait_ms: deque[float] = deque(maxlen=SAMPLE_WINDOW)
+        self._lag_ms: deque[float] = deque(maxlen=SAMPLE_WINDOW)
+
+    # ── properties ───────────────────────────────────────────────────
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queued
+
+    # ── scheduling lag bookkeeping ───────────────────────────────────
+
+    def mark_scheduled(self, key: str, scheduled_at: datetime) -> None:
+        """Record when the scheduler meant to fire ``key`` (for lag metrics)."""
+        self._scheduled_at[key] = scheduled_at
+
+    # ── admission ────────────────────────────────────────────────────
+
+    async def acquire(self, key: str | None = None, tenant: str | None = None) -> bool:
+        """Wait for a pipeline slot.  Returns False if the tick was dropped."""
+        name = tenant or DEFAULT_TENANT
+        t = self._tenant(name)
+        enqueued = time.monotonic()
+
+        if self._in_flight < self._max_concurrent and self._queued == 0:
+            self._grant(t)
+        else:
+            if self._queued >= self._max_queue and not self._evict_for(t):
+                self._reject(t, key, name)
+                return False
+
+            if not t.waiters and t.in_flight == 0:
+                t.pass_value = max(t.pass_value, self._virtual_time)
+            fut: asyncio.Future[bool] = asyncio.get_running_loop().create_future()
+            t.waiters.append(fut)
+            self._queued += 1
+            self._peak_queue_depth = max(self._peak_queue_depth, self._queued)
+            try:
+                granted = await fut
+            except asyncio.CancelledError:
+                if fut.done() and not fut.cancelled() and fut.result():
+                    # Slot was handed to us just before cancellation.
+                    self.release(tenant)
+                elif fut in t.waiters:
+                    t.waiters.remove(fut)
+                    self._queued -= 1
+                self._scheduled_at.pop(key, None)
+                raise
+            if not granted:
+                self._scheduled_at.pop(key, None)
+                return False
+
+        waited_ms = (time.monotonic() - enqueued) * 1000
+        self._admitted += 1
+        t.admitted += 1
+        self._wait_ms.append(waited_ms)
+        t.wait_ms.append(waited_ms)
+        scheduled_at = self._scheduled_at.pop(key, None) if key else None
+        if scheduled_at is not None:
+            lag = (datetime.now(timezone.utc) - scheduled_at).total_seconds() * 1000
+            self._lag_ms.append(max(0.0, lag))
+        return True
+
+    def release(self, tenant: str | None = None) -> None:
+        """Free a slot and hand it to the next fair waiter."""
+        t = self._tenant(tenant or DEFAULT_TENANT)
+        t.in_flight = max(0, t.in_flight - 1)
+        self._in_flight = max(0, self._in_flight - 1)
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(
+        self, key: str | None = None, tenant: str | None = None
+    ) -> AsyncIterator[bool]:
+        admitted = await self.acquire(key, tenant)
+        try:
+            yield admitted
+        finally:
+            if admitted:
+                self.release(tenant)
+
+    # ── internals ────────────────────────────────────────────────────
+
+    def _tenant(self, name: str) -> _Tenant:
+        t = self._tenants.get(name)
+        if t is None:
+            weight = float(self._weights.get(name, 1.0)) or 1.0
+            t = self._tenants[name] = _Tenant(weight=weight, pass_value=self._virtual_time)
+        return t
+
+    def _grant(self, t: _Tenant) -> None:
+        self._in_flight += 1
+        t.in_flight += 1
+        self._virtual_time = max(self._virtual_time, t.pass_value)
+        t.pass_value += 1.0 / t.weight
+
+    def _dispatch(self) -> None:
+        while self._in_flight < self._max_concurrent and self._queued > 0:
+            waiting = [t for t in self._tenants.values() if t.waiters]
+            under_cap = [t for t in waiting if t.in_flight < self._tenant_cap]
+            t = min(under_cap or waiting, key=lambda x: x.pass_value)
+            fut = t.waiters.popleft()
+            self._queued -= 1
+            if fut.done():
+                continue  # cancelled while waiting
+            self._grant(t)
+            fut.set_result(True)
+
+    def _evict_for(self, arriving: _Tenant) -> bool:
+        """Make room by dropping the newest waiter of the longest queue.
+
+        Returns False when the arriving tenant already has the longest
+        queue — then the arrival itself should be dropped.
+        """
+        victim = max(self._tenants.values(), key=lambda x: len(x.waiters), default=None)
+        if victim is None or victim is arriving or len(victim.waiters) <= len(arriving.waiters):
+            return False
+        fut = victim.waiters.pop()
+        self._queued -= 1
+        victim.rejected += 1
+        self._rejected += 1
+        if not fut.done():
+            fut.set_result(False)
+        return True
+
+    def _reject(self, t: _Tenant, key: str | None, name: str) -> None:
+        self._rejected += 1
+        t.rejected += 1
+        self._scheduled_at.pop(key, None)
+        logger.warning(
+            "Pipeline queue full (%d waiting, %d running) — dropping %s (tenant %s)",
+            self._queued, self._in_flight, key, name,
+        )
+
+    # ── observability ────────────────────────────────────────────────
+
+    def snapshot(self, tenant: str | None = None) -> dict[str, Any]:
+        """Global gate metrics, plus one tenant's share when ``tenant`` is given."""
+        data: dict[str, Any] = {
+            "max_concurrent": self._max_concurrent,
+            "max_queue": self._max_queue,
+            "tenant_max_concurrent": self._tenant_cap,
+            "in_flight": self._in_flight,
+            "queue_depth": self._queued,
+            "peak_queue_depth": self._peak_queue_depth,
+            "admitted": self._admitted,
+            "rejected": self._rejected,
+            "queue_wait_ms": _summarise(self._wait_ms),
+            "scheduling_lag_ms": _summarise(self._lag_ms),
+            "active_tenants": sum(
+                1 for t in self._tenants.values() if t.in_flight or t.waiters
+            ),
+        }
+        if tenant is not None:
+            t = self._tenants.get(tenant)
+            data["tenant"] = t.snapshot() if t else _Tenant(
+                weight=float(self._weights.get(tenant, 1.0))
+            ).snapshot()
+        return data
+
+
+# ─── module-level singleton ─────────────────────────────────────────────
+
+pipeline_limiter = PipelineLimiter()
@@ -0,0 +1,119 @@
+"""
+Endpoint sharding across scheduler workers.
+
+Responsibilities:
+  - Give every scheduler process a unique, human-readable worker id.
+  - Track live workers through heartbeats on the ``scheduler_workers``
+    lease table.
+  - Decide which worker owns each ``monitor_{endpoint_id}`` job.
+
+Design:
+  - Ownership uses rendezvous (highest-random-weight) hashing: every
+    worker scores ``sha1(worker_id:endpoint_id)`` and the highest score
+    wins.  All workers compute the same answer from the same member list
+    without talking to each other, and when a worker joins or dies only
+    the endpoints it gains or loses move — everything else stays put.
+  - The leader is the first live worker id in sorted order.  It prunes
+    expired lease rows; there is nothing else it needs to coordinate.
+  - Works on any database the app supports — no advisory locks needed.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import socket
+import uuid
+from typing import Sequence
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def _weight(worker_id: str, endpoint_id: str) -> int:
+    digest = hashlib.sha1(f"{worker_id}:{endpoint_id}".encode()).digest()
+    return int.from_bytes(digest[:8], "big")
+
+
+def owner_of(endpoint_id: str, workers: Sequence[str]) -> str | None:
+    """Return the worker id that owns ``endpoint_id`` (None if no workers)."""
+    if not workers:
+        return None
+    return max(workers, key=lambda w: _weight(w, endpoint_id))
+
+
+class WorkerMembership:
+    """
+    This process's view of the scheduler worker group.
+
+    Call ``heartbeat()`` periodically; it refreshes this worker's lease,
+    reloads the live member list and reports whether it changed.
+    """
+
+    def __init__(self) -> None:
+        hostname = socket.gethostname()
+        self.hostname = hostname
+        self.pid = os.getpid()
+        self.worker_id = f"{hostname}-{self.pid}-{uuid.uuid4().hex[:6]}"
+        self._members: list[str] = []
+
+    @property
+    def members(self) -> list[str]:
+        return list(self._members)
+
+    @property
+    def is_leader(self) -> bool:
+        return bool(self._members) and self._members[0] == self.worker_id
+
+    def owns(self, endpoint_id: str) -> bool:
+        """True when this worker should schedule ``endpoint_id``.
+
+        Before the first heartbeat completes the member list is empty;
+        treat ourselves as the only worker so nothing goes unmonitored.
+        """
+        members = self._members or [self.worker_id]
+        return owner_of(endpoint_id, members) == self.worker_id
+
+    async def heartbeat(self) -> bool:
+        """Refresh the lease and membership.  Returns True if members changed."""
+        from app.db.session import async_session_factory
+        from app.repositories.scheduler_worker import SchedulerWorkerRepository
+
+        ttl = settings.SCHEDULER_WORKER_TTL_SECONDS
+        async with async_session_factory() as session:
+            repo = SchedulerWorkerRepository(session)
+            await repo.heartbeat(self.worker_id, self.hostname, self.pid)
+            members = await repo.get_live_ids(ttl)
+            if members and members[0] == self.worker_id:
+                pruned = await repo.delete_expired(ttl)
+                if pruned:
+                    logger.info("Pruned %d expired scheduler worker lease(s)", pruned)
+            await session.commit()
+
+        if self.worker_id not in members:
+            # Our own row must be visible; guard against clock skew.
+            members = sorted([*members, self.worker_id])
+
+        changed = members != self._members
+        if changed:
+            logger.info(
+                "Scheduler membership changed: %d worker(s) %s (self=%s leader=%s)",
+                len(members), members, self.worker_id, members[0] == self.worker_id,
+            )
+        self._members = members
+        return changed
+
+    async def leave(self) -> None:
+        """Delete our lease so peers rebalance immediately."""
+        from app.db.session import async_session_factory
+        from app.repositories.scheduler_worker import SchedulerWorkerRepository
+
+        try:
+            async with async_session_factory() as session:
+                await SchedulerWorkerRepository(session).delete(self.worker_id)
+                await session.commit()
+        except Exception:
+            logger.exception("Failed to release scheduler lease for %s", self.worker_id)
+        self._members = []
@@ -0,0 +1,90 @@
+"""
+Phase-spread interval triggers — removes thundering-herd probe bursts.
+
+A plain ``interval`` trigger fires at ``start_date + k * interval``, and
+``start_date`` is whenever the job was added.  Endpoints loaded together
+at startup (or created together by an import) therefore fire in the same
+second forever.
+
+With ``SCHEDULER_SPREAD_ENABLED`` each endpoint instead fires on a fixed
+time-wheel slot: ``epoch + phase + k * interval``, where ``phase`` is a
+deterministic hash of the endpoint id within its interval.  Slots are
+uniformly distributed, so the dispatch rate stays close to
+``total_endpoints / interval`` and every worker (and every restart)
+computes the same slot for the same endpoint.
+
+``SCHEDULER_JITTER_SECONDS`` adds a bounded random delay per tick on top
+of the slot.  Unlike APScheduler's built-in ``jitter`` it does not
+accumulate — the next tick is always computed from the un-jittered slot.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import random
+from datetime import datetime, timezone
+from math import ceil, floor
+
+from apscheduler.triggers.interval import IntervalTrigger
+
+from app.core.config import settings
+
+_SLOT_EPSILON = 1e-6  # guards float rounding when stepping from a slot
+
+
+def phase_offset(endpoint_id: str, interval_seconds: int) -> float:
+    """Deterministic phase in ``[0, interval_seconds)`` for an endpoint."""
+    digest = hashlib.sha1(endpoint_id.encode()).digest()
+    fraction = int.from_bytes(digest[:8], "big") / 2**64
+    return round(fraction * interval_seconds, 3)
+
+
+class PhasedIntervalTrigger(IntervalTrigger):
+    """Interval trigger pinned to an epoch-anchored phase with bounded jitter."""
+
+    def __init__(
+        self,
+        *,
+        seconds: int,
+        phase_seconds: float,
+        jitter_seconds: float = 0.0,
+    ) -> None:
+        super().__init__(
+            seconds=seconds,
+            start_date=datetime.fromtimestamp(phase_seconds, tz=timezone.utc),
+            timezone=timezone.utc,
+        )
+        self.phase_seconds = phase_seconds
+        # Jitter past half an interval would let consecutive ticks overlap.
+        self.spread_jitter = max(0.0, min(jitter_seconds, seconds / 2))
+
+    def get_next_fire_time(self, previous_fire_time, now):  # noqa: ANN001, ANN201
+        start = self.start_date.timestamp()
+        length = self.interval_length
+        if previous_fire_time is not None:
+            # Step from the slot the previous (possibly jittered) tick belonged to.
+            slot = floor((previous_fire_time.timestamp() - start) / length + _SLOT_EPSILON) + 1
+        else:
+            slot = ceil((now.timestamp() - start) / length)
+
+        next_fire_time = start + slot * length
+        if self.spread_jitter:
+            next_fire_time += random.uniform(0, self.spread_jitter)
+        return datetime.fromtimestamp(next_fire_time, tz=self.timezone)
+
+    def __repr__(self) -> str:
+        return (
+            f"<PhasedIntervalTrigger (interval={self.interval!r}, "
+            f"phase={self.phase_seconds}s, jitter={self.spread_jitter}s)>"
+        )
+
+
+def build_trigger(endpoint_id: str, interval_seconds: int) -> IntervalTrigger:
+    """Return the trigger for an endpoint job according to the spread setting."""
+    if not settings.SCHEDULER_SPREAD_ENABLED:
+        return IntervalTrigger(seconds=interval_seconds)
+    return PhasedIntervalTrigger(
+        seconds=interval_seconds,
+        phase_seconds=phase_offset(endpoint_id, interval_seconds),
+        jitter_seconds=settings.SCHEDULER_JITTER_SECONDS,
+    )
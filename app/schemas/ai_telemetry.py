@@ -21,6 +21,9 @@ class AiTelemetryStats(BaseModel):
     total_cost_usd: float
     avg_latency_ms: float
     avg_tokens_per_call: float
+    calls_avoided: int = 0  # gated by the statistical pre-gate or served from cache
+    cache_hits: int = 0  # verdicts reused from the verdict cache
+    budget_denied: int = 0  # runs whose LLM call the organization's budget denied
 
 
 class AiTelemetryStatsResponse(BaseModel):
@@ -63,6 +66,27 @@ class PerEndpointUsageResponse(BaseModel):
     endpoints: list[PerEndpointUsage]
 
 
+# ── Budget ───────────────────────────────────────────────────────────────────
+
+
+class AiBudgetResponse(BaseModel):
+    """The tenant's LLM budget — limits, what is left now, and usage.
+
+    Limits are ``None`` when that budget is unlimited.  State is kept
+    in memory by the API process.
+    """
+
+    enabled: bool
+    tokens_per_minute: float | None
+    tokens_available: int | None
+    usd_per_day: float | None
+    usd_available: float | None
+    admitted_calls: int
+    denied_calls: int
+    tokens_used: int
+    cost_usd: float
+
+
 # ── Health ───────────────────────────────────────────────────────────────────
 
 
@@ -24,3 +24,6 @@ class AnomalyReadout(BaseModel):
     skipped_reason: Optional[str] = None
     ai_called: bool = False
     used_fallback: bool = False
+    gated: bool = False  # held back from the LLM by the statistical pre-gate
+    cache_hit: bool = False  # LLM verdict reused from a matching earlier run
+    over_budget: bool = False  # LLM skipped, organization over its LLM budget
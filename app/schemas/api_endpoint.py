@@ -46,6 +46,11 @@ class AdvancedConfigSchema(BaseModel):
     retry_delay_ms: int = Field(default=1000, ge=0, le=30000)
     follow_redirects: bool = True
     expected_response_time_ms: Optional[int] = Field(default=None, ge=0, le=120000)
+    # Per-origin probe limits (None → organization / global defaults)
+    origin_max_concurrency: Optional[int] = Field(default=None, ge=1, le=100)
+    origin_rate_per_second: Optional[float] = Field(default=None, gt=0, le=1000)
+    # Probe over HTTP/2 when the server negotiates it (requires h2)
+    http2: bool = False
 
 
 # ── Core schemas ─────────────────────────────────────────────────────────
@@ -58,6 +63,8 @@ class ApiEndpointCreate(BaseModel):
     expected_status: int = Field(default=200, ge=100, le=599)
     expected_schema: Optional[dict[str, Any]] = None
     monitoring_interval_seconds: int = Field(default=300, ge=10, le=86400)
+    min_interval_seconds: Optional[int] = Field(None, ge=10, le=86400)
+    max_interval_seconds: Optional[int] = Field(None, ge=10, le=86400)
 
     # V2 fields (optional, backward-compatible)
     query_params: Optional[list[KeyValueRow]] = None
@@ -75,6 +82,8 @@ class ApiEndpointUpdate(BaseModel):
     expected_status: Optional[int] = Field(None, ge=100, le=599)
     expected_schema: Optional[dict[str, Any]] = None
     monitoring_interval_seconds: Optional[int] = Field(None, ge=10, le=86400)
+    min_interval_seconds: Optional[int] = Field(None, ge=10, le=86400)
+    max_interval_seconds: Optional[int] = Field(None, ge=10, le=86400)
 
     # V2 fields (optional)
     query_params: Optional[list[KeyValueRow]] = None
@@ -93,6 +102,8 @@ class ApiEndpointRead(BaseModel):
     expected_status: int
     expected_schema: Optional[dict[str, Any]] = None
     monitoring_interval_seconds: int
+    min_interval_seconds: Optional[int] = None
+    max_interval_seconds: Optional[int] = None
 
     # V2 fields
     query_params: Optional[list[dict[str, Any]]] = None
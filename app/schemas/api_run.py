@@ -19,6 +19,13 @@ class ApiRunRead(BaseModel):
     endpoint_id: uuid.UUID
     status_code: Optional[int]
     response_time_ms: Optional[float]
+    dns_ms: Optional[float] = None
+    connect_ms: Optional[float] = None
+    tls_ms: Optional[float] = None
+    ttfb_ms: Optional[float] = None
+    download_ms: Optional[float] = None
+    response_bytes: Optional[int] = None
+    response_truncated: bool = False
     response_body: Optional[dict[str, Any]]
     is_success: bool
     error_message: Optional[str]
@@ -34,6 +41,9 @@ class ApiRunSummary(BaseModel):
     endpoint_id: uuid.UUID
     status_code: Optional[int]
     response_time_ms: Optional[float]
+    connect_ms: Optional[float] = None
+    tls_ms: Optional[float] = None
+    ttfb_ms: Optional[float] = None
     is_success: bool
     created_at: datetime
 
@@ -10,6 +10,9 @@ class TrendPoint(BaseModel):
 
     hour: str  # ISO 8601 truncated to hour, e.g. "2025-02-20T14:00:00+00:00"
     avg_response_time_ms: float
+    p50_response_time_ms: float
+    p95_response_time_ms: float
+    p99_response_time_ms: float
     request_count: int
 
 
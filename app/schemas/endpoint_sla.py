@@ -38,3 +38,16 @@ class UptimeStats(BaseModel):
     window: str
     sla_target: float
     is_breached: bool
+
+
+class LatencyPercentiles(BaseModel):
+    """Response-time percentiles over an SLA window, from hourly histograms."""
+
+    endpoint_id: uuid.UUID
+    window: str
+    sample_count: int
+    avg_ms: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    max_ms: float
@@ -23,3 +23,29 @@ class MonitorRunResult(BaseModel):
     schema_drift: Optional[SchemaDriftReadout] = None
     anomaly: Optional[AnomalyReadout] = None
     risk: Optional[RiskReadout] = None
+    stage_timings: Optional[dict[str, float]] = None  # stage → ms, plus "total"
+
+
+class StageLatency(BaseModel):
+    """Latency distribution of one pipeline stage, in milliseconds."""
+
+    count: int = 0
+    avg: float = 0.0
+    p50: float = 0.0
+    p95: float = 0.0
+    p99: float = 0.0
+    max: float = 0.0
+
+
+class PipelineStageStats(BaseModel):
+    """
+    Per-stage pipeline latency percentiles for this process.
+
+    Covers the last one to two ``window_seconds`` periods; ``runs`` counts
+    every pipeline run since startup.  This is the response from
+    GET /api/v1/monitor/pipeline-stats.
+    """
+
+    runs: int
+    window_seconds: int
+    stages: dict[str, StageLatency]
@@ -15,3 +15,11 @@ class PerformanceReadout(BaseModel):
     is_critical_spike: bool = False
     sample_size: int = 0
     has_enough_data: bool = False
+    connection_ms: Optional[float] = None  # DNS + TCP connect + TLS
+    ttfb_ms: Optional[float] = None
+    latency_source: Optional[str] = None  # network | server
+    rolling_p95_ms: Optional[float] = None
+    lifetime_avg_ms: Optional[float] = None
+    lifetime_stddev_ms: Optional[float] = None
+    baseline: str = "window"  # window | streaming | seasonal
+    seasonal_slot: Optional[int] = None  # hour of week, UTC, Monday 00:00 = 0
@@ -98,10 +98,12 @@ class AiMemoryService:
                     notes=incident.notes,
                     resolution_time_str=resolution_time_str,
                 )
-                result = await self._llm.analyse(
+                response = await self._llm.analyse(
                     system_prompt=MEMORY_EXTRACTION_SYSTEM,
                     user_prompt=prompt,
+                    organization_id=incident.organization_id,
                 )
+                result = response.data
                 if result and isinstance(result, dict):
                     learning_text = result.get("learning")
                     action_text = result.get("resolution_action")
@@ -68,6 +68,8 @@ class ApiEndpointService:
             expected_status=data.expected_status,
             expected_schema=data.expected_schema,
             monitoring_interval_seconds=data.monitoring_interval_seconds,
+            min_interval_seconds=data.min_interval_seconds,
+            max_interval_seconds=data.max_interval_seconds,
             # V2 fields
             query_params=query_params,
             request_headers=request_headers,
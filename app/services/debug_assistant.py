@@ -172,7 +172,7 @@ async def generate_debug_suggestions(
     Returns structured debug suggestions dict or None if:
     - LLM is not available
     - No anomaly exists or severity too low
-    - LLM call fails
+    - LLM call fails or the organization is over its LLM budget
 
     Cost gating: only runs when latest anomaly severity >= 40.
     """
@@ -269,14 +269,16 @@ async def generate_debug_suggestions(
         failure_rate=failure_rate,
     )
 
-    raw = await llm_client.analyse(
+    response = await llm_client.analyse(
         system_prompt=DEBUG_SYSTEM_PROMPT,
         user_prompt=user_prompt,
+        organization_id=tenant_id,
     )
+    raw = response.data
 
     # 9. Persist AI telemetry
-    if llm_client.last_call_telemetry:
-        telem = llm_client.last_call_telemetry
+    if response.telemetry is not None:
+        telem = response.telemetry
         telemetry_repo = AiTelemetryRepository(session)
         await telemetry_repo.create(
             AiTelemetryRecord(
@@ -4,9 +4,16 @@ from datetime import datetime, timedelta, timezone
 from fastapi import HTTPException, status
 
 from app.models.endpoint_sla import EndpointSLA
+from app.monitoring.latency_histograms import latency_histograms, merge_all
 from app.repositories.api_run import ApiRunRepository
 from app.repositories.endpoint_sla import EndpointSLARepository
-from app.schemas.endpoint_sla import EndpointSLACreate, EndpointSLAUpdate, UptimeStats
+from app.repositories.latency_stats import EndpointLatencyHistogramRepository
+from app.schemas.endpoint_sla import (
+    EndpointSLACreate,
+    EndpointSLAUpdate,
+    LatencyPercentiles,
+    UptimeStats,
+)
 
 
 _WINDOW_HOURS = {"24h": 24, "7d": 168, "30d": 720}
@@ -17,9 +24,11 @@ class EndpointSLAService:
         self,
         repo: EndpointSLARepository,
         run_repo: ApiRunRepository,
+        histogram_repo: EndpointLatencyHistogramRepository | None = None,
     ) -> None:
         self._repo = repo
         self._run_repo = run_repo
+        self._histogram_repo = histogram_repo
 
     # ── CRUD ──────────────────────────────────────────────────────
 
@@ -98,6 +107,29 @@ class EndpointSLAService:
             is_breached=uptime < sla.sla_target_percent,
         )
 
+    async def get_latency(
+        self, endpoint_id: uuid.UUID, tenant_id: uuid.UUID, window: str | None = None
+    ) -> LatencyPercentiles:
+        """Percentiles over ``window`` (default: the SLA's uptime window)."""
+        sla = await self.get_sla(endpoint_id, tenant_id)
+        window = window or sla.uptime_window
+        since = datetime.now(timezone.utc) - timedelta(hours=_WINDOW_HOURS.get(window, 24))
+
+        hours = await latency_histograms.window(
+            self._histogram_repo, tenant_id, since, endpoint_id=endpoint_id
+        )
+        summary = merge_all(hours).summary()
+        return LatencyPercentiles(
+            endpoint_id=endpoint_id,
+            window=window,
+            sample_count=summary["count"],
+            avg_ms=summary["avg"],
+            p50_ms=summary["p50"],
+            p95_ms=summary["p95"],
+            p99_ms=summary["p99"],
+            max_ms=summary["max"],
+        )
+
     async def check_breach(
         self, endpoint_id: uuid.UUID, tenant_id: uuid.UUID
     ) -> bool:
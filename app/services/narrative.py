@@ -1,4 +1,5 @@
 import logging
+import uuid
 from typing import Any
 
 from app.ai.llm_client import LLMClient
@@ -26,6 +27,7 @@ class NarrativeService:
         avg_resolution_ms: int | None = None,
         last_resolution_notes: str | None = None,
         cross_endpoint_count: int = 0,
+        organization_id: uuid.UUID | None = None,
     ) -> str:
         """Generate narrative. Tries LLM if conditions met, falls back to template."""
 
@@ -38,6 +40,7 @@ class NarrativeService:
 
         if use_llm:
             result = await self._llm_narrative(
+                organization_id=organization_id,
                 endpoint_name=endpoint_name,
                 signal_flags=signal_flags,
                 severity=severity,
@@ -114,14 +117,18 @@ class NarrativeService:
 
         return " ".join(parts)
 
-    async def _llm_narrative(self, **kwargs: Any) -> str | None:
+    async def _llm_narrative(
+        self, *, organization_id: uuid.UUID | None, **kwargs: Any
+    ) -> str | None:
         """Call LLM for a richer narrative. Returns None on failure."""
         try:
             user_prompt = build_narrative_prompt(**kwargs)
-            result = await self._llm.analyse(
+            response = await self._llm.analyse(
                 system_prompt=NARRATIVE_SYSTEM_PROMPT,
                 user_prompt=user_prompt,
+                organization_id=organization_id,
             )
+            result = response.data
             if result and isinstance(result, dict):
                 narrative = result.get("narrative", "")
                 action = result.get("suggested_action")
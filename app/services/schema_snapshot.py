@@ -14,6 +14,7 @@ from typing import Any
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.schema_snapshot import SchemaSnapshot
+from app.monitoring.analysis_offload import analysis_offload
 from app.repositories.schema_snapshot import SchemaSnapshotRepository
 from app.utils.schema_diff import (
     _count_fields,
@@ -29,17 +30,25 @@ async def snapshot_if_changed(
     org_id: uuid.UUID,
     response_body: dict[str, Any] | None,
     session: AsyncSession,
+    *,
+    schema_hash: str | None = None,
+    body_bytes: int | None = None,
 ) -> SchemaSnapshot | None:
     """
     Create a new schema snapshot if the response body's hash differs
     from the latest stored snapshot.
 
+    ``schema_hash`` may be passed when the caller already computed
+    ``compute_schema_hash(response_body)``.  With ``body_bytes`` at or
+    above ``ANALYSIS_OFFLOAD_MIN_BYTES`` the diff against the previous
+    snapshot runs off the event loop.
+
     Returns the new snapshot if created, or ``None`` if no change.
     """
     if response_body is None or not isinstance(response_body, dict):
         return None
 
-    schema_hash = compute_schema_hash(response_body)
+    schema_hash = schema_hash or compute_schema_hash(response_body)
     repo = SchemaSnapshotRepository(session)
 
     latest = await repo.get_latest(endpoint_id, org_id)
@@ -56,9 +65,8 @@ async def snapshot_if_changed(
     # Compute diff from previous snapshot (if one exists)
     diff_from_previous: dict[str, Any] | None = None
     if latest is not None and isinstance(latest.schema_body, dict):
-        diff_result = compute_diff(
-            expected=latest.schema_body,
-            actual=response_body,
+        diff_result = await analysis_offload.run(
+            compute_diff, latest.schema_body, response_body, size=body_bytes,
         )
         diff_from_previous = diff_result.to_summary_dict()
 
@@ -49,6 +49,7 @@ export function ResponseTrendsChart() {
       minute: "2-digit",
     }),
     avgMs: Math.round(p.avg_response_time_ms),
+    p95Ms: Math.round(p.p95_response_time_ms),
     count: p.request_count,
   }));
 
@@ -94,11 +95,24 @@ export function ResponseTrendsChart() {
               fontSize: "0.75rem",
               boxShadow: "0 4px 12px rgb(0 0 0 / 0.08)",
             }}
-            formatter={(value: number | undefined) => [`${value ?? 0}ms`, "Avg Response"]}
+            formatter={(value: number | undefined, name: string | undefined) => [
+              `${value ?? 0}ms`,
+              name ?? "",
+            ]}
+          />
+          <Area
+            type="monotone"
+            dataKey="p95Ms"
+            name="p95 Response"
+            stroke="var(--color-accent)"
+            strokeWidth={1}
+            strokeDasharray="4 3"
+            fill="none"
           />
           <Area
             type="monotone"
             dataKey="avgMs"
+            name="Avg Response"
             stroke="var(--color-accent)"
             strokeWidth={2}
             fill="url(#trendGradient)"
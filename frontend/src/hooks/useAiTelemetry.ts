@@ -4,6 +4,7 @@ import {
   getAiDailyBreakdown,
   getAiPerEndpoint,
   getAiHealth,
+  getAiBudget,
 } from "@/services/endpointsService.ts";
 
 // ── Queries ──────────────────────────────────────────────────────────────
@@ -39,3 +40,11 @@ export function useAiHealth() {
     refetchInterval: 30_000,
   });
 }
+
+export function useAiBudget() {
+  return useQuery({
+    queryKey: ["ai-telemetry-budget"],
+    queryFn: () => getAiBudget(),
+    refetchInterval: 30_000,
+  });
+}
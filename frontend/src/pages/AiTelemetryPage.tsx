@@ -148,6 +148,10 @@ export function AiTelemetryPage() {
                 <span>
                   {stats.successful_calls} successful /{" "}
                   {stats.failed_calls} failed calls
+                  {stats.calls_avoided > 0 &&
+                    ` · ${stats.calls_avoided.toLocaleString()} avoided (${stats.cache_hits.toLocaleString()} cached)`}
+                  {stats.budget_denied > 0 &&
+                    ` · ${stats.budget_denied.toLocaleString()} over budget`}
                 </span>
                 <span>
                   {stats.total_tokens > 0
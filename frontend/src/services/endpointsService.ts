@@ -16,6 +16,8 @@ import type {
   EndpointSLACreate,
   EndpointSLAUpdate,
   UptimeStats,
+  LatencyPercentiles,
+  UptimeWindow,
   AlertRule,
   AlertRuleCreate,
   AlertRuleUpdate,
@@ -225,6 +227,17 @@ export async function getEndpointUptime(
   return data;
 }
 
+export async function getEndpointLatency(
+  endpointId: string,
+  window?: UptimeWindow,
+): Promise<LatencyPercentiles> {
+  const { data } = await apiClient.get<LatencyPercentiles>(
+    `${API}/sla/${endpointId}/latency`,
+    { params: window ? { window } : undefined },
+  );
+  return data;
+}
+
 export async function createEndpointSLA(
   payload: EndpointSLACreate,
 ): Promise<EndpointSLA> {
@@ -527,6 +540,7 @@ import type {
   AiTelemetryStatsResponse,
   DailyBreakdownResponse,
   PerEndpointUsageResponse,
+  AiBudgetResponse,
   AiHealthResponse,
 } from "@/types/index.ts";
 
@@ -567,6 +581,13 @@ export async function getAiHealth(): Promise<AiHealthResponse> {
   return data;
 }
 
+export async function getAiBudget(): Promise<AiBudgetResponse> {
+  const { data } = await apiClient.get<AiBudgetResponse>(
+    `${API}/ai-telemetry/budget`,
+  );
+  return data;
+}
+
 // ── Schema Snapshots ──────────────────────────────────────────────────────
 
 import type {
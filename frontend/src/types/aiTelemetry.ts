@@ -10,6 +10,9 @@ export interface AiTelemetryStats {
   total_cost_usd: number;
   avg_latency_ms: number;
   avg_tokens_per_call: number;
+  calls_avoided: number;
+  cache_hits: number;
+  budget_denied: number;
 }
 
 export interface AiTelemetryStatsResponse {
@@ -42,6 +45,18 @@ export interface PerEndpointUsageResponse {
   endpoints: PerEndpointUsage[];
 }
 
+export interface AiBudgetResponse {
+  enabled: boolean;
+  tokens_per_minute: number | null;
+  tokens_available: number | null;
+  usd_per_day: number | null;
+  usd_available: number | null;
+  admitted_calls: number;
+  denied_calls: number;
+  tokens_used: number;
+  cost_usd: number;
+}
+
 export interface AiHealthResponse {
   total_calls: number;
   success_rate: number;
@@ -25,4 +25,7 @@ export interface AnomalyReadout {
   skipped_reason: string | null;
   ai_called: boolean;
   used_fallback: boolean;
+  gated: boolean;
+  cache_hit: boolean;
+  over_budget: boolean;
 }
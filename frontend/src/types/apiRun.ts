@@ -5,6 +5,15 @@ export interface ApiRun {
   endpoint_id: string;
   status_code: number | null;
   response_time_ms: number | null;
+  /** Phase breakdown of response_time_ms (null → phase not observed) */
+  dns_ms: number | null;
+  connect_ms: number | null;
+  tls_ms: number | null;
+  ttfb_ms: number | null;
+  download_ms: number | null;
+  /** Body bytes read; truncated → reading stopped at the size cap */
+  response_bytes: number | null;
+  response_truncated: boolean;
   response_body: Record<string, unknown> | null;
   is_success: boolean;
   error_message: string | null;
@@ -17,6 +26,9 @@ export interface ApiRunSummary {
   endpoint_id: string;
   status_code: number | null;
   response_time_ms: number | null;
+  connect_ms: number | null;
+  tls_ms: number | null;
+  ttfb_ms: number | null;
   is_success: boolean;
   created_at: string;
 }
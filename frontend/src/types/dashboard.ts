@@ -3,6 +3,9 @@
 export interface TrendPoint {
   hour: string;
   avg_response_time_ms: number;
+  p50_response_time_ms: number;
+  p95_response_time_ms: number;
+  p99_response_time_ms: number;
   request_count: number;
 }
 
@@ -77,3 +80,14 @@ export interface UptimeStats {
   sla_target: number;
   is_breached: boolean;
 }
+
+export interface LatencyPercentiles {
+  endpoint_id: string;
+  window: string;
+  sample_count: number;
+  avg_ms: number;
+  p50_ms: number;
+  p95_ms: number;
+  p99_ms: number;
+  max_ms: number;
+}
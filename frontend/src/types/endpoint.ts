@@ -9,6 +9,9 @@ export interface AdvancedConfig {
   retry_delay_ms: number;
   follow_redirects: boolean;
   expected_response_time_ms: number | null;
+  origin_max_concurrency?: number | null;
+  origin_rate_per_second?: number | null;
+  http2?: boolean;
 }
 
 export interface ApiEndpoint {
@@ -44,6 +44,7 @@ export type {
   EndpointSLACreate,
   EndpointSLAUpdate,
   UptimeStats,
+  LatencyPercentiles,
 } from "./dashboard.ts";
 export type {
   ConditionType,
@@ -71,6 +72,7 @@ export type {
   DailyBreakdownResponse,
   PerEndpointUsage,
   PerEndpointUsageResponse,
+  AiBudgetResponse,
   AiHealthResponse,
 } from "./aiTelemetry.ts";
 export type {
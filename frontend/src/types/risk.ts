@@ -32,6 +32,14 @@ export interface PerformanceReadout {
   is_critical_spike: boolean;
   sample_size: number;
   has_enough_data: boolean;
+  connection_ms: number | null;
+  ttfb_ms: number | null;
+  latency_source: "network" | "server" | null;
+  rolling_p95_ms: number | null;
+  lifetime_avg_ms: number | null;
+  lifetime_stddev_ms: number | null;
+  baseline: "window" | "streaming" | "seasonal";
+  seasonal_slot: number | null;
 }
 
 /** Schema drift types */
@@ -57,4 +65,6 @@ export interface MonitorRunResult {
   schema_drift: SchemaDriftReadout | null;
   anomaly: import("./anomaly.ts").AnomalyReadout | null;
   risk: RiskReadout | null;
+  /** Stage → milliseconds for this run, plus "total". */
+  stage_timings: Record<string, number> | null;
 }
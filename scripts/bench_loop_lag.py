@@ -0,0 +1,183 @@
+"""
+Benchmark — event-loop lag while large response bodies are analysed.
+
+Runs the pipeline's body analyzers (schema drift, credential scan,
+contract validation) over large fixture bodies in each
+``ANALYSIS_OFFLOAD_MODE`` and measures how late a 1 ms ticker on the
+event loop wakes up meanwhile — the delay every other probe, WebSocket
+and API request in the process would see.
+
+  inline    analyzers run on the event loop.
+  thread    analyzers run on the offload thread pool (share the GIL).
+  process   analyzers run on the offload process pool.
+
+The body is the mock server's ``/api/large-response`` fixture, repeated
+``--copies`` times to approach the 512 KB body cap.
+
+Usage:
+    python -m scripts.bench_loop_lag
+    python -m scripts.bench_loop_lag --runs 40 --copies 3 \\
+        --mock-url http://localhost:8001/api/large-response
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings  # noqa: E402
+from app.monitoring.analysis_offload import (  # noqa: E402
+    MODE_INLINE,
+    MODE_PROCESS,
+    MODE_THREAD,
+    AnalysisOffload,
+    analyse_body,
+)
+from app.monitoring.schema_validator import SchemaValidator  # noqa: E402
+
+TICK_SECONDS = 0.001
+
+# Per-body drift / finding warnings; module level so spawned workers
+# (which re-import this module) are quiet too.
+logging.disable(logging.WARNING)
+
+_ITEM_SCHEMA = {
+    "type": "object",
+    "required": ["id", "name", "price"],
+    "properties": {
+        "id": {"type": "integer"},
+        "name": {"type": "string"},
+        "description": {"type": "string"},
+        "price": {"type": "number"},
+        "tags": {"type": "array", "items": {"type": "string"}},
+    },
+}
+OPENAPI_SPEC = {
+    "openapi": "3.0.0",
+    "paths": {
+        "/api/large-response": {
+            "get": {
+                "responses": {
+                    "200": {
+                        "content": {
+                            "application/json": {
+                                "schema": {
+                                    "type": "object",
+                                    "required": ["status", "items"],
+                                    "properties": {
+                                        "status": {"type": "string"},
+                                        "count": {"type": "integer"},
+                                        "items": {"type": "array", "items": _ITEM_SCHEMA},
+                                    },
+                                }
+                            }
+                        }
+                    }
+                }
+            }
+        }
+    },
+}
+
+
+async def _fixture(mock_url: str | None) -> dict:
+    if mock_url:
+        import httpx
+
+        async with httpx.AsyncClient() as client:
+            response = await client.get(mock_url)
+            response.raise_for_status()
+            return response.json()
+    from tests.mock_server.main import large_response
+
+    return await large_response()
+
+
+def _inflate(body: dict, copies: int) -> dict:
+    items = [
+        dict(item, id=item["id"] + n * len(body["items"]))
+        for n in range(copies)
+        for item in body["items"]
+    ]
+    return {**body, "count": len(items), "items": items}
+
+
+def _percentile(ordered: list[float], q: float) -> float:
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))] if ordered else 0.0
+
+
+async def _measure(offload: AnalysisOffload, body: dict, expected: dict, size: int, runs: int,
+                   concurrency: int) -> tuple[list[float], float]:
+    lags: list[float] = []
+    done = asyncio.Event()
+
+    async def ticker() -> None:
+        while not done.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(TICK_SECONDS)
+            lags.append((time.perf_counter() - start - TICK_SECONDS) * 1000)
+
+    gate = asyncio.Semaphore(concurrency)
+    validator = SchemaValidator()
+
+    async def one() -> None:
+        async with gate:
+            await offload.run(
+                analyse_body, validator, "bench", expected, OPENAPI_SPEC,
+                "https://mock.test/api/large-response", "GET", 200, body, size=size,
+            )
+            await asyncio.sleep(0)
+
+    tick = asyncio.create_task(ticker())
+    start = time.perf_counter()
+    await asyncio.gather(*[one() for _ in range(runs)])
+    elapsed = time.perf_counter() - start
+    done.set()
+    await tick
+    return sorted(lags), elapsed
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--copies", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=settings.ANALYSIS_OFFLOAD_WORKERS)
+    parser.add_argument("--mock-url", default=None)
+    args = parser.parse_args()
+
+    body = _inflate(await _fixture(args.mock_url), args.copies)
+    size = len(json.dumps(body).encode())
+    # Expected schema from an older shape of the body, so drift walks the tree.
+    expected = {**body, "items": body["items"][:1], "legacy": True}
+    settings.ANALYSIS_OFFLOAD_MIN_BYTES = 0
+    settings.ANALYSIS_OFFLOAD_WORKERS = args.workers
+
+    print(
+        f"{args.runs} analyses of a {size / 1024:.0f} KB body, "
+        f"concurrency {args.concurrency}, {args.workers} worker(s)"
+    )
+    print(f"{'mode':<8} {'lag p50':>9} {'lag p99':>9} {'lag max':>9} {'wall':>8} {'bodies/s':>9}")
+    for mode in (MODE_INLINE, MODE_THREAD, MODE_PROCESS):
+        settings.ANALYSIS_OFFLOAD_MODE = mode
+        offload = AnalysisOffload()
+        offload.startup()
+        if mode == MODE_PROCESS:  # exclude worker spawn from the measurement
+            await asyncio.gather(*[offload.run(sum, [1], size=size) for _ in range(args.workers)])
+        try:
+            lags, elapsed = await _measure(offload, body, expected, size, args.runs, args.concurrency)
+        finally:
+            await offload.shutdown()
+        print(
+            f"{mode:<8} {_percentile(lags, 0.5):>7.1f}ms {_percentile(lags, 0.99):>7.1f}ms "
+            f"{(lags[-1] if lags else 0):>7.1f}ms {elapsed:>7.2f}s {args.runs / elapsed:>9.1f}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
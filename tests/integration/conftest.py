@@ -72,10 +72,12 @@ import app.models.alert_rule  # noqa: F401
 import app.models.schema_snapshot  # noqa: F401
 import app.models.security_finding  # noqa: F401
 import app.models.ai_telemetry  # noqa: F401
+import app.models.scheduler_worker  # noqa: F401
 import app.models.invite  # noqa: F401
 import app.models.incident_cluster  # noqa: F401
 import app.models.fingerprint_cache  # noqa: F401
 import app.models.ai_memory  # noqa: F401
+import app.models.latency_stats  # noqa: F401
 
 # ---------------------------------------------------------------------------
 # Test database engine (SQLite in-memory, shared across connections)
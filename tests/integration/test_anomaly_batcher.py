@@ -0,0 +1,103 @@
+"""Anomaly batcher tests -- per-org micro-batches, verdict fan-out and telemetry shares."""
+import asyncio
+import re
+import uuid
+
+import allure
+import pytest
+
+from app.ai.llm_client import CallTelemetry, LLMResult
+from app.ai.prompt_templates import BATCH_SYSTEM_PROMPT, SYSTEM_PROMPT
+from app.monitoring.anomaly_batcher import AnomalyBatcher
+from app.monitoring.anomaly_engine import AnomalyEngine
+
+pytestmark = [pytest.mark.regression]
+
+
+class EchoLLM:
+    """Answers each run with its endpoint name as the probable cause."""
+
+    available = True
+
+    def __init__(self, skip: str | None = None) -> None:
+        self.prompts: list[tuple[str, str]] = []
+        self._skip = skip
+
+    async def analyse(
+        self, *, system_prompt: str, user_prompt: str, organization_id=None
+    ) -> LLMResult:
+        self.prompts.append((system_prompt, user_prompt))
+        names = re.findall(r"^Endpoint: (.+)$", user_prompt, re.MULTILINE)
+        verdicts = [
+            {"run": i, "anomaly_detected": True, "severity_score": 80, "probable_cause": name}
+            for i, name in enumerate(names, start=1)
+            if name != self._skip
+        ]
+        telemetry = CallTelemetry(
+            model_name="gpt-4o-mini", prompt_tokens=1001, completion_tokens=300,
+            total_tokens=1301, latency_ms=2000.0, success=True, cost_usd=0.0003,
+        )
+        if system_prompt == BATCH_SYSTEM_PROMPT:
+            return LLMResult({"results": verdicts[::-1]}, telemetry)
+        return LLMResult(verdicts[0], telemetry)
+
+
+def _analyse(engine: AnomalyEngine, name: str, organization_id: uuid.UUID):
+    return engine.analyse(
+        endpoint_name=name, url=f"https://{name}.example.com", method="GET",
+        expected_status=200, actual_status=502, response_time_ms=80.0, is_success=False,
+        error_message=None, performance=None, drift=None, failure_rate_percent=0.0,
+        organization_id=organization_id,
+    )
+
+
+@allure.feature("Anomaly Batching")
+@allure.story("Incident storms share one LLM call per organization")
+@allure.severity(allure.severity_level.CRITICAL)
+@allure.title("Concurrent analyses of one org get their own verdicts from one call")
+@pytest.mark.asyncio
+async def test_storm_is_batched_per_org():
+    llm = EchoLLM()
+    batcher = AnomalyBatcher(window_ms=50, max_size=10)
+    engine = AnomalyEngine(llm, batcher=batcher)
+    org, other_org = uuid.uuid4(), uuid.uuid4()
+    names = [f"svc-{i}" for i in range(4)]
+
+    results = await asyncio.gather(
+        *(_analyse(engine, name, org) for name in names),
+        _analyse(engine, "lonely", other_org),
+    )
+
+    assert [r.probable_cause for r in results] == [*names, "lonely"]
+    assert all(r.ai_called for r in results)
+    assert sorted(system for system, _ in llm.prompts) == sorted([BATCH_SYSTEM_PROMPT, SYSTEM_PROMPT])
+    batch_prompt = next(user for system, user in llm.prompts if system == BATCH_SYSTEM_PROMPT)
+    assert "lonely" not in batch_prompt
+
+    shares = [r.telemetry for r in results[:4]]
+    assert sum(t.total_tokens for t in shares) == 1301
+    assert sum(t.prompt_tokens for t in shares) == 1001
+    assert sum(t.cost_usd for t in shares) == pytest.approx(0.0003)
+    assert batcher.stats()["calls_saved"] == 3
+
+
+@allure.feature("Anomaly Batching")
+@allure.story("Incident storms share one LLM call per organization")
+@allure.severity(allure.severity_level.NORMAL)
+@allure.title("A full batch is sent without waiting; missing verdicts fall back to rules")
+@pytest.mark.asyncio
+async def test_full_batch_and_missing_verdict():
+    llm = EchoLLM(skip="svc-1")
+    batcher = AnomalyBatcher(window_ms=60_000, max_size=3)
+    engine = AnomalyEngine(llm, batcher=batcher)
+    org = uuid.uuid4()
+
+    results = await asyncio.wait_for(
+        asyncio.gather(*(_analyse(engine, f"svc-{i}", org) for i in range(3))), timeout=5
+    )
+
+    assert len(llm.prompts) == 1
+    assert results[0].ai_called and results[2].ai_called
+    assert results[1].used_fallback and not results[1].ai_called
+    assert results[1].telemetry.total_tokens > 0  # its share of the call is still billed
+    assert batcher.stats()["unanswered"] == 1
@@ -0,0 +1,188 @@
+"""Anomaly gate tests -- robust z / CUSUM / burst decisions, engine gating and avoided-call telemetry."""
+from datetime import datetime, timedelta, timezone
+
+import allure
+import httpx
+import pytest
+
+from app.ai.llm_client import LLMResult
+from app.core.config import settings
+from app.models.ai_telemetry import OUTCOME_GATED, AiTelemetryRecord
+from app.models.api_endpoint import ApiEndpoint
+from app.models.api_run import ApiRun
+from app.monitoring.anomaly_engine import AnomalyEngine
+from app.monitoring.anomaly_gate import (
+    PASS_FAILURE_BURST,
+    PASS_FAILURE_ONSET,
+    PASS_LATENCY_OUTLIER,
+    PASS_LATENCY_SHIFT,
+    PASS_NO_HISTORY,
+    PASS_SCHEMA_DRIFT,
+    AnomalyGate,
+    RecentWindow,
+)
+from app.monitoring.api_runner import ApiRunner, RunnerConfig
+from app.monitoring.run_history import RunHistoryStore
+from app.monitoring.runner_service import RunnerService
+from app.repositories.ai_telemetry import AiTelemetryRepository
+
+pytestmark = [pytest.mark.regression]
+
+FLAPPING = [True, True, True, False] * 6  # fails every 4th run
+
+
+class FakeLLM:
+    """Available LLM client that counts calls."""
+
+    available = True
+
+    def __init__(self) -> None:
+        self.calls = 0
+
+    async def analyse(
+        self, *, system_prompt: str, user_prompt: str, organization_id=None
+    ) -> LLMResult:
+        self.calls += 1
+        return LLMResult({"anomaly_detected": True, "severity_score": 70, "confidence": 0.9})
+
+
+def _failure(gate: AnomalyGate, outcomes: list[bool]):
+    return gate.evaluate(
+        signals=["status_failure"], window=RecentWindow([100.0] * len(outcomes), outcomes),
+        response_time_ms=100.0, is_success=False,
+    )
+
+
+@allure.feature("Anomaly Gate")
+@allure.story("Only new or significant failures reach the LLM")
+@allure.severity(allure.severity_level.CRITICAL)
+@allure.title("Flapping failures are gated; an outage passes at onset and when it becomes a burst")
+def test_failure_decisions():
+    gate = AnomalyGate()
+    flapping = _failure(gate, FLAPPING)
+    assert not flapping.call_llm
+    assert flapping.burst_p_value > 0.01
+
+    outcomes = [True] * 30
+    reasons = []
+    for _ in range(4):
+        reasons.append(_failure(gate, outcomes).reasons)
+        outcomes.append(False)
+    assert reasons == [(PASS_FAILURE_ONSET,), (), (PASS_FAILURE_BURST,), ()]
+    assert gate.stats() == {
+        "evaluated": 5,
+        "passed": 2,
+        "calls_avoided": 3,
+        "pass_reasons": {PASS_FAILURE_ONSET: 1, PASS_FAILURE_BURST: 1},
+    }
+
+
+@allure.feature("Anomaly Gate")
+@allure.story("Only new or significant latency spikes reach the LLM")
+@allure.severity(allure.severity_level.CRITICAL)
+@allure.title("An outlier and a new level shift pass; the ongoing shift and jitter are gated")
+def test_latency_decisions():
+    gate = AnomalyGate()
+    latencies = [95.0, 105.0] * 10
+
+    def spike(window: list[float], ms: float):
+        return gate.evaluate(
+            signals=["latency_spike"], window=RecentWindow(window, [True] * len(window)),
+            response_time_ms=ms, is_success=True,
+        )
+
+    assert spike(latencies, 300.0).reasons == (PASS_LATENCY_OUTLIER,)
+    assert spike(latencies + [300.0], 300.0).reasons == (PASS_LATENCY_SHIFT,)
+    ongoing = spike(latencies + [300.0, 300.0], 300.0)
+    assert not ongoing.call_llm and ongoing.cusum > 5
+    assert not spike(latencies, 108.0).call_llm  # flagged by the tracker, within jitter
+
+    # Latency flapping between two levels never looks new.
+    assert not spike([100.0, 300.0] * 10, 300.0).call_llm
+
+
+@allure.feature("Anomaly Gate")
+@allure.story("Only new or significant runs reach the LLM")
+@allure.severity(allure.severity_level.NORMAL)
+@allure.title("Schema drift and short histories always pass")
+def test_always_pass():
+    gate = AnomalyGate()
+    drift = gate.evaluate(
+        signals=["status_failure", "schema_drift"], window=RecentWindow([100.0] * 24, FLAPPING),
+        response_time_ms=100.0, is_success=False,
+    )
+    assert drift.reasons == (PASS_SCHEMA_DRIFT,)
+    assert _failure(gate, [True, False, True]).reasons == (PASS_NO_HISTORY,)
+
+
+@allure.feature("Anomaly Gate")
+@allure.story("Gated runs get the rule-based analysis")
+@allure.severity(allure.severity_level.CRITICAL)
+@allure.title("The engine skips the LLM for gated runs, unless the gate is off or has no window")
+@pytest.mark.asyncio
+async def test_engine_gating(monkeypatch):
+    llm = FakeLLM()
+    engine = AnomalyEngine(llm, gate=AnomalyGate())
+    run = dict(
+        endpoint_name="Flapping API", url="https://api.example.com", method="GET",
+        expected_status=200, actual_status=500, response_time_ms=100.0, is_success=False,
+        error_message=None, performance=None, drift=None, failure_rate_percent=25.0,
+    )
+    window = RecentWindow([100.0] * 24, FLAPPING)
+
+    gated = await engine.analyse(**run, window=window)
+    assert gated.gated and gated.used_fallback and not gated.ai_called
+    assert gated.anomaly_detected and "AI skipped" in gated.skipped_reason
+    assert llm.calls == 0
+
+    assert (await engine.analyse(**run)).ai_called
+    monkeypatch.setattr(settings, "ANOMALY_GATE_ENABLED", False)
+    assert (await engine.analyse(**run, window=window)).ai_called
+    assert llm.calls == 2
+
+
+@allure.feature("Anomaly Gate")
+@allure.story("Avoided LLM calls are recorded")
+@allure.severity(allure.severity_level.CRITICAL)
+@allure.title("A gated pipeline run writes an avoided-call row counted by AI telemetry")
+@pytest.mark.asyncio
+async def test_pipeline_records_avoided_call(db_session, test_org):
+    endpoint = ApiEndpoint(
+        organization_id=test_org.id, name="Flapping API",
+        url="https://api.example.com/health", monitoring_interval_seconds=3600,
+    )
+    db_session.add(endpoint)
+    await db_session.flush()
+    start = datetime.now(timezone.utc) - timedelta(hours=2)
+    for i, ok in enumerate(FLAPPING):
+        db_session.add(ApiRun(
+            endpoint_id=endpoint.id, organization_id=test_org.id,
+            status_code=200 if ok else 500, response_time_ms=100.0, is_success=ok,
+            created_at=start + timedelta(minutes=i),
+        ))
+    await db_session.commit()
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(500, json={"error": "flaky"})
+
+    llm = FakeLLM()
+    runner = ApiRunner()
+    runner._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    service = RunnerService(
+        session=db_session, runner=runner, config=RunnerConfig(max_retries=1),
+        anomaly_engine=AnomalyEngine(llm, gate=AnomalyGate()), history=RunHistoryStore(),
+    )
+    try:
+        result = await service.execute_endpoint(endpoint.id)
+    finally:
+        await runner.shutdown()
+
+    assert result.anomaly.gated and llm.calls == 0
+    record = (await db_session.execute(
+        AiTelemetryRecord.__table__.select().where(AiTelemetryRecord.endpoint_id == endpoint.id)
+    )).one()
+    assert record.outcome == OUTCOME_GATED and record.cost_usd == 0.0
+
+    stats = await AiTelemetryRepository(db_session).get_stats(test_org.id)
+    assert stats["calls_avoided"] == 1
+    assert stats["total_calls"] == 0
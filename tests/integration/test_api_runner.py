@@ -0,0 +1,412 @@
+"""API runner tests -- per-origin limits, phase timing, capped (and compressed) body reads, connection reuse and proxies."""
+import asyncio
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import allure
+import httpx
+import pytest
+
+from app.core.config import settings
+from app.monitoring.api_runner import (
+    DEFAULT_KEEPALIVE_SECONDS,
+    MAX_RESPONSE_BODY_BYTES,
+    ApiRunner,
+    RunnerConfig,
+    _PhaseTrace,
+    _environment_proxies,
+    keepalive_for_interval,
+)
+from app.monitoring.dns_cache import DnsCache
+from app.monitoring.origin_limiter import OriginLimits, origin_of
+from app.monitoring.performance_tracker import (
+    LATENCY_SOURCE_NETWORK,
+    LATENCY_SOURCE_SERVER,
+    PerformanceTracker,
+)
+
+pytestmark = [pytest.mark.regression]
+
+PROBE_DELAY_S = 0.05
+
+
+def _runner_with(handler) -> ApiRunner:  # noqa: ANN001
+    runner = ApiRunner()
+    runner._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return runner
+
+
+@allure.feature("API Runner")
+@allure.story("Probes to one origin are capped and queued, not failed")
+@allure.severity(allure.severity_level.CRITICAL)
+@allure.title("Origin concurrency cap holds and queue time is excluded from response_time_ms")
+@pytest.mark.asyncio
+async def test_origin_concurrency_excludes_queue_time():
+    running = 0
+    peak = 0
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(PROBE_DELAY_S)
+        running -= 1
+        return httpx.Response(200, json={"ok": True})
+
+    runner = _runner_with(handler)
+    limits = OriginLimits(max_concurrent=2, rate_per_second=0, burst=1)
+    try:
+        results = await asyncio.gather(*[
+            runner.execute(
+                url=f"https://api.customer.test/items/{i}",
+                method="GET",
+                expected_status=200,
+                config=RunnerConfig(max_retries=1),
+                limits=limits,
+                tenant="org-a",
+            )
+            for i in range(6)
+        ])
+    finally:
+        await runner.shutdown()
+
+    assert peak == 2
+    assert all(r.is_success for r in results)
+    # The last pair waited for two full rounds but only measured its own request.
+    assert max(r.queue_wait_ms for r in results) >= 2 * PROBE_DELAY_S * 1000 * 0.8
+    assert max(r.response_time_ms for r in results) < 2 * PROBE_DELAY_S * 1000
+
+
+@allure.feature("API Runner")
+@allure.story("Probes to one origin respect its rate limit")
+@allure.severity(allure.severity_level.NORMAL)
+@allure.title("Token bucket spaces probes to the configured rate")
+@pytest.mark.asyncio
+async def test_origin_rate_limit_spaces_probes():
+    async def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(204)
+
+    runner = _runner_with(handler)
+    limits = OriginLimits(max_concurrent=10, rate_per_second=20, burst=1)
+    start = time.perf_counter()
+    try:
+        results = await asyncio.gather(*[
+            runner.execute(
+                url="http://slow.customer.test/ping",
+                method="GET",
+                expected_status=204,
+                limits=limits,
+            )
+            for _ in range(5)
+        ])
+    finally:
+        await runner.shutdown()
+
+    # Burst of 1 then 4 more tokens at 20/s → at least ~200 ms in total.
+    assert time.perf_counter() - start >= 0.18
+    assert all(r.is_success for r in results)
+    assert runner.origin_stats["delayed_probes"] >= 4
+
+
+@allure.feature("API Runner")
+@allure.story("Origin limits resolve endpoint → organization → global")
+@allure.severity(allure.severity_level.NORMAL)
+@allure.title("OriginLimits.resolve applies endpoint and organization overrides")
+def test_origin_limits_resolution(monkeypatch):
+    monkeypatch.setattr(settings, "RUNNER_ORIGIN_ORG_LIMITS", {
+        "org-b": {"max_concurrent": 3, "rate_per_second": 2, "burst": 4},
+    })
+    assert OriginLimits.resolve() == OriginLimits(
+        max_concurrent=settings.RUNNER_ORIGIN_MAX_CONCURRENT,
+        rate_per_second=settings.RUNNER_ORIGIN_RATE_PER_SECOND,
+        burst=settings.RUNNER_ORIGIN_BURST,
+    )
+    assert OriginLimits.resolve("org-b") == OriginLimits(3, 2.0, 4)
+    assert OriginLimits.resolve(
+        "org-b", {"origin_max_concurrency": 1, "origin_rate_per_second": None}
+    ) == OriginLimits(1, 2.0, 4)
+
+    assert origin_of("https://API.example.com/v1?x=1") == "https://api.example.com:443"
+    assert origin_of("http://example.com:8080/") == "http://example.com:8080"
+
+
+@allure.feature("API Runner")
+@allure.story("Connection-setup latency is told apart from server latency")
+@allure.severity(allure.severity_level.NORMAL)
+@allure.title("A spike explained by DNS/TCP/TLS is attributed to the network, not flagged")
+def test_connection_setup_spike_is_network():
+    tracker = PerformanceTracker()
+    history = [100.0, 105.0, 95.0, 100.0, 102.0]
+
+    # Pool miss: +90 ms of handshake, server time unchanged.
+    cold = tracker.analyse(current_time_ms=190.0, historical_times=history, connection_ms=90.0, ttfb_ms=95.0)
+    assert cold.latency_source == LATENCY_SOURCE_NETWORK
+    assert cold.is_spike is False
+
+    # Same total, but the server was slow on a reused connection.
+    slow = tracker.analyse(current_time_ms=190.0, historical_times=history, connection_ms=0.0, ttfb_ms=185.0)
+    assert slow.latency_source == LATENCY_SOURCE_SERVER
+    assert slow.is_spike is True
+
+
+@allure.feature("API Runner")
+@allure.story("Trace hooks produce a phase breakdown")
+@allure.severity(allure.severity_level.NORMAL)
+@allure.title("_PhaseTrace turns httpcore trace events into phase durations")
+@pytest.mark.asyncio
+async def test_phase_trace_breakdown():
+    trace = _PhaseTrace()
+    for event in (
+        "connection.connect_tcp.started", "connection.connect_tcp.complete",
+        "connection.start_tls.started", "connection.start_tls.complete",
+        "http11.send_request_headers.started", "http11.receive_response_headers.complete",
+        "http11.receive_response_body.started", "http11.receive_response_body.complete",
+    ):
+        await trace(event, {})
+        await asyncio.sleep(0.002)
+
+    phases = trace.timings()
+    assert phases is not None
+    for value in (phases.connect_ms, phases.tls_ms, phases.ttfb_ms, phases.download_ms):
+        assert value is not None and value > 0
+    assert phases.dns_ms is None
+    assert phases.connection_ms == round(phases.connect_ms + phases.tls_ms, 2)
+    assert _PhaseTrace().timings() is None
+
+
+@allure.feature("API Runner")
+@allure.story("Response bodies are read under a hard byte budget")
+@allure.severity(allure.severity_level.CRITICAL)
+@allure.title("An oversized streamed body stops at the cap and is reported, not buffered")
+@pytest.mark.asyncio
+async def test_oversized_body_stops_at_cap():
+    chunk = b"x" * 64 * 1024
+    produced = 0
+
+    async def endless_body():
+        nonlocal produced
+        for _ in range(3200):  # would be 200 MB if fully read
+            produced += len(chunk)
+            yield chunk
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(
+            200, headers={"content-type": "application/json"}, content=endless_body()
+        )
+
+    runner = _runner_with(handler)
+    try:
+        result = await runner.execute(
+            url="https://huge.customer.test/dump", method="GET", expected_status=200,
+        )
+    finally:
+        await runner.shutdown()
+
+    assert result.is_success
+    assert result.body_truncated is True
+    assert result.response_body is None
+    assert MAX_RESPONSE_BODY_BYTES < result.body_bytes <= MAX_RESPONSE_BODY_BYTES + len(chunk)
+    assert produced <= MAX_RESPONSE_BODY_BYTES + 2 * len(chunk)
+    assert result.phases is not None and result.phases.download_ms is not None
+
+
+@allure.feature("API Runner")
+@allure.story("Response bodies are read under a hard byte budget")
+@allure.severity(allure.severity_level.NORMAL)
+@allure.title("A body within the cap is parsed and its size recorded")
+@pytest.mark.asyncio
+async def test_small_body_parsed_with_size():
+    async def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json={"items": [1, 2, 3]})
+
+    runner = _runner_with(handler)
+    try:
+        result = await runner.execute(
+            url="https://api.customer.test/items", method="GET", expected_status=200,
+        )
+    finally:
+        await runner.shutdown()
+
+    assert result.response_body == {"items": [1, 2, 3]}
+    assert result.body_truncated is False
+    assert result.body_bytes == len(b'{"items":[1,2,3]}')
+
+
+@allure.feature("API Runner")
+@allure.story("Response bodies are read under a hard byte budget")
+@allure.severity(allure.severity_level.CRITICAL)
+@allure.title("Compressed bodies are inflated against the cap, not in one piece")
+@pytest.mark.asyncio
+@pytest.mark.parametrize("wbits", [16 + zlib.MAX_WBITS, -zlib.MAX_WBITS])
+async def test_compressed_body_inflated_under_cap(wbits):
+    def compress(data: bytes) -> bytes:
+        obj = zlib.compressobj(9, zlib.DEFLATED, wbits)
+        return obj.compress(data) + obj.flush()
+
+    encoding = "gzip" if wbits > 0 else "deflate"
+    bomb = compress(b"0" * (50 * 1024 * 1024))  # ~50 KB on the wire, 50 MB inflated
+    small = compress(b'{"ok": true}')
+
+    async def streamed(body: bytes):
+        for i in range(0, len(body), 16 * 1024):
+            yield body[i:i + 16 * 1024]
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        body = bomb if request.url.path == "/bomb" else small
+        return httpx.Response(
+            200,
+            headers={"content-type": "application/json", "content-encoding": encoding},
+            content=streamed(body),
+        )
+
+    runner = _runner_with(handler)
+    try:
+        result = await runner.execute(
+            url="https://zip.customer.test/bomb", method="GET", expected_status=200,
+        )
+        ok = await runner.execute(
+            url="https://zip.customer.test/small", method="GET", expected_status=200,
+        )
+    finally:
+        await runner.shutdown()
+
+    assert len(bomb) < MAX_RESPONSE_BODY_BYTES
+    assert result.body_truncated is True and result.response_body is None
+    assert MAX_RESPONSE_BODY_BYTES < result.body_bytes <= MAX_RESPONSE_BODY_BYTES + 1
+    assert ok.response_body == {"ok": True} and ok.body_truncated is False
+
+
+class _KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):  # noqa: N802
+        body = b'{"ok": true}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):  # noqa: ANN002
+        pass
+
+
+@allure.feature("API Runner")
+@allure.story("Probe DNS answers are cached for their TTL")
+@allure.severity(allure.severity_level.NORMAL)
+@allure.title("DnsCache coalesces concurrent lookups and re-resolves after the TTL")
+@pytest.mark.asyncio
+async def test_dns_cache_ttl_and_coalescing(monkeypatch):
+    lookups = 0
+
+    async def fake_lookup(host):  # noqa: ANN001
+        nonlocal lookups
+        lookups += 1
+        await asyncio.sleep(0.01)
+        return ["203.0.113.7"], 0.05
+
+    cache = DnsCache()
+    monkeypatch.setattr(cache, "_lookup", fake_lookup)
+
+    results = await asyncio.gather(*[cache.resolve("api.customer.test") for _ in range(5)])
+    assert results == [["203.0.113.7"]] * 5
+    assert lookups == 1
+    assert await cache.resolve("api.customer.test") == ["203.0.113.7"]
+    assert lookups == 1
+
+    await asyncio.sleep(0.06)
+    await cache.resolve("api.customer.test")
+    assert lookups == 2
+    assert await cache.resolve("198.51.100.1") == ["198.51.100.1"]
+    assert lookups == 2
+    assert cache.stats()["misses"] == 2
+
+
+@allure.feature("API Runner")
+@allure.story("Connections stay warm across the probe interval")
+@allure.severity(allure.severity_level.NORMAL)
+@allure.title("Keep-alive expiry is chosen from the endpoint's monitoring interval")
+def test_keepalive_follows_interval(monkeypatch):
+    monkeypatch.setattr(settings, "RUNNER_WARM_KEEP_MAX_INTERVAL_SECONDS", 300)
+    assert keepalive_for_interval(None) == DEFAULT_KEEPALIVE_SECONDS
+    assert keepalive_for_interval(30) == 75.0
+    assert keepalive_for_interval(60) == 75.0
+    assert keepalive_for_interval(90) == 135.0
+    assert keepalive_for_interval(300) == 315.0
+    assert keepalive_for_interval(600) == DEFAULT_KEEPALIVE_SECONDS
+
+
+@allure.feature("API Runner")
+@allure.story("Connection reuse is measured")
+@allure.severity(allure.severity_level.NORMAL)
+@allure.title("A second probe reuses the pooled connection and skips DNS/connect")
+@pytest.mark.asyncio
+async def test_pool_reuse_counted():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _KeepAliveHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    url = f"http://localhost:{server.server_address[1]}/health"
+
+    runner = ApiRunner()
+    await runner.startup()
+    try:
+        first = await runner.execute(url=url, method="GET", expected_status=200, interval_seconds=60)
+        second = await runner.execute(url=url, method="GET", expected_status=200, interval_seconds=60)
+        stats = runner.connection_stats
+    finally:
+        await runner.shutdown()
+        server.shutdown()
+        server.server_close()
+
+    assert first.is_success and second.is_success
+    assert first.phases.dns_ms is not None and first.phases.connect_ms is not None
+    assert second.phases.dns_ms is None and second.phases.connect_ms is None
+    assert stats["pool_misses"] == 1
+    assert stats["pool_hits"] == 1
+    assert stats["clients"] == 2  # default client + the 75 s keep-alive tier
+
+
+class _ProxyHandler(_KeepAliveHandler):
+    seen: list[str] = []
+
+    def do_GET(self):  # noqa: N802
+        self.seen.append(self.path)
+        super().do_GET()
+
+
+@allure.feature("API Runner")
+@allure.story("Probes honour the egress proxy")
+@allure.severity(allure.severity_level.CRITICAL)
+@allure.title("With the DNS cache on, HTTP_PROXY still routes probes; NO_PROXY hosts bypass it")
+@pytest.mark.asyncio
+async def test_probes_use_environment_proxy(monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _ProxyHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    for name in ("HTTPS_PROXY", "https_proxy", "ALL_PROXY", "all_proxy", "NO_PROXY"):
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setenv("HTTP_PROXY", f"http://127.0.0.1:{server.server_address[1]}")
+    monkeypatch.setenv("no_proxy", "internal.customer.test,10.0.0.1")
+    monkeypatch.setattr(settings, "RUNNER_DNS_CACHE_ENABLED", True)
+
+    assert _environment_proxies() == {
+        "http://": f"http://127.0.0.1:{server.server_address[1]}",
+        "all://*internal.customer.test": None,
+        "all://10.0.0.1": None,
+    }
+    runner = ApiRunner()
+    await runner.startup()
+    try:
+        # Unresolvable name: only the proxy can answer it.
+        result = await runner.execute(
+            url="http://probe.customer.invalid/health", method="GET", expected_status=200,
+        )
+    finally:
+        await runner.shutdown()
+        server.shutdown()
+        server.server_close()
+
+    assert result.is_success and result.response_body == {"ok": True}
+    assert _ProxyHandler.seen == ["http://probe.customer.invalid/health"]
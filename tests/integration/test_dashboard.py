@@ -62,7 +62,6 @@ async def test_dashboard_stats_empty_org(client, owner_headers):
 @allure.severity(allure.severity_level.NORMAL)
 @allure.title("GET /dashboard/response-trends returns trend points")
 @pytest.mark.asyncio
-@pytest.mark.skip(reason="pg-only: date_trunc not available in SQLite")
 async def test_response_trends(client, owner_headers):
     """GET /api/v1/dashboard/response-trends returns trend points."""
     response = await client.get("/api/v1/dashboard/response-trends", headers=owner_headers)
@@ -42,6 +42,25 @@ async def test_create_endpoint(client, owner_headers):
         assert "id" in data
 
 
+@allure.feature("Endpoint Management")
+@allure.story("Create endpoint with adaptive interval bounds")
+@allure.severity(allure.severity_level.NORMAL)
+@allure.title("POST /endpoints/ stores min/max adaptive interval bounds")
+@pytest.mark.asyncio
+async def test_create_endpoint_with_interval_bounds(client, owner_headers):
+    """Adaptive scheduling bounds round-trip through the API."""
+    payload = endpoint_payload(
+        monitoring_interval_seconds=60,
+        min_interval_seconds=15,
+        max_interval_seconds=600,
+    )
+    response = await client.post("/api/v1/endpoints/", json=payload, headers=owner_headers)
+    assert response.status_code == 201
+    data = response.json()
+    assert data["min_interval_seconds"] == 15
+    assert data["max_interval_seconds"] == 600
+
+
 @allure.feature("Endpoint Management")
 @allure.story("Create endpoint with missing name")
 @allure.severity(allure.severity_level.NORMAL)
@@ -186,3 +205,36 @@ async def test_member_can_create_endpoint(client, member_headers):
     payload = endpoint_payload()
     response = await client.post("/api/v1/endpoints/", json=payload, headers=member_headers)
     assert response.status_code == 201
+
+
+@allure.feature("Endpoint Management")
+@allure.story("The local scheduler follows committed state only")
+@allure.severity(allure.severity_level.CRITICAL)
+@allure.title("Endpoint jobs are registered after the commit, never on a failed one")
+@pytest.mark.asyncio
+async def test_job_registered_after_commit(client, owner_headers, db_session, monkeypatch):
+    events: list[str] = []
+    commit = db_session.commit
+
+    async def failing_commit():
+        events.append("commit failed")
+        raise RuntimeError("commit failed")
+
+    async def recorded_commit():
+        events.append("commit")
+        await commit()
+
+    monkeypatch.setattr(
+        "app.api.v1.endpoints.monitor_scheduler.schedule_endpoint",
+        lambda *args, **kwargs: events.append("schedule"),
+    )
+    monkeypatch.setattr(db_session, "commit", failing_commit)
+    with pytest.raises(RuntimeError):
+        await client.post("/api/v1/endpoints/", json=endpoint_payload(), headers=owner_headers)
+    assert "schedule" not in events
+
+    events.clear()
+    monkeypatch.setattr(db_session, "commit", recorded_commit)
+    r = await client.post("/api/v1/endpoints/", json=endpoint_payload(), headers=owner_headers)
+    assert r.status_code == 201, r.text
+    assert events[:2] == ["commit", "schedule"]
@@ -0,0 +1,120 @@
+"""Latency histogram tests -- encoding, hourly persistence and percentile APIs."""
+import random
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import allure
+import pytest
+
+from app.models.api_endpoint import ApiEndpoint
+from app.models.latency_stats import EndpointLatencyHistogram
+from app.monitoring.latency_histograms import LatencyHistogramStore, bucket_start, merge_all
+from app.monitoring.pipeline_stats import LatencyHistogram
+from app.repositories.latency_stats import EndpointLatencyHistogramRepository
+
+from .conftest import TestSessionLocal
+from .factories import endpoint_payload, sla_payload
+
+pytestmark = [pytest.mark.regression]
+
+
+@allure.feature("Latency Histograms")
+@allure.story("Histograms are stored compactly")
+@allure.severity(allure.severity_level.NORMAL)
+@allure.title("Binary encoding round-trips exactly and stays small")
+def test_encoding_round_trip():
+    rng = random.Random(5)
+    hist = LatencyHistogram()
+    for _ in range(720):  # an hour of 5-second probes
+        hist.observe(rng.lognormvariate(5, 0.4))
+
+    data = hist.to_bytes()
+    restored = LatencyHistogram.from_bytes(data)
+    assert list(restored.counts) == list(hist.counts)
+    assert restored.summary() == hist.summary()
+    assert len(data) < 200
+    assert LatencyHistogram.from_bytes(LatencyHistogram().to_bytes()).count == 0
+
+
+@allure.feature("Latency Histograms")
+@allure.story("Windows are served by merging hourly buckets")
+@allure.severity(allure.severity_level.CRITICAL)
+@allure.title("Flushes merge into stored hours; windows include unflushed samples")
+@pytest.mark.asyncio
+async def test_flush_and_window(db_session, test_org):
+    endpoint = ApiEndpoint(
+        organization_id=test_org.id, name="Histogram API",
+        url="https://api.example.com/health",
+    )
+    db_session.add(endpoint)
+    await db_session.commit()
+
+    now = datetime.now(timezone.utc)
+    earlier = now - timedelta(hours=2)
+    store = LatencyHistogramStore(TestSessionLocal)
+    for ms in range(1, 101):
+        store.observe(endpoint.id, test_org.id, float(ms), at=earlier)
+    store.observe(endpoint.id, test_org.id, 50.0, at=now)
+    assert await store.flush() == 2
+    assert len(store) == 0
+
+    # A second flush into the same hour merges with the stored row.
+    store.observe(endpoint.id, test_org.id, 1000.0, at=earlier)
+    assert await store.flush() == 1
+    row = await db_session.get(EndpointLatencyHistogram, (endpoint.id, bucket_start(earlier)))
+    await db_session.refresh(row)
+    assert row.sample_count == 101
+
+    store.observe(endpoint.id, test_org.id, 70.0, at=now)  # still pending
+    repo = EndpointLatencyHistogramRepository(db_session)
+    hours = await store.window(repo, test_org.id, now - timedelta(hours=3))
+    assert list(hours) == [bucket_start(earlier), bucket_start(now)]
+    assert hours[bucket_start(now)].count == 2
+
+    window = merge_all(hours).summary()
+    assert window["count"] == 103
+    assert window["max"] == 1000.0
+    assert window["p50"] == pytest.approx(51, rel=0.1)
+    assert window["p99"] == pytest.approx(100, rel=0.1)
+
+    recent = await store.window(repo, test_org.id, now - timedelta(minutes=30))
+    assert list(recent) == [bucket_start(now)]
+
+
+@allure.feature("Latency Histograms")
+@allure.story("Dashboards and SLA reports show tail latency")
+@allure.severity(allure.severity_level.CRITICAL)
+@allure.title("Response trends and SLA latency report p95/p99 from histograms")
+@pytest.mark.asyncio
+async def test_percentile_endpoints(client, owner_headers, db_session, monkeypatch):
+    r = await client.post("/api/v1/endpoints/", json=endpoint_payload(), headers=owner_headers)
+    endpoint = r.json()
+    r = await client.post("/api/v1/sla/", json=sla_payload(endpoint["id"]), headers=owner_headers)
+    assert r.status_code == 201, r.text
+
+    store = LatencyHistogramStore(TestSessionLocal)
+    monkeypatch.setattr("app.api.v1.dashboard.latency_histograms", store)
+    monkeypatch.setattr("app.services.endpoint_sla.latency_histograms", store)
+    row = await db_session.get(ApiEndpoint, uuid.UUID(endpoint["id"]))
+    for ms in [100.0] * 95 + [2000.0] * 5:
+        store.observe(row.id, row.organization_id, ms)
+
+    r = await client.get("/api/v1/dashboard/response-trends", headers=owner_headers)
+    assert r.status_code == 200
+    (point,) = r.json()["points"]
+    assert point["request_count"] == 100
+    assert point["avg_response_time_ms"] == pytest.approx(195.0)
+    assert point["p50_response_time_ms"] == pytest.approx(100, rel=0.1)
+    assert point["p99_response_time_ms"] == pytest.approx(2000, rel=0.1)
+
+    r = await client.get(f"/api/v1/sla/{endpoint['id']}/latency", headers=owner_headers)
+    assert r.status_code == 200
+    data = r.json()
+    assert data["window"] == "24h" and data["sample_count"] == 100
+    assert data["p95_ms"] == pytest.approx(100, rel=0.1)
+    assert data["max_ms"] == 2000.0
+
+    r = await client.get(
+        f"/api/v1/sla/{endpoint['id']}/latency", params={"window": "1y"}, headers=owner_headers
+    )
+    assert r.status_code == 422
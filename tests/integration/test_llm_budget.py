@@ -0,0 +1,187 @@
+"""LLM budget tests -- per-org token buckets, no-queue denial, rules fallback and API."""
+import asyncio
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import allure
+import pytest
+
+from app.ai.llm_budget import LLMBudget, Prediction
+from app.ai.llm_client import CallTelemetry, LLMClient
+from app.models.ai_telemetry import OUTCOME_CALLED, OUTCOME_OVER_BUDGET, AiTelemetryRecord
+from app.models.api_endpoint import ApiEndpoint
+from app.monitoring.anomaly_batcher import AnomalyBatcher
+from app.monitoring.anomaly_engine import AnomalyEngine
+from .conftest import TestSessionLocal
+
+pytestmark = [pytest.mark.regression]
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _client(monkeypatch, budget: LLMBudget, release: asyncio.Event, tokens: int) -> LLMClient:
+    """Client whose API call blocks on ``release`` and bills ``tokens`` per call."""
+    llm = LLMClient(max_concurrent=1, max_queue=10, budget=budget)
+    llm._client = object()  # available without an API key
+
+    async def do_call(system_prompt: str, user_prompt: str):
+        await release.wait()
+        usage = {"prompt_tokens": tokens, "completion_tokens": 0, "total_tokens": tokens}
+        return {"anomaly_detected": True, "severity_score": 70}, usage
+
+    monkeypatch.setattr(llm, "_do_call", do_call)
+    return llm
+
+
+@allure.feature("LLM Budget")
+@allure.story("Each organization has a token and USD budget")
+@allure.severity(allure.severity_level.CRITICAL)
+@allure.title("Buckets deny over-budget calls, refill over time and settle actual usage")
+def test_token_and_usd_buckets():
+    clock = Clock()
+    org, big_org = uuid.uuid4(), uuid.uuid4()
+    budget = LLMBudget(
+        tokens_per_minute=1000, usd_per_day=0.01,
+        tenant_weights={str(big_org): 3.0}, clock=clock,
+    )
+    call = Prediction(tokens=400, cost_usd=0.001)
+
+    assert budget.try_acquire(org, call) and budget.try_acquire(org, call)
+    assert not budget.try_acquire(org, call)  # 200 tokens left
+    assert budget.try_acquire(big_org, call)  # other tenants are unaffected
+
+    clock.now += 12  # 1000/60 tokens a second → 200 more
+    assert budget.try_acquire(org, call)
+    budget.settle(org, call, CallTelemetry("gpt-4o-mini", total_tokens=100, cost_usd=0.0002))
+    budget.settle(org, call, None)  # failed before the API: full refund
+    assert budget.snapshot(org)["tokens_available"] == 700
+    assert budget.snapshot(org)["tokens_used"] == 100
+
+    # The USD bucket holds a day's budget and refills over the day.
+    pricey = Prediction(tokens=1, cost_usd=0.006)
+    clock.now += 60
+    assert budget.try_acquire(org, pricey)
+    clock.now += 60
+    assert not budget.try_acquire(org, pricey)
+    snapshot = budget.snapshot(org)
+    assert snapshot["usd_per_day"] == 0.01 and snapshot["denied_calls"] == 2
+    assert budget.snapshot(big_org)["tokens_per_minute"] == 3000
+
+
+@allure.feature("LLM Budget")
+@allure.story("A restart does not grant a fresh day's USD budget")
+@allure.severity(allure.severity_level.CRITICAL)
+@allure.title("Startup seeds each USD bucket from the last 24 hours of called spend")
+@pytest.mark.asyncio
+async def test_usd_buckets_seeded_from_telemetry(db_session, test_org):
+    endpoint = ApiEndpoint(
+        organization_id=test_org.id, name="Billing API", url="https://billing.example.com",
+    )
+    db_session.add(endpoint)
+    await db_session.flush()
+    now = datetime.now(timezone.utc)
+    for cost, outcome, age in (
+        (3.0, OUTCOME_CALLED, timedelta(hours=2)),
+        (0.5, OUTCOME_CALLED, timedelta(hours=23)),
+        (4.0, OUTCOME_CALLED, timedelta(hours=30)),  # outside the window
+        (9.0, OUTCOME_OVER_BUDGET, timedelta(hours=1)),  # never billed
+    ):
+        db_session.add(AiTelemetryRecord(
+            endpoint_id=endpoint.id, organization_id=test_org.id, model_name="gpt-4o-mini",
+            cost_usd=cost, outcome=outcome, created_at=now - age,
+        ))
+    await db_session.commit()
+
+    budget = LLMBudget(
+        tokens_per_minute=0, usd_per_day=5.0, clock=Clock(), factory=TestSessionLocal,
+    )
+    assert await budget.seed() == 1
+    assert budget.snapshot(test_org.id)["usd_available"] == 1.5
+    assert budget.snapshot(uuid.uuid4())["usd_available"] == 5.0  # no spend, full bucket
+    assert not budget.try_acquire(test_org.id, Prediction(tokens=1, cost_usd=2.0))
+    assert budget.try_acquire(test_org.id, Prediction(tokens=1, cost_usd=1.0))
+
+
+@allure.feature("LLM Budget")
+@allure.story("Over-budget organizations never wait for a slot")
+@allure.severity(allure.severity_level.CRITICAL)
+@allure.title("An over-budget call returns at once while other calls hold the slots")
+@pytest.mark.asyncio
+async def test_over_budget_call_is_not_queued(monkeypatch):
+    release = asyncio.Event()
+    org = uuid.uuid4()
+    budget = LLMBudget(tokens_per_minute=1000, usd_per_day=0, clock=Clock())
+    llm = _client(monkeypatch, budget, release, tokens=100)
+    prompt = "x" * 1600  # ~400 prompt + 250 completion tokens predicted
+
+    first = asyncio.create_task(
+        llm.analyse(system_prompt="sys", user_prompt=prompt, organization_id=org)
+    )
+    await asyncio.sleep(0)
+    denied = await asyncio.wait_for(
+        llm.analyse(system_prompt="sys", user_prompt=prompt, organization_id=org), timeout=1
+    )
+    assert denied.over_budget and denied.data is None and denied.telemetry is None
+    assert llm.metrics.queued == 0 and llm.metrics.budget_denied_calls == 1
+
+    release.set()
+    assert (await first).data is not None
+    # The reservation was settled against the 100 tokens actually used.
+    assert budget.snapshot(org)["tokens_available"] == 900
+
+
+@allure.feature("LLM Budget")
+@allure.story("Over-budget organizations get the rule-based analysis")
+@allure.severity(allure.severity_level.CRITICAL)
+@allure.title("Anomaly analysis degrades to rules once the org's budget is spent")
+@pytest.mark.asyncio
+async def test_engine_degrades_to_rules(monkeypatch):
+    release = asyncio.Event()
+    release.set()
+    org = uuid.uuid4()
+    budget = LLMBudget(tokens_per_minute=2000, usd_per_day=0, clock=Clock())
+    llm = _client(monkeypatch, budget, release, tokens=5000)  # far above the prediction
+    engine = AnomalyEngine(llm, batcher=AnomalyBatcher(window_ms=1))
+
+    async def analyse():
+        return await engine.analyse(
+            endpoint_name="Orders API", url="https://orders.example.com", method="GET",
+            expected_status=200, actual_status=503, response_time_ms=90.0, is_success=False,
+            error_message=None, performance=None, drift=None, failure_rate_percent=50.0,
+            organization_id=org,
+        )
+
+    first = await analyse()
+    assert first.ai_called and not first.over_budget
+
+    second = await analyse()
+    assert second.over_budget and second.used_fallback and not second.ai_called
+    assert second.anomaly_detected and second.telemetry is None
+    assert "budget" in second.skipped_reason
+    assert llm.metrics.total_calls == 1
+
+
+@allure.feature("LLM Budget")
+@allure.story("Budget state is visible in the AI telemetry API")
+@allure.severity(allure.severity_level.NORMAL)
+@allure.title("GET /ai-telemetry/budget returns the tenant's limits and usage")
+@pytest.mark.asyncio
+async def test_budget_endpoint(client, owner_headers, monkeypatch):
+    budget = LLMBudget(tokens_per_minute=20000, usd_per_day=5.0)
+    monkeypatch.setattr("app.ai.llm_client.llm_client.budget", budget)
+
+    r = await client.get("/api/v1/ai-telemetry/budget", headers=owner_headers)
+    assert r.status_code == 200, r.text
+    data = r.json()
+    assert data["enabled"] is True
+    assert data["tokens_per_minute"] == 20000 and data["tokens_available"] == 20000
+    assert data["usd_per_day"] == 5.0 and data["denied_calls"] == 0
+
+    r = await client.get("/api/v1/ai-telemetry/stats", headers=owner_headers)
+    assert r.json()["stats"]["budget_denied"] == 0
@@ -0,0 +1,76 @@
+"""LLM client tests -- per-call telemetry, concurrency cap and wait queue."""
+import asyncio
+
+import allure
+import pytest
+
+from app.ai.llm_client import LLMClient
+
+pytestmark = [pytest.mark.regression]
+
+
+def _client(monkeypatch, release: asyncio.Event, **limits) -> LLMClient:
+    """Client whose API call blocks on ``release`` and bills one token per prompt char."""
+    llm = LLMClient(**limits)
+    llm._client = object()  # available without an API key
+
+    async def do_call(system_prompt: str, user_prompt: str):
+        await release.wait()
+        tokens = len(user_prompt)
+        usage = {"prompt_tokens": tokens, "completion_tokens": 0, "total_tokens": tokens}
+        return {"echo": user_prompt}, usage
+
+    monkeypatch.setattr(llm, "_do_call", do_call)
+    return llm
+
+
+@allure.feature("LLM Client")
+@allure.story("Concurrent callers get their own telemetry")
+@allure.severity(allure.severity_level.CRITICAL)
+@allure.title("Each call returns its own result and token counts")
+@pytest.mark.asyncio
+async def test_per_call_telemetry(monkeypatch):
+    release = asyncio.Event()
+    llm = _client(monkeypatch, release, max_concurrent=8)
+    prompts = ["a" * n for n in (3, 50, 7, 400)]
+    calls = [
+        asyncio.create_task(llm.analyse(system_prompt="sys", user_prompt=p)) for p in prompts
+    ]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*calls)
+
+    for prompt, result in zip(prompts, results):
+        assert result.data == {"echo": prompt}
+        assert result.telemetry.success
+        assert result.telemetry.prompt_tokens == len(prompt)
+    assert llm.metrics.total_tokens_used == sum(map(len, prompts))
+
+
+@allure.feature("LLM Client")
+@allure.story("LLM calls are capped process-wide")
+@allure.severity(allure.severity_level.CRITICAL)
+@allure.title("Calls beyond the cap queue; calls beyond the queue are rejected")
+@pytest.mark.asyncio
+async def test_concurrency_cap_and_queue(monkeypatch):
+    release = asyncio.Event()
+    llm = _client(monkeypatch, release, max_concurrent=2, max_queue=1)
+    calls = [
+        asyncio.create_task(llm.analyse(system_prompt="sys", user_prompt=f"p{i}"))
+        for i in range(4)
+    ]
+    for _ in range(3):
+        await asyncio.sleep(0)
+
+    metrics = llm.metrics.to_dict()
+    assert metrics["in_flight"] == 2 and metrics["queued"] == 1
+    rejected = await calls[3]
+    assert rejected.data is None and rejected.telemetry is None
+    assert llm.metrics.rejected_calls == 1
+
+    release.set()
+    results = await asyncio.gather(*calls[:3])
+    assert [r.data["echo"] for r in results] == ["p0", "p1", "p2"]
+    assert llm.metrics.in_flight == 0 and llm.metrics.queued == 0
+    assert llm.metrics.peak_queued == 1
+    assert llm.metrics.successful_calls == 3
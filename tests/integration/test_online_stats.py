@@ -0,0 +1,205 @@
+"""Online stats tests -- streaming estimators, seasonality, persistence and the pipeline baseline."""
+import random
+import statistics
+from datetime import datetime, timedelta, timezone
+
+import allure
+import httpx
+import pytest
+
+from app.models.api_endpoint import ApiEndpoint
+from app.models.api_run import ApiRun
+from app.models.latency_stats import EndpointLatencyStats
+from app.monitoring.api_runner import ApiRunner, RunnerConfig
+from app.monitoring.online_stats import (
+    EndpointStats,
+    Ewma,
+    OnlineStatsStore,
+    P2Quantile,
+    Welford,
+    slot_of,
+)
+from app.monitoring.performance_tracker import (
+    BASELINE_SEASONAL,
+    BASELINE_STREAMING,
+    PerformanceTracker,
+)
+from app.monitoring.runner_service import RunnerService
+
+from .conftest import TestSessionLocal
+
+pytestmark = [pytest.mark.regression]
+
+MONDAY = 1_700_438_400  # 2023-11-20 00:00 UTC
+WEEK = 7 * 86400
+
+
+@allure.feature("Online Stats")
+@allure.story("Baselines are maintained in O(1) per sample")
+@allure.severity(allure.severity_level.CRITICAL)
+@allure.title("Welford, EWMA and P² agree with exact statistics")
+def test_streaming_estimators():
+    rng = random.Random(11)
+    samples = [rng.lognormvariate(4, 0.5) for _ in range(10_000)]
+
+    welford = Welford()
+    median, p95 = P2Quantile(0.5), P2Quantile(0.95)
+    for x in samples:
+        welford.add(x)
+        median.add(x)
+        p95.add(x)
+    ordered = sorted(samples)
+    assert welford.mean == pytest.approx(statistics.mean(samples))
+    assert welford.stddev == pytest.approx(statistics.stdev(samples))
+    assert median.value == pytest.approx(ordered[5000], rel=0.03)
+    assert p95.value == pytest.approx(ordered[9500], rel=0.03)
+
+    ewma = Ewma(alpha=0.5)
+    for x in (10.0, 20.0, 30.0):
+        ewma.add(x)
+    assert ewma.mean == 22.5  # 10 → 15 → 22.5
+    assert ewma.var == pytest.approx(0.5 * (25 + 15 * 7.5))  # 0 → 25 → 68.75
+
+    # Below five samples the quantile is exact.
+    small = P2Quantile(0.5)
+    for x in (5.0, 1.0, 3.0):
+        small.add(x)
+    assert small.value == 3.0
+
+
+@allure.feature("Online Stats")
+@allure.story("State survives restarts")
+@allure.severity(allure.severity_level.NORMAL)
+@allure.title("Serialized state resumes exactly where it left off")
+def test_state_round_trip():
+    rng = random.Random(3)
+    original = EndpointStats(alpha=0.1, seasonal_alpha=0.05)
+    original.seed((MONDAY + 300 * i, rng.uniform(50, 150)) for i in range(200))
+
+    restored = EndpointStats.from_state(original.to_state(), alpha=0.1, seasonal_alpha=0.05)
+    for x in (80.0, 400.0, 95.0):
+        original.add(x, MONDAY)
+        restored.add(x, MONDAY)
+    assert restored.to_state() == original.to_state()
+    assert restored.count == 203
+    assert restored.seasonal.counts[0] == 12 + 3
+    assert EndpointStats.from_state({"v": 0}, alpha=0.1).count == 0
+
+
+@allure.feature("Online Stats")
+@allure.story("Business-hours load is expected, not a spike")
+@allure.severity(allure.severity_level.CRITICAL)
+@allure.title("Spikes are measured against the hour-of-week slot")
+def test_seasonal_baseline():
+    # Four weeks of 5-minute probes: 300 ms from 09:00 to 17:00 UTC on
+    # weekdays, 100 ms otherwise.
+    def latency(ts: float) -> float:
+        hour, weekday = (ts // 3600) % 24, ((ts - MONDAY) // 86400) % 7
+        return 300.0 if weekday < 5 and 9 <= hour < 17 else 100.0
+
+    stats = EndpointStats(alpha=0.1, seasonal_alpha=0.05)
+    stats.seed((ts, latency(ts)) for ts in range(MONDAY, MONDAY + 4 * WEEK, 300))
+    tracker = PerformanceTracker()
+
+    monday_9am = MONDAY + 4 * WEEK + 9 * 3600
+    busy = tracker.analyse(current_time_ms=310.0, historical_times=[], baseline=stats, at=monday_9am)
+    assert busy.baseline == BASELINE_SEASONAL
+    assert busy.seasonal_slot == 9
+    assert busy.rolling_avg_ms == pytest.approx(300.0)
+    assert not busy.is_spike
+
+    # The same latency at night is a spike.
+    night = tracker.analyse(
+        current_time_ms=310.0, historical_times=[], baseline=stats, at=monday_9am - 6 * 3600
+    )
+    assert night.baseline == BASELINE_SEASONAL and night.is_critical_spike
+
+    # Slots without enough samples fall back to the streaming EWMA.
+    fresh = EndpointStats(alpha=0.1)
+    fresh.seed((MONDAY + i, 100.0) for i in range(3))
+    result = tracker.analyse(current_time_ms=100.0, historical_times=[], baseline=fresh, at=MONDAY)
+    assert result.baseline == BASELINE_STREAMING and result.seasonal_slot is None
+
+
+@allure.feature("Online Stats")
+@allure.story("Spike detection uses the streaming baseline")
+@allure.severity(allure.severity_level.CRITICAL)
+@allure.title("Pipeline runs update the baseline, which is persisted and reloaded")
+@pytest.mark.asyncio
+async def test_pipeline_baseline_persists(db_session, test_org):
+    endpoint = ApiEndpoint(
+        organization_id=test_org.id, name="Baseline API",
+        url="https://api.example.com/health", monitoring_interval_seconds=3600,
+    )
+    db_session.add(endpoint)
+    await db_session.flush()
+    for latency in (100.0, 110.0, 90.0, 105.0):
+        db_session.add(ApiRun(
+            endpoint_id=endpoint.id, organization_id=test_org.id,
+            status_code=200, response_time_ms=latency, is_success=True,
+        ))
+    await db_session.commit()
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json={"status": "ok"})
+
+    runner = ApiRunner()
+    runner._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    store = OnlineStatsStore(TestSessionLocal)
+    service = RunnerService(
+        session=db_session, runner=runner, config=RunnerConfig(max_retries=1),
+        baselines=store,
+    )
+    try:
+        first = await service.execute_endpoint(endpoint.id)
+        second = await service.execute_endpoint(endpoint.id)
+    finally:
+        await runner.shutdown()
+
+    assert first.performance.baseline == BASELINE_STREAMING
+    assert first.performance.sample_size == 4  # seeded from run history
+    assert second.performance.sample_size == 5
+    assert second.performance.lifetime_avg_ms is not None
+    assert store.get(endpoint.id).dirty
+
+    assert await store.flush() == 1
+    assert not store.get(endpoint.id).dirty
+    row = await db_session.get(EndpointLatencyStats, endpoint.id)
+    await db_session.refresh(row)
+    assert row.sample_count == 6
+
+    reloaded = OnlineStatsStore(TestSessionLocal)
+    async with TestSessionLocal() as session:
+        assert await reloaded.load(session) >= 1
+    assert reloaded.get(endpoint.id).to_state() == store.get(endpoint.id).to_state()
+
+
+@allure.feature("Online Stats")
+@allure.story("Baselines are precomputed from history")
+@allure.severity(allure.severity_level.NORMAL)
+@allure.title("Backfill seeds unseeded endpoints, hour-of-week profile included")
+@pytest.mark.asyncio
+async def test_backfill_from_history(db_session, test_org):
+    endpoint = ApiEndpoint(
+        organization_id=test_org.id, name="Seasonal API",
+        url="https://api.example.com/health",
+    )
+    db_session.add(endpoint)
+    await db_session.flush()
+    now = datetime.now(timezone.utc)
+    for days_ago in (7, 14, 21):  # same hour of the week
+        db_session.add(ApiRun(
+            endpoint_id=endpoint.id, organization_id=test_org.id, status_code=200,
+            response_time_ms=120.0, is_success=True,
+            created_at=now - timedelta(days=days_ago),
+        ))
+    await db_session.commit()
+
+    store = OnlineStatsStore(TestSessionLocal)
+    async with TestSessionLocal() as session:
+        assert await store.backfill(session) == 1
+        assert await store.backfill(session) == 0
+    stats = store.get(endpoint.id)
+    assert stats.count == 3 and stats.dirty
+    assert stats.seasonal.counts[slot_of(now.timestamp())] == 3
+    assert store.stats()["seeded_from_history"] == 1
@@ -0,0 +1,126 @@
+"""Result writer tests -- batched write-behind of pipeline rows."""
+import asyncio
+
+import allure
+import httpx
+import pytest
+from sqlalchemy import func, select
+
+from app.models.api_endpoint import ApiEndpoint
+from app.models.api_run import ApiRun
+from app.models.risk_score import RiskScore
+from app.models.security_finding import SecurityFinding
+from app.monitoring.api_runner import ApiRunner, RunnerConfig
+from app.monitoring.result_writer import ResultWriter, prepare
+from app.monitoring.runner_service import RunnerService
+
+from .conftest import TestSessionLocal
+
+pytestmark = [pytest.mark.regression]
+
+
+async def _endpoint(db_session, org) -> ApiEndpoint:  # noqa: ANN001
+    endpoint = ApiEndpoint(
+        organization_id=org.id, name="Bulk API",
+        url="https://api.example.com/health", monitoring_interval_seconds=3600,
+    )
+    db_session.add(endpoint)
+    await db_session.commit()
+    return endpoint
+
+
+def _run_rows(endpoint: ApiEndpoint, run_id=None) -> list:  # noqa: ANN001
+    run = ApiRun(
+        id=run_id, endpoint_id=endpoint.id, organization_id=endpoint.organization_id,
+        status_code=200, response_time_ms=42.0, is_success=True,
+    )
+    prepare(run)
+    return [
+        run,
+        SecurityFinding(
+            api_run_id=run.id, endpoint_id=endpoint.id,
+            organization_id=endpoint.organization_id, finding_type="api_key",
+            pattern_name="generic", field_path="$.key", severity="HIGH",
+            redacted_preview="sk-****",
+        ),
+        RiskScore(api_run_id=run.id, calculated_score=10.0, risk_level="LOW"),
+    ]
+
+
+@allure.feature("Result Writer")
+@allure.story("Concurrent runs are written in one batch")
+@allure.severity(allure.severity_level.CRITICAL)
+@allure.title("Submissions from many runs share one flush and all resolve")
+@pytest.mark.asyncio
+async def test_concurrent_submissions_share_a_batch(db_session, test_org):
+    endpoint = await _endpoint(db_session, test_org)
+    writer = ResultWriter(TestSessionLocal)
+
+    futures = [writer.submit(_run_rows(endpoint)) for _ in range(25)]
+    try:
+        await asyncio.wait_for(asyncio.gather(*futures), timeout=5)
+    finally:
+        await writer.shutdown()
+
+    stats = writer.stats()
+    assert stats["batches"] == 1
+    assert stats["rows_written"] == 75
+    runs = await db_session.scalar(
+        select(func.count()).select_from(ApiRun).where(ApiRun.endpoint_id == endpoint.id)
+    )
+    scores = await db_session.scalar(select(func.count()).select_from(RiskScore))
+    assert runs == 25 and scores == 25
+
+
+@allure.feature("Result Writer")
+@allure.story("A bad run does not drop the rest of its batch")
+@allure.severity(allure.severity_level.NORMAL)
+@allure.title("A failing submission is isolated and reported on its own future")
+@pytest.mark.asyncio
+async def test_failed_submission_is_isolated(db_session, test_org):
+    endpoint = await _endpoint(db_session, test_org)
+    writer = ResultWriter(TestSessionLocal)
+
+    rows = _run_rows(endpoint)
+    good = writer.submit(rows)
+    bad = writer.submit(_run_rows(endpoint, run_id=rows[0].id))  # duplicate primary key
+    await writer.flush()
+
+    assert good.done() and good.exception() is None
+    assert bad.done() and bad.exception() is not None
+    assert writer.stats()["failed_submissions"] == 1
+    runs = await db_session.scalar(
+        select(func.count()).select_from(ApiRun).where(ApiRun.endpoint_id == endpoint.id)
+    )
+    assert runs == 1
+
+
+@allure.feature("Result Writer")
+@allure.story("The pipeline can hand its rows to the writer")
+@allure.severity(allure.severity_level.NORMAL)
+@allure.title("Pipeline rows handed to the writer are committed by its flush")
+@pytest.mark.asyncio
+async def test_pipeline_rows_go_through_writer(db_session, test_org):
+    endpoint = await _endpoint(db_session, test_org)
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json={"status": "ok"})
+
+    runner = ApiRunner()
+    runner._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    writer = ResultWriter(TestSessionLocal)
+    service = RunnerService(
+        session=db_session, runner=runner, config=RunnerConfig(max_retries=1), writer=writer,
+    )
+    try:
+        pipeline = await service.execute_endpoint(endpoint.id)
+    finally:
+        await writer.shutdown()
+        await runner.shutdown()
+
+    assert pipeline.persisted is not None and pipeline.persisted.done()
+    assert await db_session.get(ApiRun, pipeline.run.id) is not None
+    score = await db_session.scalar(
+        select(RiskScore).where(RiskScore.api_run_id == pipeline.run.id)
+    )
+    assert score is not None and score.risk_level == pipeline.risk.risk_level
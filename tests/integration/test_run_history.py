@@ -0,0 +1,175 @@
+"""Run history tests -- in-memory ring buffer, warm-up and pipeline reads."""
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import allure
+import httpx
+import pytest
+from sqlalchemy import event
+
+from app.models.api_endpoint import ApiEndpoint
+from app.models.api_run import ApiRun
+from app.monitoring.api_runner import ApiRunner, RunnerConfig
+from app.monitoring.run_history import EndpointHistory, RunHistoryStore
+from app.monitoring.runner_service import RunnerService
+from app.repositories.api_run import ApiRunRepository
+
+from .conftest import test_engine
+
+pytestmark = [pytest.mark.regression]
+
+
+async def _seed_endpoint(db_session, org, outcomes) -> ApiEndpoint:  # noqa: ANN001
+    """Endpoint with one run per (minutes_ago, latency, success), oldest first."""
+    endpoint = ApiEndpoint(
+        organization_id=org.id, name="History API", url="https://api.example.com/health",
+        monitoring_interval_seconds=3600,  # default client → the injected mock
+    )
+    db_session.add(endpoint)
+    await db_session.flush()
+    now = datetime.now(timezone.utc)
+    for minutes_ago, latency, success in outcomes:
+        db_session.add(ApiRun(
+            endpoint_id=endpoint.id,
+            organization_id=org.id,
+            status_code=200 if success else 500,
+            response_time_ms=latency,
+            is_success=success,
+            created_at=now - timedelta(minutes=minutes_ago),
+        ))
+    await db_session.flush()
+    return endpoint
+
+
+@allure.feature("Run History")
+@allure.story("Rolling state is kept in memory per endpoint")
+@allure.severity(allure.severity_level.NORMAL)
+@allure.title("Ring keeps the newest runs, failure rate and success streak")
+def test_endpoint_history_ring():
+    history = EndpointHistory(capacity=4)
+    now = time.time()
+    for i, (latency, success) in enumerate([
+        (100.0, True), (None, False), (120.0, True), (130.0, True), (140.0, True), (150.0, True),
+    ]):
+        history.record(now + i, latency, success)
+
+    # Capacity 4: the two oldest runs have been overwritten.
+    assert history.recent_times(10) == [150.0, 140.0, 130.0, 120.0]
+    assert history.recent_times(2) == [150.0, 140.0]
+    assert history.failure_rate() == round(1 / 6 * 100, 2)
+    assert history.streak == 4
+
+    history.record(now + 10, None, False)
+    assert history.streak == 0
+    # Outcomes older than 24h never count.
+    history.count(now - 25 * 3600, False)
+    assert history.failure_rate() == round(2 / 7 * 100, 2)
+
+
+@allure.feature("Run History")
+@allure.story("History is warmed from the database in bulk")
+@allure.severity(allure.severity_level.CRITICAL)
+@allure.title("Warm-up reproduces the per-run history queries")
+@pytest.mark.asyncio
+async def test_history_load_matches_queries(db_session, test_org):
+    endpoint = await _seed_endpoint(db_session, test_org, [
+        (26 * 60, 90.0, False),  # outside the 24h window
+        (50, 100.0, True),
+        (40, None, False),
+        (30, 110.0, True),
+        (20, 120.0, True),
+        (10, 130.0, True),
+    ])
+    repo = ApiRunRepository(db_session)
+    store = RunHistoryStore()
+
+    assert await store.load(repo) == 1
+    history = store.get(endpoint.id)
+    assert history is not None
+    assert history.recent_times(20) == await repo.get_recent_times(endpoint.id, limit=20)
+    assert history.failure_rate() == await repo.get_failure_rate(endpoint.id)
+    assert history.streak == 3
+
+
+@allure.feature("Run History")
+@allure.story("The pipeline reads history without querying run rows")
+@allure.severity(allure.severity_level.CRITICAL)
+@allure.title("Pipeline runs after warm-up issue no history queries against api_runs")
+@pytest.mark.asyncio
+async def test_pipeline_uses_memory_history(db_session, test_org):
+    endpoint = await _seed_endpoint(db_session, test_org, [
+        (30, 100.0, True), (20, 105.0, True), (10, 95.0, False),
+    ])
+    store = RunHistoryStore()
+    await store.load(ApiRunRepository(db_session))
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json={"status": "ok"})
+
+    runner = ApiRunner()
+    runner._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    service = RunnerService(
+        session=db_session, runner=runner,
+        config=RunnerConfig(max_retries=1), history=store,
+    )
+
+    statements: list[str] = []
+
+    def capture(conn, cursor, statement, *args):  # noqa: ANN001, ANN002
+        statements.append(statement)
+
+    event.listen(test_engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        first = await service.execute_endpoint(endpoint.id)
+        second = await service.execute_endpoint(endpoint.id)
+    finally:
+        event.remove(test_engine.sync_engine, "before_cursor_execute", capture)
+        await runner.shutdown()
+
+    history_reads = [
+        s for s in statements if s.lstrip().upper().startswith("SELECT") and "FROM api_runs" in s
+    ]
+    assert any(s.startswith("INSERT INTO api_runs") for s in statements)  # listener is live
+    assert history_reads == []
+    assert first.performance.sample_size == 3
+    assert second.performance.sample_size == 4
+    assert store.get(endpoint.id).failure_rate() == 20.0
+    assert store.get(endpoint.id).streak == 2
+    assert store.get(uuid.uuid4()) is None
+
+
+@allure.feature("Run History")
+@allure.story("History is warmed from the database in bulk")
+@allure.severity(allure.severity_level.NORMAL)
+@allure.title("Outcome counts land in the fixed-width bucket of each run's timestamp")
+@pytest.mark.asyncio
+async def test_outcome_counts_bucket_index(db_session, test_org):
+    bucket = timedelta(minutes=15)
+    now = datetime.now(timezone.utc)
+    since = datetime.fromtimestamp(
+        (int(now.timestamp() // 900) - 3) * 900, tz=timezone.utc
+    )
+    endpoint = await _seed_endpoint(db_session, test_org, [])
+    for offset, success in (
+        (timedelta(minutes=-1), False),  # before the window
+        (timedelta(0), True),  # first second of bucket 0
+        (timedelta(minutes=14, seconds=59), False),
+        (timedelta(minutes=15), True),  # bucket 1 boundary
+        (timedelta(minutes=47), False),
+    ):
+        db_session.add(ApiRun(
+            endpoint_id=endpoint.id, organization_id=test_org.id,
+            status_code=200 if success else 500, is_success=success,
+            created_at=since + offset,
+        ))
+    await db_session.flush()
+
+    counts = await ApiRunRepository(db_session).get_outcome_counts(
+        [endpoint.id], since=since, bucket=bucket, buckets=4,
+    )
+    assert sorted(counts) == [
+        (endpoint.id, 0, 2, 1),
+        (endpoint.id, 1, 1, 0),
+        (endpoint.id, 3, 1, 1),
+    ]
@@ -0,0 +1,515 @@
+"""Scheduler tests -- status, sharding, fair admission, phase spread, job registration and job DB usage."""
+import asyncio
+import uuid
+from datetime import datetime, timezone
+
+import allure
+import httpx
+import pytest
+from sqlalchemy import event, select
+
+from app.alerts import dispatcher
+from app.alerts.webhook import webhook_client
+from app.core.config import settings
+from app.models.alert_rule import AlertRule
+from app.models.api_endpoint import ApiEndpoint
+from app.models.endpoint_sla import EndpointSLA
+from app.models.incident import Incident
+from app.monitoring.api_runner import ApiRunner
+from app.monitoring.result_writer import ResultWriter
+from app.scheduler import jobs
+from app.scheduler.adaptive import AdaptiveState, IntervalBounds
+from app.scheduler.engine import MonitorScheduler
+from app.scheduler.limiter import PipelineLimiter
+from app.scheduler.sharding import owner_of
+from app.scheduler.spread import PhasedIntervalTrigger, phase_offset
+
+from .conftest import TestSessionLocal, test_engine
+from .factories import endpoint_payload
+
+pytestmark = [pytest.mark.regression]
+
+
+@allure.feature("Scheduler")
+@allure.story("Status reports disabled scheduler")
+@allure.severity(allure.severity_level.NORMAL)
+@allure.title("GET /scheduler/status returns not-running state with sharding block")
+@pytest.mark.asyncio
+async def test_scheduler_status_disabled(client, owner_headers):
+    """GET /api/v1/scheduler/status works when the scheduler is disabled."""
+    response = await client.get("/api/v1/scheduler/status", headers=owner_headers)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["running"] is False
+    assert data["job_count"] == 0
+    assert data["sharding"] == {"enabled": False}
+
+
+@allure.feature("Scheduler")
+@allure.story("Status requires authentication")
+@allure.severity(allure.severity_level.NORMAL)
+@allure.title("GET /scheduler/status requires authentication")
+@pytest.mark.asyncio
+async def test_scheduler_status_unauthenticated(client):
+    """Scheduler status requires authentication."""
+    response = await client.get("/api/v1/scheduler/status")
+    assert response.status_code in (401, 403)
+
+
+@allure.feature("Scheduler")
+@allure.story("Shard ownership is stable and rebalances minimally")
+@allure.severity(allure.severity_level.NORMAL)
+@allure.title("Adding a worker only moves endpoints onto the new worker")
+def test_shard_rebalance_is_minimal():
+    """Rendezvous hashing moves only the endpoints the new worker gains."""
+    endpoints = [str(uuid.uuid4()) for _ in range(2000)]
+    before = {ep: owner_of(ep, ["w-a", "w-b", "w-c"]) for ep in endpoints}
+    after = {ep: owner_of(ep, ["w-a", "w-b", "w-c", "w-d"]) for ep in endpoints}
+
+    moved = [ep for ep in endpoints if before[ep] != after[ep]]
+    assert all(after[ep] == "w-d" for ep in moved)
+    # Roughly a quarter of the endpoints should move to the new worker.
+    assert 350 < len(moved) < 650
+
+    # Every worker gets a reasonable share.
+    counts = {w: list(after.values()).count(w) for w in ("w-a", "w-b", "w-c", "w-d")}
+    assert min(counts.values()) > 350
+
+
+@allure.feature("Scheduler")
+@allure.story("No workers means no owner")
+@allure.severity(allure.severity_level.MINOR)
+@allure.title("owner_of returns None for an empty worker list")
+def test_shard_owner_empty():
+    assert owner_of(str(uuid.uuid4()), []) is None
+
+
+@allure.feature("Scheduler")
+@allure.story("Status exposes pipeline concurrency metrics")
+@allure.severity(allure.severity_level.NORMAL)
+@allure.title("GET /scheduler/status includes the pipeline limiter snapshot")
+@pytest.mark.asyncio
+async def test_scheduler_status_pipeline_metrics(client, owner_headers):
+    """Scheduler status reports queue depth, wait time and lag."""
+    response = await client.get("/api/v1/scheduler/status", headers=owner_headers)
+    pipeline = response.json()["pipeline"]
+    for key in ("in_flight", "queue_depth", "rejected", "queue_wait_ms", "scheduling_lag_ms"):
+        assert key in pipeline
+    assert set(pipeline["scheduling_lag_ms"]) == {"avg", "p95", "max"}
+
+
+@allure.feature("Scheduler")
+@allure.story("Pipeline limiter caps concurrency and bounds the queue")
+@allure.severity(allure.severity_level.CRITICAL)
+@allure.title("PipelineLimiter never exceeds its cap and drops ticks when full")
+@pytest.mark.asyncio
+async def test_pipeline_limiter_caps_concurrency():
+    limiter = PipelineLimiter(max_concurrent=3, max_queue=5)
+    running = 0
+    peak = 0
+    gate = asyncio.Event()
+
+    async def pipeline(i: int) -> bool:
+        nonlocal running, peak
+        async with limiter.slot(f"monitor_{i}") as admitted:
+            if not admitted:
+                return False
+            running += 1
+            peak = max(peak, running)
+            await gate.wait()
+            running -= 1
+            return True
+
+    tasks = [asyncio.create_task(pipeline(i)) for i in range(10)]
+    await asyncio.sleep(0.01)
+    assert limiter.in_flight == 3
+    assert limiter.queue_depth == 5
+
+    gate.set()
+    results = await asyncio.gather(*tasks)
+    assert results.count(True) == 8
+    assert results.count(False) == 2
+    assert peak == 3
+    snap = limiter.snapshot()
+    assert snap["in_flight"] == 0
+    assert snap["queue_depth"] == 0
+    assert snap["rejected"] == 2
+
+
+async def _run_tenants(limiter: PipelineLimiter, tenants: list[str]) -> list[str]:
+    """Queue one pipeline per entry behind a blocker; return tenants in start order."""
+    started: list[str] = []
+    gate = asyncio.Event()
+
+    async def pipeline(tenant: str) -> None:
+        async with limiter.slot(None, tenant) as admitted:
+            if admitted:
+                started.append(tenant)
+                await gate.wait() if tenant == "blocker" else await asyncio.sleep(0)
+
+    blocker = asyncio.create_task(pipeline("blocker"))
+    await asyncio.sleep(0)
+    tasks = [asyncio.create_task(pipeline(t)) for t in tenants]
+    await asyncio.sleep(0)
+    gate.set()
+    await asyncio.gather(blocker, *tasks)
+    return started[1:]
+
+
+@allure.feature("Scheduler")
+@allure.story("Pipeline slots are shared fairly between organizations")
+@allure.severity(allure.severity_level.CRITICAL)
+@allure.title("A quiet tenant is not starved by a tenant with a deep backlog")
+@pytest.mark.asyncio
+async def test_pipeline_limiter_tenant_fairness():
+    limiter = PipelineLimiter(max_concurrent=1, max_queue=100, tenant_weights={})
+    order = await _run_tenants(limiter, ["noisy"] * 20 + ["quiet"] * 2)
+    # FIFO would start the quiet tenant last; fair queueing interleaves it.
+    assert [i for i, t in enumerate(order) if t == "quiet"] == [1, 3]
+
+    snap = limiter.snapshot("quiet")
+    assert snap["tenant"]["admitted"] == 2
+    assert snap["tenant"]["queue_depth"] == 0
+
+
+@allure.feature("Scheduler")
+@allure.story("Tenant weights set throughput shares")
+@allure.severity(allure.severity_level.NORMAL)
+@allure.title("A weight-3 tenant gets three times the dispatches of a weight-1 tenant")
+@pytest.mark.asyncio
+async def test_pipeline_limiter_tenant_weights():
+    limiter = PipelineLimiter(max_concurrent=1, max_queue=100, tenant_weights={"gold": 3.0})
+    order = await _run_tenants(limiter, ["gold"] * 40 + ["basic"] * 40)
+    first = order[:20]
+    assert first.count("gold") == 15
+    assert first.count("basic") == 5
+
+
+@allure.feature("Scheduler")
+@allure.story("A full queue drops the noisiest tenant's tick")
+@allure.severity(allure.severity_level.NORMAL)
+@allure.title("Queue overflow evicts from the longest tenant queue")
+@pytest.mark.asyncio
+async def test_pipeline_limiter_evicts_longest_tenant_queue():
+    limiter = PipelineLimiter(max_concurrent=1, max_queue=3, tenant_weights={})
+    order = await _run_tenants(limiter, ["noisy"] * 3 + ["quiet"])
+    assert order.count("quiet") == 1
+    assert order.count("noisy") == 2
+    assert limiter.snapshot("noisy")["tenant"]["rejected"] == 1
+    assert limiter.snapshot()["rejected"] == 1
+
+
+@allure.feature("Scheduler")
+@allure.story("Status exposes the caller's tenant queue share")
+@allure.severity(allure.severity_level.NORMAL)
+@allure.title("GET /scheduler/status includes the caller organization's pipeline share")
+@pytest.mark.asyncio
+async def test_scheduler_status_tenant_share(client, owner_headers):
+    response = await client.get("/api/v1/scheduler/status", headers=owner_headers)
+    tenant = response.json()["pipeline"]["tenant"]
+    for key in ("weight", "in_flight", "queue_depth", "admitted", "rejected", "queue_wait_ms"):
+        assert key in tenant
+
+
+@allure.feature("Scheduler")
+@allure.story("Spread triggers fire on a stable per-endpoint phase")
+@allure.severity(allure.severity_level.NORMAL)
+@allure.title("PhasedIntervalTrigger keeps its slot and jitter does not accumulate")
+def test_phased_trigger_keeps_slot_under_jitter():
+    endpoint_id = str(uuid.uuid4())
+    phase = phase_offset(endpoint_id, 60)
+    assert 0 <= phase < 60
+    assert phase == phase_offset(endpoint_id, 60)
+
+    trigger = PhasedIntervalTrigger(seconds=60, phase_seconds=phase, jitter_seconds=5)
+    now = datetime.now(timezone.utc)
+    fire = trigger.get_next_fire_time(None, now)
+    for _ in range(50):
+        offset = (fire.timestamp() - phase) % 60
+        assert offset < 5 + 1e-3  # always within the jitter window of the slot
+        previous = fire
+        fire = trigger.get_next_fire_time(previous, previous)
+        assert 55 - 1e-3 <= (fire - previous).total_seconds() <= 65 + 1e-3
+
+
+@allure.feature("Scheduler")
+@allure.story("Endpoint changes reschedule only the affected job")
+@allure.severity(allure.severity_level.CRITICAL)
+@allure.title("schedule_endpoint / unschedule_endpoint update a single job")
+@pytest.mark.asyncio
+async def test_incremental_job_registration(monkeypatch):
+    monkeypatch.setattr(settings, "SCHEDULER_ENABLED", True)
+    scheduler = MonitorScheduler()
+    scheduler.startup()
+    try:
+        eid = uuid.uuid4()
+        assert scheduler.schedule_endpoint(eid, "Orders", 300) == "added"
+        assert scheduler.schedule_endpoint(eid, "Orders", 300) == "unchanged"
+        assert scheduler.schedule_endpoint(eid, "Orders v2", 60) == "updated"
+
+        jobs = scheduler.get_status()["jobs"]
+        assert len(jobs) == 1
+        assert jobs[0]["id"] == f"monitor_{eid}"
+        assert jobs[0]["name"] == "Monitor: Orders v2"
+        assert jobs[0]["interval_seconds"] == 60
+
+        assert scheduler.unschedule_endpoint(eid) is True
+        assert scheduler.unschedule_endpoint(eid) is False
+        assert scheduler.get_status()["job_count"] == 0
+    finally:
+        await scheduler.shutdown()
+
+
+@allure.feature("Scheduler")
+@allure.story("Endpoint CRUD works while the scheduler is disabled")
+@allure.severity(allure.severity_level.NORMAL)
+@allure.title("Create, update and delete endpoint with no running scheduler")
+@pytest.mark.asyncio
+async def test_endpoint_crud_without_scheduler(client, owner_headers):
+    response = await client.post(
+        "/api/v1/endpoints/", json=endpoint_payload(), headers=owner_headers
+    )
+    assert response.status_code == 201
+    endpoint_id = response.json()["id"]
+
+    response = await client.patch(
+        f"/api/v1/endpoints/{endpoint_id}",
+        json={"monitoring_interval_seconds": 120},
+        headers=owner_headers,
+    )
+    assert response.status_code == 200
+
+    response = await client.delete(f"/api/v1/endpoints/{endpoint_id}", headers=owner_headers)
+    assert response.status_code == 204
+
+
+@allure.feature("Scheduler")
+@allure.story("Adaptive intervals follow risk and incident state")
+@allure.severity(allure.severity_level.NORMAL)
+@allure.title("AdaptiveState backs off while LOW and snaps to min on HIGH")
+def test_adaptive_state_transitions(monkeypatch):
+    monkeypatch.setattr(settings, "SCHEDULER_ADAPTIVE_HEALTHY_RUNS", 2)
+    monkeypatch.setattr(settings, "SCHEDULER_ADAPTIVE_BACKOFF_FACTOR", 2.0)
+    bounds = IntervalBounds.for_endpoint(60, min_interval=15, max_interval=300)
+    state = AdaptiveState.initial(bounds)
+
+    # Bounded exponential back-off while healthy: 60 → 120 → 240 → 300 (cap)
+    seen = [state.observe("LOW", False) for _ in range(8)]
+    assert seen == [60, 120, 120, 240, 240, 300, 300, 300]
+
+    # Failure or open incident → fastest interval immediately
+    assert state.observe("CRITICAL", False) == 15
+    assert state.observe("LOW", True) == 15
+    # Recovery returns to the base interval before backing off again
+    assert state.observe("LOW", False) == 60
+    assert state.observe("MEDIUM", False) == 60
+
+
+@allure.feature("Scheduler")
+@allure.story("Adaptive mode reschedules the endpoint job")
+@allure.severity(allure.severity_level.NORMAL)
+@allure.title("observe_run tightens the job interval on HIGH risk")
+@pytest.mark.asyncio
+async def test_observe_run_reschedules_job(monkeypatch):
+    monkeypatch.setattr(settings, "SCHEDULER_ENABLED", True)
+    monkeypatch.setattr(settings, "SCHEDULER_ADAPTIVE_ENABLED", True)
+    scheduler = MonitorScheduler()
+    scheduler.startup()
+    try:
+        eid = uuid.uuid4()
+        scheduler.schedule_endpoint(eid, "Payments", 120, min_interval_seconds=20)
+        assert scheduler.observe_run(eid, "HIGH", False) == 20
+
+        status = scheduler.get_status()
+        job = status["jobs"][0]
+        assert job["interval_seconds"] == 20
+        assert job["base_interval_seconds"] == 120
+        assert status["adaptive"]["tightened"] == 1
+
+        # A resync with unchanged config must not undo the adaptive interval.
+        assert scheduler.schedule_endpoint(eid, "Payments", 120, min_interval_seconds=20) == "unchanged"
+        assert scheduler.get_status()["jobs"][0]["interval_seconds"] == 20
+    finally:
+        await scheduler.shutdown()
+
+
+@allure.feature("Scheduler")
+@allure.story("A scheduled run holds one pooled connection")
+@allure.severity(allure.severity_level.CRITICAL)
+@allure.title("Pipeline + post-processing check out one connection and commit at most twice")
+@pytest.mark.asyncio
+async def test_scheduled_run_uses_one_connection(db_session, test_org, monkeypatch):
+    endpoint = ApiEndpoint(
+        organization_id=test_org.id, name="Pooled API",
+        url="https://api.example.com/health", monitoring_interval_seconds=3600,
+    )
+    db_session.add(endpoint)
+    await db_session.commit()
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(500, json={"error": "boom"})
+
+    runner = ApiRunner()
+    runner._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    checkouts = 0
+    commits = 0
+    alerted_after_commits: list[int] = []
+
+    def on_checkout(*args):  # noqa: ANN002
+        nonlocal checkouts
+        checkouts += 1
+
+    def on_commit(conn):  # noqa: ANN001
+        nonlocal commits
+        commits += 1
+
+    async def fake_alert(**kwargs):  # noqa: ANN003
+        alerted_after_commits.append(commits)
+        return {"alerted": False}
+
+    monkeypatch.setattr(jobs, "async_session_factory", TestSessionLocal)
+    monkeypatch.setattr(jobs, "api_runner", runner)
+    monkeypatch.setattr(jobs, "maybe_alert", fake_alert)
+    event.listen(test_engine.sync_engine.pool, "checkout", on_checkout)
+    event.listen(test_engine.sync_engine, "commit", on_commit)
+    try:
+        await jobs._run_pipeline(endpoint.id)
+    finally:
+        event.remove(test_engine.sync_engine.pool, "checkout", on_checkout)
+        event.remove(test_engine.sync_engine, "commit", on_commit)
+        await runner.shutdown()
+
+    assert checkouts == 1
+    assert 1 <= commits <= 2
+    assert alerted_after_commits == [commits]  # all data committed before alerting
+    # Post-processing still committed: the failure opened an incident.
+    incidents = await db_session.scalars(
+        select(Incident).where(Incident.endpoint_id == endpoint.id)
+    )
+    assert len(incidents.all()) == 1
+
+
+@allure.feature("Scheduler")
+@allure.story("A scheduled run holds one pooled connection")
+@allure.severity(allure.severity_level.CRITICAL)
+@allure.title("SLA breach and alert rule webhooks are sent after the commits, with no connection held")
+@pytest.mark.asyncio
+async def test_post_processing_alerts_sent_after_session(db_session, test_org, monkeypatch):
+    endpoint = ApiEndpoint(
+        organization_id=test_org.id, name="Breaching API",
+        url="https://api.example.com/health", monitoring_interval_seconds=3600,
+    )
+    db_session.add(endpoint)
+    await db_session.flush()
+    db_session.add(EndpointSLA(endpoint_id=endpoint.id, organization_id=test_org.id))
+    db_session.add(AlertRule(
+        endpoint_id=endpoint.id, organization_id=test_org.id, name="Any failure",
+        condition_type="FAILURE_COUNT", threshold=1, consecutive_count=1,
+    ))
+    await db_session.commit()
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(500, json={"error": "boom"})
+
+    runner = ApiRunner()
+    runner._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    in_use = commits = 0
+    sent: list[tuple[str, int, int]] = []
+
+    def on_checkout(*args):  # noqa: ANN002
+        nonlocal in_use
+        in_use += 1
+
+    def on_checkin(*args):  # noqa: ANN002
+        nonlocal in_use
+        in_use -= 1
+
+    def on_commit(conn):  # noqa: ANN001
+        nonlocal commits
+        commits += 1
+
+    async def send(payload):  # noqa: ANN001
+        sent.append((payload["event"], in_use, commits))
+        return True
+
+    monkeypatch.setattr(jobs, "async_session_factory", TestSessionLocal)
+    monkeypatch.setattr(jobs, "api_runner", runner)
+    monkeypatch.setattr(dispatcher, "_cooldown_tracker", {})
+    monkeypatch.setattr(webhook_client, "_client", object())
+    monkeypatch.setattr(webhook_client, "send", send)
+    event.listen(test_engine.sync_engine.pool, "checkout", on_checkout)
+    event.listen(test_engine.sync_engine.pool, "checkin", on_checkin)
+    event.listen(test_engine.sync_engine, "commit", on_commit)
+    try:
+        await jobs._run_pipeline(endpoint.id)
+    finally:
+        event.remove(test_engine.sync_engine.pool, "checkout", on_checkout)
+        event.remove(test_engine.sync_engine.pool, "checkin", on_checkin)
+        event.remove(test_engine.sync_engine, "commit", on_commit)
+        await runner.shutdown()
+
+    events = [name for name, _, _ in sent]
+    assert "sla_breach" in events and "alert_rule_triggered" in events
+    assert all(held == 0 and done == commits for _, held, done in sent)
+
+
+@allure.feature("Scheduler")
+@allure.story("A scheduled run holds one pooled connection")
+@allure.severity(allure.severity_level.CRITICAL)
+@allure.title("Waiting on the bulk writer holds no connection; async mode skips the wait")
+@pytest.mark.asyncio
+@pytest.mark.parametrize(("durability", "status", "waits"), [
+    ("sync", 200, True),
+    ("async", 500, True),
+    ("async", 200, False),
+])
+async def test_writer_wait_releases_connection(
+    db_session, test_org, monkeypatch, durability, status, waits
+):
+    endpoint = ApiEndpoint(
+        organization_id=test_org.id, name="Buffered API",
+        url="https://api.example.com/health", monitoring_interval_seconds=3600,
+    )
+    db_session.add(endpoint)
+    await db_session.commit()
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(status, json={"status": "ok"})
+
+    runner = ApiRunner()
+    runner._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    writer = ResultWriter(TestSessionLocal)
+    in_use = peak = 0
+    persisted_at_alert: list[bool] = []
+
+    def on_checkout(*args):  # noqa: ANN002
+        nonlocal in_use, peak
+        in_use += 1
+        peak = max(peak, in_use)
+
+    def on_checkin(*args):  # noqa: ANN002
+        nonlocal in_use
+        in_use -= 1
+
+    async def fake_alert(*, pipeline, **kwargs):  # noqa: ANN001, ANN003
+        persisted_at_alert.append(pipeline.persisted.done())
+        return {"alerted": False}
+
+    monkeypatch.setattr(settings, "RESULT_WRITER_ENABLED", True)
+    monkeypatch.setattr(settings, "RESULT_WRITER_DURABILITY", durability)
+    monkeypatch.setattr(jobs, "async_session_factory", TestSessionLocal)
+    monkeypatch.setattr(jobs, "api_runner", runner)
+    monkeypatch.setattr(jobs, "result_writer", writer)
+    monkeypatch.setattr(jobs, "maybe_alert", fake_alert)
+    event.listen(test_engine.sync_engine.pool, "checkout", on_checkout)
+    event.listen(test_engine.sync_engine.pool, "checkin", on_checkin)
+    try:
+        await jobs._run_pipeline(endpoint.id)
+    finally:
+        event.remove(test_engine.sync_engine.pool, "checkout", on_checkout)
+        event.remove(test_engine.sync_engine.pool, "checkin", on_checkin)
+        await writer.shutdown()
+        await runner.shutdown()
+
+    assert peak == 1  # the job's connection is back before the writer takes one
+    assert persisted_at_alert == [waits]
@@ -0,0 +1,144 @@
+"""Verdict cache tests -- TTL and LRU eviction, engine reuse and cache-hit telemetry."""
+import time
+import uuid
+
+import allure
+import httpx
+import pytest
+
+from app.ai.llm_client import CallTelemetry, LLMResult
+from app.models.ai_telemetry import OUTCOME_CACHE_HIT, OUTCOME_CALLED, AiTelemetryRecord
+from app.models.api_endpoint import ApiEndpoint
+from app.monitoring.anomaly_engine import AnomalyEngine, AnomalyResult
+from app.monitoring.api_runner import ApiRunner, RunnerConfig
+from app.monitoring.run_history import RunHistoryStore
+from app.monitoring.runner_service import RunnerService
+from app.monitoring.verdict_cache import VerdictCache, latency_bucket
+from app.repositories.ai_telemetry import AiTelemetryRepository
+
+pytestmark = [pytest.mark.regression]
+
+
+class FakeLLM:
+    """Available LLM client that counts calls and reports telemetry."""
+
+    available = True
+
+    def __init__(self) -> None:
+        self.calls = 0
+
+    async def analyse(
+        self, *, system_prompt: str, user_prompt: str, organization_id=None
+    ) -> LLMResult:
+        self.calls += 1
+        return LLMResult(
+            {
+                "anomaly_detected": True, "severity_score": 70, "confidence": 0.9,
+                "probable_cause": "Upstream outage",
+            },
+            CallTelemetry(
+                model_name="gpt-4o-mini", prompt_tokens=400, completion_tokens=100,
+                total_tokens=500, latency_ms=1200.0, success=True, cost_usd=0.0001,
+            ),
+        )
+
+
+def _run(**overrides) -> dict:
+    run = dict(
+        endpoint_name="Broken API", url="https://api.example.com", method="GET",
+        expected_status=200, actual_status=503, response_time_ms=130.0, is_success=False,
+        error_message=None, performance=None, drift=None, failure_rate_percent=50.0,
+    )
+    run.update(overrides)
+    return run
+
+
+@allure.feature("Verdict Cache")
+@allure.story("Cached verdicts are bounded")
+@allure.severity(allure.severity_level.NORMAL)
+@allure.title("Entries expire after the TTL and the least recently used is evicted")
+def test_ttl_and_lru(monkeypatch):
+    cache = VerdictCache(max_entries=2, ttl_seconds=60)
+    verdict = AnomalyResult(anomaly_detected=True, ai_called=True)
+    cache.put("a", verdict)
+    cache.put("b", verdict)
+    assert cache.get("a") is verdict  # "b" is now least recently used
+    cache.put("c", verdict)
+    assert cache.get("b") is None and len(cache) == 2
+
+    now = time.monotonic()
+    monkeypatch.setattr("app.monitoring.verdict_cache.time.monotonic", lambda: now + 61)
+    assert cache.get("a") is None
+    stats = cache.stats()
+    assert stats["evictions"] == 1 and stats["expired"] == 1 and stats["hits"] == 1
+
+    assert latency_bucket(130.0) == latency_bucket(250.0) != latency_bucket(260.0)
+    assert latency_bucket(None) == -1
+
+
+@allure.feature("Verdict Cache")
+@allure.story("Repeat failures reuse the LLM verdict")
+@allure.severity(allure.severity_level.CRITICAL)
+@allure.title("The same incident is answered from the cache; a different one calls the LLM")
+@pytest.mark.asyncio
+async def test_engine_reuses_verdict():
+    llm = FakeLLM()
+    engine = AnomalyEngine(llm, cache=VerdictCache())
+    endpoint_id = uuid.uuid4()
+
+    first = await engine.analyse(**_run(), endpoint_id=endpoint_id)
+    repeat = await engine.analyse(**_run(response_time_ms=250.0), endpoint_id=endpoint_id)
+    assert first.ai_called and not first.cache_hit
+    assert repeat.cache_hit and not repeat.ai_called
+    assert repeat.probable_cause == "Upstream outage"
+    assert llm.calls == 1
+
+    # Other status class, latency bucket or endpoint: a new incident.
+    await engine.analyse(**_run(actual_status=404), endpoint_id=endpoint_id)
+    await engine.analyse(**_run(response_time_ms=900.0), endpoint_id=endpoint_id)
+    await engine.analyse(**_run(), endpoint_id=uuid.uuid4())
+    await engine.analyse(**_run())  # no endpoint id → never cached
+    assert llm.calls == 5
+
+
+@allure.feature("Verdict Cache")
+@allure.story("Cache hits are counted in AI telemetry")
+@allure.severity(allure.severity_level.CRITICAL)
+@allure.title("A repeat failure writes a cache-hit row instead of calling the LLM")
+@pytest.mark.asyncio
+async def test_pipeline_records_cache_hit(db_session, test_org):
+    endpoint = ApiEndpoint(
+        organization_id=test_org.id, name="Broken API",
+        url="https://api.example.com/health", monitoring_interval_seconds=3600,
+    )
+    db_session.add(endpoint)
+    await db_session.commit()
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(503, json={"error": "unavailable"})
+
+    llm = FakeLLM()
+    runner = ApiRunner()
+    runner._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    service = RunnerService(
+        session=db_session, runner=runner, config=RunnerConfig(max_retries=1),
+        anomaly_engine=AnomalyEngine(llm, cache=VerdictCache()), history=RunHistoryStore(),
+    )
+    try:
+        first = await service.execute_endpoint(endpoint.id)
+        second = await service.execute_endpoint(endpoint.id)
+    finally:
+        await runner.shutdown()
+
+    assert first.anomaly.ai_called and second.anomaly.cache_hit
+    assert llm.calls == 1
+    assert second.risk.ai_score == first.risk.ai_score > 0
+
+    rows = (await db_session.execute(
+        AiTelemetryRecord.__table__.select().where(AiTelemetryRecord.endpoint_id == endpoint.id)
+    )).all()
+    assert sorted(r.outcome for r in rows) == [OUTCOME_CACHE_HIT, OUTCOME_CALLED]
+
+    stats = await AiTelemetryRepository(db_session).get_stats(test_org.id)
+    assert stats["total_calls"] == 1 and stats["total_tokens"] == 500
+    assert stats["calls_avoided"] == 1 and stats["cache_hits"] == 1